@@ -325,6 +325,7 @@ void v_set_host(int);
 
 void v_sg_set_tempo(t_sg_seq_event_list*, SGFLT, t_sg_seq_event*);
 void v_ui_send(char * a_path, char * a_msg);
+void v_ui_send_job_finished(SGPATHSTR * a_job_id);
 void v_default_mix();
 
 void v_sg_set_playback_pos(
@@ -4,6 +4,8 @@
 #define IPC_MAX_MESSAGE_SIZE 60000
 #define IPC_ENGINE_SERVER_PORT 31999
 #define IPC_UI_SERVER_PORT 31909
+// Many messages packed into one datagram, see ipc_handle_message()
+#define IPC_BATCH_HEADER "/clinttools/batch\n\n"
 
 struct IpcServerThreadArgs{
     int (*callback)(char*, char*, char*);
@@ -19,9 +21,16 @@ struct UIMessage{
 struct EngineMessage{
     char path[128];
     char key[64];
-    char value[IPC_MAX_MESSAGE_SIZE];
+    // Points into the decoded message, so that its size is not limited
+    char* value;
 };
 
+// Set by the --ipc-socket argument.  If not empty, the engine and UI
+// communicate over Linux abstract namespace SOCK_SEQPACKET sockets named
+// "{name}-engine" and "{name}-ui" instead of UDP on localhost
+#define IPC_SOCKET_NAME_SIZE 96
+extern char IPC_SOCKET_NAME[IPC_SOCKET_NAME_SIZE];
+
 void ui_message_init(
     struct UIMessage* ui_msg,
     char* path,
@@ -35,6 +44,11 @@ void encode_ui_message(
     struct UIMessage* self,
     char* data
 );
+void ipc_handle_message(
+    struct EngineMessage* engine_message,
+    int (*callback)(char*, char*, char*),
+    char* message
+);
 
 // Send an IPC message to the UI
 void ipc_client_send(char* message);
@@ -0,0 +1,82 @@
+#ifndef SG_IPC_SHM_H
+#define SG_IPC_SHM_H
+
+#include <stdint.h>
+
+#include "compiler.h"
+
+/* A ring buffer of fixed size binary frames in a memory mapped file, for
+ * the streams that the engine sends to the UI many times per second:
+ * peak meters, the playback cursor and spectrum analyzers.  The UI reads
+ * the file directly instead of parsing text messages sent over the socket.
+ *
+ * Any thread may write frames without locking.  A writer reserves the
+ * next frame with an atomic increment of reserved_index, sets the frame's
+ * seq to 0, writes the frame, then sets seq to the frame index + 1 and
+ * advances write_index.  The reader copies a frame and checks that seq
+ * did not change while copying.  Frames that the reader is too slow to
+ * read are overwritten, the streams only need the latest values.
+ *
+ * The layout must match sglib/ipc/shm.py
+ */
+
+// "SGRB"
+#define IPC_SHM_MAGIC 0x42524753
+#define IPC_SHM_VERSION 1
+#define IPC_SHM_FRAME_COUNT 64
+// The largest frame, the spectrum analyzer's FFT size / 2
+#define IPC_SHM_MAX_VALUES 2048
+#define IPC_SHM_FILE_NAME "ui_stream.shm"
+
+// Frame types
+// id: 0, values: track number, left, right for each track
+#define IPC_SHM_PEAK 1
+// id: 0, values: The current beat
+#define IPC_SHM_POSITION 2
+// id: The plugin uid, values: The magnitude of each FFT bin
+#define IPC_SHM_SPECTRUM 3
+
+struct IpcShmHeader{
+    uint32_t magic;
+    uint32_t version;
+    uint32_t frame_count;
+    uint32_t max_values;
+    // The index of the next frame that a writer will reserve
+    uint32_t reserved_index;
+    // Every frame before this index was published
+    uint32_t write_index;
+    uint32_t padding[10];
+};
+
+struct IpcShmFrame{
+    // The frame index + 1 once published, 0 while being written
+    uint32_t seq;
+    uint32_t type;
+    int32_t id;
+    uint32_t count;
+    float values[IPC_SHM_MAX_VALUES];
+};
+
+/* Create the ring buffer file in a folder and map it
+ * Returns 1 on success, 0 if shared memory is not available, in which case
+ * the streams are sent over the socket
+ */
+int ipc_shm_open(SGPATHSTR* a_folder);
+void ipc_shm_close();
+// Returns 1 if the ring buffer is open
+int ipc_shm_is_open();
+/* Reserve a frame to write values to, or NULL if the ring buffer is not
+ * open.  Pass the frame and a_seq to ipc_shm_publish when finished
+ */
+struct IpcShmFrame* ipc_shm_reserve(
+    uint32_t a_type,
+    int32_t a_id,
+    uint32_t* a_seq
+);
+void ipc_shm_publish(
+    struct IpcShmFrame* a_frame,
+    uint32_t a_seq,
+    uint32_t a_count
+);
+
+#endif
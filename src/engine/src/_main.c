@@ -39,6 +39,7 @@ GNU General Public License for more details.
 #include "files.h"
 #include "globals.h"
 #include "ipc.h"
+#include "ipc_shm.h"
 #include "plugin.h"
 #include "hardware/audio.h"
 #include "hardware/config.h"
@@ -113,13 +114,17 @@ void print_help(){
     printf(
         "%s-engine install_prefix project_dir ui_pid "
         "huge_pages frames_per_second worker_threds "
-        "[--sleep --no-hardware]\n",
+        "[--sleep --no-hardware --ipc-socket name]\n",
         CLINTTOOLS_VERSION
     );
     printf(
         "--no-hardware: Do not use audio or MIDI hardware, for debugging\n"
     );
-    printf("--sleep: Sleep for 1ms between loops.  Implies --no-hardware\n\n");
+    printf("--sleep: Sleep for 1ms between loops.  Implies --no-hardware\n");
+    printf(
+        "--ipc-socket: Linux only, communicate with the UI over the abstract "
+        "unix sockets name-engine and name-ui instead of UDP\n\n"
+    );
     printf("Offline render:\n");
     printf(
         "%s daw [project_dir] [output_file] [start_beat] "
@@ -243,6 +248,17 @@ int _main(int argc, SGPATHSTR** argv){
                 NO_HARDWARE = 1;
             } else if(!strcmp(argv[j], "--single-thread")){
                 SINGLE_THREAD = 1;
+#if SG_OS == _OS_LINUX
+            } else if(!strcmp(argv[j], "--ipc-socket") && j + 1 < argc){
+                ++j;
+                sg_assert(
+                    strlen(argv[j]) < IPC_SOCKET_NAME_SIZE - 8,
+                    "--ipc-socket name is too long: %s",
+                    argv[j]
+                );
+                strcpy(IPC_SOCKET_NAME, argv[j]);
+                log_info("Using unix socket IPC: %s", IPC_SOCKET_NAME);
+#endif
             } else {
                 print_help();
                 log_error("Invalid argument [%i] %s", j, argv[j]);
@@ -587,6 +603,7 @@ void stop_engine(){
     v_destructor();
 
     destruct_signal_handling();
+    ipc_shm_close();
     ipc_dtor();
 }
 
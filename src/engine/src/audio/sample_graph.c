@@ -27,6 +27,7 @@ void v_create_sample_graph(t_audio_pool_item * self){
 #else
         log_info("%s exists, not creating sample graph", path_buff);
 #endif
+        v_ui_send_job_finished(path_buff);
         return;
     }
 
@@ -152,22 +153,6 @@ void v_create_sample_graph(t_audio_pool_item * self){
 
     fclose(f_sg);
 
-    sg_path_snprintf(
-        path_buff,
-        2048,
-#if SG_OS == _OS_WINDOWS
-        L"%ls/%i.finished",
-#else
-        "%s/%i.finished",
-#endif
-        STARGATE->samplegraph_folder,
-        self->uid
-    );
-#if SG_OS == _OS_WINDOWS
-    FILE * f_finished = _wfopen(path_buff, L"w");
-#else
-    FILE * f_finished = fopen(path_buff, "w");
-#endif
-    fclose(f_finished);
+    v_ui_send_job_finished(path_buff);
 }
 
@@ -3,6 +3,7 @@
 #include "audiodsp/lib/interpolate-cubic.h"
 #include "audiodsp/lib/pitch_core.h"
 #include "audio/util.h"
+#include "clinttools.h"
 #include "compiler.h"
 
 
@@ -112,23 +113,7 @@ void v_rate_envelope(
 
     sf_close(f_sndfile);
 
-    SGPATHSTR f_tmp_finished[2048];
-    sg_path_snprintf(
-        f_tmp_finished, 
-        2048, 
-#if SG_OS == _OS_WINDOWS
-        L"%ls.finished", 
-#else
-        "%s.finished", 
-#endif
-        a_file_out
-    );
-#if SG_OS == _OS_WINDOWS
-    FILE * f_finished = _wfopen(f_tmp_finished, L"w");
-#else
-    FILE * f_finished = fopen(f_tmp_finished, "w");
-#endif
-    fclose(f_finished);
+    v_ui_send_job_finished(a_file_out);
     free(f_output);
     free(f_buffer0);
     if(f_buffer1)
@@ -258,23 +243,7 @@ void v_pitch_envelope(
 
     sf_close(f_sndfile);
 
-    SGPATHSTR f_tmp_finished[2048];
-    sg_path_snprintf(
-        f_tmp_finished, 
-        2048, 
-#if SG_OS == _OS_WINDOWS
-        L"%ls.finished", 
-#else
-        "%s.finished", 
-#endif
-        a_file_out
-    );
-#if SG_OS == _OS_WINDOWS
-    FILE * f_finished = _wfopen(f_tmp_finished, L"w");
-#else
-    FILE * f_finished = fopen(f_tmp_finished, "w");
-#endif
-    fclose(f_finished);
+    v_ui_send_job_finished(a_file_out);
     free(f_output);
     free(f_buffer0);
     if(f_buffer1)
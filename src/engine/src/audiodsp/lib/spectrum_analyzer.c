@@ -9,6 +9,7 @@
 #include "audiodsp/lib/fftw_lock.h"
 #include "audiodsp/lib/lmalloc.h"
 #include "audiodsp/lib/spectrum_analyzer.h"
+#include "ipc_shm.h"
 
 t_spa_spectrum_analyzer * g_spa_spectrum_analyzer_get(
     int a_sample_count,
@@ -81,6 +82,8 @@ void v_spa_compute_fft(t_spa_spectrum_analyzer *a_spa){
     int f_i;
     char* buf;
     int bytes_written;
+    uint32_t seq;
+    struct IpcShmFrame* frame;
 
 #ifdef SG_USE_DOUBLE
     fftw_execute(a_spa->plan);
@@ -88,6 +91,22 @@ void v_spa_compute_fft(t_spa_spectrum_analyzer *a_spa){
     fftwf_execute(a_spa->plan);
 #endif
 
+    frame = ipc_shm_reserve(IPC_SHM_SPECTRUM, a_spa->plugin_uid, &seq);
+    if(frame){
+        // str_buf stays empty, there is nothing to send over the socket
+        int count = a_spa->samples_count_div2 < IPC_SHM_MAX_VALUES ?
+            a_spa->samples_count_div2 : IPC_SHM_MAX_VALUES;
+        for(f_i = 0; f_i < count; ++f_i){
+#ifdef SG_USE_DOUBLE
+            frame->values[f_i] = (float)cabs(a_spa->output[f_i]);
+#else
+            frame->values[f_i] = cabsf(a_spa->output[f_i]);
+#endif
+        }
+        ipc_shm_publish(frame, seq, count);
+        return;
+    }
+
     bytes_written = sprintf(
         a_spa->str_buf,
         "%i|spectrum",
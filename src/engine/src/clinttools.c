@@ -35,6 +35,9 @@ t_clinttools * CLINTTOOLS = NULL;
 int ZERO = 0;
 
 
+// The client socket is shared by the OSC thread and the IPC server thread
+static pthread_mutex_t UI_SEND_MUTEX = PTHREAD_MUTEX_INITIALIZER;
+
 void v_ui_send(char * a_path, char * a_msg){
     int msg_len = strlen(a_path) + strlen(a_msg);
     sg_assert(
@@ -45,7 +48,28 @@ void v_ui_send(char * a_path, char * a_msg){
     );
     char msg[60000];
     sg_snprintf(msg, 60000, "%s\n%s", a_path, a_msg);
+    pthread_mutex_lock(&UI_SEND_MUTEX);
     ipc_client_send(msg);
+    pthread_mutex_unlock(&UI_SEND_MUTEX);
+}
+
+/* Notify the UI that a job it requested has finished.  The job id is the
+ * path of the file that the job created, the UI waits for it instead of
+ * polling for a .finished file
+ */
+void v_ui_send_job_finished(SGPATHSTR * a_job_id){
+#if SG_OS == _OS_WINDOWS
+    char utf8_buff[2048];
+    utf16_to_utf8(
+        a_job_id,
+        wcslen(a_job_id),
+        (utf8_t*)utf8_buff,
+        2048
+    );
+    v_ui_send("clinttools/jobs", utf8_buff);
+#else
+    v_ui_send("clinttools/jobs", a_job_id);
+#endif
 }
 
 /* default generic t_sg_host->mix function pointer */
@@ -9,6 +9,7 @@
 #include "daw/config.h"
 #include "files.h"
 #include "globals.h"
+#include "ipc_shm.h"
 #include "osc.h"
 
 
@@ -319,12 +320,52 @@ void v_daw_configure(const char* a_key, const char* a_value){
     pthread_mutex_unlock(&CONFIG_LOCK);
 }
 
-void v_daw_osc_send(t_osc_send_data * a_buffers){
+/* Write the peak meters and playback cursor to the shared memory ring
+ * buffer instead of sending them as text
+ */
+static void v_daw_shm_send(){
     int f_i;
+    uint32_t f_count = 0;
+    uint32_t seq;
     t_pkm_peak_meter * f_pkm;
+    struct IpcShmFrame* frame = ipc_shm_reserve(IPC_SHM_PEAK, 0, &seq);
 
-    a_buffers->f_tmp1[0] = '\0';
-    a_buffers->f_tmp2[0] = '\0';
+    if(!frame){
+        return;
+    }
+    for(f_i = 0; f_i < DN_TRACK_COUNT; ++f_i){
+        f_pkm = DAW->track_pool[f_i]->peak_meter;
+        // The main track is always sent, the others only if they have
+        // ran since last v_pkm_reset()
+        if(f_i == 0 || !f_pkm->dirty){
+            frame->values[f_count] = (float)f_i;
+            frame->values[f_count + 1] = (float)f_pkm->value[0];
+            frame->values[f_count + 2] = (float)f_pkm->value[1];
+            f_count += 3;
+            v_pkm_reset(f_pkm);
+        }
+    }
+    ipc_shm_publish(frame, seq, f_count);
+
+    if(
+        CLINTTOOLS->playback_mode > 0
+        &&
+        !CLINTTOOLS->is_offline_rendering
+    ){
+        frame = ipc_shm_reserve(IPC_SHM_POSITION, 0, &seq);
+        if(frame){
+            frame->values[0] = (float)DAW->ts[0].ml_current_beat;
+            ipc_shm_publish(frame, seq, 1);
+        }
+    }
+}
+
+/* Queue the peak meters and playback cursor as text messages, when the
+ * shared memory ring buffer is not available
+ */
+static void v_daw_text_send(t_osc_send_data * a_buffers){
+    int f_i;
+    t_pkm_peak_meter * f_pkm;
 
     f_pkm = DAW->track_pool[0]->peak_meter;
     sg_snprintf(
@@ -371,6 +412,19 @@ void v_daw_osc_send(t_osc_send_data * a_buffers){
         );
         v_queue_osc_message("cur", a_buffers->f_msg);
     }
+}
+
+void v_daw_osc_send(t_osc_send_data * a_buffers){
+    int f_i;
+
+    a_buffers->f_tmp1[0] = '\0';
+    a_buffers->f_tmp2[0] = '\0';
+
+    if(ipc_shm_is_open()){
+        v_daw_shm_send();
+    } else {
+        v_daw_text_send(a_buffers);
+    }
 
     if(CLINTTOOLS->osc_queue_index > 0){
         for(f_i = 0; f_i < CLINTTOOLS->osc_queue_index; ++f_i){
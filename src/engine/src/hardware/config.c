@@ -212,6 +212,10 @@ NO_OPTIMIZATION struct HardwareConfig* load_hardware_config(
             );
 
             v_free_split_line(f_line);
+        } else if(!strcmp(f_key_char, "ipcTransport")){
+            // The UI passes --ipc-socket to the engine, it needs a name
+            // that is unique to the UI process
+            log_info("ipcTransport: %s", f_value_char);
         } else {
             log_warn(
                 "Unknown key|value pair: %s|%s",
@@ -1,8 +1,11 @@
 #include <stdio.h>
 #include <string.h>
 
+#include <stdlib.h>
+
 #include "compiler.h"
 #include "ipc.h"
+#include "log.h"
 
 
 void ui_message_init(
@@ -34,6 +37,11 @@ void ui_message_init(
     );
 }
 
+char IPC_SOCKET_NAME[IPC_SOCKET_NAME_SIZE] = "";
+
+/* Decode "{path}\n{key}\n{value}".  The value may contain newlines, and
+ * is not copied, self->value points into message
+ */
 void decode_engine_message(
     struct EngineMessage* self,
     char* message
@@ -42,21 +50,26 @@ void decode_engine_message(
     int j = 0;
     int stage = 0;
     char* current = self->path;
+    int size = sizeof(self->path);
     while(1){
         if(message[i] == '\0'){
             current[j] = '\0';
+            // Fewer than 2 newlines, there is no value
+            self->value = message + i;
             break;
-        } else if(stage < 2 && message[i] == '\n'){
+        } else if(message[i] == '\n'){
             current[j] = '\0';
             j = 0;
             ++stage;
 
             if(stage == 1){
                 current = self->key;
-            } else if(stage == 2) {
-                current = self->value;
+                size = sizeof(self->key);
+            } else {
+                self->value = message + i + 1;
+                break;
             }
-        } else {
+        } else if(j < size - 1){
             current[j] = message[i];
             ++j;
         }
@@ -76,3 +89,57 @@ void encode_ui_message(
         self->value
     );
 }
+
+/* Decode a message from the UI and pass it to the callback.  A batch
+ * message is IPC_BATCH_HEADER followed by "{length}\n{message}" for each
+ * message, where length is the length of the message in bytes
+ */
+void ipc_handle_message(
+    struct EngineMessage* engine_message,
+    int (*callback)(char*, char*, char*),
+    char* message
+){
+    size_t header_len = strlen(IPC_BATCH_HEADER);
+    if(strncmp(message, IPC_BATCH_HEADER, header_len)){
+        decode_engine_message(engine_message, message);
+        callback(
+            engine_message->path,
+            engine_message->key,
+            engine_message->value
+        );
+        return;
+    }
+
+    char* pos = message + header_len;
+    char* message_end = message + strlen(message);
+    char* end;
+    long length;
+    char tmp;
+
+    while(pos < message_end){
+        length = strtol(pos, &end, 10);
+        if(
+            end == pos
+            ||
+            *end != '\n'
+            ||
+            length < 0
+            ||
+            length > message_end - (end + 1)
+        ){
+            log_error("Invalid batch message at offset %li", pos - message);
+            return;
+        }
+        pos = end + 1;
+        tmp = pos[length];
+        pos[length] = '\0';
+        decode_engine_message(engine_message, pos);
+        callback(
+            engine_message->path,
+            engine_message->key,
+            engine_message->value
+        );
+        pos[length] = tmp;
+        pos += length;
+    }
+}
@@ -0,0 +1,219 @@
+#include <stdio.h>
+#include <string.h>
+
+#include "compiler.h"
+#include "ipc_shm.h"
+#include "log.h"
+
+#if SG_OS != _OS_WINDOWS
+    #include <fcntl.h>
+    #include <sys/mman.h>
+    #include <sys/stat.h>
+    #include <unistd.h>
+#endif
+
+#define IPC_SHM_SIZE ( \
+    sizeof(struct IpcShmHeader) \
+    + (sizeof(struct IpcShmFrame) * IPC_SHM_FRAME_COUNT) \
+)
+
+static struct IpcShmHeader* SHM_HEADER = NULL;
+static struct IpcShmFrame* SHM_FRAMES = NULL;
+#if SG_OS == _OS_WINDOWS
+static HANDLE SHM_FILE = INVALID_HANDLE_VALUE;
+static HANDLE SHM_MAPPING = NULL;
+#endif
+
+static void* _ipc_shm_map(SGPATHSTR* a_path){
+#if SG_OS == _OS_WINDOWS
+    SHM_FILE = CreateFileW(
+        a_path,
+        GENERIC_READ | GENERIC_WRITE,
+        FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+        NULL,
+        // Not CREATE_ALWAYS, the UI may still map the file from a previous
+        // run of the engine
+        OPEN_ALWAYS,
+        FILE_ATTRIBUTE_TEMPORARY,
+        NULL
+    );
+    if(SHM_FILE == INVALID_HANDLE_VALUE){
+        log_error("CreateFileW(%ls) failed: %lu", a_path, GetLastError());
+        return NULL;
+    }
+    SHM_MAPPING = CreateFileMappingW(
+        SHM_FILE,
+        NULL,
+        PAGE_READWRITE,
+        0,
+        (DWORD)IPC_SHM_SIZE,
+        NULL
+    );
+    if(!SHM_MAPPING){
+        log_error("CreateFileMappingW failed: %lu", GetLastError());
+        CloseHandle(SHM_FILE);
+        SHM_FILE = INVALID_HANDLE_VALUE;
+        return NULL;
+    }
+    void* result = MapViewOfFile(
+        SHM_MAPPING,
+        FILE_MAP_ALL_ACCESS,
+        0,
+        0,
+        IPC_SHM_SIZE
+    );
+    if(!result){
+        log_error("MapViewOfFile failed: %lu", GetLastError());
+        CloseHandle(SHM_MAPPING);
+        CloseHandle(SHM_FILE);
+        SHM_MAPPING = NULL;
+        SHM_FILE = INVALID_HANDLE_VALUE;
+    }
+    return result;
+#else
+    // Not O_TRUNC, the UI may still map the file from a previous run of the
+    // engine, and reading past the end of a truncated file raises SIGBUS
+    int fd = open(a_path, O_RDWR | O_CREAT, 0644);
+    if(fd < 0){
+        log_error("open(%s) failed", a_path);
+        return NULL;
+    }
+    if(ftruncate(fd, IPC_SHM_SIZE) != 0){
+        log_error("ftruncate(%s) failed", a_path);
+        close(fd);
+        return NULL;
+    }
+    void* result = mmap(
+        NULL,
+        IPC_SHM_SIZE,
+        PROT_READ | PROT_WRITE,
+        MAP_SHARED,
+        fd,
+        0
+    );
+    // The mapping keeps the file open
+    close(fd);
+    if(result == MAP_FAILED){
+        log_error("mmap(%s) failed", a_path);
+        return NULL;
+    }
+    return result;
+#endif
+}
+
+int ipc_shm_open(SGPATHSTR* a_folder){
+    SGPATHSTR path[2048];
+    if(SHM_HEADER){
+        return 1;
+    }
+    sg_path_snprintf(
+        path,
+        2048,
+#if SG_OS == _OS_WINDOWS
+        L"%ls/%s",
+#else
+        "%s/%s",
+#endif
+        a_folder,
+        IPC_SHM_FILE_NAME
+    );
+    char* data = (char*)_ipc_shm_map(path);
+    if(!data){
+        log_error("Shared memory not available, using sockets");
+        return 0;
+    }
+    memset(data, 0, IPC_SHM_SIZE);
+    struct IpcShmHeader* header = (struct IpcShmHeader*)data;
+    header->version = IPC_SHM_VERSION;
+    header->frame_count = IPC_SHM_FRAME_COUNT;
+    header->max_values = IPC_SHM_MAX_VALUES;
+    // Written last, the UI ignores the file until the header is complete
+    __atomic_store_n(&header->magic, IPC_SHM_MAGIC, __ATOMIC_RELEASE);
+    SHM_FRAMES = (struct IpcShmFrame*)(data + sizeof(struct IpcShmHeader));
+    __atomic_store_n(&SHM_HEADER, header, __ATOMIC_RELEASE);
+    return 1;
+}
+
+void ipc_shm_close(){
+    struct IpcShmHeader* header = __atomic_exchange_n(
+        &SHM_HEADER,
+        NULL,
+        __ATOMIC_ACQ_REL
+    );
+    if(!header){
+        return;
+    }
+#if SG_OS == _OS_WINDOWS
+    UnmapViewOfFile(header);
+    CloseHandle(SHM_MAPPING);
+    CloseHandle(SHM_FILE);
+    SHM_MAPPING = NULL;
+    SHM_FILE = INVALID_HANDLE_VALUE;
+#else
+    munmap(header, IPC_SHM_SIZE);
+#endif
+    SHM_FRAMES = NULL;
+}
+
+int ipc_shm_is_open(){
+    return __atomic_load_n(&SHM_HEADER, __ATOMIC_ACQUIRE) != NULL;
+}
+
+struct IpcShmFrame* ipc_shm_reserve(
+    uint32_t a_type,
+    int32_t a_id,
+    uint32_t* a_seq
+){
+    struct IpcShmHeader* header = __atomic_load_n(
+        &SHM_HEADER,
+        __ATOMIC_ACQUIRE
+    );
+    if(!header){
+        return NULL;
+    }
+    uint32_t index = __atomic_fetch_add(
+        &header->reserved_index,
+        1,
+        __ATOMIC_RELAXED
+    );
+    struct IpcShmFrame* frame = &SHM_FRAMES[index % IPC_SHM_FRAME_COUNT];
+    __atomic_store_n(&frame->seq, 0, __ATOMIC_RELEASE);
+    // The reader must not see the old values with the new seq
+    __atomic_thread_fence(__ATOMIC_RELEASE);
+    frame->type = a_type;
+    frame->id = a_id;
+    frame->count = 0;
+    *a_seq = index + 1;
+    return frame;
+}
+
+void ipc_shm_publish(
+    struct IpcShmFrame* a_frame,
+    uint32_t a_seq,
+    uint32_t a_count
+){
+    struct IpcShmHeader* header = SHM_HEADER;
+    sg_assert(
+        a_count <= IPC_SHM_MAX_VALUES,
+        "ipc_shm_publish: %u > %i",
+        a_count,
+        IPC_SHM_MAX_VALUES
+    );
+    a_frame->count = a_count;
+    __atomic_store_n(&a_frame->seq, a_seq, __ATOMIC_RELEASE);
+    uint32_t current = __atomic_load_n(&header->write_index, __ATOMIC_RELAXED);
+    // Another writer may have published a later frame first, the index
+    // only moves forward.  The indices wrap around, compare the distance
+    while(
+        (int32_t)(a_seq - current) > 0
+        &&
+        !__atomic_compare_exchange_n(
+            &header->write_index,
+            &current,
+            a_seq,
+            1,
+            __ATOMIC_RELEASE,
+            __ATOMIC_RELAXED
+        )
+    ){}
+}
@@ -3,13 +3,17 @@
 #if SG_OS != _OS_WINDOWS
 
 #include <arpa/inet.h>
+#include <errno.h>
 #include <netinet/in.h>
+#include <poll.h>
+#include <stddef.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <sys/socket.h>
 #include <sys/time.h>
 #include <sys/types.h>
+#include <sys/un.h>
 #include <unistd.h>
 
 #include "globals.h"
@@ -23,9 +27,14 @@ struct SocketData{
     int sockfd;
     struct sockaddr_in servaddr;
     socklen_t len;
+    // The connection to the UI when using IPC_SOCKET_NAME, or -1
+    int unix_fd;
 };
 
-static struct SocketData SOCKET_DATA;
+static struct SocketData SOCKET_DATA = {
+    .sockfd = -1,
+    .unix_fd = -1,
+};
 
 void _set_buf_size(int sockfd){
     int bufsize = 500000;
@@ -53,7 +62,140 @@ void _set_buf_size(int sockfd){
     }
 }
 
+#if SG_OS == _OS_LINUX
+/* Fill in the address of the abstract namespace socket "{name}{suffix}".
+ * Abstract sockets have no file, and are removed when closed
+ */
+static socklen_t _unix_addr(struct sockaddr_un* addr, char* suffix){
+    memset(addr, 0, sizeof(struct sockaddr_un));
+    addr->sun_family = AF_UNIX;
+    // sun_path[0] == '\0' for the abstract namespace
+    int length = snprintf(
+        addr->sun_path + 1,
+        sizeof(addr->sun_path) - 1,
+        "%s%s",
+        IPC_SOCKET_NAME,
+        suffix
+    );
+    return (socklen_t)(offsetof(struct sockaddr_un, sun_path) + 1 + length);
+}
+
+static int _unix_connect(){
+    struct sockaddr_un addr;
+    socklen_t len = _unix_addr(&addr, "-ui");
+    int fd = socket(AF_UNIX, SOCK_SEQPACKET | SOCK_CLOEXEC, 0);
+    if(fd < 0){
+        log_error("Could not create unix socket: %i", errno);
+        return -1;
+    }
+    _set_buf_size(fd);
+    // The UI creates its socket before starting the engine, retry briefly
+    // in case it is still starting
+    for(int i = 0; i < 50; ++i){
+        if(connect(fd, (struct sockaddr*)&addr, len) == 0){
+            return fd;
+        }
+        usleep(10000);
+    }
+    log_error("Could not connect to UI socket %s-ui: %i", IPC_SOCKET_NAME, errno);
+    close(fd);
+    return -1;
+}
+
+static void _unix_client_send(char* message){
+    if(SOCKET_DATA.unix_fd < 0){
+        SOCKET_DATA.unix_fd = _unix_connect();
+        if(SOCKET_DATA.unix_fd < 0){
+            return;
+        }
+    }
+    if(
+        send(
+            SOCKET_DATA.unix_fd,
+            message,
+            strlen(message),
+            MSG_NOSIGNAL
+        ) < 0
+    ){
+        log_error("Unix socket send failed: %i, reconnecting", errno);
+        close(SOCKET_DATA.unix_fd);
+        SOCKET_DATA.unix_fd = -1;
+    }
+}
+
+/* Receive messages from one UI connection until it closes.  There is no
+ * reply, the connection is reliable and ordered
+ */
+static void _unix_server_connection(
+    int fd,
+    struct IpcServerThreadArgs* args,
+    struct EngineMessage* engine_message
+){
+    size_t size = IPC_MAX_MESSAGE_SIZE;
+    char* buffer = (char*)malloc(size);
+    struct pollfd pfd = {.fd = fd, .events = POLLIN};
+    ssize_t n;
+
+    while(!is_exiting()){
+        if(poll(&pfd, 1, 100) <= 0){
+            continue;
+        }
+        // The size of the next message, without removing it
+        n = recv(fd, buffer, 0, MSG_PEEK | MSG_TRUNC);
+        if(n <= 0){
+            break;
+        }
+        if((size_t)n >= size){
+            size = (size_t)n + 1;
+            buffer = (char*)realloc(buffer, size);
+            sg_assert_ptr(buffer, "realloc of %zu bytes failed", size);
+        }
+        n = recv(fd, buffer, size - 1, 0);
+        if(n <= 0){
+            break;
+        }
+        buffer[n] = '\0';
+        ipc_handle_message(engine_message, args->callback, buffer);
+    }
+    free(buffer);
+    close(fd);
+}
+
+static void* _unix_server_thread(struct IpcServerThreadArgs* args){
+    struct EngineMessage engine_message;
+    struct sockaddr_un addr;
+    socklen_t len = _unix_addr(&addr, "-engine");
+    int sockfd = socket(AF_UNIX, SOCK_SEQPACKET | SOCK_CLOEXEC, 0);
+    sg_assert(sockfd >= 0, "unix socket creation failed");
+    _set_buf_size(sockfd);
+    sg_assert(
+        bind(sockfd, (struct sockaddr*)&addr, len) >= 0,
+        "bind failed for %s-engine",
+        IPC_SOCKET_NAME
+    );
+    sg_assert(listen(sockfd, 1) >= 0, "listen failed");
+    struct pollfd pfd = {.fd = sockfd, .events = POLLIN};
+
+    while(!is_exiting()){
+        if(poll(&pfd, 1, 100) <= 0){
+            continue;
+        }
+        int fd = accept(sockfd, NULL, NULL);
+        if(fd < 0){
+            continue;
+        }
+        _unix_server_connection(fd, args, &engine_message);
+    }
+    close(sockfd);
+    return 0;
+}
+#endif
+
 void ipc_init(){
+    if(IPC_SOCKET_NAME[0]){
+        // Connected on the first message to the UI
+        return;
+    }
     struct timeval tv = (struct timeval){
         .tv_usec = 10000,
     };
@@ -83,7 +225,12 @@ void ipc_init(){
 }
 
 void ipc_dtor(){
-    close(SOCKET_DATA.sockfd);
+    if(SOCKET_DATA.sockfd >= 0){
+        close(SOCKET_DATA.sockfd);
+    }
+    if(SOCKET_DATA.unix_fd >= 0){
+        close(SOCKET_DATA.unix_fd);
+    }
 }
 
 void ipc_client_send(
@@ -92,6 +239,13 @@ void ipc_client_send(
     int n;
     char buffer[1024];
 
+#if SG_OS == _OS_LINUX
+    if(IPC_SOCKET_NAME[0]){
+        _unix_client_send(message);
+        return;
+    }
+#endif
+
     sendto(
         SOCKET_DATA.sockfd,
         (const char*)message,
@@ -114,6 +268,11 @@ void ipc_client_send(
 
 void* ipc_server_thread(void* _arg){
     struct IpcServerThreadArgs* args = (struct IpcServerThreadArgs*)_arg;
+#if SG_OS == _OS_LINUX
+    if(IPC_SOCKET_NAME[0]){
+        return _unix_server_thread(args);
+    }
+#endif
     struct EngineMessage engine_message;
 
     int sockfd;
@@ -178,15 +337,11 @@ void* ipc_server_thread(void* _arg){
             continue;
         }
         buffer[n] = '\0';
-        decode_engine_message(
+        ipc_handle_message(
             &engine_message,
+            args->callback,
             buffer
         );
-        args->callback(
-            engine_message.path,
-            engine_message.key,
-            engine_message.value
-        );
         sendto(
             sockfd,
             (const char*)response,
@@ -291,15 +291,11 @@ void* ipc_server_thread(void* _arg){
         }
 
         buffer[recv_len] = '\0';
-        decode_engine_message(
+        ipc_handle_message(
             &engine_message,
+            args->callback,
             buffer
         );
-        args->callback(
-            engine_message.path,
-            engine_message.key,
-            engine_message.value
-        );
     }
 
     closesocket(s);
@@ -3,6 +3,7 @@
 #include "clinttools.h"
 #include "daw.h"
 #include "files.h"
+#include "ipc_shm.h"
 #include "wave_edit.h"
 
 
@@ -123,6 +124,10 @@ void v_open_project(const SGPATHSTR* a_project_folder, int a_first_load){
         CLINTTOOLS->project_folder
     );
 
+    if(a_first_load){
+        ipc_shm_open(CLINTTOOLS->audio_tmp_folder);
+    }
+
     if(a_first_load && i_file_exists(CLINTTOOLS->audio_pool_file)){
         log_info("Loading wave pool");
         v_audio_pool_add_items(
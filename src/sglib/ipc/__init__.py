@@ -1,9 +1,9 @@
 __all__ = [
     "DawIPC",
     "WaveEditIPC",
-    "StargateIPC",
+    "clinttoolsIPC",
 ]
 
 from .daw import DawIPC
-from .clinttools import StargateIPC
+from .stargate import clinttoolsIPC
 from .wave_edit import WaveEditIPC
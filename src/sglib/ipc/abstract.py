@@ -1,5 +1,7 @@
 from sglib import constants
+from sglib.ipc.jobs import ENGINE_JOBS
 from sglib.log import LOG
+import concurrent.futures
 
 class AbstractIPCTransport:
     """ Abstract class for sending data to and from the engine.
@@ -20,6 +22,19 @@ class AbstractIPCTransport:
         """
         raise NotImplementedError
 
+    def engine_args(self) -> list:
+        """ Command line arguments that the engine needs to use this
+            transport
+        """
+        return []
+
+    def flush(self, timeout: float=2.0):
+        """ Wait until every message passed to send() has been delivered
+            to the engine, for transports that send asynchronously.
+            Returns False on timeout
+        """
+        return True
+
 class AbstractIPC:
     """ Abstract class containing the minimum contract
         to run SG Plugins for host communication to the
@@ -49,3 +64,22 @@ class AbstractIPC:
             key,
             value,
         )
+
+    def submit(self, key, value, job_id):
+        """ Send a configure message for a job that the engine notifies
+            the UI of when it finishes
+
+            @job_id: The path of the file that the job creates
+            @return: A concurrent.futures.Future, call
+                     ENGINE_JOBS.result(future) to wait for the job
+        """
+        if not constants.IPC_ENABLED:
+            self.send_configure(key, value)
+            f_future = concurrent.futures.Future()
+            f_future.set_exception(
+                RuntimeError(f"The engine is not running, job {job_id}"),
+            )
+            return f_future
+        f_future = ENGINE_JOBS.add(job_id)
+        self.send_configure(key, value)
+        return f_future
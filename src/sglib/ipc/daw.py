@@ -12,13 +12,10 @@ GNU General Public License for more details.
 """
 
 from sglib import constants
-from sglib.lib.util import (
-    bool_to_int,
-    get_wait_file_path,
-    wait_for_finished_file,
-)
+from sglib.lib.util import bool_to_int
 
 from sglib.ipc.abstract import AbstractIPC
+from sglib.ipc.jobs import ENGINE_JOBS
 
 
 class DawIPC(AbstractIPC):
@@ -192,7 +189,7 @@ class DawIPC(AbstractIPC):
         a_item_indexes,
     ):
         f_index_arr = [str(x) for x in a_item_indexes]
-        self.send_configure(
+        f_future = self.submit(
             "ga",
             "|".join(
                 str(x) for x in (
@@ -203,10 +200,10 @@ class DawIPC(AbstractIPC):
                     "|".join(f_index_arr)
                 )
             ),
+            a_file_name,
         )
         if self.with_audio:
-            f_wait_file = get_wait_file_path(a_file_name)
-            wait_for_finished_file(f_wait_file)
+            ENGINE_JOBS.result(f_future)
 
     def midi_device(self, a_is_on, a_device_num, a_track_num, channel):
         self.send_configure(
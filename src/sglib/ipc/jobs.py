@@ -0,0 +1,213 @@
+""" Completion of jobs that the engine runs for the UI.
+
+    When the engine finishes a job, it sends the job id on the JOBS_PATH
+    path of the UI socket.  The job id is the path of the file that the
+    job creates.  Engine builds that predate this only create
+    "{job id}.finished", so those files are also watched, using inotify on
+    Linux, or by polling elsewhere.
+"""
+
+from sglib.constants import IS_LINUX
+from sglib.lib.util import get_wait_file_path
+from sglib.log import LOG
+import concurrent.futures
+import ctypes
+import os
+import select
+import threading
+import time
+
+__all__ = [
+    'ENGINE_JOBS',
+    'JOBS_PATH',
+    'JOB_TIMEOUT',
+    'EngineJobs',
+]
+
+JOBS_PATH = 'clinttools/jobs'
+# Seconds to wait for the engine to finish a job before giving up
+JOB_TIMEOUT = 300.
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+
+
+class _Inotify:
+    """ Wakes the watcher thread when a file is created in a watched
+        folder
+    """
+    def __init__(self):
+        self._libc = ctypes.CDLL('libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._folders = set()
+
+    def watch(self, a_folder):
+        if a_folder in self._folders:
+            return
+        f_wd = self._libc.inotify_add_watch(
+            self.fd,
+            os.fsencode(a_folder),
+            IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE,
+        )
+        if f_wd < 0:
+            raise OSError(ctypes.get_errno(), f"Could not watch {a_folder}")
+        self._folders.add(a_folder)
+
+    def wait(self, a_timeout):
+        if select.select([self.fd], [], [], a_timeout)[0]:
+            # The events are not needed, every pending job is checked
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+class EngineJobs:
+    """ Futures for the jobs that have been sent to the engine, by job id
+    """
+    # Seconds between checking for .finished files without inotify
+    POLL_INTERVAL = 0.1
+    # Seconds between checking for .finished files with inotify, in case
+    # an event was missed
+    INOTIFY_INTERVAL = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._has_jobs = threading.Condition(self._lock)
+        # job id: (Future, .finished file)
+        self._jobs = {}
+        self._inotify = None
+        self._thread = None
+
+    @staticmethod
+    def job_id(a_path):
+        """ Normalize a path, so that the paths formatted by the engine
+            match the paths formatted by the UI
+        """
+        return os.path.normcase(os.path.normpath(a_path))
+
+    def add(self, a_path) -> concurrent.futures.Future:
+        """ Return a Future that completes with a_path when the engine
+            finishes the job that creates a_path.  Call before sending the
+            job to the engine
+        """
+        f_job_id = self.job_id(a_path)
+        f_wait_file = get_wait_file_path(a_path)
+        f_future = concurrent.futures.Future()
+        with self._lock:
+            f_old = self._jobs.get(f_job_id)
+            if f_old and not f_old[0].done():
+                # The same file requested again, both complete together
+                return f_old[0]
+            self._jobs[f_job_id] = (f_future, f_wait_file)
+            self._watch(os.path.dirname(f_wait_file))
+            self._has_jobs.notify()
+        return f_future
+
+    def finish(self, a_path):
+        """ Complete the Future of a job, called when the engine sends the
+            job id.  Returns False if there was no such job
+        """
+        with self._lock:
+            f_job = self._jobs.pop(self.job_id(a_path), None)
+        if f_job is None:
+            LOG.warning(f"Engine finished unknown job {a_path}")
+            return False
+        if not f_job[0].done():
+            f_job[0].set_result(a_path)
+        return True
+
+    def cancel_all(self, a_reason):
+        """ Fail all pending jobs, for example because the engine exited
+        """
+        with self._lock:
+            f_jobs = list(self._jobs.values())
+            self._jobs.clear()
+        for f_future, _ in f_jobs:
+            if not f_future.done():
+                f_future.set_exception(RuntimeError(a_reason))
+
+    def result(self, a_future, a_timeout=JOB_TIMEOUT):
+        """ Wait for the Future of a job and return its result.  If the
+            engine does not finish the job within a_timeout seconds, the
+            job fails with TimeoutError and is no longer watched
+        """
+        try:
+            return a_future.result(a_timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        with self._lock:
+            f_job_ids = [
+                k for k, v in self._jobs.items() if v[0] is a_future
+            ]
+            for f_job_id in f_job_ids:
+                self._jobs.pop(f_job_id)
+        f_error = TimeoutError(
+            "The engine did not finish job "
+            f"{', '.join(f_job_ids)} in {a_timeout} seconds"
+        )
+        try:
+            a_future.set_exception(f_error)
+        except concurrent.futures.InvalidStateError:
+            # Finished in the meantime
+            return a_future.result(0.)
+        LOG.error(str(f_error))
+        raise f_error
+
+    def pending(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def _watch(self, a_folder):
+        """ Watch a folder for .finished files, must hold self._lock """
+        if self._thread is None:
+            if IS_LINUX:
+                try:
+                    self._inotify = _Inotify()
+                except Exception as ex:
+                    LOG.warning(f"inotify not available, polling: {ex}")
+            self._thread = threading.Thread(
+                target=self._watcher_thread,
+                name='engine-jobs',
+                daemon=True,
+            )
+            self._thread.start()
+        if self._inotify and os.path.isdir(a_folder):
+            try:
+                self._inotify.watch(a_folder)
+            except Exception as ex:
+                LOG.warning(ex)
+
+    def _watcher_thread(self):
+        while True:
+            with self._lock:
+                while not self._jobs:
+                    self._has_jobs.wait()
+            self._check_files()
+            if self._inotify:
+                self._inotify.wait(self.INOTIFY_INTERVAL)
+            else:
+                time.sleep(self.POLL_INTERVAL)
+
+    def _check_files(self):
+        """ Finish the jobs of engine builds that create .finished files """
+        with self._lock:
+            f_jobs = [(k, v[1]) for k, v in self._jobs.items()]
+        for f_job_id, f_wait_file in f_jobs:
+            if not os.path.isfile(f_wait_file):
+                continue
+            try:
+                os.remove(f_wait_file)
+            except Exception as ex:
+                LOG.error(f"Could not delete {f_wait_file}: {ex}")
+            with self._lock:
+                f_job = self._jobs.pop(f_job_id, None)
+            if f_job and not f_job[0].done():
+                f_job[0].set_result(f_wait_file[:-len('.finished')])
+
+ENGINE_JOBS = EngineJobs()
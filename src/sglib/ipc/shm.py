@@ -0,0 +1,159 @@
+""" Read the ring buffer of binary frames that the engine writes peak
+    meters, the playback cursor and spectrum analyzers to, instead of
+    sending them as text over the UI socket.
+
+    The layout must match engine/include/ipc_shm.h.  The engine writes
+    without locking, a frame is only returned if its sequence number did
+    not change while it was being copied.  Frames that were overwritten
+    before the UI read them are dropped, these streams only need the latest
+    values.
+"""
+
+from sglib.log import LOG
+import mmap
+import numpy
+import os
+
+__all__ = [
+    'SHM_FILE_NAME',
+    'SHM_PEAK',
+    'SHM_POSITION',
+    'SHM_SPECTRUM',
+    'ShmRingReader',
+]
+
+SHM_MAGIC = 0x42524753
+SHM_VERSION = 1
+SHM_FILE_NAME = 'ui_stream.shm'
+
+# Frame types
+# id: 0, values: track number, left, right for each track
+SHM_PEAK = 1
+# id: 0, values: The current beat
+SHM_POSITION = 2
+# id: The plugin uid, values: The magnitude of each FFT bin
+SHM_SPECTRUM = 3
+
+HEADER_DTYPE = numpy.dtype([
+    ('magic', numpy.uint32),
+    ('version', numpy.uint32),
+    ('frame_count', numpy.uint32),
+    ('max_values', numpy.uint32),
+    ('reserved_index', numpy.uint32),
+    ('write_index', numpy.uint32),
+    ('padding', numpy.uint32, (10,)),
+])
+
+_UINT32 = 0x100000000
+
+
+def frame_dtype(a_max_values):
+    return numpy.dtype([
+        ('seq', numpy.uint32),
+        ('type', numpy.uint32),
+        ('id', numpy.int32),
+        ('count', numpy.uint32),
+        ('values', numpy.float32, (a_max_values,)),
+    ])
+
+class ShmRingReader:
+    """ Maps the ring buffer file read-only.  self.header and self.frames
+        are NumPy views of the file
+    """
+    def __init__(self, a_path):
+        self.path = a_path
+        with open(a_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER_DTYPE.itemsize:
+            self.close()
+            raise ValueError(f"{a_path} is too small")
+        self.header = numpy.ndarray((), HEADER_DTYPE, self._mmap)
+        f_count = int(self.header['frame_count'])
+        f_max_values = int(self.header['max_values'])
+        if (
+            int(self.header['magic']) != SHM_MAGIC
+            or
+            int(self.header['version']) != SHM_VERSION
+        ):
+            self.close()
+            raise ValueError(f"{a_path} is not a version {SHM_VERSION} ring")
+        f_dtype = frame_dtype(f_max_values)
+        if (
+            len(self._mmap)
+            <
+            HEADER_DTYPE.itemsize + (f_dtype.itemsize * f_count)
+        ):
+            self.close()
+            raise ValueError(f"{a_path} is too small")
+        self.frames = numpy.ndarray(
+            (f_count,),
+            f_dtype,
+            self._mmap,
+            HEADER_DTYPE.itemsize,
+        )
+        self.read_index = int(self.header['write_index'])
+        self.dropped = 0
+
+    @staticmethod
+    def open(a_folder):
+        """ Return a reader for the ring buffer in a folder, or None if the
+            engine has not created it
+        """
+        f_path = os.path.join(a_folder, SHM_FILE_NAME)
+        if not os.path.isfile(f_path):
+            return None
+        try:
+            return ShmRingReader(f_path)
+        except Exception as ex:
+            LOG.warning(f"Could not open {f_path}: {ex}")
+            return None
+
+    def close(self):
+        self.header = None
+        self.frames = None
+        self._mmap.close()
+
+    def read(self):
+        """ Return [(type, id, values), ...] of the frames written since
+            the last call, oldest first.  values is a copy, not a view of
+            the file
+        """
+        f_header = self.header
+        if int(f_header['magic']) != SHM_MAGIC:
+            # The engine is restarting and clearing the file
+            return []
+        f_write_index = int(f_header['write_index'])
+        f_pending = (f_write_index - self.read_index) % _UINT32
+        if f_pending >= _UINT32 // 2:
+            # The index went backwards, the engine restarted
+            self.read_index = f_write_index
+            return []
+        f_count = len(self.frames)
+        if f_pending > f_count:
+            self.dropped += f_pending - f_count
+            f_pending = f_count
+        f_result = []
+        f_start = f_write_index - f_pending
+        for f_i in range(f_start, f_write_index):
+            f_seq = (f_i + 1) % _UINT32
+            f_frame = self.frames[f_i % f_count]
+            if int(f_frame['seq']) != f_seq:
+                # Overwritten, or another writer has not finished it
+                self.dropped += 1
+                continue
+            f_type = int(f_frame['type'])
+            f_id = int(f_frame['id'])
+            f_values = f_frame['values'][:int(f_frame['count'])].copy()
+            if int(f_frame['seq']) != f_seq:
+                self.dropped += 1
+                continue
+            f_result.append((f_type, f_id, f_values))
+        self.read_index = f_write_index % _UINT32
+        return f_result
+
+    def latest(self):
+        """ Like read(), but only the latest frame of each (type, id)
+
+            @return: {(type, id): values}
+        """
+        return {(x[0], x[1]): x[2] for x in self.read()}
@@ -1,9 +1,9 @@
 import os
 
 from .abstract import AbstractIPC
+from .jobs import ENGINE_JOBS
 from sglib import constants
 from sglib.lib import util
-from sglib.lib.util import get_wait_file_path, wait_for_finished_file
 from sglib.log import LOG
 
 class clinttoolsIPC(AbstractIPC):
@@ -24,10 +24,12 @@ class clinttoolsIPC(AbstractIPC):
         LOG.info("stop_server called")
         if self.with_audio:
             self.send_configure("exit", "")
+            self.transport.flush()
             constants.IPC_ENABLED = False
 
     def kill_engine(self):
         self.send_configure("abort", "")
+        self.transport.flush()
 
     def main_vol(self, a_vol):
         self.send_configure("mvol", str(round(a_vol, 8)))
@@ -64,25 +66,30 @@ class clinttoolsIPC(AbstractIPC):
         a_file: str,
         a_uid: int,
         vol: float=0.0,
+        a_wait: bool=True,
     ):
         """ Load a new file into the audio pool
 
             @a_file: The path to an audio file
             @a_uid:  The audio pool uid of the file
+            @a_wait: Wait for the engine to create the sample graph,
+                     otherwise return a Future of it
         """
         path = os.path.join(
             constants.PROJECT.samplegraph_folder,
             str(a_uid),
         )
-        f_wait_file = get_wait_file_path(path)
         a_file = util.pi_path(a_file)
-        self.send_configure(
+        f_future = self.submit(
             "wp",
             "|".join(
                 str(x) for x in (a_uid, vol, a_file)
             ),
+            path,
         )
-        wait_for_finished_file(f_wait_file)
+        if not a_wait:
+            return f_future
+        ENGINE_JOBS.result(f_future)
 
     def audio_pool_entry_volume(self, uid, vol):
         """ Update the volume of a single audio pool entry
@@ -96,8 +103,7 @@ class clinttoolsIPC(AbstractIPC):
         )
 
     def rate_env(self, a_in_file, a_out_file, a_start, a_end):
-        f_wait_file = get_wait_file_path(a_out_file)
-        self.send_configure(
+        f_future = self.submit(
             "renv",
             "{}\n{}\n{}|{}".format(
                 a_in_file,
@@ -105,12 +111,12 @@ class clinttoolsIPC(AbstractIPC):
                 a_start,
                 a_end,
             ),
+            a_out_file,
         )
-        wait_for_finished_file(f_wait_file)
+        ENGINE_JOBS.result(f_future)
 
     def pitch_env(self, a_in_file, a_out_file, a_start, a_end):
-        f_wait_file = get_wait_file_path(a_out_file)
-        self.send_configure(
+        f_future = self.submit(
             "penv",
             "{}\n{}\n{}|{}".format(
                 a_in_file,
@@ -118,8 +124,9 @@ class clinttoolsIPC(AbstractIPC):
                 a_start,
                 a_end,
             ),
+            a_out_file,
         )
-        wait_for_finished_file(f_wait_file)
+        ENGINE_JOBS.result(f_future)
 
     def preview_audio(self, a_file):
         self.send_configure("preview", util.pi_path(a_file))
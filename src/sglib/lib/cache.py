@@ -0,0 +1,191 @@
+""" Bounded, least recently used caches with memory accounting.
+
+    Every cache registers itself in CACHES, so that all cached objects
+    derived from an audio pool entry or a sequencer item can be invalidated
+    at once, and so that their statistics can be logged.
+"""
+
+from sglib.lib.util import get_file_setting
+from sglib.log import LOG
+import collections
+import threading
+
+__all__ = [
+    'AUDIO_POOL_UID',
+    'CACHES',
+    'ITEM_UID',
+    'LRUCache',
+    'cache_budget',
+    'invalidate',
+    'invalidate_audio_pool_uid',
+    'invalidate_item_uid',
+    'log_cache_stats',
+]
+
+# Tag kinds, a tag is a tuple of (kind, uid)
+AUDIO_POOL_UID = 'audio_pool_uid'
+ITEM_UID = 'item_uid'
+
+# name: LRUCache
+CACHES = {}
+MB = 1024 * 1024
+
+
+def cache_budget(a_name, a_default_mb):
+    """ Return the byte budget of a cache, the user can override the
+        default in the "{a_name}-cache-mb" file setting
+    """
+    return get_file_setting(f"{a_name}-cache-mb", int, a_default_mb) * MB
+
+class LRUCache:
+    """ A dictionary-like cache that evicts the least recently used entries
+        once the total size of its entries exceeds max_bytes
+    """
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int,
+        sizeof=None,
+    ):
+        """
+            @name:      Unique name, used for settings and statistics
+            @max_bytes: The memory budget of the cache
+            @sizeof:    Callable returning the approximate size in bytes of
+                        a value, defaults to 1 byte per entry
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof if sizeof else lambda x: 1
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key: (value, size, tags)
+        self._entries = collections.OrderedDict()
+        # tag: {key, ...}
+        self._tags = {}
+        self._lock = threading.RLock()
+        CACHES[name] = self
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """ Return the cached value and mark it as the most recently used,
+            or return @default
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, tags=(), size=None):
+        """ Add or replace a value
+
+            @tags: Iterable of (kind, uid) tuples that invalidate this entry
+            @size: The size of the value in bytes, or None to use sizeof
+        """
+        if size is None:
+            size = self.sizeof(value)
+        with self._lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                LOG.info(
+                    f"{self.name} cache: {key} is larger than the cache "
+                    f"budget ({size} > {self.max_bytes}), not caching"
+                )
+                return value
+            tags = tuple(tags)
+            self._entries[key] = (value, size, tags)
+            self.bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                return self._pop(key)
+            return default
+
+    def _pop(self, key):
+        if key not in self._entries:
+            return None
+        value, size, tags = self._entries.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                self._tags.pop(tag)
+        return value
+
+    def invalidate(self, tag):
+        """ Remove every entry tagged with @tag, return the count removed """
+        with self._lock:
+            keys = list(self._tags.get(tag, ()))
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+def invalidate(tag):
+    """ Remove every entry tagged with @tag from all caches """
+    return sum(x.invalidate(tag) for x in CACHES.values())
+
+def invalidate_audio_pool_uid(uid):
+    """ Remove everything derived from an audio pool entry """
+    return invalidate((AUDIO_POOL_UID, int(uid)))
+
+def invalidate_item_uid(uid):
+    """ Remove everything derived from a sequencer item """
+    return invalidate((ITEM_UID, int(uid)))
+
+_STATS_KEYS = (
+    'name',
+    'entries',
+    'bytes',
+    'max_bytes',
+    'hits',
+    'misses',
+    'evictions',
+)
+
+def log_cache_stats():
+    for cache in CACHES.values():
+        stats = cache.stats()
+        # Statistics that only some caches have
+        extra = "".join(
+            f", {v} {k}" for k, v in stats.items() if k not in _STATS_KEYS
+        )
+        LOG.info(
+            "{name} cache: {entries} entries, {bytes}/{max_bytes} bytes, "
+            "{hits} hits, {misses} misses, {evictions} evictions".format(
+                **stats,
+            ) + extra
+        )
@@ -12,6 +12,7 @@ from sglib.constants import ENGINE_PIDFILE, MAJOR_VERSION
 from sglib.hardware.rpi import is_rpi
 from sglib.log import LOG
 from sglib.lib import util
+from sglib.lib.save_queue import SAVE_QUEUE, SaveError
 from sglib.lib import strings as sg_strings
 from sglib.lib.translate import _
 
@@ -98,6 +99,12 @@ def open_engine(a_project_path, fps):
     if pid:
         kill_engine(pid)
     constants.PROJECT_DIR = os.path.dirname(a_project_path)
+    # The engine reads the project when it starts
+    try:
+        SAVE_QUEUE.flush()
+    except SaveError as ex:
+        # Shown by the UI
+        LOG.exception(ex)
 
     f_pid = os.getpid()
     LOG.info(f"Starting audio engine with {a_project_path}")
@@ -118,6 +125,8 @@ def open_engine(a_project_path, fps):
             threads,
         )
     ]
+    if constants.IPC_TRANSPORT is not None:
+        f_cmd.extend(constants.IPC_TRANSPORT.engine_args())
     f_cmd = util.has_pasuspender(f_cmd)
     run_engine(f_cmd)
 
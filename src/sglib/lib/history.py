@@ -11,20 +11,282 @@ This program is distributed in the hope that it will be useful,
 but WITHOUT ANY WARRANTY; without even the implied warranty of
 MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
 GNU General Public License for more details.
+
+The text of each version of a file is stored once, compressed and
+addressed by its hash, so that the old text of a change shares the blob
+with the new text of the previous change to the same file.  The blobs
+held in memory are limited to a budget.  Without a journal, the oldest
+commits are forgotten to stay within the budget.  With a journal, every
+blob and commit is appended to a file in the project folder, blobs over
+the budget are dropped from memory and read back from the journal when
+needed, and the history is restored when the project is opened again.
 """
 
-import os, time, difflib
+import base64
+import collections
+import difflib
+import hashlib
+import json
+import os
+import time
+import zlib
 
 from sglib.lib import util
+from sglib.log import LOG
+
+__all__ = [
+    'JOURNAL_FILE_NAME',
+    'HistoryBlobs',
+    'HistoryJournal',
+    'ProjectHistory',
+    'history_commit',
+    'history_file',
+]
+
+# The file name of a project's undo journal, it is not included in backups
+JOURNAL_FILE_NAME = "undo_journal.txt"
+
+# The default memory budget of the blobs
+HISTORY_MAX_BYTES = 64 * 1024 * 1024
+# When opening a project, a larger journal is rewritten with only the
+# newest commits, that fit in half of this size
+JOURNAL_MAX_BYTES = 256 * 1024 * 1024
+
+
+def text_hash(a_text):
+    return hashlib.sha1(a_text.encode('utf-8')).hexdigest()
+
+class HistoryBlobs:
+    """ Compressed file text by hash, reference counted by the commits
+        that use it
+    """
+    def __init__(self, a_max_bytes=HISTORY_MAX_BYTES):
+        self.max_bytes = a_max_bytes
+        # hash: [references, compressed bytes or None, journal offset]
+        # Least recently used first
+        self._blobs = collections.OrderedDict()
+        # The size of the compressed bytes held in memory
+        self.size = 0
+        self.journal = None
+
+    def __contains__(self, a_hash):
+        return a_hash in self._blobs
+
+    def __len__(self):
+        return len(self._blobs)
+
+    def add(self, a_text):
+        """ Store a_text and add a reference to it, return the hash """
+        f_hash = text_hash(a_text)
+        f_blob = self._blobs.get(f_hash)
+        if f_blob is None:
+            f_data = zlib.compress(a_text.encode('utf-8'))
+            f_offset = None
+            if self.journal:
+                f_offset = self.journal.append_blob(f_hash, f_data)
+            self._blobs[f_hash] = [1, f_data, f_offset]
+            self.size += len(f_data)
+        else:
+            f_blob[0] += 1
+            self._blobs.move_to_end(f_hash)
+        return f_hash
+
+    def add_spilled(self, a_hash, a_offset):
+        """ A blob that is only in the journal, when it is loaded """
+        if a_hash not in self._blobs:
+            self._blobs[a_hash] = [0, None, a_offset]
+
+    def ref(self, a_hash):
+        self._blobs[a_hash][0] += 1
+
+    def unref(self, a_hash):
+        f_blob = self._blobs[a_hash]
+        f_blob[0] -= 1
+        if f_blob[0] <= 0:
+            self._blobs.pop(a_hash)
+            if f_blob[1] is not None:
+                self.size -= len(f_blob[1])
+
+    def get(self, a_hash):
+        f_blob = self._blobs[a_hash]
+        f_data = f_blob[1]
+        if f_data is None:
+            f_data = self.journal.read_blob(f_blob[2], a_hash)
+        self._blobs.move_to_end(a_hash)
+        return zlib.decompress(f_data).decode('utf-8')
+
+    def data(self, a_hash):
+        """ The compressed bytes of a blob """
+        f_blob = self._blobs[a_hash]
+        if f_blob[1] is None:
+            return self.journal.read_blob(f_blob[2], a_hash)
+        return f_blob[1]
+
+    def spill(self):
+        """ Drop the least recently used blobs that are in the journal from
+            memory, until within the budget.  Returns False if still over
+            the budget
+        """
+        for f_blob in self._blobs.values():
+            if self.size <= self.max_bytes:
+                break
+            if f_blob[1] is not None and f_blob[2] is not None:
+                self.size -= len(f_blob[1])
+                f_blob[1] = None
+        return self.size <= self.max_bytes
+
+    def move(self, a_hash, a_offset):
+        """ The blob was rewritten to a new journal at a_offset """
+        f_blob = self._blobs[a_hash]
+        if f_blob[1] is not None:
+            self.size -= len(f_blob[1])
+        f_blob[1] = None
+        f_blob[2] = a_offset
+
+    def prune(self):
+        """ Forget the journal blobs that no commit uses """
+        for f_hash in [k for k, v in self._blobs.items() if v[0] <= 0]:
+            self._blobs.pop(f_hash)
+
+    def clear(self):
+        self._blobs.clear()
+        self.size = 0
+
+class HistoryJournal:
+    """ An append-only file of JSON lines, one per blob, commit, undo,
+        redo or cleared context
+    """
+    def __init__(self, a_path):
+        self.path = a_path
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+            if self._file.tell() and not self._ends_with_newline():
+                # Do not append to a line that was partially written
+                self._file.write(b'\n')
+        return self._file
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def reset(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def size(self):
+        if not os.path.isfile(self.path):
+            return 0
+        return os.path.getsize(self.path)
+
+    def append(self, a_record):
+        f_file = self._open()
+        f_file.write(json.dumps(a_record).encode('utf-8') + b'\n')
+        f_file.flush()
+
+    def append_blob(self, a_hash, a_data):
+        """ Returns the offset to read the blob from """
+        f_file = self._open()
+        f_offset = f_file.tell()
+        self.append({
+            'blob': a_hash,
+            'data': base64.b64encode(a_data).decode('ascii'),
+        })
+        return f_offset
+
+    def read_blob(self, a_offset, a_hash):
+        if self._file is not None:
+            self._file.flush()
+        with open(self.path, 'rb') as f:
+            f.seek(a_offset)
+            f_record = json.loads(f.readline())
+        assert f_record['blob'] == a_hash, (f_record['blob'], a_hash)
+        return base64.b64decode(f_record['data'])
+
+    def read(self):
+        """ Yield (offset, record) for each record.  A line that was only
+            partially written when the UI exited is skipped
+        """
+        if not os.path.isfile(self.path):
+            return
+        f_offset = 0
+        with open(self.path, 'rb') as f:
+            for f_line in f:
+                try:
+                    f_record = json.loads(f_line)
+                except ValueError:
+                    LOG.warning(
+                        f"Skipping invalid undo journal line at {f_offset}"
+                    )
+                else:
+                    yield f_offset, f_record
+                f_offset += len(f_line)
 
 class history_file:
     def __init__(self, a_folder, a_file_name, a_text_new,
-                 a_text_old, a_existed):
+                 a_text_old, a_existed, a_blobs=None):
         self.folder = str(a_folder)
         self.file_name = str(a_file_name)
-        self.new_text = str(a_text_new)
-        self.old_text = str(a_text_old)
         self.existed = int(a_existed)
+        self.blobs = a_blobs if a_blobs is not None else HistoryBlobs()
+        self.new_hash = self.blobs.add(str(a_text_new))
+        self.old_hash = self.blobs.add(str(a_text_old))
+
+    @staticmethod
+    def from_hashes(
+        a_folder,
+        a_file_name,
+        a_new_hash,
+        a_old_hash,
+        a_existed,
+        a_blobs,
+    ):
+        """ A file with blobs that are already stored """
+        f_result = history_file.__new__(history_file)
+        f_result.folder = str(a_folder)
+        f_result.file_name = str(a_file_name)
+        f_result.existed = int(a_existed)
+        f_result.blobs = a_blobs
+        f_result.new_hash = a_new_hash
+        f_result.old_hash = a_old_hash
+        a_blobs.ref(a_new_hash)
+        a_blobs.ref(a_old_hash)
+        return f_result
+
+    @property
+    def new_text(self):
+        return self.blobs.get(self.new_hash)
+
+    @property
+    def old_text(self):
+        return self.blobs.get(self.old_hash)
+
+    @property
+    def path(self):
+        return os.path.join(self.folder, self.file_name)
+
+    def free(self):
+        """ Release the blobs, the file can no longer be used """
+        self.blobs.unref(self.new_hash)
+        self.blobs.unref(self.old_hash)
+
+    def to_list(self):
+        return [
+            self.folder,
+            self.file_name,
+            self.new_hash,
+            self.old_hash,
+            self.existed,
+        ]
 
     def __str__(self):
         """ Generate a human-readable summary of the changes """
@@ -41,13 +303,15 @@ class history_commit:
         self.files = a_files
         self.message = a_message
         self.timestamp = int(time.time())
+        # The order of commits in all undo contexts
+        self.seq = 0
 
     def undo(self, a_project_folder):
         for f_file in self.files:
             f_full_path = os.path.join(
                 a_project_folder, f_file.folder, f_file.file_name)
             if f_file.existed == 0:
-                os.remove(f_full_path)
+                util.delete_file(f_full_path)
             else:
                 util.write_file_text(f_full_path, f_file.old_text)
 
@@ -57,3 +321,317 @@ class history_commit:
                 a_project_folder, f_file.folder, f_file.file_name)
             util.write_file_text(f_full_path, f_file.new_text)
 
+    def free(self):
+        for f_file in self.files:
+            f_file.free()
+
+    def to_dict(self, a_context):
+        return {
+            'commit': a_context,
+            'seq': self.seq,
+            'message': self.message,
+            'timestamp': self.timestamp,
+            'files': [x.to_list() for x in self.files],
+        }
+
+class ProjectHistory:
+    """ The undo history of each undo context of a project """
+    def __init__(self, a_max_bytes=HISTORY_MAX_BYTES):
+        self.blobs = HistoryBlobs(a_max_bytes)
+        self.journal = None
+        self.context = 0
+        # context: [history_commit, ...], oldest first
+        self.commits = {}
+        # context: The number of commits that are undone
+        self.cursors = {}
+        # The files changed since the last commit
+        self.files = []
+        self._seq = 0
+
+    def add_file(self, a_folder, a_file, a_text_new, a_text_old, a_existed):
+        self.files.append(
+            history_file(
+                a_folder,
+                a_file,
+                a_text_new,
+                a_text_old,
+                a_existed,
+                self.blobs,
+            )
+        )
+
+    def set_context(self, a_context):
+        self.context = a_context
+
+    def clear_context(self, a_context):
+        for f_commit in self.commits.pop(a_context, []):
+            f_commit.free()
+        self.cursors.pop(a_context, None)
+        if self.journal:
+            self.journal.append({'clear': a_context})
+
+    def clear(self):
+        for f_commit in self._all_commits():
+            f_commit.free()
+        for f_file in self.files:
+            f_file.free()
+        self.commits = {}
+        self.cursors = {}
+        self.files = []
+        self.blobs.clear()
+        if self.journal:
+            self.journal.reset()
+
+    def commit(self, a_message, a_discard=False):
+        f_files = self.files
+        self.files = []
+        self._truncate(self.context)
+        if not f_files:
+            return None
+        if a_discard:
+            if self.journal:
+                self.journal.append({
+                    'state': [[x.path, x.new_hash] for x in f_files],
+                })
+            for f_file in f_files:
+                f_file.free()
+            return None
+        f_commit = history_commit(f_files, a_message)
+        self._add_commit(self.context, f_commit)
+        if self.journal:
+            self.journal.append(f_commit.to_dict(self.context))
+        self._enforce_budget()
+        return f_commit
+
+    def undo(self, a_project_folder):
+        """ Returns the commit that was undone, or None """
+        f_commit = self._undo(self.context)
+        if f_commit is None:
+            return None
+        f_commit.undo(a_project_folder)
+        if self.journal:
+            self.journal.append({'undo': self.context})
+        return f_commit
+
+    def redo(self, a_project_folder):
+        """ Returns the commit that was redone, or None """
+        f_commit = self._redo(self.context)
+        if f_commit is None:
+            return None
+        f_commit.redo(a_project_folder)
+        if self.journal:
+            self.journal.append({'redo': self.context})
+        return f_commit
+
+    def open_journal(self, a_path, a_project_folder):
+        """ Journal the history to a_path, and restore the history that it
+            contains.  The journal is discarded if the project files are not
+            in the state that it expects, for example if the project was
+            edited by an older version
+        """
+        self.clear()
+        self.journal = HistoryJournal(a_path)
+        self.blobs.journal = self.journal
+        try:
+            f_expected = self._replay(a_project_folder)
+        except Exception as ex:
+            LOG.exception(ex)
+            f_expected = None
+        if f_expected is None:
+            self.clear()
+            return False
+        self.blobs.prune()
+        if self.journal.size() > JOURNAL_MAX_BYTES:
+            self._compact(f_expected)
+        LOG.info(
+            f"Restored {len(list(self._all_commits()))} undo commits from "
+            f"{a_path}"
+        )
+        return True
+
+    def close_journal(self):
+        if self.journal:
+            self.journal.close()
+        self.journal = None
+        self.blobs.journal = None
+
+    def _all_commits(self):
+        for f_commits in self.commits.values():
+            yield from f_commits
+
+    def _add_commit(self, a_context, a_commit):
+        self._seq += 1
+        a_commit.seq = self._seq
+        self.commits.setdefault(a_context, []).append(a_commit)
+
+    def _truncate(self, a_context):
+        """ Forget the commits that were undone """
+        f_cursor = self.cursors.get(a_context, 0)
+        if f_cursor:
+            f_commits = self.commits[a_context]
+            for f_commit in f_commits[-f_cursor:]:
+                f_commit.free()
+            del f_commits[-f_cursor:]
+            self.cursors[a_context] = 0
+
+    def _undo(self, a_context):
+        f_commits = self.commits.get(a_context, [])
+        f_cursor = self.cursors.get(a_context, 0)
+        if f_cursor >= len(f_commits):
+            return None
+        f_cursor += 1
+        self.cursors[a_context] = f_cursor
+        return f_commits[-f_cursor]
+
+    def _redo(self, a_context):
+        f_commits = self.commits.get(a_context, [])
+        f_cursor = self.cursors.get(a_context, 0)
+        if f_cursor == 0:
+            return None
+        self.cursors[a_context] = f_cursor - 1
+        return f_commits[-f_cursor]
+
+    def _enforce_budget(self):
+        """ Spill blobs to the journal, or forget the oldest commits, until
+            the blobs in memory are within the budget
+        """
+        if self.journal and self.blobs.spill():
+            return
+        while self.blobs.size > self.blobs.max_bytes:
+            f_oldest = min(
+                (x for x in self.commits.items() if x[1]),
+                key=lambda x: x[1][0].seq,
+                default=None,
+            )
+            if (
+                f_oldest is None
+                or
+                sum(len(x) for x in self.commits.values()) <= 1
+            ):
+                # Always keep the newest commit
+                break
+            f_context, f_commits = f_oldest
+            f_commits.pop(0).free()
+            f_cursor = self.cursors.get(f_context, 0)
+            if f_cursor > len(f_commits):
+                self.cursors[f_context] = len(f_commits)
+            if self.journal:
+                self.blobs.spill()
+
+    def _replay(self, a_project_folder):
+        """ Rebuild the history from the journal.  Returns None if the
+            project files do not match the journal, otherwise
+            {path: the hash of the text that the file should contain}
+        """
+        # path: The hash of the text that the file should contain, or None
+        # if the file should not exist
+        f_expected = {}
+        f_journal = self.journal
+        # Do not write the replayed records to the journal again
+        self.journal = None
+        try:
+            for f_offset, f_record in f_journal.read():
+                if 'blob' in f_record:
+                    self.blobs.add_spilled(f_record['blob'], f_offset)
+                elif 'commit' in f_record:
+                    f_context = f_record['commit']
+                    self._truncate(f_context)
+                    f_files = [
+                        history_file.from_hashes(*x, self.blobs)
+                        for x in f_record['files']
+                    ]
+                    f_commit = history_commit(f_files, f_record['message'])
+                    f_commit.timestamp = f_record['timestamp']
+                    self._add_commit(f_context, f_commit)
+                    for f_file in f_files:
+                        f_expected[f_file.path] = f_file.new_hash
+                elif 'undo' in f_record:
+                    f_commit = self._undo(f_record['undo'])
+                    for f_file in f_commit.files if f_commit else []:
+                        f_expected[f_file.path] = (
+                            f_file.old_hash if f_file.existed else None
+                        )
+                elif 'redo' in f_record:
+                    f_commit = self._redo(f_record['redo'])
+                    for f_file in f_commit.files if f_commit else []:
+                        f_expected[f_file.path] = f_file.new_hash
+                elif 'clear' in f_record:
+                    self.clear_context(f_record['clear'])
+                elif 'state' in f_record:
+                    for f_path, f_hash in f_record['state']:
+                        f_expected[f_path] = f_hash
+        finally:
+            self.journal = f_journal
+        for f_path, f_hash in f_expected.items():
+            f_full_path = os.path.join(a_project_folder, f_path)
+            if f_hash is None:
+                if os.path.exists(f_full_path):
+                    return None
+            elif (
+                not os.path.isfile(f_full_path)
+                or
+                text_hash(util.read_file_text(f_full_path)) != f_hash
+            ):
+                LOG.warning(
+                    f"{f_full_path} does not match the undo journal"
+                )
+                return None
+        return f_expected
+
+    def _compact(self, a_expected):
+        """ Rewrite the journal with only the newest commits
+
+            @a_expected: The state of the files returned by _replay
+        """
+        f_max_bytes = JOURNAL_MAX_BYTES // 2
+        f_commits = sorted(
+            (
+                (f_commit.seq, f_context, f_commit)
+                for f_context, f_list in self.commits.items()
+                for f_commit in f_list
+            ),
+            key=lambda x: x[0],
+            reverse=True,
+        )
+        f_keep = set()
+        f_hashes = set()
+        f_size = 0
+        for _, f_context, f_commit in f_commits:
+            f_new = set(
+                y for x in f_commit.files for y in (x.new_hash, x.old_hash)
+            ) - f_hashes
+            f_size += sum(len(self.blobs.data(x)) for x in f_new)
+            if f_keep and f_size > f_max_bytes:
+                break
+            f_hashes.update(f_new)
+            f_keep.add(f_commit.seq)
+        f_path = self.journal.path
+        f_tmp = HistoryJournal(f"{f_path}.tmp")
+        f_tmp.reset()
+        f_offsets = {}
+        for f_hash in f_hashes:
+            f_offsets[f_hash] = f_tmp.append_blob(
+                f_hash,
+                self.blobs.data(f_hash),
+            )
+        for f_context, f_list in self.commits.items():
+            f_cursor = self.cursors.get(f_context, 0)
+            for f_commit in [x for x in f_list if x.seq not in f_keep]:
+                f_commit.free()
+                f_list.remove(f_commit)
+            self.cursors[f_context] = min(f_cursor, len(f_list))
+        for _, f_context, f_commit in reversed(f_commits):
+            if f_commit.seq in f_keep:
+                f_tmp.append(f_commit.to_dict(f_context))
+        for f_context, f_cursor in self.cursors.items():
+            for _ in range(f_cursor):
+                f_tmp.append({'undo': f_context})
+        # The commits and undos of different contexts are no longer in the
+        # order that they happened
+        f_tmp.append({'state': sorted(a_expected.items())})
+        f_tmp.close()
+        self.journal.close()
+        os.replace(f_tmp.path, f_path)
+        for f_hash, f_offset in f_offsets.items():
+            self.blobs.move(f_hash, f_offset)
+        LOG.info(f"Compacted the undo journal to {len(f_keep)} commits")
@@ -18,6 +18,9 @@ GNU General Public License for more details.
 """
 
 from argparse import ArgumentParser
+import collections
+import concurrent.futures
+import itertools
 import numpy
 import os
 import subprocess
@@ -71,13 +74,451 @@ def optimize_windowsize(n):
     return orig_n
 
 
+class _SampleStream:
+    """ The samples of a file, read in blocks with WaveReader.read_iter, so
+        that only a window of look-ahead is kept in memory
+    """
+    def __init__(self, a_reader, a_block_size, a_fade_size, a_start=0):
+        """
+            @a_reader:     wavefile.WaveReader
+            @a_block_size: The number of frames to read at once
+            @a_fade_size:  The number of frames to fade out at the end
+            @a_start:      The first frame to read
+        """
+        if a_start >= a_reader.frames:
+            self._blocks = iter(())
+        else:
+            if a_start:
+                a_reader.seek(a_start)
+            self._blocks = a_reader.read_iter(size=a_block_size)
+        self._pending = None
+        self.pos = a_start
+        # Fade out the end of the file
+        self._fade_start = a_reader.frames - a_fade_size
+        self._fade = numpy.linspace(1.0, 0.0, a_fade_size)
+
+    def read(self, a_out):
+        """ Fill a_out with the next a_out.shape[1] frames, with zeros after
+            the end of the file
+        """
+        f_len = a_out.shape[1]
+        f_filled = 0
+        while f_filled < f_len:
+            if self._pending is None or not self._pending.shape[1]:
+                self._pending = next(self._blocks, None)
+                if self._pending is None:
+                    a_out[:,f_filled:] = 0.0
+                    break
+            f_count = min(f_len - f_filled, self._pending.shape[1])
+            a_out[:,f_filled:f_filled + f_count] = self._pending[:,:f_count]
+            self._pending = self._pending[:,f_count:]
+            f_filled += f_count
+        f_start = max(self.pos, self._fade_start)
+        f_end = min(self.pos + f_len, self._fade_start + len(self._fade))
+        if f_start < f_end:
+            a_out[:,f_start - self.pos:f_end - self.pos] *= self._fade[
+                f_start - self._fade_start:f_end - self._fade_start
+            ]
+        self.pos += f_len
+
+
+class _Spectra:
+    """ The amplitude spectra of the input windows of a file, computed
+        batch_size windows at a time.  Input window k starts at
+        k * half_windowsize
+    """
+    num_bins_scaled_freq = 32
+
+    def __init__(
+        self,
+        a_reader,
+        a_window,
+        a_fade_size,
+        a_batch_size,
+        a_first_window=0,
+    ):
+        """
+            @a_reader:       wavefile.WaveReader
+            @a_window:       The Hann window
+            @a_fade_size:    The number of frames to fade out at the end
+            @a_batch_size:   The number of windows to read at once
+            @a_first_window: The index of the first window to read
+        """
+        windowsize = len(a_window)
+        half_windowsize = windowsize // 2
+        nchannels = a_reader.channels
+        self.window = a_window
+        self.batch_size = a_batch_size
+        self.stream = _SampleStream(
+            a_reader,
+            a_batch_size * half_windowsize,
+            a_fade_size,
+            a_first_window * half_windowsize,
+        )
+        # The samples of a batch of input windows
+        self.smp = numpy.zeros(
+            (nchannels, (a_batch_size + 1) * half_windowsize),
+            numpy.float32,
+        )
+        self.smp_windows = numpy.lib.stride_tricks.sliding_window_view(
+            self.smp,
+            windowsize,
+            axis=1,
+        )[:,::half_windowsize].transpose(1, 0, 2)
+        self.windowed = numpy.zeros((a_batch_size, nchannels, windowsize))
+        # The amplitudes of the window before the batch, followed by the
+        # windows of the batch
+        self.freqs = numpy.zeros(
+            (a_batch_size + 1, nchannels, half_windowsize + 1),
+        )
+        self.freqs_scaled = numpy.zeros(
+            (a_batch_size + 1, self.num_bins_scaled_freq),
+        )
+        self._started = False
+
+    def read(self, a_count):
+        """ Compute the spectra of the next batch of windows, the window
+            before them is at self.freqs[0], or zeros before the first
+            window of the file
+
+            @a_count:
+                The number of windows to compute, less than batch_size
+                only for the last batch
+        """
+        half_windowsize = len(self.window) // 2
+        if self._started:
+            self.smp[:,:half_windowsize] = \
+                self.smp[:,self.batch_size * half_windowsize:]
+            self.stream.read(self.smp[:,half_windowsize:])
+            self.freqs[0] = self.freqs[self.batch_size]
+            self.freqs_scaled[0] = self.freqs_scaled[self.batch_size]
+        else:
+            self.stream.read(self.smp)
+            self._started = True
+
+        #get the windowed buffers
+        numpy.multiply(self.smp_windows, self.window, out=self.windowed)
+
+        # get the amplitudes of the frequency components
+        # and discard the phases
+        self.freqs[1:a_count + 1] = numpy.abs(
+            numpy.fft.rfft(self.windowed[:a_count]),
+        )
+
+    def onsets(self, a_count, a_onset_level):
+        """ Return a bool array, True for each window of the last
+            a_count windows read that starts an onset
+        """
+        freqs = self.freqs[1:a_count + 1]
+        freqs_scaled = self.freqs_scaled
+        num_bins_scaled_freq = self.num_bins_scaled_freq
+
+        #scale down the spectrum to detect onsets
+        freqs_len = freqs.shape[2]
+        if num_bins_scaled_freq < freqs_len:
+            freqs_len_div = freqs_len // num_bins_scaled_freq
+            new_freqs_len = freqs_len_div * num_bins_scaled_freq
+            freqs_scaled[1:a_count + 1] = numpy.mean(
+                numpy.mean(freqs, 1)[:,:new_freqs_len].reshape(
+                [a_count, num_bins_scaled_freq, freqs_len_div]), 2)
+
+        #process onsets
+        m = 2.0 * numpy.mean(
+            freqs_scaled[1:a_count + 1] - freqs_scaled[:a_count],
+            1,
+        ) / (numpy.mean(numpy.abs(freqs_scaled[:a_count]), 1) + 1e-3)
+        m = numpy.clip(m, 0.0, 1.0)
+        return m > a_onset_level
+
+
+class _Displacement:
+    """ The position of each output frame between the previous and the
+        current input window, input windows are skipped more slowly after
+        an onset
+    """
+    def __init__(self, a_stretch):
+        self.tick = 0.0
+        self.increase = 1.0 / a_stretch
+        if self.increase > 1.0:
+            self.increase = 1.0
+        self.onset_credit = 0.0
+
+    def window_ticks(self, a_onset, a_last):
+        """ Return the ticks of the output frames of the next input window
+
+            @a_onset: True if the window starts an onset
+            @a_last:  True if it is the last window of the file
+        """
+        if a_onset:
+            self.tick = 1.0
+            self.onset_credit += 1.0
+        f_result = [self.tick]
+        if a_last:
+            return f_result
+        while True:
+            if self.onset_credit <= 0.0:
+                self.tick += self.increase
+            else:
+                #this must be less than increase
+                f_credit_get = 0.5 * self.increase
+                self.onset_credit -= f_credit_get
+                if self.onset_credit < 0:
+                    self.onset_credit = 0
+                self.tick += self.increase - f_credit_get
+            if self.tick >= 1.0:
+                self.tick = self.tick % 1.0
+                return f_result
+            f_result.append(self.tick)
+
+
+def _phases(a_seed, a_frame_size, a_first_frame=0):
+    """ Return a function like numpy.random.random for the random phases of
+        the output frames, starting at output frame a_first_frame.
+
+        With a seed, the phases of each output frame only depend on its
+        position, so that segments of the output can be rendered
+        separately.  Without a seed, the global numpy.random state is used
+
+        @a_frame_size:  The number of phases of each output frame
+    """
+    if a_seed is None:
+        return numpy.random.random
+    f_bit_generator = numpy.random.PCG64(a_seed)
+    # Generator.random draws one 64 bit number per phase
+    f_bit_generator.advance(a_first_frame * a_frame_size)
+    return numpy.random.Generator(f_bit_generator).random
+
+
+class _Synthesis:
+    """ Overlap-adds output frames, each output frame is the spectrum
+        between 2 input windows with random phases
+    """
+    def __init__(self, a_channels, a_window, a_batch_size, a_phases):
+        """
+            @a_channels:   The number of channels
+            @a_window:     The Hann window
+            @a_batch_size: The maximum number of frames to render at once
+            @a_phases:     The function returned by _phases
+        """
+        windowsize = len(a_window)
+        half_windowsize = windowsize // 2
+        self.window = a_window
+        self.random = a_phases
+        self.old_windowed_buf = numpy.zeros((a_channels, windowsize))
+        self.hinv_buf = _hinv_buf(half_windowsize)
+        # The first half of the first output frame before overlap-adding,
+        # to stitch segments that were rendered separately
+        self.head = None
+        # Written with one call per batch of output frames, in column-major
+        # order so that WaveWriter.write does not copy it
+        self.output = numpy.zeros(
+            (a_channels, a_batch_size * half_windowsize),
+            order='F',
+        )
+        self.output_frames = self.output.T.reshape(
+            (a_batch_size, half_windowsize, a_channels),
+        ).transpose(0, 2, 1)
+
+    def render(self, a_freqs, a_windows, a_ticks):
+        """ Render a batch of output frames, return the output as a view of
+            a buffer that is reused by the next call
+
+            @a_freqs:   _Spectra.freqs
+            @a_windows: The index in a_freqs of the input window of each
+                        output frame, the previous input window is at the
+                        previous index
+            @a_ticks:   The tick of each output frame, how far it is from
+                        the previous input window to the input window
+        """
+        half_windowsize = len(self.window) // 2
+        frames = len(a_windows)
+        tick = a_ticks[:,None,None]
+        output_frames = self.output_frames
+
+        cfreqs = (a_freqs[a_windows] * tick) + \
+            (a_freqs[a_windows - 1] * (1.0 - tick))
+
+        # randomize the phases by multiplication with a random
+        # complex number with modulus=1
+        ph = self.random(size=cfreqs.shape) * (2. * numpy.pi) * 1j
+        cfreqs = cfreqs * numpy.exp(ph)
+
+        #do the inverse FFT
+        buf = numpy.fft.irfft(cfreqs)
+
+        #window again the output buffer
+        buf *= self.window
+
+        #overlap-add the output
+        if self.head is None:
+            self.head = buf[0,:,:half_windowsize].copy()
+        output_frames[0] = buf[0,:,:half_windowsize] + \
+            self.old_windowed_buf[:,half_windowsize:]
+        numpy.add(
+            buf[1:,:,:half_windowsize],
+            buf[:-1,:,half_windowsize:],
+            out=output_frames[1:frames],
+        )
+        self.old_windowed_buf = buf[-1]
+
+        #remove the resulted amplitude modulation
+        output_frames[:frames] *= self.hinv_buf
+
+        return self.output[:,:frames * half_windowsize]
+
+
+def _hann_window(windowsize):
+    return 0.5 - numpy.cos(numpy.arange(windowsize, dtype='double') * \
+        2.0 * numpy.pi / (windowsize - 1)) * 0.5
+
+def _hinv_buf(half_windowsize):
+    hinv_sqrt2 = (1 + numpy.sqrt(0.5)) * 0.5
+    return (
+        2.0 * (
+            hinv_sqrt2 - (1.0 - hinv_sqrt2) * numpy.cos(numpy.arange(
+                half_windowsize,
+                dtype='double',
+            ) * 2.0 * numpy.pi / half_windowsize)
+        ) / hinv_sqrt2
+    )
+
+def _num_windows(nsamples, half_windowsize):
+    """ The file ends after the first output frame of the first input
+        window that starts at or after the end of the file minus
+        half_windowsize
+    """
+    return max(1, -(-nsamples // half_windowsize))
+
+def _schedule(
+    file_path,
+    window,
+    end_size,
+    stretch,
+    onset_level,
+    batch_size,
+):
+    """ Return the input window and the tick of each output frame, as
+        NumPy arrays.  Only needs to read the file to detect onsets
+    """
+    f_reader = wavefile.WaveReader(file_path)
+    num_windows = _num_windows(f_reader.frames, len(window) // 2)
+    displacement = _Displacement(stretch)
+    frame_windows = []
+    frame_ticks = []
+    # m is from 0.0 to 1.0
+    spectra = _Spectra(f_reader, window, end_size, batch_size) \
+        if onset_level < 1.0 else None
+    for batch_start in range(0, num_windows, batch_size):
+        count = min(batch_size, num_windows - batch_start)
+        if spectra is None:
+            onsets = numpy.zeros(count, dtype=bool)
+        else:
+            spectra.read(count)
+            onsets = spectra.onsets(count, onset_level)
+        for i in range(count):
+            ticks = displacement.window_ticks(
+                onsets[i],
+                batch_start + i == num_windows - 1,
+            )
+            frame_windows.extend([batch_start + i] * len(ticks))
+            frame_ticks.extend(ticks)
+    f_reader.close()
+    return (
+        numpy.array(frame_windows, dtype=numpy.int64),
+        numpy.array(frame_ticks, dtype=numpy.float64),
+    )
+
+def _render_segment(a_args):
+    """ Render consecutive output frames in a worker process
+
+        @a_args:
+            (file_path, window, end_size, batch_size, seed, first_frame,
+            frame_windows, frame_ticks), see _schedule
+        @return:
+            (output, head, tail), the output of the frames, the first
+            half of the first frame before overlap-adding and removing the
+            amplitude modulation, and the second half of the last frame
+            to overlap-add with the next segment
+    """
+    (
+        file_path,
+        window,
+        end_size,
+        batch_size,
+        seed,
+        first_frame,
+        frame_windows,
+        frame_ticks,
+    ) = a_args
+    half_windowsize = len(window) // 2
+    f_reader = wavefile.WaveReader(file_path)
+    nchannels = f_reader.channels
+    # The spectrum of the input window before the first output frame
+    first_window = max(int(frame_windows[0]) - 1, 0)
+    last_window = int(frame_windows[-1])
+    spectra = _Spectra(f_reader, window, end_size, batch_size, first_window)
+    synthesis = _Synthesis(
+        nchannels,
+        window,
+        batch_size,
+        _phases(seed, nchannels * (half_windowsize + 1), first_frame),
+    )
+    output = numpy.zeros(
+        (nchannels, len(frame_ticks) * half_windowsize),
+        order='F',
+    )
+    frame_pos = 0
+    for batch_start in range(first_window, last_window + 1, batch_size):
+        count = min(batch_size, last_window + 1 - batch_start)
+        spectra.read(count)
+        frame_end = numpy.searchsorted(
+            frame_windows,
+            batch_start + count,
+        )
+        for frame_start in range(frame_pos, frame_end, batch_size):
+            frame_stop = min(frame_start + batch_size, frame_end)
+            output[
+                :,
+                frame_start * half_windowsize:frame_stop * half_windowsize,
+            ] = synthesis.render(
+                spectra.freqs,
+                frame_windows[frame_start:frame_stop] - batch_start + 1,
+                frame_ticks[frame_start:frame_stop],
+            )
+        frame_pos = frame_end
+    f_reader.close()
+    return (
+        output,
+        synthesis.head,
+        synthesis.old_windowed_buf[:,half_windowsize:],
+    )
+
+
 def paulstretch(
     file_path,
     stretch,
     windowsize_seconds,
     onset_level,
     outfilename,
+    batch_size=8,
+    jobs=1,
+    seed=None,
 ):
+    """ Stretch file_path into outfilename, streaming both files.
+
+        @batch_size:
+            The number of input windows and output frames that are
+            transformed with each FFT call, memory use is about
+            batch_size * channels * windowsize * 48 bytes
+        @jobs:
+            The number of processes to render with.  With more than 1,
+            the output frames are scheduled first, then rendered in
+            segments of 32 * batch_size frames
+        @seed:
+            The seed for the random phases, the output is the same for
+            any number of jobs with the same seed.  Without a seed, it is
+            drawn from numpy.random for more than 1 job
+    """
     stretch = numpy.double(stretch)
     windowsize_seconds = numpy.double(windowsize_seconds)
     onset_level = numpy.double(onset_level)
@@ -112,141 +553,102 @@ def paulstretch(
     windowsize = int(windowsize / 2) * 2
     half_windowsize = int(windowsize / 2)
 
-    smp = numpy.zeros((nchannels, nsamples), numpy.float32, order='F')
-    f_reader.read(smp)
-
     #correct the end of the smp
-
     end_size = int(samplerate * 0.05)
     if end_size < 16:
         end_size = 16
 
-    smp[:,nsamples-end_size:nsamples] *= numpy.linspace(1.0, 0.0, end_size)
-
-    #compute the displacement inside the input file
-    start_pos = 0.0
-    displace_pos = windowsize * 0.5
-
     #create Hann window
-    window = 0.5 - numpy.cos(numpy.arange(windowsize, dtype='double') * \
-        2.0 * numpy.pi / (windowsize - 1)) * 0.5
+    window = _hann_window(windowsize)
+
+    if jobs > 1:
+        f_reader.close()
+        if seed is None:
+            seed = int(numpy.random.randint(2 ** 31))
+        frame_windows, frame_ticks = _schedule(
+            file_path,
+            window,
+            end_size,
+            stretch,
+            onset_level,
+            batch_size,
+        )
+        segment_size = 32 * batch_size
+        segments = (
+            (
+                file_path,
+                window,
+                end_size,
+                batch_size,
+                seed,
+                frame_start,
+                frame_windows[frame_start:frame_start + segment_size],
+                frame_ticks[frame_start:frame_start + segment_size],
+            )
+            for frame_start in range(0, len(frame_ticks), segment_size)
+        )
+        hinv_buf = _hinv_buf(half_windowsize)
+        tail = numpy.zeros((nchannels, half_windowsize))
+        # Limit the rendered segments waiting to be written
+        pending = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+        ) as executor:
+            for segment in itertools.chain(segments, [None]):
+                while pending and (
+                    segment is None or len(pending) >= 2 * jobs
+                ):
+                    output, head, next_tail = pending.popleft().result()
+                    # overlap-add the segments
+                    output[:,:half_windowsize] = (head + tail) * hinv_buf
+                    tail = next_tail
+                    outfile.write(output)
+                if segment is not None:
+                    pending.append(
+                        executor.submit(_render_segment, segment),
+                    )
+        outfile.close()
+        return
 
-    old_windowed_buf = numpy.zeros((nchannels, windowsize))
-    hinv_sqrt2 = (1 + numpy.sqrt(0.5)) * 0.5
-    hinv_buf = (
-        2.0 * (
-            hinv_sqrt2 - (1.0 - hinv_sqrt2) * numpy.cos(numpy.arange(
-                half_windowsize,
-                dtype='double',
-            ) * 2.0 * numpy.pi / half_windowsize)
-        ) / hinv_sqrt2
+    num_windows = _num_windows(nsamples, half_windowsize)
+    spectra = _Spectra(f_reader, window, end_size, batch_size)
+    synthesis = _Synthesis(
+        nchannels,
+        window,
+        batch_size,
+        _phases(seed, nchannels * (half_windowsize + 1)),
     )
-
-    freqs = numpy.zeros((nchannels, half_windowsize + 1))
-    old_freqs = freqs
-
-    num_bins_scaled_freq = 32
-    freqs_scaled = numpy.zeros(num_bins_scaled_freq)
-    old_freqs_scaled = freqs_scaled
-
-    displace_tick = 0.0
-    displace_tick_increase = 1.0 / stretch
-    if displace_tick_increase > 1.0:
-        displace_tick_increase = 1.0
-    extra_onset_time_credit = 0.0
-    get_next_buf = True
-
-    while True:
-        if get_next_buf:
-            old_freqs = freqs
-            old_freqs_scaled = freqs_scaled
-
-            #get the windowed buffer
-            istart_pos = int(numpy.floor(start_pos))
-            buf = smp[:,istart_pos:istart_pos + windowsize]
-            if buf.shape[1] < windowsize:
-                buf = numpy.append(
-                    buf,
-                    numpy.zeros((nchannels, windowsize - buf.shape[1])),
-                    1,
-                )
-            buf = buf * window
-
-            # get the amplitudes of the frequency components
-            # and discard the phases
-            freqs = numpy.abs(numpy.fft.rfft(buf))
-
-            #scale down the spectrum to detect onsets
-            freqs_len = freqs.shape[1]
-            if num_bins_scaled_freq < freqs_len:
-                freqs_len_div = freqs_len // num_bins_scaled_freq
-                new_freqs_len = freqs_len_div * num_bins_scaled_freq
-                freqs_scaled = numpy.mean(
-                    numpy.mean(freqs, 0)[:new_freqs_len].reshape(
-                    [num_bins_scaled_freq, freqs_len_div]), 1)
-            else:
-                freqs_scaled = numpy.zeros(num_bins_scaled_freq)
-
-            #process onsets
-            m = 2.0 * numpy.mean(
-                freqs_scaled - old_freqs_scaled
-            ) / (numpy.mean(numpy.abs(old_freqs_scaled)) + 1e-3)
-            if m < 0.0:
-                m = 0.0
-            if m > 1.0:
-                m = 1.0
-
-            if m > onset_level:
-                displace_tick = 1.0
-                extra_onset_time_credit += 1.0
-
-        cfreqs = (freqs * displace_tick) + (old_freqs * (1.0 - displace_tick))
-
-        # randomize the phases by multiplication with a random
-        # complex number with modulus=1
-        ph = numpy.random.random(
-            size=(nchannels, cfreqs.shape[1])
-        ) * (2. * numpy.pi) * 1j
-        cfreqs = cfreqs * numpy.exp(ph)
-
-        #do the inverse FFT
-        buf = numpy.fft.irfft(cfreqs)
-
-        #window again the output buffer
-        buf *= window
-
-        #overlap-add the output
-        output = buf[:,0:half_windowsize] + \
-            old_windowed_buf[:,half_windowsize:windowsize]
-        old_windowed_buf=buf
-
-        #remove the resulted amplitude modulation
-        output *= hinv_buf
-
-        outfile.write(output)
-
-        if get_next_buf:
-            start_pos += displace_pos
-
-        get_next_buf = False
-
-        if start_pos >= nsamples:
-            break
-
-        if extra_onset_time_credit <= 0.0:
-            displace_tick += displace_tick_increase
-        else:
-            #this must be less than displace_tick_increase
-            credit_get = 0.5 * displace_tick_increase
-            extra_onset_time_credit -= credit_get
-            if extra_onset_time_credit < 0:
-                extra_onset_time_credit = 0
-            displace_tick += displace_tick_increase - credit_get
-
-        if displace_tick >= 1.0:
-            displace_tick = displace_tick % 1.0
-            get_next_buf = True
-
+    displacement = _Displacement(stretch)
+
+    for batch_start in range(0, num_windows, batch_size):
+        count = min(batch_size, num_windows - batch_start)
+        spectra.read(count)
+        onsets = spectra.onsets(count, onset_level)
+
+        # The input window and the tick of each output frame
+        frame_windows = []
+        frame_ticks = []
+        for i in range(count):
+            ticks = displacement.window_ticks(
+                onsets[i],
+                batch_start + i == num_windows - 1,
+            )
+            frame_windows.extend([i + 1] * len(ticks))
+            frame_ticks.extend(ticks)
+
+        for frame_start in range(0, len(frame_ticks), batch_size):
+            output = synthesis.render(
+                spectra.freqs,
+                numpy.array(
+                    frame_windows[frame_start:frame_start + batch_size],
+                ),
+                numpy.array(
+                    frame_ticks[frame_start:frame_start + batch_size],
+                ),
+            )
+            outfile.write(output)
+
+    f_reader.close()
     outfile.close()
 
 
@@ -305,6 +707,32 @@ def main():
         help="end pitch (36.0=max, -36.0=min)",
         type=float,
     )
+    parser.add_argument(
+        "--batch-size",
+        "-b",
+        default=8,
+        dest="batch_size",
+        help="the number of windows transformed with each FFT call",
+        type=int,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        default=1,
+        dest="jobs",
+        help="the number of processes to render with",
+        type=int,
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        dest="seed",
+        help=(
+            "the seed for the random phases, the output is the same for "
+            "any number of jobs with the same seed"
+        ),
+        type=int,
+    )
 
     args = parser.parse_args()
 
@@ -312,6 +740,10 @@ def main():
         args.stretch <= 0.0
         or
         args.window_size <= 0.001
+        or
+        args.batch_size < 1
+        or
+        args.jobs < 1
     ):
         print("Error in command line parameters. Run this program with "
             "--help for help.")
@@ -327,6 +759,9 @@ def main():
         numpy.double(args.window_size),
         numpy.double(args.onset),
         args.output,
+        args.batch_size,
+        args.jobs,
+        args.seed,
     )
 
 if __name__ == "__main__":
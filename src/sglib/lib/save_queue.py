@@ -0,0 +1,272 @@
+""" Write-behind saving of project files.
+
+    AbstractProject.save_file queues the text of files that already exist,
+    and a background thread writes them to a temporary file, then renames
+    it over the original, so that the UI thread does not wait for the disk
+    and a file is never left partially written.  Repeated saves of the same
+    file before it is written only write the latest text.
+
+    Until a file is written, util.read_file_text returns the queued text.
+    Messages to the engine are not sent until the files saved before them
+    are written, and flush() must be called before anything else reads the
+    project folder, for example rendering or restarting the engine.
+
+    A file that could not be written keeps its text, and is written again
+    with the next batch.  flush() raises SaveError while any file has not
+    been written, and pop_errors() returns each failure once, for the UI
+    to show.
+"""
+
+from sglib.log import LOG
+import collections
+import os
+import threading
+import time
+
+__all__ = [
+    'SAVE_QUEUE',
+    'SaveError',
+    'SaveQueue',
+]
+
+
+class SaveError(OSError):
+    """ Raised by SaveQueue.flush if files could not be written """
+    def __init__(self, a_errors):
+        """ @a_errors: {path: exception} """
+        self.errors = dict(a_errors)
+        super().__init__(
+            "Could not save:\n" + "\n".join(
+                f"{k}: {v}" for k, v in self.errors.items()
+            )
+        )
+
+
+class SaveQueue:
+    # Times to retry replacing a file, Windows does not allow replacing a
+    # file that another process has open
+    REPLACE_RETRIES = 10
+
+    def __init__(self, a_fsync=True):
+        self.fsync = a_fsync
+        self._cond = threading.Condition()
+        # path: text, oldest first
+        self._pending = collections.OrderedDict()
+        # The files being written by the background thread, path: text
+        self._writing = {}
+        # The files that could not be written, path: text, they are
+        # written again with the next batch
+        self._failed = {}
+        # path: exception, of the files in self._failed
+        self._errors = {}
+        # path: exception, the errors that pop_errors has not returned
+        self._unreported = {}
+        # Incremented by each write(), flush() waits for the current
+        # generation to be written
+        self._generation = 0
+        self._written = 0
+        # [(generation, callback), ...]
+        self._callbacks = []
+        self._thread = None
+
+    @staticmethod
+    def key(a_path):
+        return os.path.normcase(os.path.abspath(str(a_path)))
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def pending(self):
+        """ The number of files that have not been written """
+        with self._cond:
+            return (
+                len(self._pending)
+                +
+                len(self._writing)
+                +
+                len(self._failed)
+            )
+
+    def write(self, a_path, a_text):
+        """ Queue a_text to be written to a_path """
+        f_key = self.key(a_path)
+        with self._cond:
+            self._pending.pop(f_key, None)
+            self._forget_failed(f_key)
+            self._pending[f_key] = str(a_text)
+            self._generation += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._save_thread,
+                    name='project-save',
+                    daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def read(self, a_path):
+        """ Return the text that is queued for a_path, or None """
+        f_key = self.key(a_path)
+        with self._cond:
+            if f_key in self._pending:
+                return self._pending[f_key]
+            if f_key in self._writing:
+                return self._writing[f_key]
+            return self._failed.get(f_key)
+
+    def discard(self, a_path):
+        """ Forget the queued text of a file that is about to be written
+            or deleted directly, and wait if it is being written
+        """
+        f_key = self.key(a_path)
+        f_callbacks = []
+        with self._cond:
+            self._pending.pop(f_key, None)
+            self._cond.wait_for(lambda: f_key not in self._writing)
+            self._forget_failed(f_key)
+            if not self._pending and not self._writing:
+                # Nothing left for the thread to write
+                f_callbacks = self._set_written(self._generation)
+        self._run_callbacks(f_callbacks)
+
+    def wait(self, a_generation, timeout=None):
+        """ Wait until the files queued up to a_generation are written.
+            Returns False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._written >= a_generation,
+                timeout,
+            )
+
+    def flush(self, timeout=None):
+        """ Wait until every queued file is written.  Returns False on
+            timeout, raises SaveError if any file could not be written
+        """
+        if not self.wait(self._generation, timeout):
+            return False
+        with self._cond:
+            if self._errors:
+                raise SaveError(self._errors)
+        return True
+
+    def pop_errors(self):
+        """ Return {path: exception} of the files that could not be written
+            since the last call
+        """
+        with self._cond:
+            f_result = self._unreported
+            self._unreported = {}
+        return f_result
+
+    def _forget_failed(self, a_key):
+        """ Must hold self._cond """
+        self._failed.pop(a_key, None)
+        self._errors.pop(a_key, None)
+        self._unreported.pop(a_key, None)
+
+    def call_after(self, a_generation, a_callback):
+        """ Call a_callback once the files queued up to a_generation are
+            written, from the thread that writes them, or now if they
+            already are
+        """
+        with self._cond:
+            if self._written < a_generation:
+                self._callbacks.append((a_generation, a_callback))
+                return
+        a_callback()
+
+    def _save_thread(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                f_generation = self._generation
+                # Retry the files that failed before
+                self._writing = dict(self._failed)
+                self._writing.update(self._pending)
+                self._failed.clear()
+                self._pending.clear()
+            f_errors = self._write_batch(self._writing)
+            with self._cond:
+                for f_key in self._writing:
+                    if f_key in f_errors:
+                        self._failed[f_key] = self._writing[f_key]
+                    else:
+                        self._errors.pop(f_key, None)
+                        self._unreported.pop(f_key, None)
+                self._errors.update(f_errors)
+                self._unreported.update(f_errors)
+                self._writing = {}
+                f_callbacks = self._set_written(f_generation)
+            self._run_callbacks(f_callbacks)
+
+    def _set_written(self, a_generation):
+        """ Must hold self._cond, returns the callbacks to call after
+            releasing it
+        """
+        self._written = max(self._written, a_generation)
+        f_callbacks = [x[1] for x in self._callbacks if x[0] <= self._written]
+        self._callbacks = [x for x in self._callbacks if x[0] > self._written]
+        self._cond.notify_all()
+        return f_callbacks
+
+    def _run_callbacks(self, a_callbacks):
+        for f_callback in a_callbacks:
+            try:
+                f_callback()
+            except Exception as ex:
+                LOG.exception(ex)
+
+    def _write_batch(self, a_files):
+        """ Write each file to a temporary file, then rename them all, then
+            sync each folder once.  Returns {path: exception} of the files
+            that could not be written
+        """
+        f_errors = {}
+        f_replace = []
+        for f_path, f_text in a_files.items():
+            f_tmp = f"{f_path}.tmp"
+            try:
+                with open(f_tmp, "w", encoding='utf-8', newline="\n") as f:
+                    f.write(f_text)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                f_replace.append((f_tmp, f_path))
+            except Exception as ex:
+                LOG.error(f"Could not save {f_path}")
+                LOG.exception(ex)
+                f_errors[f_path] = ex
+        f_folders = set()
+        for f_tmp, f_path in f_replace:
+            for f_retry in range(self.REPLACE_RETRIES):
+                try:
+                    os.replace(f_tmp, f_path)
+                    f_folders.add(os.path.dirname(f_path))
+                    break
+                except PermissionError as ex:
+                    if f_retry == self.REPLACE_RETRIES - 1:
+                        LOG.error(f"Could not save {f_path}")
+                        LOG.exception(ex)
+                        f_errors[f_path] = ex
+                    else:
+                        time.sleep(0.05)
+                except Exception as ex:
+                    LOG.error(f"Could not save {f_path}")
+                    LOG.exception(ex)
+                    f_errors[f_path] = ex
+                    break
+        if self.fsync and hasattr(os, 'O_DIRECTORY'):
+            for f_folder in f_folders:
+                try:
+                    f_fd = os.open(f_folder, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(f_fd)
+                    finally:
+                        os.close(f_fd)
+                except Exception as ex:
+                    LOG.warning(f"Could not sync {f_folder}: {ex}")
+        return f_errors
+
+SAVE_QUEUE = SaveQueue()
@@ -0,0 +1,268 @@
+""" A persistent cache of time stretched audio files, shared by all
+    projects.
+
+    Stretched files are keyed by the content of the source file, the time
+    stretch mode and parameters, and the version of the program that
+    stretched them, so that a cached file is found again after the source
+    file moved or was imported into another project.  The index is an
+    SQLite database next to the cached files, the least recently used
+    files are removed once their total size exceeds the budget, together
+    with the memoized hashes of source files that were deleted or changed.
+"""
+
+from sglib.constants import HOME
+from sglib.lib.cache import cache_budget
+from sglib.log import LOG
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+__all__ = [
+    'STRETCH_CACHE_DIR',
+    'StretchCache',
+    'default_stretch_cache',
+    'tool_version',
+]
+
+STRETCH_CACHE_DIR = os.path.join(HOME, 'cache', 'timestretch')
+
+_DEFAULT = None
+_DEFAULT_LOCK = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+"""
+
+
+def default_stretch_cache():
+    """ Return the StretchCache in the user's STRETCH_CACHE_DIR, its
+        budget is the "timestretch-disk-cache-mb" file setting
+    """
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = StretchCache(
+                STRETCH_CACHE_DIR,
+                cache_budget('timestretch-disk', 2048),
+            )
+        return _DEFAULT
+
+def tool_version(a_path):
+    """ Identify the version of a program or script by the size and
+        modification time of its file, without running it.  Returns an
+        empty string if it does not exist
+    """
+    try:
+        f_stat = os.stat(a_path)
+    except (OSError, TypeError):
+        return ''
+    return f'{f_stat.st_size}:{f_stat.st_mtime_ns}'
+
+
+class StretchCache:
+    """ Stretched audio files by StretchCache.key, in a folder with an
+        SQLite index.  Can be used by several processes at once
+    """
+    def __init__(self, a_dir, a_max_bytes):
+        """
+            @a_dir:        The folder of the index and the cached files
+            @a_max_bytes:  The total size of the cached files to keep
+        """
+        self.dir = a_dir
+        self.max_bytes = a_max_bytes
+        os.makedirs(a_dir, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(a_dir, 'index.sqlite'),
+            timeout=10.,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _path(self, a_key):
+        return os.path.join(self.dir, f'{a_key}.wav')
+
+    def content_hash(self, a_path):
+        """ Return the SHA-256 of the content of a file.  It is only read
+            again if its size or modification time changed
+        """
+        f_stat = os.stat(a_path)
+        with self._lock:
+            f_row = self._db.execute(
+                'SELECT size, mtime_ns, hash FROM sources WHERE path = ?',
+                (a_path,),
+            ).fetchone()
+        if f_row and f_row[:2] == (f_stat.st_size, f_stat.st_mtime_ns):
+            return f_row[2]
+        f_hash = hashlib.sha256()
+        with open(a_path, 'rb') as f:
+            for f_block in iter(lambda: f.read(1024 * 1024), b''):
+                f_hash.update(f_block)
+        f_hash = f_hash.hexdigest()
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)',
+                (a_path, f_stat.st_size, f_stat.st_mtime_ns, f_hash),
+            )
+        return f_hash
+
+    def key(self, a_src_path, a_mode, a_params, a_tool_version):
+        """ Return the key of a stretched file
+
+            @a_src_path:      The file that was stretched
+            @a_mode:          The time stretch mode
+            @a_params:        A sequence of the parameters of the mode
+            @a_tool_version:  See tool_version
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    self.content_hash(a_src_path),
+                    a_mode,
+                    list(a_params),
+                    a_tool_version,
+                ],
+            ).encode(),
+        ).hexdigest()
+
+    def get(self, a_key, a_dest_path):
+        """ Copy the cached file of a_key to a_dest_path and mark it as the
+            most recently used, return True, or False if it is not cached
+        """
+        f_path = self._path(a_key)
+        with self._lock:
+            f_row = self._db.execute(
+                'SELECT size FROM entries WHERE key = ?',
+                (a_key,),
+            ).fetchone()
+        if f_row is None:
+            return False
+        try:
+            shutil.copyfile(f_path, a_dest_path)
+        except OSError as ex:
+            LOG.warning(f"Removing missing stretch cache file {f_path}")
+            LOG.exception(ex)
+            with self._lock, self._db:
+                self._db.execute(
+                    'DELETE FROM entries WHERE key = ?',
+                    (a_key,),
+                )
+            return False
+        with self._lock, self._db:
+            self._db.execute(
+                'UPDATE entries SET last_used = ? WHERE key = ?',
+                (time.time(), a_key),
+            )
+        return True
+
+    def put(self, a_key, a_path):
+        """ Copy the stretched file a_path into the cache, then remove the
+            least recently used files until the cache is within budget
+        """
+        f_size = os.path.getsize(a_path)
+        if f_size > self.max_bytes:
+            return
+        f_cache_path = self._path(a_key)
+        # Unique, another thread or process may put the same key
+        f_fd, f_tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.dir)
+        os.close(f_fd)
+        try:
+            shutil.copyfile(a_path, f_tmp_path)
+            os.replace(f_tmp_path, f_cache_path)
+        except OSError:
+            try:
+                os.remove(f_tmp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?)',
+                (a_key, f_size, time.time()),
+            )
+        self.evict()
+
+    def evict(self):
+        """ Remove the least recently used files until the total size is
+            within max_bytes, and the hashes of source files that no
+            longer exist or changed
+        """
+        with self._lock, self._db:
+            f_total = self._db.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM entries',
+            ).fetchone()[0]
+            if f_total <= self.max_bytes:
+                return
+            f_removed = []
+            for f_key, f_size in self._db.execute(
+                'SELECT key, size FROM entries ORDER BY last_used',
+            ).fetchall():
+                if f_total <= self.max_bytes:
+                    break
+                f_removed.append(f_key)
+                f_total -= f_size
+            self._db.executemany(
+                'DELETE FROM entries WHERE key = ?',
+                ((x,) for x in f_removed),
+            )
+        for f_key in f_removed:
+            try:
+                os.remove(self._path(f_key))
+            except OSError:
+                pass
+        self.prune_sources()
+
+    def prune_sources(self):
+        """ Remove the hashes of source files that were deleted or changed
+            since they were hashed
+        """
+        with self._lock:
+            f_rows = self._db.execute(
+                'SELECT path, size, mtime_ns FROM sources',
+            ).fetchall()
+        f_stale = []
+        for f_path, f_size, f_mtime_ns in f_rows:
+            try:
+                f_stat = os.stat(f_path)
+            except OSError:
+                f_stale.append((f_path, f_size, f_mtime_ns))
+                continue
+            if (f_stat.st_size, f_stat.st_mtime_ns) != (f_size, f_mtime_ns):
+                f_stale.append((f_path, f_size, f_mtime_ns))
+        if not f_stale:
+            return
+        with self._lock, self._db:
+            # Unless another process hashed it again in the meantime
+            self._db.executemany(
+                'DELETE FROM sources '
+                'WHERE path = ? AND size = ? AND mtime_ns = ?',
+                f_stale,
+            )
+
+    def stats(self):
+        """ Return {'entries': count, 'bytes': total size} """
+        with self._lock:
+            f_count, f_total = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries',
+            ).fetchone()
+        return {'entries': f_count, 'bytes': f_total}
@@ -127,7 +127,8 @@ other process(es)""")
 routing_graph = _("""\
 Audio (click), sidechain(CTRL+click) and MIDI(SHIFT+click) routing between
 tracks. Click below the dest. to route to lower numbered tracks,
-above for higher. Double click a track to open plugins
+above for higher. Double click a track to open plugins.  Right click for
+an estimate of how well the routing scales across CPU cores
 """)
 
 track_panel_dropdown = _("""\
@@ -1,5 +1,6 @@
 from sglib.constants import *
 from sglib.hardware.rpi import is_rpi
+from sglib.lib.save_queue import SAVE_QUEUE
 from sglib.log import LOG
 from sglib.math import clip_max, clip_min, clip_value
 import ctypes
@@ -149,6 +150,13 @@ USE_HUGEPAGES = 0
 DEVICE_SETTINGS = {}
 DEVICE_CONFIG_PATH = os.path.join(CONFIG_DIR, "device.txt")
 
+# Values of the ipcTransport device setting
+IPC_TRANSPORT_UDP = 'udp'
+IPC_TRANSPORT_UNIX = 'unix'
+# The name of the unix sockets, unique to this UI process so that multiple
+# instances do not collide, see engine --ipc-socket
+IPC_SOCKET_NAME = f"clinttools-{os.getpid()}"
+
 MIDI_IN_DEVICES = []
 
 SAMPLE_RATE = None
@@ -539,11 +547,13 @@ def paulstretch(
     a_src_path,
     a_dest_path,
     a_timestretch_amt,
+    a_jobs=None,
 ):
     f_cmd = [
         PAULSTRETCH_PATH,
         'paulstretch',
         "-s", str(a_timestretch_amt),
+        "-j", str(a_jobs if a_jobs else AUTO_CPU_COUNT),
         a_src_path,
         a_dest_path,
     ]
@@ -554,14 +564,23 @@ def paulstretch(
     return f_proc
 
 def read_file_text(a_file):
+    f_text = SAVE_QUEUE.read(a_file)
+    if f_text is not None:
+        return f_text
     with sg_open(pi_path(a_file)) as f:
         return f.read()
 
 def read_file_lines(path):
+    f_text = SAVE_QUEUE.read(path)
+    if f_text is not None:
+        return f_text.splitlines(keepends=True)
     with sg_open(pi_path(path)) as f:
         return f.readlines()
 
 def read_file_json(path):
+    f_text = SAVE_QUEUE.read(path)
+    if f_text is not None:
+        return json.loads(f_text)
     with sg_open(pi_path(path)) as f:
         return json.load(f)
 
@@ -570,9 +589,21 @@ def read_file_yaml(path):
         return yaml.safe_load(f)
 
 def write_file_text(a_file, a_text):
+    SAVE_QUEUE.discard(a_file)
     with sg_open(pi_path(a_file), "w", newline="\n") as f:
         f.write(str(a_text))
 
+def write_file_text_atomic(a_file, a_text):
+    """ Write to a temporary file in the same folder, then rename it over
+        a_file, so that a_file is never left partially written
+    """
+    a_file = pi_path(a_file)
+    SAVE_QUEUE.discard(a_file)
+    f_tmp = f"{a_file}.tmp"
+    with sg_open(f_tmp, "w", newline="\n") as f:
+        f.write(str(a_text))
+    os.replace(f_tmp, a_file)
+
 def gen_uid():
     """Generated an integer uid.  Adding together multiple random
         numbers gives a far less uniform distribution of
@@ -660,20 +691,10 @@ class OnePoleLP:
         self.z1 = a_in * self.a0 + self.z1 * self.b1
         return self.z1
 
-def wait_for_finished_file(a_file):
-    """ Wait until a_file exists, then delete it and return.  It should
-        already have the .finished extension
-    """
-    while True:
-        if os.path.isfile(a_file):
-            try:
-                os.remove(a_file)
-                break
-            except:
-                LOG.error("wait_for_finished_file:  Exception "
-                    "when deleting {}".format(a_file))
-        else:
-            time.sleep(0.1)
+def delete_file(a_file):
+    """ Delete a file, and any text that is queued to be saved to it """
+    SAVE_QUEUE.discard(a_file)
+    os.remove(a_file)
 
 def get_wait_file_path(a_file):
     f_wait_file = "{}.finished".format(a_file)
@@ -781,6 +802,19 @@ def read_device_config():
 
 read_device_config()
 
+def ipc_transport():
+    """ Return the transport chosen in the ipcTransport device setting.
+        Unix sockets use the Linux abstract namespace, UDP is used on other
+        platforms and by default
+    """
+    if (
+        IS_LINUX
+        and
+        DEVICE_SETTINGS.get("ipcTransport") == IPC_TRANSPORT_UNIX
+    ):
+        return IPC_TRANSPORT_UNIX
+    return IPC_TRANSPORT_UDP
+
 def rgb_minus(a_rgb, a_amt):
     f_result = []
     for f_color in a_rgb:
@@ -4,5 +4,6 @@ from .midi_events import *
 from .project import *
 from .sample_graph import *
 from .takes import *
+from .timestretch import *
 from .tracks import *
 
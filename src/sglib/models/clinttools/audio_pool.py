@@ -126,6 +126,15 @@ class AudioPool:
             PerFileFX,
             desc="Entries describing audio files used in this project",
         )
+        self.reindex()
+
+    def reindex(self):
+        """ Rebuild the uid and path indexes.  Only needed after changing
+            the uid or path of an existing entry
+        """
+        self._by_uid = {x.uid: x for x in self.pool}
+        self._by_path = {x.path: x for x in self.pool}
+        self._next_uid = max(self._by_uid) + 1 if self._by_uid else 0
 
     def add_entry(self, path, uid=None) -> AudioPoolEntry:
         path = pi_path(path)
@@ -134,48 +143,52 @@ class AudioPool:
             FileNotFoundError,
             path,
         )
-        by_path = self.by_path()
         pm_assert(
-            path not in by_path,
+            path not in self._by_path,
             FileExistsError,
-            (path, uid, by_path),
+            (path, uid),
         )
         if uid is None:
             uid = self.next_uid()
         type_assert(uid, int)
-        by_uid = self.by_uid()
         pm_assert(
-            uid not in by_uid,
+            uid not in self._by_uid,
             FileExistsError,
-            (uid, by_uid),
+            (uid, path),
         )
         entry = AudioPoolEntry(uid, 0., path)
         self.pool.append(entry)
+        self._by_uid[entry.uid] = entry
+        self._by_path[entry.path] = entry
+        if entry.uid >= self._next_uid:
+            self._next_uid = entry.uid + 1
         return entry
 
     def remove_by_uid(self, uids):
+        uids = set(uids)
         self.pool = [
             x for x in self.pool
             if x.uid not in uids
         ]
+        for uid in uids:
+            entry = self._by_uid.pop(uid, None)
+            if entry is not None:
+                self._by_path.pop(entry.path, None)
 
     def next_uid(self):
-        if self.pool:
-            return max(x.uid for x in self.pool) + 1
-        else:
-            return 0
+        """ Return the next unused uid.  UIDs of removed entries are not
+            reused while the pool is loaded, files derived from the old uid
+            such as sample graphs may still exist
+        """
+        return self._next_uid
 
     def by_uid(self):
-        return {
-            x.uid: x
-            for x in self.pool
-        }
+        """ Return the {uid: AudioPoolEntry} index, do not modify it """
+        return self._by_uid
 
     def by_path(self):
-        return {
-            x.path: x
-            for x in self.pool
-        }
+        """ Return the {path: AudioPoolEntry} index, do not modify it """
+        return self._by_path
 
     def per_file_fx_by_uid(self):
         return {
@@ -4,13 +4,25 @@ from .audio_pool import (
 )
 from .sample_graph import (
     clear_sample_graph_cache,
+    generate_sample_graph,
     remove_item_from_sg_cache,
+    sample_graph_binary_path,
     SampleGraph,
+    SampleGraphBatch,
+)
+from .timestretch import (
+    TimestretchBatch,
+    TimestretchJob,
 )
 from sglib import constants
 from sglib.lib import *
 from sglib.lib.util import *
 from sglib.constants import MAJOR_VERSION
+from sglib.ipc.shm import SHM_FILE_NAME
+from sglib.lib.cache import invalidate_audio_pool_uid
+from sglib.lib.history import JOURNAL_FILE_NAME
+from sglib.lib.save_queue import SAVE_QUEUE, SaveError
+from sglib.lib.stretch_cache import default_stretch_cache, tool_version
 from sglib.models.project.abstract import AbstractProject
 from sglib.log import LOG
 import collections
@@ -45,6 +57,10 @@ class SgProject(AbstractProject):
     def __init__(self):
         self.cached_audio_files = []
         self.glued_name_index = 0
+        self._audio_pool = None
+        self._audio_pool_text = None
+        self.sample_graph_batch = None
+        self.stretch_cache = None
 
     def set_project_folders(self, a_project_file):
         #folders
@@ -109,6 +125,11 @@ class SgProject(AbstractProject):
         ]
 
         clear_sample_graph_cache()
+        self._audio_pool = None
+        self._audio_pool_text = None
+        if self.sample_graph_batch is not None:
+            self.sample_graph_batch.shutdown()
+            self.sample_graph_batch = None
 
     def open_project(self, a_project_file, a_notify_osc=True):
         self.set_project_folders(a_project_file)
@@ -165,6 +186,7 @@ class SgProject(AbstractProject):
                     )
         if changed:
             LOG.info('Saving repaired audio pool')
+            pool.reindex()
             self.save_audio_pool(pool)
 
 
@@ -204,6 +226,9 @@ class SgProject(AbstractProject):
     def clear_audio_tmp_folder(self):
         pattern = os.path.join(self.audio_tmp_folder, '*')
         for path in glob.glob(pattern):
+            # The engine's shared memory ring buffer
+            if os.path.basename(path) == SHM_FILE_NAME:
+                continue
             os.remove(path)
 
     def create_backup(self, a_name=None):
@@ -214,10 +239,24 @@ class SgProject(AbstractProject):
         if os.path.exists(path):
             LOG.error(f"create_backup: '{path}' exists, not creating")
             return False
+        try:
+            SAVE_QUEUE.flush()
+        except SaveError as ex:
+            # Shown by the UI, back up what is on disk
+            LOG.exception(ex)
+
+        def _filter(a_info):
+            # The undo journal can be very large, and is not needed to
+            # restore the project
+            if os.path.basename(a_info.name) == JOURNAL_FILE_NAME:
+                return None
+            return a_info
+
         with tarfile.open(path, "w:bz2") as f_tar:
             f_tar.add(
                 self.projects_folder,
                 arcname=os.path.basename(self.projects_folder),
+                filter=_filter,
             )
         LOG.info(f'Created backup at {path}')
         return True
@@ -240,13 +279,29 @@ class SgProject(AbstractProject):
         for f_line in f_cache_text.split("\n"):
             if f_line == terminating_char:
                 break
-            f_line_arr = f_line.split("|", 5)
-            f_file_path_and_uid = f_line_arr[5].split("|||")
+            f_key, f_uid = f_line.rsplit("|||", 1)
+            f_key = f_key.split("|", 5)
+            f_crispness, f_path = f_key[5], ""
+            if "|" in f_crispness:
+                f_crispness, f_path = f_crispness.split("|", 1)
+            try:
+                f_crispness = int(f_crispness)
+            except ValueError:
+                # Legacy line without the crispness, use the default of
+                # SgAudioItem.  The path may contain "|"
+                f_crispness = 5
+                f_path = f_key[5]
             self.timestretch_cache[
-                (int(f_line_arr[0]), float(f_line_arr[1]),
-                float(f_line_arr[2]), float(f_line_arr[3]),
-                float(f_line_arr[4]),
-                f_file_path_and_uid[0])] = int(f_file_path_and_uid[1])
+                (
+                    int(f_key[0]),
+                    float(f_key[1]),
+                    float(f_key[2]),
+                    float(f_key[3]),
+                    float(f_key[4]),
+                    f_crispness,
+                    f_path,
+                )
+            ] = int(f_uid)
 
         f_map_text = read_file_text(self.pystretch_map_file)
         for f_line in f_map_text.split("\n"):
@@ -258,28 +313,85 @@ class SgProject(AbstractProject):
             self.timestretch_reverse_lookup[src] = dst
 
     def save_stretch_dicts(self):
-        f_stretch_text = ""
-        for k, v in list(self.timestretch_cache.items()):
-            for f_tuple_val in k:
-                f_stretch_text += "{}|".format(f_tuple_val)
-            f_stretch_text += "||{}\n".format(v)
-        f_stretch_text += terminating_char
-        self.save_file("", file_pystretch, f_stretch_text)
-
-        f_map_text = ""
-        for k, v in list(self.timestretch_reverse_lookup.items()):
-            f_map_text += "{}|||{}\n".format(k, v)
-        f_map_text += terminating_char
-        self.save_file("", file_pystretch_map, f_map_text)
+        f_stretch_text = "".join(
+            "{}|||{}\n".format("|".join(str(x) for x in k), v)
+            for k, v in self.timestretch_cache.items()
+        )
+        self.save_file(
+            "",
+            file_pystretch,
+            f_stretch_text + terminating_char,
+        )
+
+        f_map_text = "".join(
+            "{}|||{}\n".format(k, v)
+            for k, v in self.timestretch_reverse_lookup.items()
+        )
+        self.save_file(
+            "",
+            file_pystretch_map,
+            f_map_text + terminating_char,
+        )
+
+    def get_stretch_cache(self):
+        """ Return the StretchCache shared by all projects """
+        if self.stretch_cache is None:
+            self.stretch_cache = default_stretch_cache()
+        return self.stretch_cache
+
+    def _stretch_cache_key(self, a_key):
+        """ Return the StretchCache key for a timestretch_cache key, or
+            None if its source file cannot be read
+        """
+        f_mode = a_key[0]
+        if f_mode == 6:
+            f_tool = os.path.join(
+                os.path.dirname(util.__file__),
+                'paulstretch.py',
+            )
+        else:
+            f_tool = {
+                3: RUBBERBAND_PATH,
+                4: RUBBERBAND_PATH,
+                5: SBSMS,
+                7: SOUNDSTRETCH,
+                8: SOUNDSTRETCH,
+            }[f_mode]
+        try:
+            return self.get_stretch_cache().key(
+                a_key[-1],
+                f_mode,
+                a_key[1:-1],
+                tool_version(f_tool),
+            )
+        except OSError as ex:
+            LOG.warning(f"Not caching the stretched {a_key[-1]}")
+            LOG.exception(ex)
+            return None
 
     def get_audio_pool(self):
-        if not os.path.exists(self.audio_pool_file):
-            return AudioPool.new()
-        content = read_file_text(self.audio_pool_file)
-        return AudioPool.from_str(content)
+        """ Return the project's AudioPool.  It is only read from disk the
+            first time, changes are written back by save_audio_pool
+        """
+        if self._audio_pool is None:
+            if os.path.exists(self.audio_pool_file):
+                content = read_file_text(self.audio_pool_file)
+                self._audio_pool = AudioPool.from_str(content)
+                self._audio_pool_text = content
+            else:
+                self._audio_pool = AudioPool.new()
+        return self._audio_pool
 
     def save_audio_pool(self, a_uid_dict):
-        write_file_text(self.audio_pool_file, a_uid_dict)
+        """ Make a_uid_dict the project's AudioPool, and write it to disk
+            if it has changed since it was last read or written
+        """
+        self._audio_pool = a_uid_dict
+        content = str(a_uid_dict)
+        if content == self._audio_pool_text:
+            return
+        write_file_text_atomic(self.audio_pool_file, content)
+        self._audio_pool_text = content
 
     def timestretch_lookup_orig_path(self, a_path):
         if a_path in self.timestretch_reverse_lookup:
@@ -287,10 +399,10 @@ class SgProject(AbstractProject):
         else:
             return a_path
 
-    def timestretch_audio_item(self, a_audio_item):
-        """ Return path, uid for a time-stretched
-            audio item and update all project files,
-            or None if the UID already exists in the cache
+    def _timestretch_key(self, a_audio_item):
+        """ Round the time stretch parameters of an audio item, return
+            (key, source path) for timestretch_cache, or None if it does
+            not need to be stretched
         """
         a_audio_item.timestretch_amt = round(
             a_audio_item.timestretch_amt, 6)
@@ -327,7 +439,7 @@ class SgProject(AbstractProject):
                     a_audio_item.timestretch_amt_end
             ):
                 #Don't process if the file is not being stretched/shifted yet
-                return
+                return None
         f_key = (
             a_audio_item.time_stretch_mode,
             a_audio_item.timestretch_amt,
@@ -337,17 +449,91 @@ class SgProject(AbstractProject):
             a_audio_item.crispness,
             f_src_path,
         )
-        if f_key in self.timestretch_cache:
-            a_audio_item.uid = self.timestretch_cache[f_key]
-            return
-        else:
-            f_wavs_dict = self.get_audio_pool()
-            f_uid = f_wavs_dict.next_uid()
+        return f_key, f_src_path
+
+    def timestretch_audio_item(self, a_audio_item, a_jobs=None):
+        """ Time stretch an audio item and update all project files, see
+            timestretch_audio_items
+
+            @a_jobs:  The number of processes for Paulstretch to render
+                      with, defaults to util.AUTO_CPU_COUNT
+        """
+        self.timestretch_audio_items([a_audio_item], a_jobs=a_jobs)
+
+    def timestretch_audio_items(
+        self,
+        a_audio_items,
+        a_progress=None,
+        a_jobs=None,
+        a_workers=None,
+    ):
+        """ Time stretch audio items and update all project files.  The
+            stretched files that are not cached yet are created by running
+            several time stretching programs at once, audio items with the
+            same source file and parameters share one run.  When all of
+            them have finished, timestretch_cache and the audio pool are
+            updated, and each audio item is set to its stretched file.
+
+            Raises the FileNotFoundError of the first program that failed,
+            after updating the audio items of the others
+
+            @a_progress:  Called with (done, total) while waiting for the
+                          programs, see TimestretchBatch.run
+            @a_jobs:      The number of processes for each Paulstretch run
+                          to render with, defaults to
+                          util.AUTO_CPU_COUNT divided by the number of
+                          audio items
+            @a_workers:   The number of programs to run at once, defaults
+                          to util.AUTO_CPU_COUNT
+        """
+        f_wavs_dict = self.get_audio_pool()
+        f_batch = TimestretchBatch(a_workers)
+        # key: TimestretchJob, the files copied from the StretchCache
+        f_cached = {}
+        if not a_jobs:
+            a_jobs = max(1, AUTO_CPU_COUNT // max(1, len(a_audio_items)))
+        for a_audio_item in a_audio_items:
+            f_key_and_path = self._timestretch_key(a_audio_item)
+            if f_key_and_path is None:
+                continue
+            f_key, f_src_path = f_key_and_path
+            if f_key in self.timestretch_cache:
+                a_audio_item.uid = self.timestretch_cache[f_key]
+                continue
+            f_job = f_batch.get(f_key) or f_cached.get(f_key)
+            if f_job is not None:
+                f_job.audio_items.append(a_audio_item)
+                continue
+            # The files created by the batch are added to the audio pool
+            # after it finishes, reserve a uid for each of them
+            f_uid = f_wavs_dict.next_uid() + len(f_batch) + len(f_cached)
             f_dest_path = os.path.join(
                 self.timestretch_folder,
                 f"{f_uid}.wav",
             )
             f_dest_path = util.pi_path(f_dest_path)
+            f_cmd_src_path = f_src_path
+
+            # The engine modes are fast, only the external programs are
+            # worth caching across projects
+            f_cache_key = None
+            if a_audio_item.time_stretch_mode >= 3:
+                f_cache_key = self._stretch_cache_key(f_key)
+                if (
+                    f_cache_key is not None
+                    and
+                    self.get_stretch_cache().get(f_cache_key, f_dest_path)
+                ):
+                    f_job = TimestretchJob(
+                        f_key,
+                        f_uid,
+                        f_src_path,
+                        f_dest_path,
+                        None,
+                    )
+                    f_job.audio_items.append(a_audio_item)
+                    f_cached[f_key] = f_job
+                    continue
 
             f_cmd = None
             if a_audio_item.time_stretch_mode == 1:
@@ -406,6 +592,7 @@ class SgProject(AbstractProject):
                     PAULSTRETCH_PATH,
                     'paulstretch',
                     "-s", str(a_audio_item.timestretch_amt),
+                    "-j", str(a_jobs),
                     f_src_path,
                     f_dest_path,
                 ]
@@ -417,11 +604,11 @@ class SgProject(AbstractProject):
                     with tempfile.NamedTemporaryFile() as t:
                         tmp = t.name + '.wav'
                     convert_to_wav(f_src_path, tmp)
-                    f_src_path = tmp
+                    f_cmd_src_path = tmp
                 _rate = ((1. / a_audio_item.timestretch_amt) - 1.0) * 100.
                 f_cmd = [
                     SOUNDSTRETCH,
-                    f_src_path,
+                    f_cmd_src_path,
                     f_dest_path,
                     f'-pitch={a_audio_item.pitch_shift}',
                     f'-rate={_rate}',
@@ -429,47 +616,47 @@ class SgProject(AbstractProject):
                 if a_audio_item.time_stretch_mode == 8:
                     f_cmd.append('-speech')
 
-            self.timestretch_cache[f_key] = f_uid
-            self.timestretch_reverse_lookup[f_dest_path] = f_src_path
-
-            if f_cmd is not None:
-                LOG.info("Running {}".format(" ".join(f_cmd)))
-                if IS_WINDOWS:
-                    startupinfo = subprocess.STARTUPINFO()
-                    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                    env = os.environ.copy()
-                    env['PATH'] = ENGINE_DIR + ';' + env['PATH']
-                    env['PYTHONPATH'] = INSTALL_PREFIX
-                    #LOG.info(env)
-                    f_proc = subprocess.Popen(
-                        f_cmd,
-                        encoding='UTF-8',
-                        env=env,
-                        startupinfo=startupinfo,
-                    )
-                else:
-                    f_proc = subprocess.Popen(
+            if f_cmd is None:
+                self.timestretch_cache[f_key] = f_uid
+                self.timestretch_reverse_lookup[f_dest_path] = f_src_path
+            else:
+                f_job = f_batch.add(
+                    TimestretchJob(
+                        f_key,
+                        f_uid,
+                        f_src_path,
+                        f_dest_path,
                         f_cmd,
-                        encoding='UTF-8',
-                    )
-                stdout, stderr = f_proc.communicate()
-                if not (
-                    f_proc.returncode == 0
-                    and
-                    os.path.exists(f_dest_path)
-                ):
-                    LOG.error(f"{f_cmd} failed with {f_proc.returncode}")
-                    LOG.error(stdout)
-                    LOG.error(stderr)
-                    raise FileNotFoundError(
-                        f"Could not time stretch file, {f_cmd} returned "
-                        f"{f_proc.returncode}"
-                    )
-                a_audio_item.uid = self.timestretch_cache[f_key]
-                self.get_wav_uid_by_name(
-                    f_dest_path,
-                    a_uid=f_uid,
+                    ),
                 )
+                f_job.cache_key = f_cache_key
+                f_job.audio_items.append(a_audio_item)
+
+        if not f_batch and not f_cached:
+            return
+        for f_job in list(f_cached.values()) + f_batch.run(a_progress):
+            if f_job.cmd is not None and f_job.cache_key is not None:
+                try:
+                    self.get_stretch_cache().put(
+                        f_job.cache_key,
+                        f_job.dest_path,
+                    )
+                except OSError as ex:
+                    LOG.warning(f"Could not cache {f_job.dest_path}")
+                    LOG.exception(ex)
+            self.cp_audio_file_to_cache(f_job.dest_path)
+            if f_job.dest_path not in f_wavs_dict.by_path():
+                f_wavs_dict.add_entry(f_job.dest_path, uid=f_job.uid)
+                self.create_sample_graph(f_job.dest_path, f_job.uid)
+            self.timestretch_cache[f_job.key] = f_job.uid
+            self.timestretch_reverse_lookup[f_job.dest_path] = \
+                f_job.src_path
+            for f_audio_item in f_job.audio_items:
+                f_audio_item.uid = f_job.uid
+        self.save_audio_pool(f_wavs_dict)
+        for f_job in f_batch.jobs.values():
+            if f_job.error is not None:
+                raise f_job.error
 
     def timestretch_get_orig_file_uid(self, a_uid):
         """ Return the UID of the original file """
@@ -488,12 +675,17 @@ class SgProject(AbstractProject):
         return self.get_sample_graph_by_uid(f_uid)
 
     def get_sample_graph_by_uid(self, a_uid):
+        if self.sample_graph_batch is not None:
+            f_placeholder = self.sample_graph_batch.placeholder(a_uid)
+            if f_placeholder is not None:
+                return f_placeholder
         f_pygraph_file = os.path.join(
             *(str(x) for x in (self.samplegraph_folder, a_uid))
         )
         f_result = SampleGraph.create(
             f_pygraph_file,
             self.samples_folder,
+            a_uid,
         )
         if not f_result.is_valid(): # or not f_result.check_mtime():
             LOG.info(
@@ -503,7 +695,7 @@ class SgProject(AbstractProject):
             remove_item_from_sg_cache(f_pygraph_file)
             self.create_sample_graph(self.get_wav_path_by_uid(a_uid), a_uid)
             return SampleGraph.create(
-                f_pygraph_file, self.samples_folder)
+                f_pygraph_file, self.samples_folder, a_uid)
         else:
             return f_result
 
@@ -543,6 +735,82 @@ class SgProject(AbstractProject):
             self.save_audio_pool(audio_pool)
             return entry.uid
 
+    def import_audio_files(self, a_paths, a_cp=True):
+        """ Add many audio files to the audio pool without waiting for
+            their sample graphs, which are generated in the background.
+            Until then, get_sample_graph_by_uid returns a placeholder with
+            the correct length, call poll_sample_graphs periodically to
+            receive them.
+
+            @a_paths: Paths to audio files
+            @a_cp:    Copy the files to the project's sample cache
+            @return:  [uid, ...] in the same order as a_paths
+        """
+        audio_pool = self.get_audio_pool()
+        by_path = audio_pool.by_path()
+        f_result = []
+        for f_path in a_paths:
+            f_path = util.pi_path(f_path)
+            if a_cp:
+                self.cp_audio_file_to_cache(f_path)
+            if f_path in by_path:
+                f_result.append(by_path[f_path].uid)
+                continue
+            entry = audio_pool.add_entry(f_path)
+            self._queue_sample_graph(f_path, entry.uid)
+            f_result.append(entry.uid)
+        self.save_audio_pool(audio_pool)
+        return f_result
+
+    def _queue_sample_graph(self, a_path, a_uid):
+        f_path = self._sample_graph_audio_file(a_path)
+        f_pygraph_file = os.path.join(self.samplegraph_folder, str(a_uid))
+        if os.path.exists(f_pygraph_file) or os.path.exists(
+            sample_graph_binary_path(f_pygraph_file),
+        ):
+            # Left over from a removed audio pool entry
+            remove_item_from_sg_cache(f_pygraph_file)
+        if self.sample_graph_batch is None:
+            self.sample_graph_batch = SampleGraphBatch(self.samples_folder)
+        if constants.IPC_ENABLED:
+            # The engine loads the file anyway, and creates the sample
+            # graph while doing so.  Loading it now also guarantees that
+            # the engine has it before any item that uses it
+            f_engine_job = constants.IPC.add_to_audio_pool(
+                f_path,
+                a_uid,
+                a_wait=False,
+            )
+        else:
+            f_engine_job = None
+        self.sample_graph_batch.add(
+            a_uid,
+            f_path,
+            f_pygraph_file,
+            f_engine_job,
+        )
+
+    def poll_sample_graphs(self):
+        """ Return the uids of the sample graphs that finished generating
+            in the background since the last call.  Anything cached that
+            was drawn using their placeholders is invalidated
+        """
+        if self.sample_graph_batch is None:
+            return []
+        return [x for x, _ in self.sample_graph_batch.poll()]
+
+    def sample_graph_progress(self):
+        """ Return (done, total) of the sample graphs being generated in
+            the background, or None if there are none
+        """
+        if (
+            self.sample_graph_batch is None
+            or
+            self.sample_graph_batch.is_finished()
+        ):
+            return None
+        return self.sample_graph_batch.progress()
+
 
     def to_long_audio_file_path(self, path: str) -> str:
         """ Check if an audio file path begins with an escape character
@@ -592,6 +860,7 @@ class SgProject(AbstractProject):
             shutil.copy(path, cache_path)
 
         self.delete_sample_graph_by_name(path)
+        invalidate_audio_pool_uid(uid)
         constants.IPC.reload_audio_pool_item(uid)
 
     def audio_file_cache_path(self, path):
@@ -647,19 +916,32 @@ class SgProject(AbstractProject):
         by_uid = audio_pool.by_uid()
         return by_uid[a_uid].path
 
-    def create_sample_graph(self, a_path, a_uid):
-        f_uid = int(a_uid)
+    def _sample_graph_audio_file(self, a_path):
+        """ Return the path of the original audio file, or else of the
+            copy in the project's sample cache
+        """
         a_path = util.pi_path(a_path)
         f_sample_dir_path = "{}{}".format(self.samples_folder, a_path)
         if os.path.isfile(a_path):
-            f_path = a_path
+            return a_path
         elif os.path.isfile(f_sample_dir_path):
-            f_path = f_sample_dir_path
+            return f_sample_dir_path
         else:
             raise Exception("Cannot create sample graph, the "
                 "following do not exist:\n{}\n{}\n".format(
                 a_path, f_sample_dir_path))
-        constants.IPC.add_to_audio_pool(f_path, f_uid)
+
+    def create_sample_graph(self, a_path, a_uid):
+        f_uid = int(a_uid)
+        f_path = self._sample_graph_audio_file(a_path)
+        if constants.IPC_ENABLED:
+            constants.IPC.add_to_audio_pool(f_path, f_uid)
+        else:
+            # No engine to create it
+            generate_sample_graph(
+                f_path,
+                os.path.join(self.samplegraph_folder, str(f_uid)),
+            )
 
 
     def copy_plugin(self, a_old, a_new):
@@ -1,25 +1,245 @@
 from sglib.math import clip_value, db_to_lin, lin_to_db
 from sglib.lib import *
 from sglib.lib.util import *
+from sglib.lib.cache import (
+    AUDIO_POOL_UID,
+    LRUCache,
+    cache_budget,
+    invalidate_audio_pool_uid,
+)
+from sglib.ipc.jobs import ENGINE_JOBS
+from sglib.log import LOG
+from sg_py_vendor import wavefile
+import concurrent.futures
 import numpy
 import os
+import struct
+import time
 
+# The engine writes sample graphs as text, the first time one is loaded it
+# is converted to this binary format and memory mapped from then on.
+#
+# Layout:  A fixed header, the UTF-8 encoded file name, padding up to
+# SAMPLE_GRAPH_ALIGN bytes, then one float32 array of shape
+# (channels, 2, count) per level.  Index 0 is the high peaks and index 1 is
+# the low peaks, both in chronological order.  Level 0 is the full
+# resolution graph, each following level halves the resolution of the
+# previous one, until a level has SAMPLE_GRAPH_MIN_LEVEL_COUNT peaks or less
+SAMPLE_GRAPH_EXT = '.peaks'
+SAMPLE_GRAPH_MAGIC = b'SGPK'
+SAMPLE_GRAPH_VERSION = 2
+SAMPLE_GRAPH_ALIGN = 16
+SAMPLE_GRAPH_DTYPE = numpy.float32
+SAMPLE_GRAPH_MIN_LEVEL_COUNT = 32
+# magic, version, channels, count, frame_count, timestamp, sample_rate,
+# length_in_seconds, peak, len(filename), levels
+SAMPLE_GRAPH_HEADER = struct.Struct('<4sHHIQQIdfII')
+
+# Must match AUDIO_ITEM_PADDING_DIV2 in the engine, audio pool items are
+# padded with this many samples of silence at the start, and the engine
+# uses 20 less than this as the padding at the end
+AUDIO_ITEM_PADDING_DIV2 = 32
+# The number of peaks to read from an audio file at once
+SAMPLE_GRAPH_BLOCK_PEAKS = 4096
+
+
+def sample_graph_binary_path(a_path):
+    """ Return the path of the binary peak file for a text sample graph """
+    return f"{a_path}{SAMPLE_GRAPH_EXT}"
+
+def sample_graph_level_counts(a_count):
+    """ Return the number of peaks in each level of a sample graph with
+        a_count peaks at full resolution
+    """
+    f_result = [a_count]
+    while a_count > SAMPLE_GRAPH_MIN_LEVEL_COUNT:
+        a_count = (a_count + 1) // 2
+        f_result.append(a_count)
+    return f_result
+
+def reduce_sample_graph_level(a_peaks):
+    """ Halve the resolution of a (channels, 2, count) peak array, keeping
+        the highest high peak and the lowest low peak of each pair
+    """
+    if a_peaks.shape[2] % 2:
+        a_peaks = numpy.concatenate((a_peaks, a_peaks[:, :, -1:]), axis=2)
+    f_result = numpy.empty(
+        (a_peaks.shape[0], 2, a_peaks.shape[2] // 2),
+        dtype=a_peaks.dtype,
+    )
+    numpy.maximum(
+        a_peaks[:, 0, 0::2],
+        a_peaks[:, 0, 1::2],
+        out=f_result[:, 0],
+    )
+    numpy.minimum(
+        a_peaks[:, 1, 0::2],
+        a_peaks[:, 1, 1::2],
+        out=f_result[:, 1],
+    )
+    return f_result
+
+def sample_graph_peak_size(a_frame_count, a_sample_rate):
+    """ Return the number of samples per peak, the same as the engine """
+    f_length = a_frame_count / a_sample_rate
+    if f_length < 3.0:
+        return 16
+    elif f_length < 20.0:
+        return int(a_sample_rate * 0.005)
+    else:
+        return int(a_sample_rate * 0.025)
+
+def _block_peaks(a_samples, a_peak_size):
+    """ Return the (channels, 2, count) peaks of a (channels, frames) array,
+        the last peak may be shorter than a_peak_size
+    """
+    f_channels, f_frames = a_samples.shape
+    f_count = -(-f_frames // a_peak_size)
+    f_padded = numpy.zeros(
+        (f_channels, f_count * a_peak_size),
+        dtype=SAMPLE_GRAPH_DTYPE,
+    )
+    f_padded[:, :f_frames] = a_samples
+    f_padded = f_padded.reshape((f_channels, f_count, a_peak_size))
+    f_result = numpy.empty((f_channels, 2, f_count), dtype=SAMPLE_GRAPH_DTYPE)
+    numpy.maximum(f_padded.max(axis=2), 0.01, out=f_result[:, 0])
+    numpy.minimum(f_padded.min(axis=2), -0.01, out=f_result[:, 1])
+    return f_result
+
+def generate_sample_graph(a_audio_file, a_file_name):
+    """ Generate a sample graph without the engine, with the same
+        resolution that the engine uses, directly in the binary format.
+        The 5ms fade out that the engine applies to the end of the file is
+        not applied to the peaks.
+
+        Audio is read and reduced in blocks, and the peaks are written
+        from the NumPy array, libsndfile and NumPy release the GIL, so
+        that this can run in worker threads.
+
+        @a_audio_file:  The path to the audio file
+        @a_file_name:   The path to the sample graph, /.../sample_graphs/uid
+        @return:        The number of peaks
+    """
+    with wavefile.WaveReader(a_audio_file) as f_reader:
+        f_channels = 2 if f_reader.channels >= 2 else 1
+        f_sample_rate = f_reader.samplerate
+        # The engine's length includes the padding
+        f_length = f_reader.frames + AUDIO_ITEM_PADDING_DIV2 - 20
+        f_peak_size = sample_graph_peak_size(f_length, f_sample_rate)
+        f_buffer = f_reader.buffer(f_peak_size * SAMPLE_GRAPH_BLOCK_PEAKS)
+        f_pending = numpy.zeros(
+            (f_channels, AUDIO_ITEM_PADDING_DIV2),
+            dtype=SAMPLE_GRAPH_DTYPE,
+        )
+        f_pos = 0
+        f_blocks = []
+        while f_pos < f_length:
+            f_frames = f_reader.read(f_buffer)
+            if f_frames:
+                f_pending = numpy.concatenate(
+                    (f_pending, f_buffer[:f_channels, :f_frames]),
+                    axis=1,
+                )
+            f_pending = f_pending[:, :f_length - f_pos]
+            if f_frames:
+                f_whole = f_pending.shape[1]
+                f_whole -= f_whole % f_peak_size
+            else:
+                f_whole = f_pending.shape[1]
+            if f_whole:
+                f_blocks.append(
+                    _block_peaks(f_pending[:, :f_whole], f_peak_size),
+                )
+                f_pos += f_whole
+                f_pending = f_pending[:, f_whole:]
+            if not f_frames:
+                break
+    if f_blocks:
+        f_peaks = numpy.concatenate(f_blocks, axis=2)
+    else:
+        f_peaks = numpy.zeros((f_channels, 2, 0), dtype=SAMPLE_GRAPH_DTYPE)
+    f_count = f_peaks.shape[2]
+    f_peak = float(numpy.abs(f_peaks).max()) if f_count else 0.0
+    numpy.clip(f_peaks[:, 0], 0.01, 0.99, out=f_peaks[:, 0])
+    numpy.clip(f_peaks[:, 1], -0.99, -0.01, out=f_peaks[:, 1])
+    write_sample_graph_binary(
+        sample_graph_binary_path(a_file_name),
+        f_peaks,
+        a_audio_file,
+        int(time.time()),
+        f_length,
+        f_sample_rate,
+        f_length / f_sample_rate,
+        f_peak,
+    )
+    return f_count
+
+def write_sample_graph_binary(
+    a_path,
+    a_peaks,
+    a_audio_file,
+    a_timestamp,
+    a_frame_count,
+    a_sample_rate,
+    a_length_in_seconds,
+    a_peak,
+):
+    """ Write a sample graph in the binary format, atomically replacing
+        any existing file
+
+        @a_path:   The path to the binary peak file
+        @a_peaks:  The (channels, 2, count) full resolution peaks, the
+                   lower resolution levels are calculated from it
+    """
+    f_levels = [numpy.asarray(a_peaks, dtype=SAMPLE_GRAPH_DTYPE)]
+    for _ in sample_graph_level_counts(a_peaks.shape[2])[1:]:
+        f_levels.append(reduce_sample_graph_level(f_levels[-1]))
+    f_name = a_audio_file.encode('utf-8')
+    f_header = SAMPLE_GRAPH_HEADER.pack(
+        SAMPLE_GRAPH_MAGIC,
+        SAMPLE_GRAPH_VERSION,
+        a_peaks.shape[0],
+        a_peaks.shape[2],
+        a_frame_count,
+        a_timestamp,
+        a_sample_rate,
+        a_length_in_seconds,
+        a_peak,
+        len(f_name),
+        len(f_levels),
+    )
+    f_len = len(f_header) + len(f_name)
+    f_pad = b'\0' * (-f_len % SAMPLE_GRAPH_ALIGN)
+    f_tmp = f"{a_path}.tmp"
+    with open(f_tmp, 'wb') as f:
+        f.write(f_header)
+        f.write(f_name)
+        f.write(f_pad)
+        for f_level in f_levels:
+            f.write(f_level.tobytes())
+    os.replace(f_tmp, a_path)
 
 def clear_sample_graph_cache():
-    global global_sample_graph_cache
-    global_sample_graph_cache = {}
+    SAMPLE_GRAPH_CACHE.clear()
 
 def remove_item_from_sg_cache(a_path):
-    global global_sample_graph_cache
-    if os.path.exists(a_path):
-        os.remove(a_path)
-    if a_path in global_sample_graph_cache:
-        global_sample_graph_cache.pop(a_path)
-    else:
+    # Drop the reference to the memory map before deleting the file,
+    # Windows will not delete a file that is still mapped
+    if SAMPLE_GRAPH_CACHE.pop(a_path) is None:
         print("\n\nremove_item_from_sg_cache: {} "
             "not found.\n\n".format(a_path))
+    for path in (a_path, sample_graph_binary_path(a_path)):
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as ex:
+                LOG.warning(f"Could not delete sample graph {path}: {ex}")
 
-global_sample_graph_cache = {}
+SAMPLE_GRAPH_CACHE = LRUCache(
+    'sample-graph',
+    cache_budget('sample-graph', 256),
+    lambda x: x.nbytes(),
+)
 
 class SampleGraph:
     __slots__ = [
@@ -37,26 +257,67 @@ class SampleGraph:
         'frame_count',
         'peak',
         'cache',
+        'peaks',
+        'levels',
     ]
     @staticmethod
-    def create(a_file_name, a_sample_dir):
+    def create(a_file_name, a_sample_dir, a_uid=None):
         """ Used to instantiate a sample_graph, but
             grabs from the cache if it already exists...
             Prefer this over directly instantiating.
+
+            a_uid:  The audio pool uid of the file, if known, the cached
+                    graph is invalidated along with that uid
         """
         f_file_name = str(a_file_name)
-        global global_sample_graph_cache
-        if f_file_name in global_sample_graph_cache:
-            return global_sample_graph_cache[f_file_name]
-        else:
+        f_result = SAMPLE_GRAPH_CACHE.get(f_file_name)
+        if f_result is None:
             f_result = SampleGraph(f_file_name, a_sample_dir)
-            global_sample_graph_cache[f_file_name] = f_result
-            return f_result
+            SAMPLE_GRAPH_CACHE.put(
+                f_file_name,
+                f_result,
+                () if a_uid is None else ((AUDIO_POOL_UID, int(a_uid)),),
+            )
+        return f_result
+
+    @staticmethod
+    def placeholder(a_file_name, a_sample_dir, a_audio_file):
+        """ Return a flat sample graph with the length of a_audio_file,
+            to draw until the real sample graph has been generated.  Only
+            the header of the audio file is read
+        """
+        f_result = SampleGraph(a_file_name, a_sample_dir, a_load=False)
+        with wavefile.WaveReader(a_audio_file) as f_reader:
+            f_channels = 2 if f_reader.channels >= 2 else 1
+            f_result.sample_rate = f_reader.samplerate
+            f_result.frame_count = (
+                f_reader.frames + AUDIO_ITEM_PADDING_DIV2 - 20
+            )
+        f_result._file = a_audio_file
+        f_result.sample_dir_file = "{}{}".format(
+            f_result.sample_dir,
+            a_audio_file,
+        )
+        f_result.timestamp = int(time.time())
+        f_result.channels = f_channels
+        f_result.count = 1
+        f_result.length_in_seconds = (
+            f_result.frame_count / f_result.sample_rate
+        )
+        f_result.high_peaks = [
+            numpy.array([0.01]) for _ in range(max(2, f_channels))
+        ]
+        f_result.low_peaks = [
+            numpy.array([-0.01]) for _ in range(max(2, f_channels))
+        ]
+        f_result.levels = [(f_result.high_peaks, f_result.low_peaks)]
+        return f_result
 
-    def __init__(self, a_file_name, a_sample_dir):
+    def __init__(self, a_file_name, a_sample_dir, a_load=True):
         """
         a_file_name:  The full path to /.../sample_graphs/uid
         a_sample_dir:  The project's sample dir
+        a_load:  False to not read a_file_name
         """
         self.sample_graph_cache = None
         f_file_name = str(a_file_name)
@@ -73,6 +334,22 @@ class SampleGraph:
         self.frame_count = None
         self.peak = 0.0
         self.cache = None
+        self.peaks = None
+        self.levels = [(self.high_peaks, self.low_peaks)]
+        if not a_load:
+            return
+
+        f_binary_file = sample_graph_binary_path(f_file_name)
+        if self._binary_is_current(f_file_name, f_binary_file):
+            try:
+                self._open_binary(f_binary_file)
+                return
+            except Exception as ex:
+                # Also older versions of the format, they are converted
+                # again from the text sample graph
+                LOG.warning(
+                    f"Invalid binary sample graph {f_binary_file}: {ex}"
+                )
 
         if not os.path.isfile(f_file_name):
             return
@@ -82,7 +359,48 @@ class SampleGraph:
         except:
             return
 
-        for f_line in f_line_arr:
+        self._parse_text(f_line_arr)
+        self.levels = [(self.high_peaks, self.low_peaks)]
+
+        if self._has_meta():
+            try:
+                self._write_binary(f_binary_file)
+                self._open_binary(f_binary_file)
+            except Exception as ex:
+                LOG.warning(
+                    f"Could not convert sample graph {f_file_name}, using "
+                    "the text version"
+                )
+                LOG.exception(ex)
+
+    @staticmethod
+    def _binary_is_current(a_text_file, a_binary_file):
+        """ Returns True if the binary peak file exists and is not older
+            than the text sample graph it was converted from
+        """
+        if not os.path.isfile(a_binary_file):
+            return False
+        if not os.path.isfile(a_text_file):
+            return True
+        return (
+            os.path.getmtime(a_binary_file) >= os.path.getmtime(a_text_file)
+        )
+
+    def _has_meta(self):
+        return None not in (
+            self._file,
+            self.timestamp,
+            self.channels,
+            self.frame_count,
+            self.sample_rate,
+            self.length_in_seconds,
+        )
+
+    def _parse_text(self, a_lines):
+        """ Parse the text format written by the engine """
+        f_high_peaks = {}
+        f_low_peaks = {}
+        for f_line in a_lines:
             f_line_arr = f_line.split("|")
             if f_line_arr[0] == "\\":
                 break
@@ -105,30 +423,157 @@ class SampleGraph:
                 elif f_line_arr[1] == "sample_rate":
                     self.sample_rate = int(f_line_arr[2])
             elif f_line_arr[0] == "p":
-                f_p_val = float(f_line_arr[3])
-                f_abs_p_val = abs(f_p_val)
-                if f_abs_p_val > self.peak:
-                    self.peak = f_abs_p_val
-                if f_p_val > 1.0:
-                    f_p_val = 1.0
-                elif f_p_val < -1.0:
-                    f_p_val = -1.0
+                f_ch = int(f_line_arr[1])
                 if f_line_arr[2] == "h":
-                    self.high_peaks[int(f_line_arr[1])].append(f_p_val)
+                    f_high_peaks.setdefault(f_ch, []).append(f_line_arr[3])
                 elif f_line_arr[2] == "l":
-                    self.low_peaks[int(f_line_arr[1])].append(f_p_val)
+                    f_low_peaks.setdefault(f_ch, []).append(f_line_arr[3])
                 else:
                     print("Invalid sample_graph [2] value " + f_line_arr[2])
-        for f_list in self.low_peaks:
-            f_list.reverse()
 
-        self.low_peaks = [numpy.array(x) for x in self.low_peaks]
-        self.high_peaks = [numpy.array(x) for x in self.high_peaks]
+        f_channels = max(
+            [2, self.channels or 0] + [x + 1 for x in f_high_peaks],
+        )
+        self.high_peaks = [
+            numpy.array(f_high_peaks.get(x, []), dtype=numpy.float64)
+            for x in range(f_channels)
+        ]
+        self.low_peaks = [
+            numpy.array(f_low_peaks.get(x, []), dtype=numpy.float64)
+            for x in range(f_channels)
+        ]
+        for f_arr in self.high_peaks + self.low_peaks:
+            if f_arr.size:
+                self.peak = max(self.peak, float(numpy.amax(numpy.abs(f_arr))))
+
+        self.low_peaks = [x[::-1] for x in self.low_peaks]
 
         for f_high_peaks, f_low_peaks in zip(self.high_peaks, self.low_peaks):
             numpy.clip(f_high_peaks, 0.01, 0.99, f_high_peaks)
             numpy.clip(f_low_peaks, -0.99, -0.01, f_low_peaks)
 
+    def _write_binary(self, a_path):
+        """ Write the parsed text sample graph to a_path in the binary
+            format, atomically replacing any existing file
+        """
+        f_count = len(self.high_peaks[0])
+        f_arr = numpy.empty(
+            (self.channels, 2, f_count),
+            dtype=SAMPLE_GRAPH_DTYPE,
+        )
+        for f_ch in range(self.channels):
+            f_arr[f_ch][0] = self.high_peaks[f_ch][:f_count]
+            f_arr[f_ch][1] = self.low_peaks[f_ch][::-1][:f_count]
+        write_sample_graph_binary(
+            a_path,
+            f_arr,
+            self._file,
+            self.timestamp,
+            self.frame_count,
+            self.sample_rate,
+            self.length_in_seconds,
+            self.peak,
+        )
+
+    def _open_binary(self, a_path):
+        """ Read the header of a binary peak file and memory map the peaks.
+            No peak data is read from disk until it is accessed
+        """
+        with open(a_path, 'rb') as f:
+            f_header = f.read(SAMPLE_GRAPH_HEADER.size)
+            (
+                f_magic,
+                f_version,
+                f_channels,
+                f_count,
+                f_frame_count,
+                f_timestamp,
+                f_sample_rate,
+                f_length,
+                f_peak,
+                f_name_len,
+                f_level_count,
+            ) = SAMPLE_GRAPH_HEADER.unpack(f_header)
+            if (
+                f_magic != SAMPLE_GRAPH_MAGIC
+                or
+                f_version != SAMPLE_GRAPH_VERSION
+            ):
+                raise ValueError(f"Unsupported peak file {a_path}")
+            f_name = f.read(f_name_len).decode('utf-8')
+        f_offset = SAMPLE_GRAPH_HEADER.size + f_name_len
+        f_offset += -f_offset % SAMPLE_GRAPH_ALIGN
+        f_level_counts = sample_graph_level_counts(f_count)
+        if len(f_level_counts) != f_level_count:
+            raise ValueError(f"Invalid level count in {a_path}")
+        f_total = sum(f_level_counts)
+        if f_total:
+            f_data = numpy.memmap(
+                a_path,
+                dtype=SAMPLE_GRAPH_DTYPE,
+                mode='r',
+                offset=f_offset,
+                shape=(f_channels * 2 * f_total,),
+            )
+        else:
+            # numpy cannot map a zero length array
+            f_data = numpy.zeros((0,), dtype=SAMPLE_GRAPH_DTYPE)
+        f_levels = []
+        f_pos = 0
+        for f_level_count in f_level_counts:
+            f_size = f_channels * 2 * f_level_count
+            f_levels.append(
+                f_data[f_pos:f_pos + f_size].reshape(
+                    (f_channels, 2, f_level_count),
+                ),
+            )
+            f_pos += f_size
+        f_peaks = f_levels[0]
+
+        self._file = f_name
+        self.sample_dir_file = "{}{}".format(self.sample_dir, self._file)
+        self.timestamp = f_timestamp
+        self.channels = f_channels
+        self.count = f_count
+        self.frame_count = f_frame_count
+        self.sample_rate = f_sample_rate
+        self.length_in_seconds = f_length
+        self.peak = f_peak
+        self.peaks = f_peaks
+        # Views, the low peaks are reversed to match the text format
+        self.levels = [
+            (
+                [x[f_ch][0] for f_ch in range(f_channels)],
+                [x[f_ch][1][::-1] for f_ch in range(f_channels)],
+            )
+            for x in f_levels
+        ]
+        self.high_peaks, self.low_peaks = self.levels[0]
+
+    def peaks_for_width(self, a_width):
+        """ Return (high_peaks, low_peaks) from the lowest resolution level
+            that still has at least one peak per pixel when the whole file
+            is drawn a_width pixels wide.  Same format as self.high_peaks
+            and self.low_peaks
+        """
+        for f_high_peaks, f_low_peaks in reversed(self.levels):
+            if len(f_high_peaks[0]) >= a_width:
+                return f_high_peaks, f_low_peaks
+        return self.levels[0]
+
+    def nbytes(self):
+        """ The approximate memory used by this sample graph, assuming the
+            whole memory map has been paged in
+        """
+        f_result = 512
+        for f_high_peaks, f_low_peaks in self.levels:
+            for f_arr in list(f_high_peaks) + list(f_low_peaks):
+                f_result += getattr(f_arr, 'nbytes', 0)
+        if self.cache:
+            # x, y and the element type of each QPainterPath element
+            f_result += sum(x.elementCount() * 24 for x in self.cache)
+        return f_result
+
     def is_valid(self):
         if (self._file is None):
             print("\n\nsample_graph.is_valid() "
@@ -180,3 +625,130 @@ class SampleGraph:
             print("\n\nError getting mtime: \n{}\n\n".format(f_ex.message))
             return False
 
+
+class SampleGraphBatch:
+    """ Generate the sample graphs of many audio files concurrently in a
+        pool of worker threads, for importing many files at once without
+        blocking the UI.  A placeholder graph with the correct length is
+        available for each file until its sample graph has been generated.
+
+        Jobs are added and polled from the same thread, usually the UI
+        thread.
+    """
+    def __init__(self, a_sample_dir, a_workers=None):
+        """
+            @a_sample_dir:  The project's sample dir
+            @a_workers:     The number of worker threads, defaults to
+                            util.AUTO_CPU_COUNT
+        """
+        self.sample_dir = a_sample_dir
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=a_workers if a_workers else AUTO_CPU_COUNT,
+            thread_name_prefix='sample-graph',
+        )
+        # uid: (future, file name, placeholder)
+        self._pending = {}
+        self.total = 0
+        self.done = 0
+
+    def add(self, a_uid, a_audio_file, a_file_name, a_engine_job=None):
+        """ Start generating a sample graph, return its placeholder
+
+            @a_uid:         The audio pool uid of the audio file
+            @a_audio_file:  The path to the audio file
+            @a_file_name:   The path to the sample graph,
+                            /.../sample_graphs/uid
+            @a_engine_job:  If the engine is generating the sample graph,
+                            the Future of that job, to wait for instead of
+                            generating it
+        """
+        f_uid = int(a_uid)
+        if not self._pending:
+            # Progress is reported per batch of imports
+            self.total = 0
+            self.done = 0
+        f_placeholder = SampleGraph.placeholder(
+            a_file_name,
+            self.sample_dir,
+            a_audio_file,
+        )
+        f_future = self._executor.submit(
+            self._job,
+            a_audio_file,
+            a_file_name,
+            a_engine_job,
+        )
+        self._pending[f_uid] = (f_future, a_file_name, f_placeholder)
+        self.total += 1
+        return f_placeholder
+
+    def _job(self, a_audio_file, a_file_name, a_engine_job):
+        if a_engine_job:
+            ENGINE_JOBS.result(a_engine_job)
+        else:
+            generate_sample_graph(a_audio_file, a_file_name)
+        # Converts the engine's text sample graph in the worker thread as
+        # well, generated ones are only memory mapped
+        return SampleGraph(a_file_name, self.sample_dir)
+
+    def placeholder(self, a_uid):
+        """ Return the placeholder for a_uid, or None if its sample graph
+            is not being generated
+        """
+        f_uid = int(a_uid)
+        if f_uid in self._pending:
+            return self._pending[f_uid][2]
+        return None
+
+    def poll(self):
+        """ Return [(uid, SampleGraph), ...] for the sample graphs generated
+            since the last call, and add them to the sample graph cache.
+            The SampleGraph is None if it could not be generated.  Anything
+            cached that was derived from the placeholder is invalidated
+        """
+        f_result = []
+        for f_uid, (f_future, f_file_name, _) in list(
+            self._pending.items()
+        ):
+            if not f_future.done():
+                continue
+            self._pending.pop(f_uid)
+            self.done += 1
+            invalidate_audio_pool_uid(f_uid)
+            try:
+                f_graph = f_future.result()
+                SAMPLE_GRAPH_CACHE.put(
+                    f_file_name,
+                    f_graph,
+                    ((AUDIO_POOL_UID, f_uid),),
+                )
+            except Exception as ex:
+                LOG.error(f"Could not generate sample graph {f_file_name}")
+                LOG.exception(ex)
+                f_graph = None
+            f_result.append((f_uid, f_graph))
+        return f_result
+
+    def wait(self, a_timeout=None):
+        """ Wait for all pending sample graphs, then poll() """
+        concurrent.futures.wait(
+            [x[0] for x in self._pending.values()],
+            timeout=a_timeout,
+        )
+        return self.poll()
+
+    def progress(self):
+        """ Return (done, total) """
+        return self.done, self.total
+
+    def is_finished(self):
+        return not self._pending
+
+    def shutdown(self):
+        """ Cancel the jobs that have not started, and stop the worker
+            threads once the running jobs finish
+        """
+        for f_future, _, _ in self._pending.values():
+            f_future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
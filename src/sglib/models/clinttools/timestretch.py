@@ -0,0 +1,141 @@
+from sglib.lib.util import *
+from sglib.log import LOG
+import concurrent.futures
+import os
+import subprocess
+
+__all__ = [
+    'TimestretchBatch',
+    'TimestretchJob',
+]
+
+
+class TimestretchJob:
+    """ One run of an external time stretching program, shared by all of
+        the audio items with the same time stretch key
+    """
+    def __init__(self, a_key, a_uid, a_src_path, a_dest_path, a_cmd):
+        """
+            @a_key:        The key of SgProject.timestretch_cache
+            @a_uid:        The audio pool uid reserved for a_dest_path
+            @a_src_path:   The file to stretch
+            @a_dest_path:  The stretched file to create
+            @a_cmd:        The command that creates a_dest_path, or None
+                           if it was already created
+        """
+        self.key = a_key
+        self.uid = a_uid
+        self.src_path = a_src_path
+        self.dest_path = a_dest_path
+        self.cmd = a_cmd
+        self.audio_items = []
+        # The key of the stretched file in the StretchCache, if it can be
+        # cached
+        self.cache_key = None
+        # The exception raised by the command, if it failed
+        self.error = None
+
+
+def run_timestretch_cmd(a_cmd, a_dest_path):
+    """ Run a time stretching program and wait for it to finish, raise
+        FileNotFoundError if it did not create a_dest_path
+    """
+    LOG.info("Running {}".format(" ".join(a_cmd)))
+    if IS_WINDOWS:
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        env = os.environ.copy()
+        env['PATH'] = ENGINE_DIR + ';' + env['PATH']
+        env['PYTHONPATH'] = INSTALL_PREFIX
+        f_proc = subprocess.Popen(
+            a_cmd,
+            encoding='UTF-8',
+            env=env,
+            startupinfo=startupinfo,
+        )
+    else:
+        f_proc = subprocess.Popen(
+            a_cmd,
+            encoding='UTF-8',
+        )
+    stdout, stderr = f_proc.communicate()
+    if not (
+        f_proc.returncode == 0
+        and
+        os.path.exists(a_dest_path)
+    ):
+        LOG.error(f"{a_cmd} failed with {f_proc.returncode}")
+        LOG.error(stdout)
+        LOG.error(stderr)
+        raise FileNotFoundError(
+            f"Could not time stretch file, {a_cmd} returned "
+            f"{f_proc.returncode}"
+        )
+
+
+class TimestretchBatch:
+    """ Run the time stretching programs of many audio items concurrently,
+        each process is waited for by a worker thread.  Audio items with
+        the same key share one job.
+
+        Jobs are added and run from the same thread, usually the UI
+        thread.
+    """
+    def __init__(self, a_workers=None):
+        """
+            @a_workers:  The number of processes to run at once, defaults
+                         to util.AUTO_CPU_COUNT
+        """
+        self.workers = a_workers if a_workers else AUTO_CPU_COUNT
+        # key: TimestretchJob, in the order that they were added
+        self.jobs = {}
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def get(self, a_key):
+        """ Return the job for a_key, or None if it was not added """
+        return self.jobs.get(a_key)
+
+    def add(self, a_job):
+        """ Add a TimestretchJob, return it """
+        assert a_job.key not in self.jobs, a_job.key
+        self.jobs[a_job.key] = a_job
+        return a_job
+
+    def run(self, a_progress=None, a_poll_interval=0.1):
+        """ Run all of the jobs and wait for them, return the jobs that
+            succeeded.  The jobs that failed have their error set
+
+            @a_progress:
+                Called with (done, total) when the jobs start, then about
+                every a_poll_interval seconds from this thread until they
+                finish, for example to show the progress and process
+                UI events
+        """
+        f_total = len(self.jobs)
+        f_done = 0
+        if a_progress:
+            a_progress(f_done, f_total)
+        if not f_total:
+            return []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.workers, f_total),
+            thread_name_prefix='timestretch',
+        ) as executor:
+            f_pending = {
+                executor.submit(run_timestretch_cmd, x.cmd, x.dest_path): x
+                for x in self.jobs.values()
+            }
+            while f_pending:
+                f_finished, _ = concurrent.futures.wait(
+                    f_pending,
+                    timeout=a_poll_interval,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for f_future in f_finished:
+                    f_pending.pop(f_future).error = f_future.exception()
+                    f_done += 1
+                if a_progress:
+                    a_progress(f_done, f_total)
+        return [x for x in self.jobs.values() if x.error is None]
@@ -5,6 +5,7 @@ from .item import item
 from .sequence_marker import loop_marker
 from .seq_item import sequencer_item
 from .sequencer import sequencer
+from .tempo_map import TempoMap
 from .tempo_marker import tempo_marker
 #from .text_marker import DawTextMarker
 from ._shared import (
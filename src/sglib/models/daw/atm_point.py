@@ -6,13 +6,15 @@ from sglib.lib.translate import _
 
 class DawAtmPoint:
     __slots__ = [
-        'beat',
+        '_beat',
         'port_num',
         'cc_val',
         'index',
         'plugin_index',
         'break_after',
         'curve',
+        # The points of the port in DawAtmRegion that the point is in
+        '_port_points',
     ]
     def __init__(
         self,
@@ -24,6 +26,7 @@ class DawAtmPoint:
         a_break_after=0,
         a_curve=0.0,
     ):
+        self._port_points = None
         self.beat = round(float(a_beat), 4)
         self.port_num = int(a_port_num)
         self.cc_val = round(float(a_cc_val), 4)
@@ -35,6 +38,22 @@ class DawAtmPoint:
         # so I don't have to code around it later
         self.curve = float(a_curve)
 
+    @property
+    def beat(self):
+        return self._beat
+
+    @beat.setter
+    def beat(self, a_beat):
+        if self._port_points is not None:
+            self._port_points.moved()
+        self._beat = a_beat
+
+    def __getstate__(self):
+        # A copy is not in the DawAtmRegion
+        f_state = {x: getattr(self, x) for x in self.__slots__}
+        f_state['_port_points'] = None
+        return (None, f_state)
+
     def set_val(self, a_val):
         self.cc_val = clip_value(float(a_val), 0.0, 127.0, True)
 
@@ -51,16 +70,9 @@ class DawAtmPoint:
 #            (self.plugin_index == other.plugin_index))
 
     def __str__(self):
-        return "|".join(
-            str(x) for x in (
-                self.beat,
-                self.port_num,
-                self.cc_val,
-                self.index,
-                self.plugin_index,
-                self.break_after,
-                self.curve,
-            )
+        return (
+            f"{self._beat}|{self.port_num}|{self.cc_val}|{self.index}|"
+            f"{self.plugin_index}|{self.break_after}|{self.curve}"
         )
 
     @staticmethod
@@ -4,58 +4,175 @@ from sglib.models.clinttools import *
 from sglib.lib.util import *
 from sglib.lib.translate import _
 
+import bisect
+
+
+def _point_beat(a_point):
+    return a_point.beat
+
+class _PortPoints:
+    """ The automation points of one port of a plugin, sorted by beat when
+        they are needed in order.  A point notifies the list when its beat
+        is changed, and the list is sorted again before the next query
+    """
+    __slots__ = [
+        '_points',
+        '_beats',
+        '_sorted',
+    ]
+
+    def __init__(self):
+        self._points = []
+        # The beat of each point, while self._sorted
+        self._beats = []
+        self._sorted = True
+
+    def __len__(self):
+        return len(self._points)
+
+    def moved(self):
+        self._sorted = False
+
+    def points(self):
+        """ The points sorted by beat, the caller must not modify the
+            list
+        """
+        if not self._sorted:
+            # Stable, like the list.sort of points by DawAtmPoint.__lt__
+            self._points.sort(key=_point_beat)
+            self._beats = [x.beat for x in self._points]
+            self._sorted = True
+        return self._points
+
+    def add(self, a_point):
+        a_point._port_points = self
+        if not self._sorted:
+            self._points.append(a_point)
+        elif not self._beats or a_point.beat >= self._beats[-1]:
+            self._points.append(a_point)
+            self._beats.append(a_point.beat)
+        else:
+            f_index = bisect.bisect_right(self._beats, a_point.beat)
+            self._points.insert(f_index, a_point)
+            self._beats.insert(f_index, a_point.beat)
+
+    def extend(self, a_points):
+        a_points = list(a_points)
+        for f_point in a_points:
+            f_point._port_points = self
+        self._points.extend(a_points)
+        self._sorted = False
+
+    def remove(self, a_point):
+        if a_point._port_points is not self:
+            raise ValueError(f"{a_point} is not in the list")
+        f_points = self.points()
+        f_index = bisect.bisect_left(self._beats, a_point.beat)
+        while f_points[f_index] is not a_point:
+            f_index += 1
+        del f_points[f_index]
+        del self._beats[f_index]
+        a_point._port_points = None
+
+    def _range(self, a_start_beat, a_end_beat):
+        self.points()
+        return (
+            bisect.bisect_left(self._beats, a_start_beat),
+            bisect.bisect_left(self._beats, a_end_beat),
+        )
+
+    def get_range(self, a_start_beat, a_end_beat):
+        """ The points at or after a_start_beat and before a_end_beat """
+        f_lo, f_hi = self._range(a_start_beat, a_end_beat)
+        return self._points[f_lo:f_hi]
+
+    def remove_range(self, a_start_beat, a_end_beat):
+        """ Remove and return the points at or after a_start_beat and before
+            a_end_beat
+        """
+        f_lo, f_hi = self._range(a_start_beat, a_end_beat)
+        f_result = self._points[f_lo:f_hi]
+        del self._points[f_lo:f_hi]
+        del self._beats[f_lo:f_hi]
+        for f_point in f_result:
+            f_point._port_points = None
+        return f_result
 
 class DawAtmRegion:
+    """ Automation points by plugin pool UID and port number """
     __slots__ = [
         'plugins',
-        'points',
     ]
     def __init__(self):
+        # plugin pool uid: {port_num: _PortPoints}
         self.plugins = {}
-        self.points = []
+
+    @property
+    def points(self):
+        """ A new list of every point, by plugin, port and beat """
+        return [
+            x
+            for _, f_port_points in self._port_points()
+            for x in f_port_points.points()
+        ]
+
+    def _port_points(self, a_plugins=None):
+        """ ((plugin uid, port_num), _PortPoints) of a_plugins, or of every
+            plugin if None
+        """
+        return [
+            ((f_index, f_port_num), self.plugins[f_index][f_port_num])
+            for f_index in sorted(self.plugins)
+            if a_plugins is None or f_index in a_plugins
+            for f_port_num in sorted(self.plugins[f_index])
+        ]
 
     def set_first_beat(self, beat):
-        if not self.points:
+        f_port_points = [y for _, y in self._port_points() if y]
+        if not f_port_points:
             return
-        _min = min(x.beat for x in self.points)
+        _min = min(x.points()[0].beat for x in f_port_points)
         offset = int(beat - _min)
-        for point in self.points:
-            point.beat += offset
+        for f_points in f_port_points:
+            for point in f_points.points()[:]:
+                point.beat += offset
 
     def split(self, a_points, a_plugins=None, a_port=None):
+        """ Returns a list of the points at or after each beat in a_points
+            and before the next beat, and a list of the points after the
+            last beat
+        """
         if a_points[0] != 0.0:
             a_points.insert(0, 0.0)
         assert(sorted(a_points) == a_points)
-        f_result = []
-        if not a_plugins:
-            f_points = self.points[:]
-        else:
-            f_points = [x for x in self.points if x.index in a_plugins]
-            if a_port is not None:
-                f_points = [x for x in f_points if x.port == a_port]
-        for f_p1, f_p2 in zip(a_points, a_points[1:]):
-            f_list = [x for x in f_points if x >= f_p1 and x < f_p2]
-            f_result.append(f_list)
-        f_list = [x for x in f_points if x > a_points[-1]]
-        f_result.append(f_list)
+        f_result = [[] for _ in a_points]
+        f_ends = a_points[1:] + [float('inf')]
+        for (_, f_port_num), f_points in self._port_points(
+            a_plugins if a_plugins else None,
+        ):
+            if a_port is not None and f_port_num != a_port:
+                continue
+            for f_list, f_p1, f_p2 in zip(f_result, a_points, f_ends):
+                f_list.extend(f_points.get_range(f_p1, f_p2))
         return f_result
 
     def insert_space(self, start, length):
-        for point in (x for x in self.points if x.beat >= start):
-            point.beat += length
+        for _, f_points in self._port_points():
+            for point in f_points.get_range(start, float('inf')):
+                point.beat += length
 
     def copy_range_all(self, a_start, a_end):
         return [
             x.clone()
-            for x in self.points
-            if x.beat >= a_start and x.beat < a_end
+            for _, f_points in self._port_points()
+            for x in f_points.get_range(a_start, a_end)
         ]
 
     def copy_range_by_plugins(self, a_start, a_end, a_plugins):
         f_result = [
             x.clone()
-            for x in self.points
-            if x.beat >= a_start and x.beat < a_end and x.index in a_plugins
+            for _, f_points in self._port_points(a_plugins)
+            for x in f_points.get_range(a_start, a_end)
         ]
         for x in f_result:
             x.beat -= a_start
@@ -65,17 +182,14 @@ class DawAtmRegion:
         if not a_point.index in self.plugins:
             self.plugins[a_point.index] = {}
         if not a_point.port_num in self.plugins[a_point.index]:
-            self.plugins[a_point.index][a_point.port_num] = []
+            self.plugins[a_point.index][a_point.port_num] = _PortPoints()
 
     def add_point(self, a_point):
         self.add_port_list(a_point)
-        self.plugins[a_point.index][a_point.port_num].append(a_point)
-        self.points.append(a_point)
+        self.plugins[a_point.index][a_point.port_num].add(a_point)
 
     def remove_point(self, a_point):
-        #self.add_port_list(a_point)
         self.plugins[a_point.index][a_point.port_num].remove(a_point)
-        self.points.remove(a_point)
 
     def get_ports(self, a_index):
         a_index = int(a_index)
@@ -85,41 +199,41 @@ class DawAtmRegion:
             return sorted(self.plugins[a_index])
 
     def get_points(self, a_index, a_port_num):
+        """ The points of a port sorted by beat, the caller must not modify
+            the list
+        """
         a_port_num = int(a_port_num)
         a_index = int(a_index)
         if a_index not in self.plugins or \
         a_port_num not in self.plugins[a_index]:
             return []
         else:
-            f_result = self.plugins[a_index][a_port_num]
-            f_result.sort()
-            return f_result
+            return self.plugins[a_index][a_port_num].points()
 
     def clear_range_by_plugins(self, a_start, a_end, a_plugins):
-        f_result = [x for x in self.points
-            if x.beat >= a_start and x.beat < a_end and x.index in a_plugins]
-        for f_point in f_result:
-            self.remove_point(f_point)
+        for _, f_points in self._port_points(a_plugins):
+            f_points.remove_range(a_start, a_end)
 
     def clear_plugins(self, a_plugin_uids):
-        f_result = [x for x in self.points if x.index in a_plugin_uids]
-        for f_point in f_result:
-            self.remove_point(f_point)
+        for _, f_points in self._port_points(a_plugin_uids):
+            f_points.remove_range(float('-inf'), float('inf'))
 
     def clear_port(self, a_index, a_port_num):
         f_result = self.get_points(a_index, a_port_num)
-        for f_point in f_result:
+        for f_point in f_result[:]:
             self.remove_point(f_point)
 
     def clear_range(self, a_index, a_port_num, a_start_beat, a_end_beat):
-        f_list = self.get_points(a_index, a_port_num)
-        if f_list:
-            f_new = [x for x in f_list if
-                x.beat < a_start_beat or x.beat >= a_end_beat]
-            f_result = [x for x in f_list if
-                x.beat >= a_start_beat or x.beat < a_end_beat]
-            self.plugins[a_index][a_port_num] = f_new
-            return f_result
+        """ Remove and return the points of a port at or after a_start_beat
+            and before a_end_beat
+        """
+        a_index = int(a_index)
+        a_port_num = int(a_port_num)
+        if a_index in self.plugins and a_port_num in self.plugins[a_index]:
+            return self.plugins[a_index][a_port_num].remove_range(
+                a_start_beat,
+                a_end_beat,
+            )
 
     def smooth_points(
             self, a_index, a_port_num, a_plugin_index, a_points, a_linear):
@@ -133,7 +247,8 @@ class DawAtmRegion:
         f_end = a_points[-1]
         self.clear_range(a_index, a_port_num, f_start.beat, f_end.beat)
         f_inc = 0.0625 # 64th note
-        f_result = self.plugins[a_index][a_port_num]
+        f_port_points = self.plugins[a_index][a_port_num]
+        f_result = []
         f_smoother = util.OnePoleLP(f_start.cc_val)
         for f_point, f_next in zip(a_points, a_points[1:]):
             f_beat = f_point.beat + f_inc
@@ -145,7 +260,6 @@ class DawAtmRegion:
                 continue
             f_beat_diff = f_beat_next - f_beat
             if f_beat_diff < f_inc:
-                f_result.append(f_point)
                 continue
             f_inc_count = int(round(f_beat_diff / f_inc))
             for f_i in range(1, f_inc_count + 1):
@@ -165,41 +279,47 @@ class DawAtmRegion:
                 a_points.append(f_point2)
                 f_beat += f_inc
         f_result.append(f_end)
+        # The points after the range were not cleared
+        f_port_points.extend(
+            x for x in f_result if x._port_points is not f_port_points
+        )
 
-    def __str__(self):
+    def iter_lines(self):
+        """ The lines of the file format, one at a time """
         # New file format:
         # lines starting with 'p':  p|plugin_uid|port_count
         # lines starting with 'q':  n|port_num|point_count
         # other lines:  DawAtmPoint
-        f_result = []
         for f_index in sorted(self.plugins):
             port_dict = {k:v for k, v in self.plugins[f_index].items() if v}
             if not port_dict:
                 continue
-            port_len = len(port_dict)
-            f_result.append(
-                "|".join(str(x) for x in
-                ("p", f_index, port_len)))
+            yield f"p|{f_index}|{len(port_dict)}"
             for port_num in sorted(port_dict):
-                port_list = port_dict[port_num]
-                port_list.sort()
-                f_result.append(
-                    "|".join(str(x) for x in
-                    ("q", port_num, len(port_list))))
-                for f_point in port_list:
-                    f_result.append(str(f_point))
-        f_result.append(terminating_char)
-        return "\n".join(f_result)
+                port_list = port_dict[port_num].points()
+                yield f"q|{port_num}|{len(port_list)}"
+                yield from map(str, port_list)
+        yield terminating_char
+
+    def __str__(self):
+        return "\n".join(self.iter_lines())
 
     @staticmethod
     def from_str(a_str):
         f_result = DawAtmRegion()
+        # (plugin uid, port_num): [DawAtmPoint, ...]
+        f_ports = {}
         for f_line in str(a_str).split("\n"):
             if f_line == terminating_char:
                 break
             if f_line[0] in ("p", "q"):
                 continue
             f_point = DawAtmPoint.from_str(f_line)
-            f_result.add_point(f_point)
+            f_key = (f_point.index, f_point.port_num)
+            if f_key not in f_ports:
+                f_result.add_port_list(f_point)
+                f_ports[f_key] = []
+            f_ports[f_key].append(f_point)
+        for (f_index, f_port_num), f_points in f_ports.items():
+            f_result.plugins[f_index][f_port_num].extend(f_points)
         return f_result
-
@@ -3,36 +3,283 @@ from sglib.lib.util import *
 
 from . import _shared
 from .audio_item import DawAudioItem
+from .item_events import *
 from sglib.math import clip_value
 from sglib import constants
 from sglib.log import LOG
 from sglib.models.multifx_settings import multifx_settings
 from sglib.lib.translate import _
 
+import bisect
 import copy
+import numpy
 import traceback
 
 
 MAX_AUDIO_ITEM_COUNT = 256
+# The fields compared by MIDINote.__eq__
+_NOTE_EQ_FIELDS = ('start', 'length', 'note_num', 'velocity', 'channel')
+
+
+def _event_start(a_event):
+    return a_event.start
+
+class _NoteOverlaps:
+    """ The notes accepted by item.from_str, by (channel, note number),
+        to find the notes that a new note overlaps without comparing it to
+        every note
+    """
+    def __init__(self):
+        # (channel, note_num): ([start, ...], [MIDINote, ...]), by start
+        self._notes = {}
+        # (channel, note_num): The longest note length
+        self._lengths = {}
+
+    def add(self, a_note):
+        """ Add a_note and return True if it does not overlap any note
+            already added, like item.add_note
+        """
+        f_key = (a_note.channel, a_note.note_num)
+        if f_key not in self._notes:
+            self._notes[f_key] = ([a_note.start], [a_note])
+            self._lengths[f_key] = a_note.length
+            return True
+        f_starts, f_notes = self._notes[f_key]
+        f_index = bisect.bisect_right(f_starts, a_note.start)
+        # Notes that start before a_note, but may end after it starts
+        f_min_start = a_note.start - self._lengths[f_key] - 1e-6
+        f_i = f_index - 1
+        while f_i >= 0 and f_starts[f_i] >= f_min_start:
+            if f_notes[f_i].overlaps(a_note):
+                return False
+            f_i -= 1
+        # Notes that start after a_note starts, but before it ends
+        f_i = f_index
+        while f_i < len(f_starts) and f_starts[f_i] < a_note.end:
+            if f_notes[f_i].overlaps(a_note):
+                return False
+            f_i += 1
+        f_starts.insert(f_index, a_note.start)
+        f_notes.insert(f_index, a_note)
+        if a_note.length > self._lengths[f_key]:
+            self._lengths[f_key] = a_note.length
+        return True
+
+def _fix_overlaps_cluster(a_starts, a_lengths, a_ends, a_velocities):
+    """ Resolve the overlaps of notes with the same channel and note number,
+        some of them starting at the same time.  The result depends on the
+        order of the notes in item.notes, which the notes must be in:  Each
+        note is compared with the notes after its start in that order,
+        a note that starts at the same time as a shorter note is moved to
+        the end of it, and a note with the same start and length is
+        deleted, unless it is equal to the note it is compared with.
+
+        Clusters of notes that do not overlap each other can be resolved
+        together.  The notes are lists of the fields of MIDINote, so that
+        packed notes are not converted to MIDINote.  Modifies the lists and
+        returns the indices of the notes to delete.  A deleted note is the
+        first note equal to it, like list.remove
+    """
+    # The fields compared by MIDINote.__eq__ that can differ between notes
+    # with the same channel and note number
+    f_keys = list(zip(a_starts, a_lengths, a_velocities))
+    # The indices of the notes sorted by start, and their starts, the notes
+    # that a note is compared with are the notes that start after it
+    # starts and before it ends
+    f_order = sorted(range(len(a_starts)), key=a_starts.__getitem__)
+    f_sorted_starts = [a_starts[x] for x in f_order]
+    # The keys of the deleted notes, a deleted note is never modified
+    f_deleted = set()
+    f_to_delete = []
+    f_bisect = bisect.bisect_left
+
+    def _set(a_i, a_start, a_length):
+        if a_start != a_starts[a_i]:
+            f_index = f_bisect(f_sorted_starts, a_starts[a_i])
+            while f_order[f_index] != a_i:
+                f_index += 1
+            del f_sorted_starts[f_index]
+            del f_order[f_index]
+            f_index = f_bisect(f_sorted_starts, a_start)
+            f_sorted_starts.insert(f_index, a_start)
+            f_order.insert(f_index, a_i)
+            a_starts[a_i] = a_start
+        a_lengths[a_i] = a_length
+        # Like MIDINote.set_end
+        a_ends[a_i] = round(a_length + a_start, 6)
+        f_keys[a_i] = (a_start, a_length, a_velocities[a_i])
+
+    for f_i in range(len(a_starts)):
+        f_key = f_keys[f_i]
+        if f_key in f_deleted:
+            continue
+        f_start = a_starts[f_i]
+        # The end only moves by rounding error when the note is moved
+        f_lo = f_bisect(f_sorted_starts, f_start)
+        f_hi = f_bisect(
+            f_sorted_starts,
+            max(f_start, a_ends[f_i]) + 1e-5,
+            f_lo,
+        )
+        if f_hi - f_lo < 2:
+            # Only the note itself
+            continue
+        for f_i2 in sorted(f_order[f_lo:f_hi]):
+            f_key2 = f_keys[f_i2]
+            if f_key2 == f_keys[f_i] or f_key2 in f_deleted:
+                continue
+            f_start, f_length = a_starts[f_i], a_lengths[f_i]
+            f_start2, f_length2 = a_starts[f_i2], a_lengths[f_i2]
+            if f_start2 == f_start:
+                if f_length2 == f_length:
+                    f_deleted.add(f_key2)
+                    f_to_delete.append(f_i2)
+                elif f_length2 > f_length:
+                    _set(f_i2, a_ends[f_i], f_length2 - f_length)
+                else:
+                    _set(f_i, a_ends[f_i2], f_length - f_length2)
+            elif f_start2 > f_start and a_ends[f_i] > f_start2:
+                # Truncated, the start does not change
+                f_length = f_start2 - f_start
+                a_lengths[f_i] = f_length
+                a_ends[f_i] = round(f_length + f_start, 6)
+                f_keys[f_i] = (f_start, f_length, a_velocities[f_i])
+
+    f_to_delete.extend(
+        i for i, x in enumerate(a_lengths)
+        if x < _shared.min_note_length
+    )
+    # key: [index, ...] of the notes not deleted yet, last first
+    f_remaining = {}
+    for f_i in reversed(range(len(a_starts))):
+        f_remaining.setdefault(f_keys[f_i], []).append(f_i)
+    f_result = []
+    for f_i in f_to_delete:
+        f_list = f_remaining[f_keys[f_i]]
+        if f_list:
+            f_result.append(f_list.pop())
+    return f_result
 
 class item:
     __slots__ = [
         'items',
-        'notes',
-        'ccs',
-        'pitchbends',
+        '_notes',
+        '_ccs',
+        '_pitchbends',
+        '_events',
         'uid',
         'fx_list',
     ]
 
     def __init__(self, a_uid):
         self.items = {}  # audio items:  TODO rename
-        self.notes = []
-        self.ccs = []
-        self.pitchbends = []
+        self._notes = []
+        self._ccs = []
+        self._pitchbends = []
+        # ItemEvents while the MIDI events are packed, see pack()
+        self._events = None
         self.uid = int(a_uid)
         self.fx_list = {} #per-audio-item-fx
 
+    @property
+    def notes(self):
+        if self._events is not None:
+            self._unpack()
+        return self._notes
+
+    @notes.setter
+    def notes(self, a_notes):
+        if self._events is not None:
+            self._unpack()
+        self._notes = a_notes
+
+    @property
+    def ccs(self):
+        if self._events is not None:
+            self._unpack()
+        return self._ccs
+
+    @ccs.setter
+    def ccs(self, a_ccs):
+        if self._events is not None:
+            self._unpack()
+        self._ccs = a_ccs
+
+    @property
+    def pitchbends(self):
+        if self._events is not None:
+            self._unpack()
+        return self._pitchbends
+
+    @pitchbends.setter
+    def pitchbends(self, a_pitchbends):
+        if self._events is not None:
+            self._unpack()
+        self._pitchbends = a_pitchbends
+
+    def pack(self):
+        """ Store the MIDI events as NumPy arrays instead of event objects,
+            until notes, ccs or pitchbends is next accessed.  The bulk edit
+            methods, get_length, event_arrays and str() do not unpack
+            them.  Returns self
+        """
+        if self._events is None:
+            self._events = ItemEvents.from_lists(
+                self._notes,
+                self._ccs,
+                self._pitchbends,
+            )
+            self._notes = None
+            self._ccs = None
+            self._pitchbends = None
+        return self
+
+    def is_packed(self):
+        return self._events is not None
+
+    def _unpack(self):
+        f_events = self._events
+        self._events = None
+        self._notes = note_objects(f_events.notes)
+        self._ccs = cc_objects(f_events.ccs)
+        self._pitchbends = pb_objects(f_events.pitchbends)
+
+    def event_arrays(self):
+        """ The MIDI events as an ItemEvents, without unpacking them.  The
+            arrays must not be modified
+        """
+        if self._events is not None:
+            return self._events
+        return ItemEvents.from_lists(
+            self._notes,
+            self._ccs,
+            self._pitchbends,
+        )
+
+    def _note_array(self, a_fields=None):
+        """ The notes as an array for a bulk edit.  The packed array if
+            packed, otherwise a new array of a_fields of the MIDINote
+            objects, that _set_notes writes back to them
+        """
+        if self._events is not None:
+            return self._events.notes
+        return note_array(self._notes, a_fields)
+
+    def _set_notes(self, a_notes, a_indices, a_fields):
+        """ Write a_fields of a_notes at a_indices back to the MIDINote
+            objects, the packed array was already modified
+        """
+        if self._events is not None:
+            return
+        a_indices = numpy.unique(a_indices).tolist()
+        f_columns = [a_notes[x][a_indices].tolist() for x in a_fields]
+        for f_i, f_values in zip(a_indices, zip(*f_columns)):
+            f_note = self._notes[f_i]
+            for f_field, f_value in zip(a_fields, f_values):
+                setattr(f_note, f_field, f_value)
+            if 'start' in a_fields or 'length' in a_fields:
+                f_note.set_end()
+
     def get_next_lane(self):
         f_lanes = set(x.lane_num for x in self.items.values())
         for f_i in range(24):
@@ -41,16 +288,16 @@ class item:
         return 0
 
     def get_length(self, a_tempo=None):
-        f_result = 0.0
-
-        for f_note in self.notes:
-            f_end = f_note.start + f_note.length
-            if f_end > f_result:
-                f_result = f_end
-
-        for f_ev in self.ccs + self.pitchbends:
-            if f_ev.start > f_result:
-                f_result = f_ev.start
+        f_events = self.event_arrays()
+        f_result = max(
+            float(
+                (
+                    f_events.notes['start'] + f_events.notes['length']
+                ).max(initial=0.0)
+            ),
+            float(f_events.ccs['start'].max(initial=0.0)),
+            float(f_events.pitchbends['start'].max(initial=0.0)),
+        )
 
         if a_tempo:
             f_spb = 60.0 / a_tempo
@@ -258,34 +505,36 @@ class item:
 
          Modify the velocity of a range of notes
          """
-        f_notes = []
-
         if a_notes is None:
-            f_notes = [x for x in self.notes if x.channel == channel]
+            f_notes = self._note_array(('start', 'velocity', 'channel'))
         else:
-            for f_note in a_notes:
-                for f_note2 in self.notes:
-                    if f_note2 == f_note:
-                        f_notes.append(f_note2)
-                        break
-
+            f_notes = self._note_array(_NOTE_EQ_FIELDS)
+        f_indices = select_notes(f_notes, a_notes, channel)
         f_range_beats = a_end_beat - a_start_beat
+        f_velocity = f_notes['velocity'].astype(numpy.int64)
+
+        for f_round in split_repeats(f_indices)[0]:
+            f_start = f_notes['start'][f_round]
+            f_in_range = (f_start >= a_start_beat) & (f_start <= a_end_beat)
+            f_round = f_round[f_in_range]
+            if a_line:
+                if len(f_round) and not f_range_beats:
+                    raise ZeroDivisionError("a_start_beat == a_end_beat")
+                f_frac = (f_start[f_in_range] - a_start_beat) / f_range_beats
+                # Truncated like int()
+                f_value = (
+                    ((a_end_amt - a_amt) * f_frac) + a_amt
+                ).astype(numpy.int64)
+            else:
+                f_value = int(a_amt)
+            if a_add:
+                f_velocity[f_round] += f_value
+            else:
+                f_velocity[f_round] = f_value
+            f_velocity[f_round] = numpy.clip(f_velocity[f_round], 1, 127)
 
-        for note in f_notes:
-            if note.start >= a_start_beat and note.start <= a_end_beat:
-                if a_line:
-                    f_frac = ((note.start - a_start_beat)/f_range_beats)
-                    f_value = int(((a_end_amt - a_amt) * f_frac) + a_amt)
-                else:
-                    f_value = int(a_amt)
-                if a_add:
-                    note.velocity += f_value
-                else:
-                    note.velocity = f_value
-                if note.velocity > 127:
-                    note.velocity = 127
-                elif note.velocity < 1:
-                    note.velocity = 1
+        f_notes['velocity'] = f_velocity
+        self._set_notes(f_notes, f_indices, ('velocity',))
 
     def quantize(
         self,
@@ -295,70 +544,38 @@ class item:
         a_notes=None,
         a_selected_only=False,
     ):
-        f_notes = []
-        f_ccs = []
-        f_pbs = []
+        """ Quantize the start and length of notes to a_beat_frac.  Returns
+            the text of each note that was quantized
 
-        f_result = []
-
-        if a_notes is None:
-            f_notes = [x for x in self.notes if x.channel == midi_channel]
-            f_ccs = [x for x in self.ccs if x.channel == midi_channel]
-            f_pbs = [x for x in self.pitchbends if x.channel == midi_channel]
-        else:
-            for i in range(len(a_notes)):
-                for f_note in self.notes:
-                    if f_note == a_notes[i]:
-                        if a_events_move_with_item:
-                            f_start = f_note.start
-                            f_end = f_note.start + f_note.length
-                            for f_cc in self.ccs:
-                                if (
-                                    f_cc.start >= f_start
-                                    and
-                                    f_cc.start <= f_end
-                                    and
-                                    f_cc.channel == midi_channel
-                                ):
-                                    f_ccs.append(f_cc)
-                            for f_pb in self.pitchbends:
-                                if (
-                                    f_pb.start >= f_start
-                                    and
-                                    f_pb.start <= f_end
-                                    and
-                                    f_pb.channel == midi_channel
-                                ):
-                                    f_pbs.append(f_pb)
-                        f_notes.append(f_note)
-                        break
+            @a_events_move_with_item:
+                Not implemented, the CCs and pitchbends of the notes are not
+                moved
+        """
+        f_notes = self._note_array()
+        f_indices = select_notes(f_notes, a_notes, midi_channel)
+        if a_selected_only:
+            f_indices = f_indices[f_notes['is_selected'][f_indices]]
 
         f_quantized_value = bar_frac_text_to_float(a_beat_frac)
         f_quantize_multiple = 1.0 / f_quantized_value
 
-        for note in f_notes:
-            if a_selected_only and not note.is_selected:
-                continue
-            f_new_start = round(note.start *
-                f_quantize_multiple) * f_quantized_value
-            note.start = f_new_start
-            shift_adjust = note.start - f_new_start
-            f_new_length = round(note.length *
-                f_quantize_multiple) * f_quantized_value
-            if f_new_length == 0.0:
-                f_new_length = f_quantized_value
-            note.set_length(f_new_length)
-            f_result.append(str(note))
+        f_rounds, f_positions = split_repeats(f_indices)
+        f_strs = []
+        for f_round in f_rounds:
+            f_notes['start'][f_round] = numpy.round(
+                f_notes['start'][f_round] * f_quantize_multiple,
+            ) * f_quantized_value
+            f_new_length = numpy.round(
+                f_notes['length'][f_round] * f_quantize_multiple,
+            ) * f_quantized_value
+            f_new_length[f_new_length == 0.0] = f_quantized_value
+            f_notes['length'][f_round] = py_round(f_new_length, 6)
+            f_strs.append(note_strs(f_notes[f_round]))
+        self._set_notes(f_notes, f_indices, ('start', 'length'))
 
         self.fix_overlaps()
 
-        if a_events_move_with_item:
-            for cc in f_ccs:
-                cc.start -= shift_adjust
-            for pb in f_pbs:
-                pb.start -= shift_adjust
-
-        return f_result
+        return [f_strs[x][y] for x, y in f_positions]
 
     def transpose(
         self,
@@ -370,34 +587,54 @@ class item:
         channel=None,
     ):
         f_total = a_semitones + (a_octave * 12)
-        f_notes = []
-        f_result = []
-
-        if a_notes is None:
-            f_notes = [
-                x for x in self.notes
-                if channel is None or channel == x.channel
-            ]
-        else:
-            for i in range(len(a_notes)):
-                for f_note in self.notes:
-                    if f_note == a_notes[i]:
-                        f_notes.append(f_note)
-                        break
-        if a_duplicate:
-            f_duplicates = []
-        for note in f_notes:
-            if a_selected_only and not note.is_selected:
-                continue
+        f_notes = self._note_array()
+        f_indices = select_notes(f_notes, a_notes, channel)
+        if a_selected_only:
+            f_indices = f_indices[f_notes['is_selected'][f_indices]]
+
+        f_rounds, f_positions = split_repeats(f_indices)
+        f_strs = []
+        f_duplicates = []
+        for f_round in f_rounds:
             if a_duplicate:
-                f_duplicates.append(MIDINote.from_str(str(note)))
-            note.note_num += f_total
-            note.note_num = clip_value(note.note_num, 0, 120)
-            f_result.append(str(note))
+                # The same as MIDINote.from_str(str(note))
+                f_round_duplicates = f_notes[f_round]
+                for f_field in ('start', 'length'):
+                    f_round_duplicates[f_field] = py_round(
+                        f_round_duplicates[f_field],
+                        6,
+                    )
+                for f_field in (
+                    'pan', 'attack', 'decay', 'sustain', 'release',
+                ):
+                    f_round_duplicates[f_field] = py_round(
+                        f_round_duplicates[f_field],
+                        2,
+                    )
+                f_round_duplicates['is_selected'] = False
+                f_duplicates.append(f_round_duplicates)
+            f_notes['note_num'][f_round] = numpy.clip(
+                f_notes['note_num'][f_round].astype(numpy.int64) + f_total,
+                0,
+                120,
+            )
+            f_strs.append(note_strs(f_notes[f_round]))
+        self._set_notes(f_notes, f_indices, ('note_num',))
+
         if a_duplicate:
-            self.notes += f_duplicates
-            self.notes.sort()
-        return f_result
+            f_offsets = numpy.cumsum([0] + [len(x) for x in f_duplicates])
+            f_duplicates = numpy.concatenate(
+                f_duplicates,
+            )[[f_offsets[x] + y for x, y in f_positions]]
+            if self._events is None:
+                self._notes += note_objects(f_duplicates)
+                self._notes.sort()
+            else:
+                f_notes = numpy.concatenate((f_notes, f_duplicates))
+                self._events.notes = f_notes[
+                    numpy.argsort(f_notes['start'], kind='stable')
+                ]
+        return [f_strs[x][y] for x, y in f_positions]
 
     def smooth_automation_points(self, a_is_cc, midi_channel, a_cc_num=-1):
         if a_is_cc:
@@ -494,41 +731,157 @@ class item:
 
     def fix_overlaps(self):
         """ Truncate the lengths of any notes that overlap
-            the start of another note
+            the start of another note, and delete notes shorter than
+            min_note_length
+
+            Sorts the notes by channel, note number and start, and splits
+            them into clusters of notes that overlap.  In a cluster where
+            every note starts at a different time, each note that overlaps
+            the start of the next note is truncated to it.  The result for
+            a cluster with notes that start at the same time depends on the
+            order of self.notes, see _fix_overlaps_cluster
         """
-        channels = {x.channel for x in self.notes}
-        f_to_delete = []
-        for channel in channels:
-            for f_note in (x for x in self.notes if x.channel == channel):
-                if f_note not in f_to_delete:
-                    for f_note2 in (
-                        x for x in self.notes if x.channel == channel
-                    ):
-                        if f_note != f_note2 and f_note2 not in f_to_delete:
-                            if f_note.note_num == f_note2.note_num:
-                                if f_note2.start == f_note.start:
-                                    if f_note2.length == f_note.length:
-                                        f_to_delete.append(f_note2)
-                                    elif f_note2.length > f_note.length:
-                                        f_note2.length = \
-                                            f_note2.length - f_note.length
-                                        f_note2.start = f_note.end
-                                        f_note2.set_end()
-                                    else:
-                                        f_note.length = \
-                                            f_note.length - f_note2.length
-                                        f_note.start = f_note2.end
-                                        f_note.set_end()
-                                elif f_note2.start > f_note.start:
-                                    if f_note.end > f_note2.start:
-                                        f_note.length = \
-                                            f_note2.start - f_note.start
-                                        f_note.set_end()
-        for f_note in self.notes:
-            if f_note.length < _shared.min_note_length:
-                f_to_delete.append(f_note)
-        for f_note in f_to_delete:
-            self.notes.remove(f_note)
+        f_notes = self._note_array(_NOTE_EQ_FIELDS)
+        if self._events is None:
+            f_ends = numpy.array(
+                [x.end for x in self._notes],
+                dtype=numpy.float64,
+            )
+        else:
+            f_ends = py_round(f_notes['length'] + f_notes['start'], 6)
+        f_order = numpy.lexsort(
+            (f_notes['start'], f_notes['note_num'], f_notes['channel']),
+        )
+        f_start = f_notes['start'][f_order]
+        f_end = f_ends[f_order]
+        f_channel = f_notes['channel'][f_order]
+        f_note_num = f_notes['note_num'][f_order]
+
+        # True for the first note of each cluster, the notes of a cluster
+        # have the same channel and note number, and start before the end
+        # of an earlier note in it.  Includes notes that start within
+        # rounding error of the end, in case an order dependent cluster
+        # moves a note there
+        f_first = numpy.ones(len(f_order), dtype=bool)
+        f_groups = numpy.concatenate(
+            (
+                [0],
+                numpy.flatnonzero(
+                    (f_channel[1:] != f_channel[:-1])
+                    |
+                    (f_note_num[1:] != f_note_num[:-1])
+                ) + 1,
+                [len(f_order)],
+            ),
+        )
+        for f_a, f_b in zip(f_groups[:-1], f_groups[1:]):
+            f_max_end = numpy.maximum.accumulate(
+                numpy.maximum(f_start[f_a:f_b], f_end[f_a:f_b]),
+            )
+            f_first[f_a + 1:f_b] = (
+                f_start[f_a + 1:f_b] >= f_max_end[:-1] + 1e-6
+            )
+        f_cluster = numpy.cumsum(f_first)
+
+        # The result for a cluster where notes start at the same time
+        # depends on the order of self.notes.  The end of a truncated note
+        # is rounded, so the note it is truncated to also depends on the
+        # order if the starts are not
+        f_ordered = numpy.round(f_start, 6) != f_start
+        f_ordered[1:] |= (f_start[1:] == f_start[:-1]) & ~f_first[1:]
+        f_ordered = numpy.isin(f_cluster, f_cluster[f_ordered])
+
+        # In the other clusters, each note that overlaps the start of the
+        # next note is truncated to it
+        f_truncate = numpy.flatnonzero(
+            ~f_first[1:]
+            &
+            ~f_ordered[:-1]
+            &
+            (f_end[:-1] > f_start[1:])
+        )
+        f_truncated = f_order[f_truncate]
+        f_starts = f_notes['start'].copy()
+        f_lengths = f_notes['length'].copy()
+        f_lengths[f_truncated] = (
+            f_start[f_truncate + 1] - f_start[f_truncate]
+        )
+        f_delete = f_lengths < _shared.min_note_length
+
+        f_ordered = numpy.flatnonzero(f_ordered)
+        if len(f_ordered):
+            # The clusters with the same channel and note number do not
+            # affect each other, they are resolved together, by channel and
+            # note number in the order of self.notes
+            f_group = numpy.zeros(len(f_order), dtype=numpy.intp)
+            f_group[f_groups[1:-1]] = 1
+            f_group = numpy.cumsum(f_group)
+            f_ordered = f_ordered[
+                numpy.lexsort((f_order[f_ordered], f_group[f_ordered]))
+            ]
+            f_rows = f_order[f_ordered]
+            f_replay_starts = f_notes['start'][f_rows].tolist()
+            f_replay_lengths = f_notes['length'][f_rows].tolist()
+            f_replay_ends = f_end[f_ordered].tolist()
+            f_velocities = f_notes['velocity'][f_rows].tolist()
+            f_ids = f_group[f_ordered]
+            f_bounds = numpy.concatenate(
+                (
+                    [0],
+                    numpy.flatnonzero(f_ids[1:] != f_ids[:-1]) + 1,
+                    [len(f_ids)],
+                ),
+            ).tolist()
+            f_deleted = []
+            for f_a, f_b in zip(f_bounds[:-1], f_bounds[1:]):
+                f_group_starts = f_replay_starts[f_a:f_b]
+                f_group_lengths = f_replay_lengths[f_a:f_b]
+                f_deleted.extend(
+                    f_a + x for x in _fix_overlaps_cluster(
+                        f_group_starts,
+                        f_group_lengths,
+                        f_replay_ends[f_a:f_b],
+                        f_velocities[f_a:f_b],
+                    )
+                )
+                f_replay_starts[f_a:f_b] = f_group_starts
+                f_replay_lengths[f_a:f_b] = f_group_lengths
+            f_delete[f_rows] = False
+            f_delete[f_rows[numpy.array(f_deleted, dtype=int)]] = True
+            f_starts[f_rows] = f_replay_starts
+            f_lengths[f_rows] = f_replay_lengths
+
+        if self._events is None:
+            # Only the notes that changed
+            f_changed = numpy.flatnonzero(
+                (f_starts != f_notes['start'])
+                |
+                (f_lengths != f_notes['length'])
+            )
+            for f_i, f_note_start, f_note_length, f_note_end in zip(
+                f_changed.tolist(),
+                f_starts[f_changed].tolist(),
+                f_lengths[f_changed].tolist(),
+                py_round(
+                    f_lengths[f_changed] + f_starts[f_changed],
+                    6,
+                ).tolist(),
+            ):
+                # Like MIDINote.set_end
+                f_note = self._notes[f_i]
+                f_note.start = f_note_start
+                f_note.length = f_note_length
+                f_note.end = f_note_end
+            if f_delete.any():
+                self._notes = [
+                    x for x, y in zip(self._notes, f_delete.tolist())
+                    if not y
+                ]
+        else:
+            f_notes['start'] = f_starts
+            f_notes['length'] = f_lengths
+            if f_delete.any():
+                self._events.notes = f_notes[~f_delete]
 
     def get_next_default_note(self):
         pass
@@ -553,20 +906,24 @@ class item:
         """ Delete all pitchbends greater than a_start_beat
             and less than a_end_beat
         """
-        f_ccs_to_delete = []
-        for cc in self.ccs:
-            if (
-                cc.cc_num == a_cc_num
-                and
-                cc.start >= a_start_beat
-                and
-                cc.start <= a_end_beat
-                and
-                cc.channel == midi_channel
-            ):
-                f_ccs_to_delete.append(cc)
-        for cc in f_ccs_to_delete:
-            self.remove_cc(cc)
+        f_ccs = (
+            cc_array(self._ccs) if self._events is None else self._events.ccs
+        )
+        f_delete = (
+            (f_ccs['cc_num'] == a_cc_num)
+            &
+            (f_ccs['start'] >= a_start_beat)
+            &
+            (f_ccs['start'] <= a_end_beat)
+            &
+            (f_ccs['channel'] == midi_channel)
+        )
+        if self._events is None:
+            self._ccs = [
+                x for x, y in zip(self._ccs, f_delete.tolist()) if not y
+            ]
+        else:
+            self._events.ccs = f_ccs[~f_delete]
 
     #TODO:  A maximum number of events per line?
     def draw_cc_line(
@@ -614,18 +971,23 @@ class item:
         """ Delete all pitchbends greater than
             a_start_beat and less than a_end_beat
         """
-        f_pbs_to_delete = []
-        for pb in self.pitchbends:
-            if (
-                pb.channel == midi_channel
-                and
-                pb.start >= a_start_beat
-                and
-                pb.start <= a_end_beat
-            ):
-                f_pbs_to_delete.append(pb)
-        for pb in f_pbs_to_delete:
-            self.remove_pb(pb)
+        f_pbs = (
+            pb_array(self._pitchbends)
+            if self._events is None else self._events.pitchbends
+        )
+        f_delete = (
+            (f_pbs['channel'] == midi_channel)
+            &
+            (f_pbs['start'] >= a_start_beat)
+            &
+            (f_pbs['start'] <= a_end_beat)
+        )
+        if self._events is None:
+            self._pitchbends = [
+                x for x, y in zip(self._pitchbends, f_delete.tolist()) if not y
+            ]
+        else:
+            self._events.pitchbends = f_pbs[~f_delete]
 
     def draw_pb_line(
         self,
@@ -665,64 +1027,138 @@ class item:
 
     @staticmethod
     def from_str(a_str, a_uid):
+        """ Parse an item file.  Equivalent to calling add_note, add_cc
+            and add_pb for each event, but each list is only sorted once,
+            and the duplicate and overlap checks do not scan every event
+            already added
+        """
         f_result = item(a_uid)
-        f_arr = a_str.split("\n")
-        for f_event_str in f_arr:
+        f_notes = _NoteOverlaps()
+        f_ccs = set()
+        f_pbs = set()
+        for f_event_str in a_str.split("\n"):
             if f_event_str == terminating_char:
                 break
+            f_event_arr = f_event_str.split("|")
+            f_type = f_event_arr[0]
+            if f_type == "n":
+                f_note = MIDINote(*f_event_arr[1:])
+                if f_notes.add(f_note):
+                    f_result.notes.append(f_note)
+            elif f_type == "c":
+                f_cc = MIDIControl(*f_event_arr[1:])
+                f_key = (f_cc.start, f_cc.cc_num, f_cc.cc_val, f_cc.channel)
+                if f_key not in f_ccs:
+                    f_ccs.add(f_key)
+                    f_result.ccs.append(f_cc)
+            elif f_type == "p":
+                f_pb = MIDIPitchbend(*f_event_arr[1:])
+                f_key = (f_pb.start, f_pb.pb_val, f_pb.channel)
+                if f_key not in f_pbs:
+                    f_pbs.add(f_key)
+                    f_result.pitchbends.append(f_pb)
+            elif f_type == "a":
+                f_result.add_item(
+                    int(f_event_arr[1]),
+                    DawAudioItem.from_arr(f_event_arr[2:]),
+                )
+            elif f_type == "f":
+                f_items_arr = []
+                f_item_index = f_event_arr[1]
+                f_vals_arr = f_event_arr[2:]
+                for f_i in range(8):
+                    f_index = f_i * 4
+                    f_index_end = f_index + 4
+                    a_knob0, a_knob1, a_knob2, a_type = f_vals_arr[
+                        f_index:f_index_end]
+                    f_items_arr.append(
+                        multifx_settings(
+                            a_knob0, a_knob1, a_knob2, a_type))
+                f_result.set_row(f_item_index, f_items_arr)
+            elif f_type == "U":
+                f_result.uid = int(f_event_arr[1])
+            elif f_type == "M":
+                pass
             else:
-                f_event_arr = f_event_str.split("|")
-                if f_event_arr[0] == "n":
-                    f_result.add_note(MIDINote.from_arr(f_event_arr[1:]))
-                elif f_event_arr[0] == "c":
-                    f_result.add_cc(MIDIControl.from_arr(f_event_arr[1:]))
-                elif f_event_arr[0] == "p":
-                    f_result.add_pb(MIDIPitchbend.from_arr(f_event_arr[1:]))
-                elif f_event_arr[0] == "a":
-                    f_result.add_item(
-                        int(f_event_arr[1]),
-                        DawAudioItem.from_arr(f_event_arr[2:]),
-                    )
-                elif f_event_arr[0] == "f":
-                    f_items_arr = []
-                    f_item_index = f_event_arr[1]
-                    f_vals_arr = f_event_arr[2:]
-                    for f_i in range(8):
-                        f_index = f_i * 4
-                        f_index_end = f_index + 4
-                        a_knob0, a_knob1, a_knob2, a_type = f_vals_arr[
-                            f_index:f_index_end]
-                        f_items_arr.append(
-                            multifx_settings(
-                                a_knob0, a_knob1, a_knob2, a_type))
-                    f_result.set_row(f_item_index, f_items_arr)
-                elif f_event_arr[0] == "U":
-                    f_result.uid = int(f_event_arr[1])
-                elif f_event_arr[0] == "M":
-                    pass
-                else:
-                    LOG.error("Error: {}".format(f_event_arr))
-                    assert False, "Invalid type '{}'".format(f_event_arr[0])
+                LOG.error("Error: {}".format(f_event_arr))
+                assert False, "Invalid type '{}'".format(f_type)
+        # Stable sorts, the same order as sorting after each event
+        f_result.notes.sort(key=_event_start)
+        f_result.ccs.sort(key=_event_start)
+        f_result.pitchbends.sort(key=_event_start)
         return f_result
 
     def deduplicate(self):
-        len_orig = len(self.notes)
-        f_note_set = {str(x) for x in self.notes}
-        note_diff = len_orig - len(f_note_set)
+        """ Remove notes that serialize to the same text as an earlier
+            note.  Returns the text of each note in self.notes
+        """
+        if self._events is None:
+            f_strs = [str(x) for x in self._notes]
+        else:
+            f_strs = note_strs(self._events.notes)
+        f_seen = set()
+        f_keep = []
+        for f_i, f_str in enumerate(f_strs):
+            if f_str not in f_seen:
+                f_seen.add(f_str)
+                f_keep.append(f_i)
+        note_diff = len(f_strs) - len(f_keep)
         if note_diff:
             LOG.info("Deduplicated {} notes".format(note_diff))
-            self.notes = [MIDINote.from_str(x) for x in f_note_set]
-            self.notes.sort()
+            if self._events is None:
+                f_notes = [self._notes[x] for x in f_keep]
+                f_order = sorted(
+                    range(len(f_notes)),
+                    key=lambda x: f_notes[x].start,
+                )
+                self._notes = [f_notes[x] for x in f_order]
+            else:
+                f_notes = self._events.notes[f_keep]
+                f_order = numpy.argsort(
+                    f_notes['start'],
+                    kind='stable',
+                ).tolist()
+                self._events.notes = f_notes[f_order]
+            f_strs = [f_strs[f_keep[x]] for x in f_order]
         # TODO:  Others
+        return f_strs
 
     def __str__(self):
-        self.deduplicate()
+        f_note_strs = self.deduplicate()
         f_result = []
         f_result.append("U|{}".format(self.uid))
-        f_midi_count = len(self.notes) + len(self.ccs) + len(self.pitchbends)
-        f_result.append("M|{}".format(f_midi_count))
-        f_result += [str(x) for x in
-            sorted(self.notes + self.ccs + self.pitchbends)]
+        if self._events is None:
+            f_midi_count = (
+                len(self._notes) + len(self._ccs) + len(self._pitchbends)
+            )
+            f_result.append("M|{}".format(f_midi_count))
+            f_events = list(zip(self._notes, f_note_strs))
+            f_events.extend((x, str(x)) for x in self._ccs)
+            f_events.extend((x, str(x)) for x in self._pitchbends)
+            f_events.sort(key=lambda x: x[0].start)
+            f_result.extend(x[1] for x in f_events)
+        else:
+            f_events = self._events
+            f_midi_count = (
+                len(f_note_strs) + len(f_events.ccs) + len(f_events.pitchbends)
+            )
+            f_result.append("M|{}".format(f_midi_count))
+            f_strs = (
+                f_note_strs
+                + cc_strs(f_events.ccs)
+                + pb_strs(f_events.pitchbends)
+            )
+            f_order = numpy.argsort(
+                numpy.concatenate(
+                    (
+                        f_events.notes['start'],
+                        f_events.ccs['start'],
+                        f_events.pitchbends['start'],
+                    ),
+                ),
+                kind='stable',
+            )
+            f_result.extend(f_strs[x] for x in f_order.tolist())
         for k, f_item in list(self.items.items()):
             f_result.append("a|{}|{}".format(k, f_item))
         for k, v in self.fx_list.items():
@@ -0,0 +1,288 @@
+""" The MIDI events of a sequencer item as NumPy structured arrays, one
+    column per attribute of MIDINote, MIDIControl and MIDIPitchbend.
+
+    A note takes NOTE_DTYPE.itemsize bytes instead of the few hundred bytes
+    of a MIDINote object and the float objects it references, and bulk
+    edits of many events are array operations instead of Python loops.
+    Converting to and from the event objects is lossless.
+"""
+
+from sglib.models.clinttools import MIDIControl, MIDINote, MIDIPitchbend
+import numpy
+
+__all__ = [
+    'CC_DTYPE',
+    'ItemEvents',
+    'NOTE_DTYPE',
+    'PB_DTYPE',
+    'cc_array',
+    'cc_objects',
+    'cc_strs',
+    'note_array',
+    'note_objects',
+    'note_strs',
+    'pb_array',
+    'pb_objects',
+    'pb_strs',
+    'py_round',
+    'select_notes',
+    'split_repeats',
+]
+
+
+NOTE_DTYPE = numpy.dtype([
+    ('start', numpy.float64),
+    ('length', numpy.float64),
+    ('pan', numpy.float64),
+    ('attack', numpy.float64),
+    ('decay', numpy.float64),
+    ('sustain', numpy.float64),
+    ('release', numpy.float64),
+    ('note_num', numpy.int16),
+    ('velocity', numpy.int16),
+    ('channel', numpy.int16),
+    ('is_selected', numpy.bool_),
+])
+
+CC_DTYPE = numpy.dtype([
+    ('start', numpy.float64),
+    ('cc_val', numpy.float64),
+    ('cc_num', numpy.int16),
+    ('channel', numpy.int16),
+])
+
+PB_DTYPE = numpy.dtype([
+    ('start', numpy.float64),
+    ('pb_val', numpy.float64),
+    ('channel', numpy.int16),
+])
+
+
+def py_round(a_arr, a_digits):
+    """ Round each value like round(), which rounds to the nearest decimal
+        correctly.  numpy.round scales by a power of 10 first, the
+        rounding error of the scaling can only change the result of values
+        that are scaled to about halfway between 2 integers, those are
+        rounded with round()
+    """
+    f_scale = 10. ** a_digits
+    f_scaled = numpy.asarray(a_arr, dtype=numpy.float64) * f_scale
+    f_rounded = numpy.rint(f_scaled)
+    f_result = f_rounded / f_scale
+    with numpy.errstate(invalid='ignore'):
+        f_halfway = numpy.flatnonzero(
+            (numpy.abs(numpy.abs(f_scaled - f_rounded) - 0.5) < 1e-3)
+            |
+            ~(numpy.abs(f_scaled) < 2. ** 40)
+        )
+    if len(f_halfway):
+        f_result[f_halfway] = [
+            round(x, a_digits)
+            for x in numpy.asarray(a_arr)[f_halfway].tolist()
+        ]
+    return f_result
+
+def select_notes(a_notes, a_selection, a_channel=None):
+    """ The indices of the notes to edit, like the bulk edit methods of
+        item select them
+
+        @a_notes:     A NOTE_DTYPE array
+        @a_selection: None for every note on a_channel, or a list of
+                      MIDINote, each matching the first note in a_notes
+                      that is equal to it.  May contain the same note more
+                      than once
+        @a_channel:   None for every channel
+    """
+    if a_selection is None:
+        if a_channel is None:
+            return numpy.arange(len(a_notes))
+        return numpy.flatnonzero(a_notes['channel'] == a_channel)
+    f_first = {}
+    for f_i, f_key in enumerate(
+        zip(
+            a_notes['start'].tolist(),
+            a_notes['note_num'].tolist(),
+            a_notes['length'].tolist(),
+            a_notes['velocity'].tolist(),
+            a_notes['channel'].tolist(),
+        )
+    ):
+        f_first.setdefault(f_key, f_i)
+    f_result = []
+    for f_note in a_selection:
+        f_index = f_first.get(
+            (
+                f_note.start,
+                f_note.note_num,
+                f_note.length,
+                f_note.velocity,
+                f_note.channel,
+            )
+        )
+        if f_index is not None:
+            f_result.append(f_index)
+    return numpy.array(f_result, dtype=numpy.intp)
+
+def split_repeats(a_indices):
+    """ Split a_indices into rounds without repeated indices, so that an
+        edit applied to each round in order is applied to a repeated index
+        once per occurrence, like a loop over a_indices.
+
+        Returns ([round indices, ...], [(round, position), ...]), the
+        second list has the round of each occurrence in a_indices and its
+        position in that round
+    """
+    if (
+        # select_notes returns increasing indices for a_selection=None
+        numpy.all(a_indices[1:] > a_indices[:-1])
+        or
+        len(numpy.unique(a_indices)) == len(a_indices)
+    ):
+        return (
+            [a_indices],
+            [(0, x) for x in range(len(a_indices))],
+        )
+    f_count = {}
+    f_rounds = []
+    f_positions = []
+    for f_index in a_indices.tolist():
+        f_round = f_count.get(f_index, 0)
+        f_count[f_index] = f_round + 1
+        if f_round == len(f_rounds):
+            f_rounds.append([])
+        f_positions.append((f_round, len(f_rounds[f_round])))
+        f_rounds[f_round].append(f_index)
+    return (
+        [numpy.array(x, dtype=numpy.intp) for x in f_rounds],
+        f_positions,
+    )
+
+
+def _to_array(a_events, a_dtype, a_fields=None):
+    if a_fields is None:
+        f_result = numpy.empty(len(a_events), dtype=a_dtype)
+        a_fields = a_dtype.names
+    else:
+        f_result = numpy.zeros(len(a_events), dtype=a_dtype)
+    for f_name in a_fields:
+        f_result[f_name] = [getattr(x, f_name) for x in a_events]
+    return f_result
+
+def note_array(a_notes, a_fields=None):
+    """ A NOTE_DTYPE array of a list of MIDINote
+
+        @a_fields:  The names of the fields to copy from the notes, the
+                    other fields are zero.  None for every field
+    """
+    return _to_array(a_notes, NOTE_DTYPE, a_fields)
+
+def cc_array(a_ccs):
+    """ A CC_DTYPE array of a list of MIDIControl """
+    return _to_array(a_ccs, CC_DTYPE)
+
+def pb_array(a_pbs):
+    """ A PB_DTYPE array of a list of MIDIPitchbend """
+    return _to_array(a_pbs, PB_DTYPE)
+
+# The values in the arrays were already converted and rounded by the event
+# constructors, and may have been edited since, so the event objects are
+# created without converting and rounding them again
+
+def note_objects(a_notes):
+    """ A list of MIDINote of a NOTE_DTYPE array """
+    f_result = []
+    for (
+        f_start, f_length, f_pan, f_attack, f_decay, f_sustain,
+        f_release, f_note_num, f_velocity, f_channel, f_selected,
+    ) in a_notes.tolist():
+        f_note = MIDINote.__new__(MIDINote)
+        f_note.start = f_start
+        f_note.length = f_length
+        f_note.velocity = f_velocity
+        f_note.pan = f_pan
+        f_note.attack = f_attack
+        f_note.decay = f_decay
+        f_note.sustain = f_sustain
+        f_note.release = f_release
+        f_note.note_num = f_note_num
+        f_note.channel = f_channel
+        f_note.is_selected = f_selected
+        f_note.set_end()
+        f_result.append(f_note)
+    return f_result
+
+def cc_objects(a_ccs):
+    """ A list of MIDIControl of a CC_DTYPE array """
+    f_result = []
+    for f_start, f_cc_val, f_cc_num, f_channel in a_ccs.tolist():
+        f_cc = MIDIControl.__new__(MIDIControl)
+        f_cc.start = f_start
+        f_cc.cc_num = f_cc_num
+        f_cc.cc_val = f_cc_val
+        f_cc.channel = f_channel
+        f_result.append(f_cc)
+    return f_result
+
+def pb_objects(a_pbs):
+    """ A list of MIDIPitchbend of a PB_DTYPE array """
+    f_result = []
+    for f_start, f_pb_val, f_channel in a_pbs.tolist():
+        f_pb = MIDIPitchbend.__new__(MIDIPitchbend)
+        f_pb.start = f_start
+        f_pb.pb_val = f_pb_val
+        f_pb.channel = f_channel
+        f_result.append(f_pb)
+    return f_result
+
+def note_strs(a_notes):
+    """ str() of each note of a NOTE_DTYPE array, as a MIDINote """
+    return [
+        f"n|{round(f_start, 6)}|{round(f_length, 6)}|{f_note_num}|"
+        f"{f_velocity}|{f_pan}|{f_attack}|{f_decay}|{f_sustain}|"
+        f"{f_release}|{f_channel}"
+        for (
+            f_start, f_length, f_pan, f_attack, f_decay, f_sustain,
+            f_release, f_note_num, f_velocity, f_channel, _,
+        ) in a_notes.tolist()
+    ]
+
+def cc_strs(a_ccs):
+    """ str() of each CC of a CC_DTYPE array, as a MIDIControl """
+    return [
+        f"c|{round(f_start, 6)}|{f_cc_num}|{round(f_cc_val, 6)}|{f_channel}"
+        for f_start, f_cc_val, f_cc_num, f_channel in a_ccs.tolist()
+    ]
+
+def pb_strs(a_pbs):
+    """ str() of each pitchbend of a PB_DTYPE array, as a MIDIPitchbend """
+    return [
+        f"p|{f_start}|{round(f_pb_val, 6)}|{f_channel}"
+        for f_start, f_pb_val, f_channel in a_pbs.tolist()
+    ]
+
+class ItemEvents:
+    """ The notes, CCs and pitchbends of an item, in the same order as the
+        lists of event objects
+    """
+    __slots__ = [
+        'notes',
+        'ccs',
+        'pitchbends',
+    ]
+
+    def __init__(self, a_notes, a_ccs, a_pitchbends):
+        self.notes = a_notes
+        self.ccs = a_ccs
+        self.pitchbends = a_pitchbends
+
+    @staticmethod
+    def from_lists(a_notes, a_ccs, a_pitchbends):
+        return ItemEvents(
+            note_array(a_notes),
+            cc_array(a_ccs),
+            pb_array(a_pitchbends),
+        )
+
+    @property
+    def nbytes(self):
+        return self.notes.nbytes + self.ccs.nbytes + self.pitchbends.nbytes
@@ -0,0 +1,79 @@
+from .item import item
+from sglib.lib.cache import LRUCache, cache_budget
+from sglib.lib.util import get_file_setting
+import copy
+import time
+
+__all__ = [
+    'ItemRepository',
+]
+
+# The approximate memory used by each event of an item
+ITEM_EVENT_NBYTES = 400
+
+
+def item_nbytes(a_item):
+    f_count = 1 + len(a_item.items) + len(a_item.fx_list)
+    if a_item.is_packed():
+        return (
+            ITEM_EVENT_NBYTES * f_count
+            + a_item.event_arrays().nbytes
+        )
+    return ITEM_EVENT_NBYTES * (
+        f_count
+        + len(a_item.notes)
+        + len(a_item.ccs)
+        + len(a_item.pitchbends)
+    )
+
+class ItemRepository(LRUCache):
+    """ Parsed sequencer items by uid.  Each item is parsed once when it is
+        first requested, and replaced when it is saved.
+
+        The cached items are shared by every caller that only reads them,
+        callers that modify an item must request a copy, so that the cache
+        only changes when the item is saved.
+
+        Parsed items are packed, see item.pack, unless the
+        'item-event-arrays' setting is 0
+    """
+    def __init__(self, a_load):
+        """ @a_load: Callable(uid) that returns the text of an item """
+        LRUCache.__init__(
+            self,
+            'daw-item',
+            cache_budget('daw-item', 128),
+            item_nbytes,
+        )
+        self._load = a_load
+        self.pack = bool(get_file_setting('item-event-arrays', int, 1))
+        # The number of items parsed, and the time spent parsing them
+        self.parses = 0
+        self.parse_seconds = 0.
+
+    def get_item(self, a_uid, a_copy=False):
+        a_uid = int(a_uid)
+        f_item = self.get(a_uid)
+        if f_item is None:
+            f_start = time.perf_counter()
+            f_item = item.from_str(self._load(a_uid), a_uid)
+            if self.pack:
+                f_item.pack()
+            self.parse_seconds += time.perf_counter() - f_start
+            self.parses += 1
+            self.put(a_uid, f_item)
+        if a_copy:
+            return copy.deepcopy(f_item)
+        return f_item
+
+    def put_item(self, a_uid, a_item):
+        """ Replace the cached item with a_item, the caller must not modify
+            a_item afterwards
+        """
+        self.put(int(a_uid), a_item)
+
+    def stats(self) -> dict:
+        f_result = LRUCache.stats(self)
+        f_result['parses'] = self.parses
+        f_result['parse_seconds'] = round(self.parse_seconds, 3)
+        return f_result
@@ -149,7 +149,7 @@ class DawMidiFile:
 
     def single_item(self):
         uid = self.project.create_empty_item(self.name)
-        item = self.project.get_item_by_uid(uid)
+        item = self.project.get_item_by_uid(uid, _copy=True)
         _channel = None
         channels = self.get_used_channels()
         if len(channels) == 1:
@@ -215,7 +215,10 @@ class DawMidiFile:
             key = int(channel)
             if not key in self.result_dict:
                 uid = self.project.create_empty_item(self.name)
-                self.result_dict[key] = self.project.get_item_by_uid(uid)
+                self.result_dict[key] = self.project.get_item_by_uid(
+                    uid,
+                    _copy=True,
+                )
             if (
                 self.notes
                 and
@@ -2,6 +2,7 @@ from . import _shared
 from .atm_sequence import DawAtmRegion
 from .audio_item import DawAudioItem
 from .item import item
+from .item_repository import ItemRepository
 from .seq_item import sequencer_item
 from .sequencer import sequencer
 from sglib import constants
@@ -48,17 +49,24 @@ file_takes = os.path.join(folder_daw, "takes.txt")
 file_pytracks = os.path.join(folder_daw, "tracks.txt")
 file_pyinput = os.path.join(folder_daw, "input.txt")
 file_notes = os.path.join(folder_daw, "notes.txt")
+file_undo_journal = os.path.join(folder_daw, history.JOURNAL_FILE_NAME)
 
 class DawProject(AbstractProject):
     def __init__(self, a_with_audio):
         self.undo_context = 0
         self.TRACK_COUNT = _shared.TRACK_COUNT_ALL
         self.last_item_number = 1
-        self.clear_history()
+        self.history = history.ProjectHistory(
+            util.get_file_setting(
+                'undo-memory-mb',
+                int,
+                history.HISTORY_MAX_BYTES // (1024 * 1024),
+            ) * 1024 * 1024,
+        )
         self.suppress_updates = False
         self._items_dict_cache = None
         self._sequence_cache = {}
-        self._item_cache = {}
+        self._item_cache = ItemRepository(self.get_item_string)
 
     def quirks(self):
         """ Make modifications to the project folder format as needed, to
@@ -92,52 +100,62 @@ class DawProject(AbstractProject):
             self, a_folder, a_file, a_text, a_force_new)
         if f_result:
             f_existed, f_old = f_result
-            f_history_file = history.history_file(
-                a_folder, a_file, a_text, f_old, f_existed)
-            self.history_files.append(f_history_file)
+            self.history.add_file(a_folder, a_file, a_text, f_old, f_existed)
+            self._invalidate_file(a_folder, a_file)
+
+    def _invalidate_file(self, a_folder, a_file):
+        """ Forget the cached objects that were parsed from a project file
+        """
+        f_path = os.path.normpath(os.path.join(str(a_folder), str(a_file)))
+        f_folder, f_name = os.path.split(f_path)
+        if f_folder == os.path.normpath(folder_items):
+            self._item_cache.pop(int(f_name))
+        elif f_folder == os.path.normpath(FOLDER_SONGS):
+            # Cached by str or int uid
+            self._sequence_cache.pop(f_name, None)
+            self._sequence_cache.pop(int(f_name), None)
+        elif f_path == os.path.normpath(file_pyitems):
+            self._items_dict_cache = None
 
     def set_undo_context(self, a_context):
         self.undo_context = a_context
+        self.history.set_context(a_context)
 
     def clear_undo_context(self, a_context):
-        self.history_commits[a_context] = []
+        self.history.clear_context(a_context)
 
     def commit(self, a_message, a_discard=False):
         """ Commit the project history """
-        if self.undo_context not in self.history_commits:
-            self.history_commits[self.undo_context] = []
-        if self.history_undo_cursor > 0:
-            self.history_commits[self.undo_context] = self.history_commits[
-                self.undo_context][:self.history_undo_cursor]
-            self.history_undo_cursor = 0
-        if self.history_files and not a_discard:
-            f_commit = history.history_commit(
-                self.history_files, a_message)
-            self.history_commits[self.undo_context].append(f_commit)
-        self.history_files = []
+        self.history.commit(a_message, a_discard)
 
     def clear_history(self):
-        self.history_undo_cursor = 0
-        self.history_files = []
-        self.history_commits = {}
+        self.history.clear()
+
+    def open_history_journal(self, a_reset=False):
+        """ Journal the undo history to the project folder, so that it can
+            be restored when the project is opened again.  Disabled by
+            setting undo-journal to 0
+        """
+        self.history.close_journal()
+        if not util.get_file_setting('undo-journal', int, 1):
+            return
+        f_path = os.path.join(self.project_folder, file_undo_journal)
+        if a_reset and os.path.exists(f_path):
+            os.remove(f_path)
+        self.history.open_journal(f_path, self.project_folder)
 
     def undo(self):
-        if self.undo_context not in self.history_commits or \
-        self.history_undo_cursor >= len(
-        self.history_commits[self.undo_context]):
-            return False
-        self.history_undo_cursor += 1
-        self.history_commits[self.undo_context][
-            -1 * self.history_undo_cursor].undo(self.project_folder)
-        return True
+        return self._undo_redo(self.history.undo)
 
     def redo(self):
-        if self.undo_context not in self.history_commits or \
-        self.history_undo_cursor == 0:
+        return self._undo_redo(self.history.redo)
+
+    def _undo_redo(self, a_func):
+        f_commit = a_func(self.project_folder)
+        if f_commit is None:
             return False
-        self.history_commits[self.undo_context][
-            -1 * self.history_undo_cursor].redo(self.project_folder)
-        self.history_undo_cursor -= 1
+        for f_file in f_commit.files:
+            self._invalidate_file(f_file.folder, f_file.file_name)
         return True
 
     def get_files_dict(self, a_folder, a_ext=None):
@@ -219,12 +237,15 @@ class DawProject(AbstractProject):
             LOG.info("project file {} does not exist, creating as "
                 "new project".format(a_project_file))
             self.new_project(a_project_file)
+        else:
+            self.open_history_journal()
 
         if a_notify_osc:
             constants.DAW_IPC.open_song(self.project_folder)
 
     def new_project(self, a_project_file, a_notify_osc=True):
         self.set_project_folders(a_project_file)
+        self.open_history_journal(a_reset=True)
 
         j = marshal_json(Playlist.new())
         j = json.dumps(j, indent=2, sort_keys=True)
@@ -355,8 +376,8 @@ class DawProject(AbstractProject):
             return name_uid_dict()
 
     def save_items_dict(self, a_uid_dict):
-        self._items_dict_cache = a_uid_dict
         self.save_file("", file_pyitems, str(a_uid_dict))
+        self._items_dict_cache = a_uid_dict
 
     def create_sequence(self, name):
         """ Create a new sequence with the next available uid
@@ -497,7 +518,7 @@ class DawProject(AbstractProject):
         """ Generator function to open, modify and save all items
         """
         for name in self.get_item_list():
-            item = self.get_item_by_name(name)
+            item = self.get_item_by_name(name, _copy=True)
             yield item
             self.save_item_by_uid(item.uid, item)
 
@@ -548,16 +569,12 @@ class DawProject(AbstractProject):
             return ""
 
     def get_item_by_uid(self, a_item_uid, _copy=False):
+        """ @_copy: Return a copy that the caller may modify.  Otherwise the
+                    item is shared with every other caller, and must not be
+                    modified
+        """
         a_item_uid = int(a_item_uid)
-        if a_item_uid in self._item_cache:
-            _item = self._item_cache[a_item_uid]
-            if _copy:
-                _item = copy.deepcopy(_item)
-        else:
-            _item = item.from_str(
-                self.get_item_string(a_item_uid),
-                a_item_uid,
-            )
+        _item = self._item_cache.get_item(a_item_uid, _copy)
         assert _item.uid == a_item_uid, (
             "UIDs do not match",
             _item.uid,
@@ -602,7 +619,7 @@ class DawProject(AbstractProject):
                 *(str(x) for x in (self.track_pool_folder, k))
             )
             if os.path.exists(f_path):
-                os.remove(f_path)
+                delete_file(f_path)
         for k, v in f_track_plugins.items():
             if v:
                 self.save_track_plugins(a_dict[k], v)
@@ -675,7 +692,6 @@ class DawProject(AbstractProject):
         a_uid = int(a_uid)
         a_item = copy.deepcopy(a_item)
         a_item.uid = a_uid
-        self._item_cache[a_uid] = a_item
         if not self.suppress_updates:
             self.save_file(
                 folder_items,
@@ -684,6 +700,7 @@ class DawProject(AbstractProject):
                 a_new_item,
             )
             constants.DAW_IPC.save_item(a_uid)
+        self._item_cache.put_item(a_uid, a_item)
 
     def save_sequence(
         self,
@@ -696,12 +713,12 @@ class DawProject(AbstractProject):
         a_sequence.fix_overlaps()
         if uid is None:
             uid = str(constants.DAW_CURRENT_SEQUENCE_UID)
-        self._sequence_cache[uid] = a_sequence
         self.save_file(
             FOLDER_SONGS,
             uid,
             str(a_sequence),
         )
+        self._sequence_cache[uid] = a_sequence
         if a_notify:
             constants.DAW_IPC.save_sequence(uid)
         self.check_output()
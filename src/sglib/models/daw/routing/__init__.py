@@ -1,3 +1,4 @@
+from .analysis import RoutingAnalysis
 from .graph import RoutingGraph
 from .midi import MIDIRoute, MIDIRoutes
 from .track import TrackSend
@@ -0,0 +1,265 @@
+""" Estimate how well the routing of a project scales across CPU cores.
+
+    Each worker thread of the engine takes the next track that is not
+    being processed, in the order of RoutingGraph.sort_all_paths, and a
+    bus waits until all of the tracks that send to it are processed.  The
+    number of tracks on the longest path to the main track, the critical
+    path, limits the speedup regardless of the number of worker threads.
+
+    Run it on a project folder:
+
+        python -m sglib.models.daw.routing.analysis PROJECT [-t 4 -t 8]
+"""
+
+from argparse import ArgumentParser
+import heapq
+import os
+
+__all__ = [
+    'MAX_WORKER_THREADS',
+    'RoutingAnalysis',
+]
+
+# The most worker threads that the engine will spawn
+MAX_WORKER_THREADS = 16
+
+
+class RoutingAnalysis:
+    """ The parallelism of a RoutingGraph.  Every track that sends to the
+        main track is assumed to take the same time to process, the real
+        speedup also depends on how heavy the tracks on the critical path
+        are
+    """
+    def __init__(self, a_graph):
+        """ @a_graph: RoutingGraph """
+        f_levels = a_graph.levels()
+        # {track_num: level} of the tracks that send to the main track
+        self.levels = {k: v for k, v in f_levels.items() if v}
+        # The tracks that do not send to the main track
+        self.unrouted = sorted(
+            k for k, v in f_levels.items()
+            if not v and k in a_graph.graph
+        )
+        self.critical_path_length = max(self.levels.values(), default=0)
+        # The number of tracks of each level, the first level is processed
+        # first, the last level is the main track
+        self.widths = [0] * self.critical_path_length
+        for f_level in self.levels.values():
+            self.widths[self.critical_path_length - f_level] += 1
+
+        # Tracks in the order that they are processed, a track is always
+        # before the tracks that it sends to
+        f_order = sorted(self.levels, key=lambda x: (-self.levels[x], x))
+        f_sends = {
+            k: [
+                x for x in sorted(a_graph.graph.get(k, {}).values())
+                if x.output in self.levels
+            ]
+            for k in f_order
+        }
+        # The order that the worker threads take the tracks in, the main
+        # track is not in the graph if it has no sends, it is processed
+        # last
+        self._schedule_order = [
+            x for x in a_graph.sort_all_paths() if x in self.levels
+        ]
+        self._schedule_order.extend(
+            x for x in f_order if x not in a_graph.graph
+        )
+        # {track_num: [the tracks that send to it]}
+        self._inputs = {x: [] for x in f_order}
+        for f_track_num in f_order:
+            for f_send in f_sends[f_track_num]:
+                self._inputs[f_send.output].append(f_track_num)
+        # The number of tracks on the longest path that ends at each track
+        f_depths = {x: 1 for x in f_order}
+        for f_track_num in f_order:
+            for f_send in f_sends[f_track_num]:
+                f_depths[f_send.output] = max(
+                    f_depths[f_send.output],
+                    f_depths[f_track_num] + 1,
+                )
+
+        def _is_critical(a_send):
+            return (
+                self.levels[a_send.track_num]
+                ==
+                self.levels[a_send.output] + 1
+                and
+                f_depths[a_send.output]
+                ==
+                f_depths[a_send.track_num] + 1
+                and
+                f_depths[a_send.track_num] + self.levels[a_send.track_num]
+                ==
+                self.critical_path_length + 1
+            )
+
+        # The sends on a critical path, except the sends to the main track.
+        # Removing them, or routing the track to the main track instead,
+        # is what would shorten the critical path
+        self.serializing_sends = [
+            x for f_track_num in f_order
+            for x in f_sends[f_track_num]
+            if x.output != 0 and _is_critical(x)
+        ]
+        # One critical path, from the first track processed to the main
+        # track
+        self.critical_path = []
+        f_track_num = next(
+            (
+                x for x in f_order
+                if self.levels[x] == self.critical_path_length
+            ),
+            None,
+        )
+        while f_track_num is not None:
+            self.critical_path.append(f_track_num)
+            f_track_num = next(
+                (
+                    x.output for x in f_sends[f_track_num]
+                    if _is_critical(x)
+                ),
+                None,
+            )
+
+    @property
+    def track_count(self):
+        return len(self.levels)
+
+    def speedup(self, a_threads):
+        """ Return the estimated speedup with a_threads worker threads,
+            compared to 1 thread.  The first thread that is free takes the
+            next track, and waits until the tracks that send to it are
+            processed, like the engine's worker threads
+        """
+        # The times that each thread is free again
+        f_free = [0] * a_threads
+        # {track_num: The time that it is processed}
+        f_done = {}
+        for f_track_num in self._schedule_order:
+            f_start = max(
+                [heapq.heappop(f_free)]
+                +
+                [f_done[x] for x in self._inputs[f_track_num]]
+            )
+            f_done[f_track_num] = f_start + 1
+            heapq.heappush(f_free, f_start + 1)
+        f_time = max(f_done.values(), default=0)
+        return self.track_count / f_time if f_time else 1.
+
+    def max_speedup(self):
+        """ Return the speedup with unlimited worker threads """
+        if not self.critical_path_length:
+            return 1.
+        return self.track_count / self.critical_path_length
+
+    def report(
+        self,
+        a_track_names=None,
+        a_threads=(1, 2, 4, 8, MAX_WORKER_THREADS),
+    ):
+        """ Return the analysis as text
+
+            @a_track_names:  {track_num: name} or a list of names by
+                             track number, the track numbers are shown if
+                             None
+            @a_threads:      The numbers of worker threads to estimate the
+                             speedup of
+        """
+        def _name(a_track_num):
+            if a_track_names is None:
+                return str(a_track_num)
+            return a_track_names[a_track_num]
+
+        f_result = [
+            f"Tracks routed to Main: {self.track_count}",
+            f"Critical path: {self.critical_path_length} tracks",
+        ]
+        if self.critical_path:
+            f_result.append(
+                "    " + " -> ".join(_name(x) for x in self.critical_path)
+            )
+        f_result.append(
+            "Width of each level, from the first processed to Main:"
+        )
+        f_result.extend(
+            f"    {i}: {x}" for i, x in enumerate(self.widths, 1)
+        )
+        f_result.append("Estimated speedup:")
+        f_result.extend(
+            f"    {x:>2} threads: {self.speedup(x):.2f}x"
+            for x in a_threads
+        )
+        f_result.append(
+            f"    unlimited: {self.max_speedup():.2f}x"
+        )
+        if self.serializing_sends:
+            f_result.append("Sends that serialize the graph:")
+            f_result.extend(
+                f"    {_name(x.track_num)} -> {_name(x.output)}"
+                for x in self.serializing_sends
+            )
+        if self.unrouted:
+            f_result.append(
+                "Not routed to Main: "
+                + ", ".join(_name(x) for x in self.unrouted)
+            )
+        return "\n".join(f_result)
+
+
+def main():
+    from sglib.lib.util import read_file_text
+    from sglib.models.clinttools.tracks import tracks
+    from sglib.models.daw.project import file_pytracks, file_routing_graph
+    from sglib.models.daw.routing import RoutingGraph
+    parser = ArgumentParser(
+        description=(
+            "Estimate how well the routing of a project scales across "
+            "CPU cores"
+        ),
+    )
+    parser.add_argument(
+        'project',
+        help=(
+            "The project folder, or the clinttools.project file in it"
+        ),
+    )
+    parser.add_argument(
+        "--threads",
+        "-t",
+        action='append',
+        dest="threads",
+        help=(
+            "The number of worker threads to estimate the speedup of, "
+            "can be repeated.  Default: 1, 2, 4, 8 and "
+            f"{MAX_WORKER_THREADS}"
+        ),
+        type=int,
+    )
+    args = parser.parse_args()
+    f_folder = args.project
+    if os.path.isfile(f_folder):
+        f_folder = os.path.dirname(f_folder)
+    f_routing_path = os.path.join(f_folder, file_routing_graph)
+    if not os.path.isfile(f_routing_path):
+        parser.error(f"{f_routing_path} does not exist")
+    f_graph = RoutingGraph.from_str(read_file_text(f_routing_path))
+    f_tracks_path = os.path.join(f_folder, file_pytracks)
+    f_names = None
+    if os.path.isfile(f_tracks_path):
+        f_tracks = tracks.from_str(read_file_text(f_tracks_path)).tracks
+        f_names = {k: v.name for k, v in f_tracks.items()}
+        if any(x not in f_names for x in f_graph.levels()):
+            f_names = None
+    if args.threads and min(args.threads) < 1:
+        parser.error("--threads must be at least 1")
+    print(
+        RoutingAnalysis(f_graph).report(
+            f_names,
+            args.threads or (1, 2, 4, 8, MAX_WORKER_THREADS),
+        )
+    )
+
+if __name__ == "__main__":
+    main()
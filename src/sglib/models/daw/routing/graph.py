@@ -1,4 +1,5 @@
 from .track import TrackSend
+import collections
 try:
     from sg_py_vendor.pymarshal import pm_assert
 except ImportError:
@@ -7,6 +8,15 @@ except ImportError:
 MAX_TRACK_SENDS = 16
 
 class RoutingGraph:
+    """ The sends between tracks.  The graph must not have cycles, a cycle
+        would be a feedback loop.
+
+        The adjacency of the tracks and the level of each track, the
+        number of tracks on the longest path from it to the main track,
+        are cached.  They are updated in place when toggle or set_node
+        changes a single track.  Do not change self.graph directly,
+        or call set_node afterwards
+    """
     def __init__(self, graph=None):
         """
             @graph:
@@ -15,6 +25,131 @@ class RoutingGraph:
                 There may not be more than MAX_TRACK_SENDS track sends.
         """
         self.graph = graph if graph is not None else {}
+        self._invalidate()
+
+    def _invalidate(self):
+        # {track_num: Counter({output: number of sends})}, None if not
+        # built yet
+        self._outputs = None
+        # {track_num: Counter({input: number of sends})}
+        self._inputs = None
+        # {track_num: level}, None if not built yet
+        self._levels = None
+        # False if the graph had a cycle the last time that the levels
+        # were built, the levels are then not updated in place
+        self._acyclic = True
+
+    def _adjacency(self):
+        if self._outputs is None:
+            self._outputs = collections.defaultdict(collections.Counter)
+            self._inputs = collections.defaultdict(collections.Counter)
+            for k, f_sends in self.graph.items():
+                for f_send in f_sends.values():
+                    self._add_edge(k, f_send.output)
+        return self._outputs
+
+    def _add_edge(self, a_src, a_dest):
+        self._outputs[a_src][a_dest] += 1
+        self._inputs[a_dest][a_src] += 1
+
+    def _remove_edge(self, a_src, a_dest):
+        for f_dict, k, v in (
+            (self._outputs, a_src, a_dest),
+            (self._inputs, a_dest, a_src),
+        ):
+            f_dict[k][v] -= 1
+            if not f_dict[k][v]:
+                del f_dict[k][v]
+
+    def _level(self, a_track_num):
+        """ Calculate the level of a track from the levels of its outputs,
+            the paths end at the main track
+        """
+        if a_track_num == 0:
+            return 1
+        f_levels = [
+            1 if x == 0 else self._levels.get(x, 0)
+            for x in self._outputs.get(a_track_num, ())
+        ]
+        f_max = max(f_levels, default=0)
+        return f_max + 1 if f_max else 0
+
+    def levels(self):
+        """ Return {track_num: level}, the number of tracks on the longest
+            path from each track to the main track, including both, or 0
+            if the track does not send to the main track.  Tracks on a
+            cycle are level 0
+        """
+        if self._levels is None:
+            f_outputs = self._adjacency()
+            # Topological sort from the main track and the tracks without
+            # outputs, to the tracks that send to them
+            f_remaining = {
+                k: len(v) for k, v in f_outputs.items() if k != 0
+            }
+            f_queue = collections.deque(
+                x for x in set(self.graph).union(f_outputs, self._inputs)
+                if not f_remaining.get(x)
+            )
+            self._levels = {}
+            while f_queue:
+                f_track_num = f_queue.popleft()
+                self._levels[f_track_num] = self._level(f_track_num)
+                for f_input in self._inputs.get(f_track_num, ()):
+                    if f_input == 0:
+                        continue
+                    f_remaining[f_input] -= 1
+                    if not f_remaining[f_input]:
+                        f_queue.append(f_input)
+            self._acyclic = not any(f_remaining.values())
+            for k in f_remaining:
+                self._levels.setdefault(k, 0)
+        return self._levels
+
+    def _update_levels(self, a_track_num):
+        """ Update the levels after the outputs of a track changed """
+        if self._levels is None:
+            return
+        if not self._acyclic:
+            self._levels = None
+            return
+        f_queue = collections.deque([a_track_num])
+        while f_queue:
+            f_track_num = f_queue.popleft()
+            f_level = self._level(f_track_num)
+            if self._levels.get(f_track_num, 0) != f_level:
+                self._levels[f_track_num] = f_level
+                f_queue.extend(
+                    x for x in self._inputs.get(f_track_num, ())
+                    if x != 0
+                )
+
+    def _set_outputs(self, a_track_num, a_old, a_new):
+        """ Update the cached adjacency and levels after the sends of a
+            track changed
+
+            @a_old:  The sends that were removed
+            @a_new:  The sends that were added
+        """
+        if self._outputs is None:
+            return
+        for f_send in a_old:
+            self._remove_edge(a_track_num, f_send.output)
+        # set_node is not checked for feedback like toggle, the levels
+        # cannot be updated in place around a cycle
+        f_cycle = self._levels is not None and any(
+            self.reaches(x.output, a_track_num) for x in a_new
+        )
+        for f_send in a_new:
+            self._add_edge(a_track_num, f_send.output)
+        if f_cycle:
+            self._acyclic = False
+            self._levels = None
+        if self._levels is not None:
+            for f_track_num in [a_track_num] + [x.output for x in a_new]:
+                if f_track_num not in self._levels:
+                    self._levels[f_track_num] = self._level(f_track_num)
+        self._update_levels(a_track_num)
 
     def reorder(self, a_dict):
         """
@@ -29,30 +164,40 @@ class RoutingGraph:
             for v in f_dict.values():
                 v.track_num = k
                 v.output = a_dict[v.output]
+        self._invalidate()
 
     def set_node(self, a_index, a_dict):
         """
             a_index: int, the index to set
             a_dict:  {0: TrackSend(...), ...}
         """
-        self.graph[int(a_index)] = a_dict
-
-    def find_all_paths(self, start, end=0, path=[]):
-        path = path + [start]
-        if start == end:
-            return [path]
-        if not start in self.graph:
-            return []
-        paths = []
-        for node in (x.output for x in sorted(self.graph[start].values())):
-            if node not in path:
-                newpaths = self.find_all_paths(node, end, path)
-                for newpath in newpaths:
-                    paths.append(newpath)
-        return paths
+        a_index = int(a_index)
+        f_old = list(self.graph.get(a_index, {}).values())
+        self.graph[a_index] = a_dict
+        self._set_outputs(a_index, f_old, list(a_dict.values()))
+
+    def reaches(self, a_src, a_dest):
+        """ Return True if there is a path of sends from track a_src to
+            track a_dest, or they are the same track
+        """
+        f_outputs = self._adjacency()
+        f_visited = {a_src}
+        f_stack = [a_src]
+        while f_stack:
+            f_track_num = f_stack.pop()
+            if f_track_num == a_dest:
+                return True
+            for f_output in f_outputs.get(f_track_num, ()):
+                if f_output not in f_visited:
+                    f_visited.add(f_output)
+                    f_stack.append(f_output)
+        return False
 
     def check_for_feedback(self, a_new, a_old):
-        return self.find_all_paths(a_old, a_new)
+        """ Return True if a send from a_new to a_old would create a
+            feedback loop
+        """
+        return self.reaches(a_old, a_new)
 
     def toggle(
         self,
@@ -75,9 +220,11 @@ class RoutingGraph:
             ]
         )
         if f_connected:
+            f_removed = []
             for k, v in self.graph[a_src].copy().items():
                 if v.output == a_dest and v.conn_type == conn_type:
-                    self.graph[a_src].pop(k)
+                    f_removed.append(self.graph[a_src].pop(k))
+            self._set_outputs(a_src, f_removed, [])
         else:
             if self.check_for_feedback(a_src, a_dest):
                 return "Can't make connection, it would create a feedback loop"
@@ -93,7 +240,7 @@ class RoutingGraph:
                         break
             f_result = TrackSend(a_src, f_i, a_dest, conn_type)
             self.graph[a_src][f_i] = f_result
-            self.set_node(a_src, self.graph[a_src])
+            self._set_outputs(a_src, [], [f_result])
         return None
 
     def set_default_output(
@@ -121,16 +268,13 @@ class RoutingGraph:
             return False
 
     def sort_all_paths(self):
-        f_result = {}
-        for f_path in self.graph:
-            f_paths = self.find_all_paths(f_path, 0)
-            if f_paths:
-                f_result[f_path] = max(len(x) for x in f_paths)
-            else:
-                f_result[f_path] = 0
+        """ Return the track numbers of self.graph, sorted by level, the
+            tracks furthest from the main track first
+        """
+        f_levels = self.levels()
         return sorted(
-            f_result,
-            key=lambda x: f_result[x],
+            self.graph,
+            key=lambda x: f_levels.get(x, 0),
             reverse=True,
         )
 
@@ -1,4 +1,8 @@
 
+# The attributes that the index of the sequencer sorts the items by
+_INDEXED_ATTRS = frozenset(('track_num', 'start_beat', 'length_beats'))
+
+
 class sequencer_item:
     __slots__ = [
         'track_num',
@@ -8,6 +12,8 @@ class sequencer_item:
         'start_offset',
         'modified',
         'uid',
+        # The index of the sequencer that the item is in, or None
+        '_index',
     ]
     def __init__(
         self,
@@ -18,6 +24,7 @@ class sequencer_item:
         a_start_pos=0.0,
         modified=True,
     ):
+        self._index = None
         self.track_num = int(a_track_num)
         self.start_beat = float(a_start_beat)
         self.length_beats = float(a_length_beats)
@@ -26,6 +33,24 @@ class sequencer_item:
         #self.sample_start = float(a_start_pos)
         self.modified = modified
 
+    def __setattr__(self, a_name, a_value):
+        if a_name in _INDEXED_ATTRS:
+            f_index = getattr(self, '_index', None)
+            if f_index is not None:
+                f_index.moved(self, a_name, a_value)
+        object.__setattr__(self, a_name, a_value)
+
+    def __getstate__(self):
+        # A copy is not in the index of the sequencer
+        return (
+            None,
+            {
+                x: getattr(self, x)
+                for x in self.__slots__
+                if x != '_index' and hasattr(self, x)
+            },
+        )
+
     def clone(self):
         f_self = str(self).split("|")
         return sequencer_item(*f_self)
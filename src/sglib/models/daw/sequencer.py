@@ -1,28 +1,239 @@
 from . import _shared
 from .sequence_marker import loop_marker
 from .seq_item import sequencer_item
+from .tempo_map import TempoMap
 from .tempo_marker import tempo_marker
 from sglib.models.clinttools import *
 from sglib.lib.util import *
 from sglib.lib.translate import _
 
+import bisect
+
+
+def _item_key(a_item):
+    # Sorts like sequencer_item.__lt__ within a track
+    return (a_item.start_beat, a_item.modified)
+
+class _ItemIndex:
+    """ The items of a sequencer by track, sorted by start beat, to find
+        the items in a range of beats without comparing every item.
+
+        An item notifies the index when its track, start or length is
+        changed, and the tracks that it was and is on are sorted again
+        before the next query.  An item can be in one index at a time
+    """
+    def __init__(self, a_items=()):
+        # track_num: [start_beat, ...]
+        self._starts = {}
+        # track_num: [sequencer_item, ...], in the order of self._starts
+        self._items = {}
+        # track_num: The longest item length, or longer
+        self._lengths = {}
+        # The tracks to sort again
+        self._dirty = set()
+        for f_item in a_items:
+            f_item._index = self
+            self._items.setdefault(f_item.track_num, []).append(f_item)
+        self._dirty.update(self._items)
+
+    def __len__(self):
+        return sum(len(x) for x in self._items.values())
+
+    def moved(self, a_item, a_name, a_value):
+        """ Called by a_item before a_name is set to a_value """
+        self._dirty.add(a_item.track_num)
+        if a_name == 'track_num':
+            self._dirty.add(a_value)
+
+    def _sort(self):
+        if not self._dirty:
+            return
+        f_items = []
+        for f_track in self._dirty:
+            f_items.extend(self._items.pop(f_track, ()))
+            self._starts.pop(f_track, None)
+            self._lengths.pop(f_track, None)
+        self._dirty.clear()
+        f_tracks = {}
+        for f_item in f_items:
+            f_tracks.setdefault(f_item.track_num, []).append(f_item)
+        for f_track, f_list in f_tracks.items():
+            f_list.sort(key=_item_key)
+            self._items[f_track] = f_list
+            self._starts[f_track] = [x.start_beat for x in f_list]
+            self._lengths[f_track] = max(x.length_beats for x in f_list)
+
+    def add(self, a_item):
+        self._sort()
+        a_item._index = self
+        f_track = a_item.track_num
+        if f_track not in self._items:
+            self._starts[f_track] = [a_item.start_beat]
+            self._items[f_track] = [a_item]
+            self._lengths[f_track] = a_item.length_beats
+            return
+        f_starts = self._starts[f_track]
+        f_items = self._items[f_track]
+        f_index = bisect.bisect_right(f_starts, a_item.start_beat)
+        if not a_item.modified:
+            # Before the modified items that start at the same time
+            while (
+                f_index > 0
+                and
+                f_starts[f_index - 1] == a_item.start_beat
+                and
+                f_items[f_index - 1].modified
+            ):
+                f_index -= 1
+        f_starts.insert(f_index, a_item.start_beat)
+        f_items.insert(f_index, a_item)
+        if a_item.length_beats > self._lengths[f_track]:
+            self._lengths[f_track] = a_item.length_beats
+
+    def remove(self, a_item):
+        """ Remove a_item, not an item equal to it """
+        self._sort()
+        f_track = a_item.track_num
+        f_starts = self._starts[f_track]
+        f_items = self._items[f_track]
+        f_index = bisect.bisect_left(f_starts, a_item.start_beat)
+        while f_items[f_index] is not a_item:
+            f_index += 1
+        del f_starts[f_index]
+        del f_items[f_index]
+        if not f_items:
+            del self._starts[f_track]
+            del self._items[f_track]
+            del self._lengths[f_track]
+        a_item._index = None
+
+    def track_nums(self):
+        self._sort()
+        return sorted(self._items)
+
+    def items(self, a_track=None):
+        """ The items of a_track, or of every track, sorted by track and
+            start beat
+        """
+        self._sort()
+        if a_track is not None:
+            return self._items.get(a_track, [])[:]
+        return [
+            x
+            for f_track in sorted(self._items)
+            for x in self._items[f_track]
+        ]
+
+    def starting(self, a_track, a_start_beat, a_end_beat):
+        """ The items of a_track that start at or after a_start_beat and
+            before a_end_beat
+        """
+        self._sort()
+        if a_track not in self._items:
+            return []
+        f_starts = self._starts[a_track]
+        return self._items[a_track][
+            bisect.bisect_left(f_starts, a_start_beat):
+            bisect.bisect_left(f_starts, a_end_beat)
+        ]
+
+    def overlapping(self, a_track, a_start_beat, a_end_beat):
+        """ The items of a_track that start at or after a_start_beat and
+            before a_end_beat, or start before a_start_beat and end after it
+        """
+        self._sort()
+        if a_track not in self._items:
+            return []
+        return [
+            x for x in self.starting(
+                a_track,
+                a_start_beat - self._lengths[a_track] - 1e-6,
+                a_end_beat,
+            )
+            if (
+                x.start_beat >= a_start_beat
+                or
+                x.start_beat + x.length_beats > a_start_beat
+            )
+        ]
+
+    def equal(self, a_item):
+        """ The items equal to a_item, ie: with the same str() """
+        f_str = str(a_item)
+        # str() rounds the start beat
+        return [
+            x for x in self.starting(
+                a_item.track_num,
+                a_item.start_beat - 1e-5,
+                a_item.start_beat + 1e-5,
+            )
+            if str(x) == f_str
+        ]
 
 class sequencer:
     __slots__ = [
         'name',
-        'items',
+        '_index',
         'markers',
         'loop_marker',
+        '_tempo_map',
     ]
     def __init__(self, name=None):
         self.name = name
-        self.items = []
+        self._index = _ItemIndex()
         self.markers = {}
+        # TempoMap of the tempo markers, None until it is needed
+        self._tempo_map = None
         self.loop_marker = None
         self.set_marker(tempo_marker(0, 128.0, 4, 4))
 
+    def __getstate__(self):
+        # The items of a copy are in a new index of the copy
+        f_state = {
+            x: getattr(self, x)
+            for x in self.__slots__
+            if x != '_index' and hasattr(self, x)
+        }
+        f_state['items'] = self._index.items()
+        return f_state
+
+    def __setstate__(self, a_state):
+        a_state = dict(a_state)
+        f_items = a_state.pop('items')
+        for k, v in a_state.items():
+            setattr(self, k, v)
+        self.items = f_items
+
+    @property
+    def items(self):
+        """ A new list of the items, sorted by track and start beat """
+        return self._index.items()
+
+    @items.setter
+    def items(self, a_items):
+        self._index = _ItemIndex(a_items)
+
+    def get_items_in_range(self, a_start_beat, a_end_beat, a_tracks=None):
+        """ The items that start at or after a_start_beat and before
+            a_end_beat, or start before a_start_beat and end after it,
+            sorted by track and start beat
+
+            @a_tracks: The track numbers, or None for every track
+        """
+        return [
+            x
+            for f_track in self._index.track_nums()
+            if a_tracks is None or f_track in a_tracks
+            for x in self._index.overlapping(
+                f_track,
+                a_start_beat,
+                a_end_beat,
+            )
+        ]
+
     def set_marker(self, a_marker):
         self.markers[(a_marker.beat, a_marker.type)] = a_marker
+        self._tempo_map = None
 
     def delete_marker(self, a_marker):
         f_tuple = (a_marker.beat, a_marker.type)
@@ -30,6 +241,7 @@ class sequencer:
             return # don't delete the first tempo marker
         if f_tuple in self.markers:
             self.markers.pop(f_tuple)
+            self._tempo_map = None
 
     def has_marker(self, a_beat, a_type):
         f_tuple = tuple(int(x) for x in (a_beat, a_type))
@@ -55,37 +267,25 @@ class sequencer:
     def get_tempo_markers(self):
         return sorted(x for x in self.markers.values() if x.type == 2)
 
+    def get_tempo_map(self):
+        """ The TempoMap of the tempo markers, the markers must only be
+            changed by the methods of this class
+        """
+        if self._tempo_map is None:
+            self._tempo_map = TempoMap(self.get_tempo_markers())
+        return self._tempo_map
+
     def get_tempo_at_pos(self, a_beat):
-        f_tempo_markers = self.get_tempo_markers()
-        for f_t1, f_t2 in zip(f_tempo_markers, f_tempo_markers[1:]):
-            if a_beat < f_t2.beat and a_beat >= f_t1.beat:
-                return f_t1.real_tempo
-        return f_tempo_markers[-1].real_tempo
+        return self.get_tempo_map().tempo_at_beat(a_beat)
 
     def get_tsig_at_pos(self, a_beat):
-        f_tempo_markers = self.get_tempo_markers()
-        for f_t1, f_t2 in zip(f_tempo_markers, f_tempo_markers[1:]):
-            if a_beat < f_t2.beat and a_beat > f_t1.beat:
-                return f_t1.tsig_num
-        return f_tempo_markers[-1].tsig_num
+        return self.get_tempo_map().tsig_at_beat(a_beat)
 
     def get_seconds_at_beat(self, a_beat):
-        if not a_beat:
-            return 0.0
-        f_time = 0.0
-        f_found = False
-        f_tempo_markers = self.get_tempo_markers()
-        for f_t1, f_t2 in zip(f_tempo_markers, f_tempo_markers[1:]):
-            if a_beat < f_t2.beat and a_beat > f_t1.beat:
-                f_time += (a_beat - f_t1.beat) * (60.0 / f_t1.real_tempo)
-                f_found = True
-                break
-            else:
-                f_time += (f_t2.beat - f_t1.beat) * (60.0 / f_t1.real_tempo)
-        if not f_found:
-            f_t1 = f_tempo_markers[-1]
-            f_time += (a_beat - f_t1.beat) * (60.0 / f_t1.real_tempo)
-        return f_time
+        return self.get_tempo_map().seconds_at_beat(a_beat)
+
+    def get_beat_at_seconds(self, a_seconds):
+        return self.get_tempo_map().beat_at_seconds(a_seconds)
 
     def get_time_at_beat(self, a_beat):
         f_time = self.get_seconds_at_beat(a_beat)
@@ -100,7 +300,7 @@ class sequencer:
         return int(round((f_time1 - f_time2) * a_sr))
 
     def reorder(self, a_dict):
-        for f_item in self.items:
+        for f_item in self._index.items():
             f_item.track_num = a_dict[f_item.track_num]
 
     def add_item_ref_by_name(self, a_item_ref, a_item_name, a_uid_dict):
@@ -109,55 +309,79 @@ class sequencer:
 
     def add_item_ref_by_uid(self, a_item_ref):
         self.remove_item_ref(a_item_ref)
-        self.items.append(a_item_ref)
+        self._index.add(a_item_ref)
 
     def add_item(self, a_item):
-        self.items.append(a_item)
+        self._index.add(a_item)
 
     def remove_item_ref(self, a_item):
-        f_to_remove = str(a_item)
-        for f_item in self.items:
-            if str(f_item) == f_to_remove:
-                self.items.remove(f_item)
+        """ Remove every item equal to a_item """
+        for f_item in self._index.equal(a_item):
+            self._index.remove(f_item)
 
     def split(self, a_points, a_tracks=None, a_modify=True):
+        """ Split the items at each beat in a_points
+
+            Returns a list of the items that start at or after each point
+            and before the next point, and a list of the items after the
+            last point.  An item that continues after the next point is
+            split there, the part after it is a new item that is not
+            added to the sequencer
+
+            @a_points:  Sorted beats
+            @a_tracks:  The track numbers, or None for every track
+            @a_modify:  True to shorten the split items to the point, False
+                        to only add the new items to the result
+        """
         if a_points[0] != 0.0:
             a_points.insert(0, 0.0)
         assert sorted(a_points) == a_points
-        f_result = []
-        if not a_tracks:
-            f_items = self.items[:]
-        else:
-            f_items = [x for x in self.items if x.track_num in a_tracks]
-            if a_port is not None:
-                f_items = [x for x in f_items if x.port == a_port]
-        for f_p1, f_p2 in zip(a_points, a_points[1:]):
-            f_list = [x for x in f_items
-                if x.start_beat >= f_p1 and x.start_beat < f_p2]
-            f_result.append(f_list)
-            for f_item in f_list:
-                if f_item.length_beats + f_item.start_beat > f_p2:
+        f_result = [[] for _ in a_points]
+        for f_track in self._index.track_nums():
+            if a_tracks and f_track not in a_tracks:
+                continue
+            for f_item in self._index.starting(
+                f_track,
+                a_points[0],
+                float('inf'),
+            ):
+                f_i = bisect.bisect_right(a_points, f_item.start_beat) - 1
+                f_result[f_i].append(f_item)
+                while (
+                    f_i < len(a_points) - 1
+                    and
+                    f_item.length_beats + f_item.start_beat
+                    >
+                    a_points[f_i + 1]
+                ):
+                    f_p2 = a_points[f_i + 1]
                     f_new_item = f_item.clone()
-                    f_items.append(f_new_item)
                     f_diff = f_p2 - f_item.start_beat
+                    f_new_item.start_beat = f_p2
                     f_new_item.length_beats = f_item.length_beats - f_diff
                     f_new_item.start_offset += f_diff
                     if a_modify:
                         f_item.length_beats = f_diff
-        f_list = [x for x in f_items if x > a_points[-1]]
-        f_result.append(f_list)
+                    f_i += 1
+                    f_result[f_i].append(f_new_item)
+                    f_item = f_new_item
         return f_result
 
     def insert_space(self, a_start, a_length):
-        for f_item in (x for x in self.items if x.start_beat >= a_start):
-            f_item.start_beat += a_length
+        for f_track in self._index.track_nums():
+            for f_item in self._index.starting(
+                f_track,
+                a_start,
+                float('inf'),
+            ):
+                f_item.start_beat += a_length
 
     def set_first_beat(self, beat):
-        if not self.items:
+        if not len(self._index):
             return
-        _min = min(x.start_beat for x in self.items)
+        _min = min(x.start_beat for x in self._index.items())
         offset = int(beat - _min)
-        for item in self.items:
+        for item in self._index.items():
             item.start_beat += offset
         markers = {(0, 2): self.markers[(0, 2)]}
         for key in sorted(self.markers):
@@ -174,13 +398,18 @@ class sequencer:
             tpl = (marker.beat, marker.type)
             markers[tpl] = marker
         self.markers = markers
+        self._tempo_map = None
 
     def clear_range(self, a_track_list, a_start_beat, a_end_beat):
         LOG.debug(
             f'Clearing items from {a_start_beat} to {a_end_beat} '
             f'for {a_track_list}'
         )
-        for f_item in [x for x in self.items if x.track_num in a_track_list]:
+        for f_item in self.get_items_in_range(
+            a_start_beat,
+            a_end_beat,
+            a_track_list,
+        ):
             f_end_beat = f_item.start_beat + f_item.length_beats
             if (
                 f_item.start_beat >= a_start_beat
@@ -188,7 +417,7 @@ class sequencer:
                 f_item.start_beat < a_end_beat
             ):
                 if f_end_beat <= a_end_beat:
-                    self.items.remove(f_item)
+                    self._index.remove(f_item)
                 else:
                     f_diff = a_end_beat - f_item.start_beat
                     f_item.start_offset += f_diff
@@ -199,8 +428,9 @@ class sequencer:
                     f_item.length_beats = a_start_beat - f_item.start_beat
 
     def get_length(self):
+        f_items = self._index.items()
         f_item_max = max(x.start_beat + x.length_beats
-            for x in self.items) if self.items else 0
+            for x in f_items) if f_items else 0
         f_marker_max = max(
             x.beat for x in self.markers.values()) if self.markers else 0
         return max((f_item_max, f_marker_max)) + 64
@@ -208,8 +438,8 @@ class sequencer:
     def fix_overlaps(self):
         to_delete = set()
         to_delete_list = []
-        _item_set = set(self.items)
-        self.items = sorted(_item_set)
+        # The first of each group of equal items
+        self.items = dict.fromkeys(self.items)
 
         def to_delete_add(item, reason):
             to_delete.add(item)
@@ -220,15 +450,14 @@ class sequencer:
 
         # Delete items with length < 1/16th note
         for i in range(_shared.TRACK_COUNT_ALL):
+            # The items are unique, so the items in to_delete are the
+            # items that are too short
             items = [
-                x for x in self.items
-                if x.track_num == i
-                and
-                x not in to_delete
+                x for x in self._index.items(i)
+                if x.length_beats >= 0.25
             ]
             if items:
-                # sort is by start_beat then (not modified)
-                items.sort()
+                # sorted by start_beat then (not modified)
                 for item, _next in zip(items, items[1:]):
                     if item.start_beat == _next.start_beat:
                         to_delete_add(
@@ -247,7 +476,7 @@ class sequencer:
                         else:
                             item.length_beats = length_beats
         LOG.debug(
-            f'self.items count {len(self.items)} '
+            f'self.items count {len(self._index)} '
             f'to_delete count: {len(to_delete)}'
         )
         _to_delete = {str(x) for x in to_delete}
@@ -255,9 +484,10 @@ class sequencer:
         LOG.debug([str(x) for x in self.items])
         for item, reason in to_delete_list:
             LOG.debug(f"Removing {item} from sequencer: {reason} ")
-        self.items = [x for x in self.items if str(x) not in _to_delete]
+        for item in to_delete:
+            self.remove_item_ref(item)
         LOG.debug(
-            f'self.items count {len(self.items)} '
+            f'self.items count {len(self._index)} '
             f'to_delete count: {len(to_delete)}'
         )
 
@@ -275,9 +505,8 @@ class sequencer:
         for v in sorted(self.markers.values()):
             f_result.append(str(v))
         for f_i in range(_shared.TRACK_COUNT_ALL):
-            f_items = [x for x in self.items if x.track_num == f_i]
+            f_items = self._index.items(f_i)
             if f_items:
-                f_items.sort()
                 f_result.append("C|{}|{}".format(f_i, len(f_items)))
                 for f_item in f_items:
                     f_result.append(str(f_item))
@@ -316,7 +545,6 @@ class sequencer:
                 f_result.add_item(
                     sequencer_item(*f_item_arr, modified=False)
                 )
-        f_result.items.sort()
         return f_result
 
 
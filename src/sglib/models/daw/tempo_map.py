@@ -0,0 +1,87 @@
+import numpy
+
+__all__ = [
+    'TempoMap',
+]
+
+
+class TempoMap:
+    """ The tempo markers of a sequence as arrays, to convert between beats
+        and seconds with a binary search instead of walking every marker.
+
+        Each marker applies from its beat to the beat of the next marker,
+        the first marker also applies before its beat, and the last marker
+        applies after it.  The methods accept a beat or seconds value, or a
+        NumPy array of them
+    """
+    def __init__(self, a_markers):
+        """ @a_markers: tempo_marker, sorted by beat, at least one """
+        assert a_markers, "A sequence has at least one tempo marker"
+        self.beats = numpy.array(
+            [x.beat for x in a_markers],
+            dtype=numpy.float64,
+        )
+        self.tempos = numpy.array(
+            [x.real_tempo for x in a_markers],
+            dtype=numpy.float64,
+        )
+        self.tsig_nums = numpy.array(
+            [x.tsig_num for x in a_markers],
+            dtype=numpy.int64,
+        )
+        self._seconds_per_beat = 60.0 / self.tempos
+        # The seconds at the beat of each marker
+        self.seconds = numpy.zeros(len(a_markers), dtype=numpy.float64)
+        numpy.cumsum(
+            numpy.diff(self.beats) * self._seconds_per_beat[:-1],
+            out=self.seconds[1:],
+        )
+
+    def __len__(self):
+        return len(self.beats)
+
+    def _marker_at_beat(self, a_beat):
+        return numpy.maximum(
+            numpy.searchsorted(self.beats, a_beat, side='right') - 1,
+            0,
+        )
+
+    def _result(self, a_value, a_result):
+        if numpy.ndim(a_value):
+            return a_result
+        return a_result.item()
+
+    def tempo_at_beat(self, a_beat):
+        """ The real tempo in BPM at a_beat """
+        return self._result(
+            a_beat,
+            self.tempos[self._marker_at_beat(a_beat)],
+        )
+
+    def tsig_at_beat(self, a_beat):
+        """ The beats per bar at a_beat """
+        return self._result(
+            a_beat,
+            self.tsig_nums[self._marker_at_beat(a_beat)],
+        )
+
+    def seconds_at_beat(self, a_beat):
+        f_i = self._marker_at_beat(a_beat)
+        return self._result(
+            a_beat,
+            self.seconds[f_i]
+            +
+            (a_beat - self.beats[f_i]) * self._seconds_per_beat[f_i],
+        )
+
+    def beat_at_seconds(self, a_seconds):
+        f_i = numpy.maximum(
+            numpy.searchsorted(self.seconds, a_seconds, side='right') - 1,
+            0,
+        )
+        return self._result(
+            a_seconds,
+            self.beats[f_i]
+            +
+            (a_seconds - self.seconds[f_i]) / self._seconds_per_beat[f_i],
+        )
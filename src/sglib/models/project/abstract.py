@@ -4,6 +4,7 @@ Utility functions that are global to the entire application
 
 from sglib.lib import util
 from sglib.lib.engine import close_engine, reopen_engine
+from sglib.lib.save_queue import SAVE_QUEUE
 from sglib.models.track_plugin import track_plugins
 from sglib.models.daw.track_colors import TrackColors
 from sglib.lib.translate import _
@@ -38,7 +39,9 @@ class AbstractProject:
 
     def save_file(self, a_folder, a_file, a_text, a_force_new=False):
         """ Writes a file to disk and updates the project
-            history to reflect the changes
+            history to reflect the changes.  Changes to existing files
+            are written in the background by SAVE_QUEUE, new files are
+            written now, so that checking if a file exists still works
         """
         f_full_path = os.path.join(
             *(str(x) for x in (self.project_folder, a_folder, a_file)))
@@ -47,10 +50,11 @@ class AbstractProject:
             if f_old == a_text:
                 return None
             f_existed = 1
+            SAVE_QUEUE.write(f_full_path, a_text)
         else:
             f_old = ""
             f_existed = 0
-        util.write_file_text(f_full_path, a_text)
+            util.write_file_text(f_full_path, a_text)
         return f_existed, f_old
 
     def get_track_plugins(self, a_track_num):
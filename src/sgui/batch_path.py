@@ -0,0 +1,87 @@
+""" Build QPainterPaths from NumPy coordinate arrays in a single call.
+
+    Calling QPainterPath.lineTo() once per point from Python is slow for
+    waveforms, notes and automation with thousands of points.  Instead,
+    the elements are written into a contiguous buffer in the QDataStream
+    serialization format of QPainterPath and deserialized in one call.
+"""
+
+from sgui.sgqt import *
+import numpy
+
+__all__ = [
+    'path_from_arrays',
+    'rects_path',
+]
+
+# QPainterPath.ElementType
+MOVE_TO = 0
+LINE_TO = 1
+
+# The QDataStream layout of a QPainterPath:  The element count, then
+# (type, x, y) per element, then the start index of the current subpath
+# and the fill rule.  QDataStream is big-endian by default
+_ELEMENT_DTYPE = numpy.dtype([
+    ('type', '>i4'),
+    ('x', '>f8'),
+    ('y', '>f8'),
+])
+_HEADER_DTYPE = numpy.dtype('>i4')
+_FOOTER = numpy.zeros(2, dtype='>i4').tobytes()
+
+
+def path_from_arrays(a_x, a_y, a_move_to=None):
+    """ Create a QPainterPath from arrays of coordinates
+
+        @a_x:       Array of X coordinates
+        @a_y:       Array of Y coordinates, same length as @a_x
+        @a_move_to: Optional boolean array, True where a new subpath
+                    begins at that point instead of a line being drawn to
+                    it.  The first point always begins a subpath.
+        @return:    QPainterPath
+    """
+    f_count = len(a_x)
+    if not f_count:
+        return QPainterPath()
+    f_elements = numpy.empty(f_count, dtype=_ELEMENT_DTYPE)
+    f_elements['x'] = a_x
+    f_elements['y'] = a_y
+    if a_move_to is None:
+        f_elements['type'] = LINE_TO
+    else:
+        f_elements['type'] = numpy.where(a_move_to, MOVE_TO, LINE_TO)
+    f_elements['type'][0] = MOVE_TO
+    f_buffer = QtCore.QByteArray(
+        numpy.array([f_count], dtype=_HEADER_DTYPE).tobytes()
+        + f_elements.tobytes()
+        + _FOOTER
+    )
+    f_path = QPainterPath()
+    f_stream = QtCore.QDataStream(f_buffer)
+    f_stream >> f_path
+    return f_path
+
+def rects_path(a_x, a_y, a_width, a_height):
+    """ Create a QPainterPath of many rectangles, equivalent to calling
+        QPainterPath.addRect() for each one
+
+        @a_x, @a_y:  Arrays of the top left corner of each rectangle
+        @a_width:    Array or scalar width of the rectangles
+        @a_height:   Array or scalar height of the rectangles
+    """
+    f_count = len(a_x)
+    if not f_count:
+        return QPainterPath()
+    f_x = numpy.asarray(a_x, dtype=numpy.float64)
+    f_y = numpy.asarray(a_y, dtype=numpy.float64)
+    f_right = f_x + a_width
+    f_bottom = f_y + a_height
+    f_xs = numpy.stack((f_x, f_right, f_right, f_x, f_x), axis=1)
+    f_ys = numpy.stack((f_y, f_y, f_bottom, f_bottom, f_y), axis=1)
+    f_move_to = numpy.zeros((f_count, 5), dtype=bool)
+    f_move_to[:, 0] = True
+    return path_from_arrays(
+        f_xs.ravel(),
+        f_ys.ravel(),
+        f_move_to.ravel(),
+    )
@@ -46,6 +46,12 @@ from .transport import (
 )
 from sglib import constants
 from sglib.api.daw import api_project_notes
+from sglib.ipc.shm import (
+    SHM_PEAK,
+    SHM_POSITION,
+    SHM_SPECTRUM,
+    ShmRingReader,
+)
 from sgui import plugins
 from sgui import shared as glbl_shared
 from sgui.daw import strings as daw_strings
@@ -61,6 +67,7 @@ import os
 import random
 import shutil
 import subprocess
+import time
 import traceback
 
 
@@ -228,6 +235,16 @@ class MainWindow(QTabWidget):
         self.currentChanged.connect(self.tab_changed)
         shared.DAW = self
 
+        # Peak meters, the playback cursor and spectrum analyzers are
+        # written by the engine to shared memory instead of being sent to
+        # configure_callback
+        self.shm_reader = None
+        self.shm_retry_time = 0.
+        self.shm_timer = QtCore.QTimer(self)
+        self.shm_timer.setInterval(30)
+        self.shm_timer.timeout.connect(self.shm_callback)
+        self.shm_timer.start()
+
     def open_project(self):
         """ Open an existing project in the widgets """
         # TODO: SG DEPRECATED: Use new files/folders
@@ -641,7 +658,45 @@ class MainWindow(QTabWidget):
                     plugin =  glbl_shared.PLUGIN_UI_DICT[f_plugin_uid]
                     plugin.set_cc_val(f_cc, f_val)
 
+    def shm_callback(self):
+        if not constants.IPC_ENABLED or not constants.PROJECT:
+            return
+        f_folder = constants.PROJECT.audio_tmp_folder
+        if (
+            self.shm_reader is not None
+            and
+            os.path.dirname(self.shm_reader.path) != f_folder
+        ):
+            self.shm_reader.close()
+            self.shm_reader = None
+        if self.shm_reader is None:
+            # The engine creates the file after opening the project, or
+            # not at all if shared memory is not available
+            f_now = time.time()
+            if f_now < self.shm_retry_time:
+                return
+            self.shm_retry_time = f_now + 1.
+            self.shm_reader = ShmRingReader.open(f_folder)
+            if self.shm_reader is None:
+                return
+        for (f_type, f_id), f_values in self.shm_reader.latest().items():
+            if f_type == SHM_PEAK:
+                global_update_peak_meters_array(f_values.reshape(-1, 3))
+            elif f_type == SHM_POSITION:
+                if glbl_shared.IS_PLAYING:
+                    global_set_playback_pos(float(f_values[0]))
+            elif f_type == SHM_SPECTRUM:
+                if f_id in glbl_shared.PLUGIN_UI_DICT:
+                    glbl_shared.PLUGIN_UI_DICT[f_id].ui_message(
+                        "spectrum",
+                        f_values,
+                    )
+
     def prepare_to_quit(self):
+        self.shm_timer.stop()
+        if self.shm_reader is not None:
+            self.shm_reader.close()
+            self.shm_reader = None
         try:
             for f_widget in (
                 shared.AUDIO_SEQ,
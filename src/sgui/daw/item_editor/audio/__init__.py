@@ -447,8 +447,10 @@ class AudioItemSeq(AbstractItemEditor):
 
         f_items = shared.CURRENT_ITEM
 
-        for f_file_name in a_item_list:
-            f_file_name_str = str(f_file_name)
+        f_file_names = [str(x) for x in a_item_list if str(x)]
+        f_uids = constants.PROJECT.import_audio_files(f_file_names)
+
+        for f_file_name_str, f_uid in zip(f_file_names, f_uids):
             if not f_file_name_str is None and not f_file_name_str == "":
                 f_index = f_items.get_next_index()
                 if f_index == -1:
@@ -457,9 +459,6 @@ class AudioItemSeq(AbstractItemEditor):
                     "max per sequence is {}").format(MAX_AUDIO_ITEM_COUNT))
                     break
                 else:
-                    f_uid = constants.PROJECT.get_wav_uid_by_name(
-                        f_file_name_str,
-                    )
                     f_item = DawAudioItem(
                         f_uid,
                         a_start_bar=0,
@@ -477,6 +476,7 @@ class AudioItemSeq(AbstractItemEditor):
         constants.DAW_PROJECT.commit(
             _("Added audio items to item {}").format(shared.CURRENT_ITEM.uid))
         global_open_audio_items()
+        shared.poll_sample_graphs()
         self.last_open_dir = os.path.dirname(f_file_name_str)
 
     def reset_selection(self):
@@ -1,5 +1,10 @@
 from sglib import constants
 from sglib.math import clip_value
+from sglib.lib.cache import (
+    LRUCache,
+    cache_budget,
+    invalidate_audio_pool_uid,
+)
 from sglib.lib.util import pi_path, ITEM_SNAP_DIVISORS
 from sglib.log import LOG
 from sgui import shared as glbl_shared
@@ -20,7 +25,13 @@ AUDIO_ITEM_HEIGHT = 75.0
 AUDIO_ITEM_MAX_LANE = 23
 AUDIO_ITEM_LANE_COUNT = 24
 
-PAINTER_PATH_CACHE = {}
+# audio pool uid: [QPainterPath, ...]
+PAINTER_PATH_CACHE = LRUCache(
+    'audio-item-painter-path',
+    cache_budget('audio-item-painter-path', 128),
+    # x, y and the element type of each QPainterPath element
+    lambda x: sum(y.elementCount() * 24 for y in x),
+)
 
 CURRENT_AUDIO_ITEM_INDEX = None
 # The currently selected audio item
@@ -44,7 +55,7 @@ def remove_path_from_painter_path_cache(path):
 def remove_uid_from_painter_path_cache(uid):
     if uid in PAINTER_PATH_CACHE:
         LOG.info(f'Removing {uid} from audio item painter path cache')
-        PAINTER_PATH_CACHE.pop(uid)
+        invalidate_audio_pool_uid(uid)
     else:
         LOG.info(
             f'{uid} not in {PAINTER_PATH_CACHE}, not removing from '
@@ -14,12 +14,13 @@ from sglib.math import (
 )
 from sglib import constants
 from sglib.lib import strings as sg_strings
+from sglib.lib.cache import AUDIO_POOL_UID, invalidate_audio_pool_uid
 from sglib.lib import util
 from sglib.lib.translate import _
 from sglib.models import theme
 from sgui import shared as glbl_shared
 from sgui.daw.lib import item as item_lib
-from sgui.daw import painter_path as daw_painter_path, shared
+from sgui.daw import shared
 from sgui.shared import AUDIO_ITEM_SCENE_RECT
 from sgui.widgets.sample_graph import create_sample_graph
 from . import (
@@ -72,14 +73,16 @@ class AudioSeqItem(QGraphicsRectItem):
         self.track_num = a_track_num
 
         f_uid = self.audio_item.uid
-        if f_uid in _shared.PAINTER_PATH_CACHE:
-            self.painter_paths = _shared.PAINTER_PATH_CACHE[f_uid]
-        else:
-            self.painter_paths = create_sample_graph(
-                a_graph,
-                True,
+        self.painter_paths = _shared.PAINTER_PATH_CACHE.get(f_uid)
+        if self.painter_paths is None:
+            self.painter_paths = _shared.PAINTER_PATH_CACHE.put(
+                f_uid,
+                create_sample_graph(
+                    a_graph,
+                    True,
+                ),
+                ((AUDIO_POOL_UID, f_uid),),
             )
-            _shared.PAINTER_PATH_CACHE[f_uid] = self.painter_paths
 
         self.y_inc = _shared.AUDIO_ITEM_HEIGHT / len(self.painter_paths)
         f_y_pos = 0.0
@@ -290,6 +293,7 @@ class AudioSeqItem(QGraphicsRectItem):
         constants.DAW_PROJECT.commit(_("Replace audio item"))
         shared.CURRENT_ITEM = constants.DAW_PROJECT.get_item_by_uid(
             shared.CURRENT_ITEM.uid,
+            _copy=True,
         )
         global_open_audio_items(True)
         daw_painter_clear_cache()
@@ -1119,6 +1123,7 @@ class AudioSeqItem(QGraphicsRectItem):
         f_reset_selection = True
         f_did_change = False
         f_was_stretching = False
+        f_stretched_items = []
         f_event_pos = qt_event_pos(a_event).x()
         f_event_diff = f_event_pos - self.event_pos_orig
 
@@ -1199,16 +1204,7 @@ class AudioSeqItem(QGraphicsRectItem):
                     f_audio_item.orig_string != str(f_item)
                 ):
                     f_was_stretching = True
-                    try:
-                        constants.PROJECT.timestretch_audio_item(f_item)
-                    except FileNotFoundError as ex:
-                        QMessageBox.warning(
-                            glbl_shared.MAIN_WINDOW,
-                            _("Error"),
-                            str(ex),
-                        )
-                        global_open_audio_items(f_reset_selection)
-                        return
+                    f_stretched_items.append(f_item)
                 f_audio_item.setRect(
                     0.0,
                     0.0,
@@ -1270,6 +1266,20 @@ class AudioSeqItem(QGraphicsRectItem):
             f_audio_item.setFlag(
                 QGraphicsItem.GraphicsItemFlag.ItemClipsChildrenToShape,
             )
+        if f_stretched_items:
+            try:
+                constants.PROJECT.timestretch_audio_items(
+                    f_stretched_items,
+                    timestretch_progress,
+                )
+            except FileNotFoundError as ex:
+                QMessageBox.warning(
+                    glbl_shared.MAIN_WINDOW,
+                    _("Error"),
+                    str(ex),
+                )
+                global_open_audio_items(f_reset_selection)
+                return
         if f_did_change:
             f_audio_items.deduplicate_items()
             if self.is_amp_dragging_audio_pool:
@@ -1277,13 +1287,12 @@ class AudioSeqItem(QGraphicsRectItem):
                 for uid in self._audio_pool_selected_uids:
                     vol = self._audio_pool_by_uid[uid].volume
                     constants.IPC.audio_pool_entry_volume(uid, vol)
+                    # Any item containing this file now has an inaccurate
+                    # waveform
+                    invalidate_audio_pool_uid(uid)
                 self._audio_pool_selected_uids = None
                 self._audio_pool = None
                 self._audio_pool_by_uid = None
-                # Any item containing this file now has an inaccurate
-                # waveform, so take the brute force approach and force
-                # everything to redraw
-                daw_painter_path.clear_caches()
             elif f_was_stretching:
                 constants.PROJECT.save_stretch_dicts()
             item_lib.save_item(
@@ -436,6 +436,7 @@ def replace_with_clipboard_all():
         constants.DAW_PROJECT.commit(_("Replace audio item"))
         shared.CURRENT_ITEM = constants.DAW_PROJECT.get_item_by_uid(
             shared.CURRENT_ITEM.uid,
+            _copy=True,
         )
         global_open_audio_items(True)
         daw_painter_clear_cache()
@@ -456,6 +457,7 @@ def clone_sef():
     constants.DAW_PROJECT.commit(_("Replace audio item"))
     shared.CURRENT_ITEM = constants.DAW_PROJECT.get_item_by_uid(
         shared.CURRENT_ITEM.uid,
+        _copy=True,
     )
     global_open_audio_items(True)
     daw_painter_clear_cache()
@@ -740,23 +742,25 @@ def timestretch_items(a_list):
     audio_pool = constants.PROJECT.get_audio_pool()
     by_path = audio_pool.by_path()
     for f_item in a_list:
-        if f_item.time_stretch_mode >= 3:
-            try:
-                constants.PROJECT.timestretch_audio_item(f_item)
-            except FileNotFoundError as ex:
-                QMessageBox.warning(
-                    glbl_shared.MAIN_WINDOW,
-                    _("Error"),
-                    str(ex),
-                )
-                global_open_audio_items(True)
-                return
-        else:
+        if f_item.time_stretch_mode < 3:
             src_path = constants.PROJECT.get_wav_name_by_uid(f_item.uid)
             if src_path in constants.PROJECT.timestretch_reverse_lookup:
                 orig = constants.PROJECT.timestretch_reverse_lookup[src_path]
                 LOG.info(f'Setting {f_item.uid} to {by_path[orig].uid}')
                 f_item.uid = by_path[orig].uid
+    try:
+        constants.PROJECT.timestretch_audio_items(
+            [x for x in a_list if x.time_stretch_mode >= 3],
+            timestretch_progress,
+        )
+    except FileNotFoundError as ex:
+        QMessageBox.warning(
+            glbl_shared.MAIN_WINDOW,
+            _("Error"),
+            str(ex),
+        )
+        global_open_audio_items(True)
+        return
 
     constants.PROJECT.save_stretch_dicts()
 
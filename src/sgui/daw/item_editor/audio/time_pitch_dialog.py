@@ -30,6 +30,7 @@ class TimePitchDialogWidget(TimePitchDialogWidget):
         f_selected_count = 0
 
         f_was_stretching = False
+        f_stretched_items = []
 
         for f_item in shared.AUDIO_SEQ.audio_items:
             if f_item.isSelected():
@@ -101,21 +102,26 @@ class TimePitchDialogWidget(TimePitchDialogWidget):
                     f_item.orig_string != str(f_item.audio_item)
                 ):
                     f_was_stretching = True
-                    try:
-                        constants.PROJECT.timestretch_audio_item(
-                            f_item.audio_item,
-                        )
-                    except FileNotFoundError as ex:
-                        QMessageBox.warning(
-                            self.widget,
-                            _("Error"),
-                            str(ex),
-                        )
-                        global_open_audio_items(True)
-                        return
-
-                f_item.draw()
+                    f_stretched_items.append(f_item)
+                else:
+                    f_item.draw()
                 f_selected_count += 1
+        if f_stretched_items:
+            try:
+                constants.PROJECT.timestretch_audio_items(
+                    [x.audio_item for x in f_stretched_items],
+                    timestretch_progress,
+                )
+            except FileNotFoundError as ex:
+                QMessageBox.warning(
+                    self.widget,
+                    _("Error"),
+                    str(ex),
+                )
+                global_open_audio_items(True)
+                return
+            for f_item in f_stretched_items:
+                f_item.draw()
         if f_selected_count == 0:
             QMessageBox.warning(
                 self.widget, _("Error"), _("No items selected"))
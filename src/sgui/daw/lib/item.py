@@ -140,7 +140,7 @@ def save_recorded_items(
             f'{shared.TRACK_NAMES[a_track_num]}-{f_item_name}',
         )
         f_uid = project.create_empty_item(f_name)
-        f_item = project.get_item_by_uid(f_uid)
+        f_item = project.get_item_by_uid(f_uid, _copy=True)
         f_items_to_save[f_uid] = f_item
         project.rec_take[a_track_num] = f_item
         f_item_ref = sequencer_item(
@@ -158,7 +158,7 @@ def save_recorded_items(
             f_name = project.get_next_default_item_name(
                 f_item_name)
             f_uid = project.copy_item(f_old_name, f_name)
-            f_item = project.get_item_by_uid(f_uid)
+            f_item = project.get_item_by_uid(f_uid, _copy=True)
             f_items_to_save[f_uid] = f_item
             project.rec_take[a_track_num] = f_item
             f_item_ref = sequencer_item(
@@ -1,17 +1,43 @@
 from sglib import constants
+from sglib.lib.cache import (
+    AUDIO_POOL_UID,
+    ITEM_UID,
+    LRUCache,
+    cache_budget,
+    invalidate_item_uid,
+)
 from sglib.math import clip_max
 from sgui import shared as glbl_shared
 from sglib.models import theme
+from sgui.batch_path import rects_path
 from sgui.daw import shared
 from sgui.sgqt import *
 from sgui.widgets.sample_graph import create_sample_graph
+import numpy
 
 PIXMAP_BEAT_WIDTH = 48
 PIXMAP_TILE_HEIGHT = 32
 PIXMAP_TILE_WIDTH = 4000
 
-PIXMAP_CACHE = {}
-PIXMAP_CACHE_UNSCALED = {}
+def pixmaps_nbytes(a_pixmaps):
+    """ The approximate memory used by a list of QPixmaps """
+    return sum(
+        x.width() * x.height() * max(x.depth(), 8) // 8
+        for x in a_pixmaps
+    )
+
+# (uid, px_per_beat, height, tempo): [QPixmap, ...]
+PIXMAP_CACHE = LRUCache(
+    'sequencer-pixmap',
+    cache_budget('sequencer-pixmap', 256),
+    pixmaps_nbytes,
+)
+# uid: [QPixmap, ...]
+PIXMAP_CACHE_UNSCALED = LRUCache(
+    'sequencer-pixmap-unscaled',
+    cache_budget('sequencer-pixmap-unscaled', 128),
+    pixmaps_nbytes,
+)
 
 
 def scale_sizes(a_width_from, a_height_from, a_width_to, a_height_to):
@@ -19,6 +45,15 @@ def scale_sizes(a_width_from, a_height_from, a_width_to, a_height_to):
     f_y = a_height_to / a_height_from
     return (f_x, f_y)
 
+def item_cache_tags(a_item):
+    """ The cache tags of everything drawn from a sequencer item """
+    f_result = [(ITEM_UID, int(a_item.uid))]
+    f_result.extend(
+        (AUDIO_POOL_UID, int(x.uid))
+        for x in a_item.items.values()
+    )
+    return f_result
+
 def get_item_path(
     a_uid,
     a_px_per_beat,
@@ -27,39 +62,35 @@ def get_item_path(
 ):
     project = constants.DAW_PROJECT
     a_uid = int(a_uid)
-    f_key = (a_px_per_beat, a_height, round(a_tempo, 1))
-    if (
-        a_uid in PIXMAP_CACHE
-        and
-        f_key in PIXMAP_CACHE[a_uid]
-    ):
-        return PIXMAP_CACHE[a_uid][f_key]
-    else:
-        f_item_obj = project.get_item_by_uid(a_uid)
-        if a_uid not in PIXMAP_CACHE_UNSCALED:
-            f_path = painter_path(
-                f_item_obj,
-                PIXMAP_BEAT_WIDTH,
-                PIXMAP_TILE_HEIGHT,
-                a_tempo,
-            )
-            PIXMAP_CACHE_UNSCALED[a_uid] = f_path
-        if a_uid not in PIXMAP_CACHE:
-            PIXMAP_CACHE[a_uid] = {}
-        PIXMAP_CACHE[a_uid][f_key] = [
+    f_key = (a_uid, a_px_per_beat, a_height, round(a_tempo, 1))
+    f_result = PIXMAP_CACHE.get(f_key)
+    if f_result is not None:
+        return f_result
+    f_item_obj = project.get_item_by_uid(a_uid)
+    f_tags = item_cache_tags(f_item_obj)
+    f_unscaled = PIXMAP_CACHE_UNSCALED.get(a_uid)
+    if f_unscaled is None:
+        f_unscaled = painter_path(
+            f_item_obj,
+            PIXMAP_BEAT_WIDTH,
+            PIXMAP_TILE_HEIGHT,
+            a_tempo,
+        )
+        PIXMAP_CACHE_UNSCALED.put(a_uid, f_unscaled, f_tags)
+    return PIXMAP_CACHE.put(
+        f_key,
+        [
             x.scaled(
                 int(a_px_per_beat * f_item_obj.get_length(a_tempo)),
                 int(a_height),
             )
-            for x in PIXMAP_CACHE_UNSCALED[a_uid]
-        ]
-        return PIXMAP_CACHE[a_uid][f_key]
+            for x in f_unscaled
+        ],
+        f_tags,
+    )
 
 def pop_path_from_cache(a_uid):
-    if a_uid in PIXMAP_CACHE:
-        PIXMAP_CACHE.pop(a_uid)
-    if a_uid in PIXMAP_CACHE_UNSCALED:
-        PIXMAP_CACHE_UNSCALED.pop(a_uid)
+    invalidate_item_uid(a_uid)
 
 def clear_caches():
     PIXMAP_CACHE.clear()
@@ -100,9 +131,11 @@ def painter_path(
 
     f_notes_path = QPainterPath()
     f_notes_path.addRect(0., 0., 1., 1.)
-    if item.notes:
+    # Does not unpack the notes of packed items from the item cache
+    f_notes = item.event_arrays().notes
+    if len(f_notes):
         f_note_set = sorted(
-            set(x.note_num for x in item.notes),
+            set(f_notes['note_num'].tolist()),
             reverse=True,
         )
         f_note_h_area = (a_height * 0.6)
@@ -115,20 +148,21 @@ def painter_path(
         f_note_bias = (
             f_note_h_area - (f_note_height * len(f_note_set))
         ) * f_min
-        f_note_dict = {
-            x:((((y * f_note_height) + a_height * 0.36)) + f_note_bias)
-            for x, y in zip(f_note_set, range(len(f_note_set)))
-        }
-        for f_note in item.notes:
-            f_y_pos = f_note_dict[f_note.note_num]
-            f_x_pos = f_note.start * a_px_per_beat
-            f_width = f_note.length * a_px_per_beat
-            f_notes_path.addRect(
-                float(f_x_pos),
-                float(f_y_pos),
-                float(f_width),
+        # The index of each note number in f_note_set, highest first
+        f_note_index = (len(f_note_set) - 1) - numpy.searchsorted(
+            f_note_set[::-1],
+            f_notes['note_num'],
+        )
+        f_notes_path.addPath(
+            rects_path(
+                f_notes['start'] * a_px_per_beat,
+                (
+                    (f_note_index * f_note_height) + a_height * 0.36
+                ) + f_note_bias,
+                f_notes['length'] * a_px_per_beat,
                 float(f_note_height),
-            )
+            ),
+        )
 
     f_audio_width = f_audio_path.boundingRect().width()
     f_notes_width = f_notes_path.boundingRect().width()
@@ -382,7 +382,10 @@ def transpose_dialog():
 
     def transpose_ok_handler():
         for f_item_name in f_item_set:
-            f_item = constants.DAW_PROJECT.get_item_by_name(f_item_name)
+            f_item = constants.DAW_PROJECT.get_item_by_name(
+                f_item_name,
+                _copy=True,
+            )
             f_item.transpose(
                 f_semitone.value(),
                 f_octave.value(),
@@ -464,7 +467,10 @@ def glue_selected():
                 f_items_dict,
             )
             f_new_uid = constants.DAW_PROJECT.create_empty_item(f_new_name)
-            f_new_item = constants.DAW_PROJECT.get_item_by_uid(f_new_uid)
+            f_new_item = constants.DAW_PROJECT.get_item_by_uid(
+                f_new_uid,
+                _copy=True,
+            )
             f_tempo = shared.CURRENT_SEQUENCE.get_tempo_at_pos(
                 f_new_ref.start_beat,
             )
@@ -786,11 +786,7 @@ class SequencerItem(QGraphicsRectItem):
                     f_audio_item.orig_string != str(f_item)
                 ):
                     f_was_stretching = True
-                    f_ts_result = constants.PROJECT.timestretch_audio_item(
-                        f_item,
-                    )
-                    if f_ts_result is not None:
-                        f_stretched_items.append(f_ts_result)
+                    f_stretched_items.append(f_item)
                 f_audio_item.setRect(
                     0.0,
                     0.0,
@@ -829,6 +825,11 @@ class SequencerItem(QGraphicsRectItem):
             f_audio_item.setFlag(
                 QGraphicsItem.GraphicsItemFlag.ItemClipsChildrenToShape,
             )
+        if f_stretched_items:
+            constants.PROJECT.timestretch_audio_items(
+                f_stretched_items,
+                timestretch_progress,
+            )
         if f_was_resizing:
             _shared.LAST_ITEM_LENGTH = self.audio_item.length_beats
 
@@ -1,5 +1,6 @@
 import copy
 import math
+import numpy
 
 from .midi_file_dialog import midi_file_dialog
 from sglib import constants
@@ -27,6 +28,7 @@ from sglib.lib import util
 from sglib.lib.translate import _
 from sgui import shared as glbl_shared
 from sgui import widgets
+from sgui.batch_path import path_from_arrays
 from sgui.daw import shared
 from sgui.daw import strings as daw_strings
 from sgui.daw.lib import item as item_lib
@@ -607,16 +609,22 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
         self.ignore_selection_change = True
         #, key=lambda x: x.bar_num,
         _shared.CACHED_SEQ_LEN = get_current_sequence_length()
-        for f_item in sorted(shared.CURRENT_SEQUENCE.items, reverse=True):
-            if f_item.start_beat < get_current_sequence_length():
-                f_item_name = f_items_dict.get_name_by_uid(f_item.item_uid)
-                f_new_item = self.draw_item(f_item_name, f_item)
-                if (
-                    f_new_item.get_selected_string()
-                    in
-                    self.selected_item_strings
-                ):
-                    f_new_item.setSelected(True)
+        # Every item of the sequence is drawn, not only the visible ones,
+        # selecting, copying and moving items work on self.audio_items
+        for f_item in reversed(
+            shared.CURRENT_SEQUENCE.get_items_in_range(
+                0.,
+                _shared.CACHED_SEQ_LEN,
+            )
+        ):
+            f_item_name = f_items_dict.get_name_by_uid(f_item.item_uid)
+            f_new_item = self.draw_item(f_item_name, f_item)
+            if (
+                f_new_item.get_selected_string()
+                in
+                self.selected_item_strings
+            ):
+                f_new_item.setSelected(True)
         self.ignore_selection_change = False
         if _shared.SEQUENCE_EDITOR_MODE == 1:
             self.open_atm_sequence()
@@ -639,27 +647,27 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
 
     def draw_atm_lines(self, a_track_num, a_points):
         plugin_uid = a_points[0].item.index
-        path = QPainterPath()
-        point = a_points[0]
-        pos = point.scenePos()
-        x = pos.x() + _shared.ATM_POINT_RADIUS
-        y = pos.y() + _shared.ATM_POINT_RADIUS
-        path.moveTo(0.0, y)
-        path.lineTo(x, y)
-        break_after = point.item.break_after
-
-        for point in a_points[1:]:
+        # Start at the left edge of the sequence, a line is drawn to each
+        # point unless the previous point breaks the line, then continue
+        # to the right edge unless the last point breaks the line
+        count = len(a_points)
+        x = numpy.empty(count + 2)
+        y = numpy.empty(count + 2)
+        move_to = numpy.zeros(count + 2, dtype=bool)
+        for i, point in enumerate(a_points, 1):
             pos = point.scenePos()
-            x = pos.x() + _shared.ATM_POINT_RADIUS
-            y = pos.y() + _shared.ATM_POINT_RADIUS
-            if break_after:
-                path.moveTo(x, y)
-            else:
-                path.lineTo(x, y)
-            break_after = point.item.break_after
-
-        if not break_after:
-            path.lineTo(self.sceneRect().right(), y)
+            x[i] = pos.x()
+            y[i] = pos.y()
+            move_to[i + 1] = point.item.break_after
+        x[1:-1] += _shared.ATM_POINT_RADIUS
+        y[1:-1] += _shared.ATM_POINT_RADIUS
+        x[0] = 0.0
+        y[0] = y[1]
+        x[-1] = self.sceneRect().right()
+        y[-1] = y[-2]
+        if move_to[-1]:
+            x, y, move_to = x[:-1], y[:-1], move_to[:-1]
+        path = path_from_arrays(x, y, move_to)
 
         path_item = QGraphicsPathItem(path)
         path_item.setPen(
@@ -880,7 +888,10 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
             lane_num = 0
             f_item_name = "{}-1".format(shared.TRACK_NAMES[f_track_num])
             f_item_uid = constants.DAW_PROJECT.create_empty_item(f_item_name)
-            f_items = constants.DAW_PROJECT.get_item_by_uid(f_item_uid)
+            f_items = constants.DAW_PROJECT.get_item_by_uid(
+                f_item_uid,
+                _copy=True,
+            )
             f_item_ref = sequencer_item(
                 f_track_num,
                 f_beat_frac,
@@ -888,14 +899,25 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
                 f_item_uid,
             )
 
-        for f_file_name in a_item_list:
+        f_file_names = [str(x) for x in a_item_list if str(x)]
+        if a_single_item:
+            f_file_names = f_file_names[:MAX_AUDIO_ITEM_COUNT]
+        else:
+            f_file_names = f_file_names[:TRACK_COUNT_ALL - f_track_num]
+        # Sample graphs are generated in the background, the items are
+        # drawn with placeholders until then
+        f_uids = constants.PROJECT.import_audio_files(f_file_names)
+
+        for f_file_name_str, f_uid in zip(f_file_names, f_uids):
             glbl_shared.APP.processEvents()
-            f_file_name_str = str(f_file_name)
             f_item_name = os.path.basename(f_file_name_str)
             if f_file_name_str:
                 if not a_single_item:
                     f_item_uid = constants.DAW_PROJECT.create_empty_item(f_item_name)
-                    f_items = constants.DAW_PROJECT.get_item_by_uid(f_item_uid)
+                    f_items = constants.DAW_PROJECT.get_item_by_uid(
+                        f_item_uid,
+                        _copy=True,
+                    )
                 f_index = f_items.get_next_index()
 
                 if f_index == -1:
@@ -904,7 +926,6 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
                     "max per sequence is {}").format(MAX_AUDIO_ITEM_COUNT))
                     break
 
-                f_uid = constants.PROJECT.get_wav_uid_by_name(f_file_name_str)
                 f_graph = constants.PROJECT.get_sample_graph_by_uid(f_uid)
                 f_delta = datetime.timedelta(
                     seconds=f_graph.length_in_seconds)
@@ -956,6 +977,8 @@ class ItemSequencer(QGraphicsView, HoverCursorChange):
         shared.SEQ_WIDGET.open_sequence()
         self.last_open_dir = os.path.dirname(f_file_name_str)
 
+        shared.poll_sample_graphs()
+
         if f_restart:
             glbl_shared.restart_engine()
 
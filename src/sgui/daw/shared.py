@@ -361,7 +361,11 @@ def global_open_items(
                 f_editor.horizontalScrollBar().setSliderPosition(0)
         f_items_dict = constants.DAW_PROJECT.get_items_dict()
         f_uid = f_items_dict.get_uid_by_name(a_items)
-        CURRENT_ITEM = constants.DAW_PROJECT.get_item_by_uid(f_uid)
+        # The item editors modify it
+        CURRENT_ITEM = constants.DAW_PROJECT.get_item_by_uid(
+            f_uid,
+            _copy=True,
+        )
         ITEM_EDITOR.item_name_lineedit.setText(a_items)
         ITEM_EDITOR.item_name_lineedit.setReadOnly(False)
 
@@ -498,6 +502,67 @@ def global_update_peak_meters(a_val):
         else:
             LOG.info("{} not in ALL_PEAK_METERS".format(f_index))
 
+def global_update_peak_meters_array(a_values):
+    """ Like global_update_peak_meters, from the shared memory ring buffer
+
+        @a_values: NumPy array of rows of track number, left, right
+    """
+    for f_row in a_values:
+        f_index = int(f_row[0])
+        if f_index in ALL_PEAK_METERS:
+            for f_pkm in ALL_PEAK_METERS[f_index]:
+                f_pkm.set_value(f_row[1:])
+        else:
+            LOG.info("{} not in ALL_PEAK_METERS".format(f_index))
+
+SAMPLE_GRAPH_TIMER = None
+
+def poll_sample_graphs():
+    """ Start redrawing the items drawn with placeholder sample graphs as
+        their real sample graphs are generated in the background, and show
+        the progress in the window title.  Call after
+        PROJECT.import_audio_files
+    """
+    global SAMPLE_GRAPH_TIMER
+    if SAMPLE_GRAPH_TIMER is None:
+        SAMPLE_GRAPH_TIMER = QtCore.QTimer()
+        SAMPLE_GRAPH_TIMER.setInterval(250)
+        SAMPLE_GRAPH_TIMER.timeout.connect(_on_sample_graph_timeout)
+    if not SAMPLE_GRAPH_TIMER.isActive():
+        SAMPLE_GRAPH_TIMER.start()
+
+def _on_sample_graph_timeout():
+    f_uids = set(constants.PROJECT.poll_sample_graphs())
+    if f_uids:
+        SEQ_WIDGET.open_sequence()
+        if CURRENT_ITEM and any(
+            x.uid in f_uids for x in CURRENT_ITEM.items.values()
+        ):
+            global_open_audio_items()
+    f_progress = constants.PROJECT.sample_graph_progress()
+    if f_progress is None:
+        SAMPLE_GRAPH_TIMER.stop()
+        glbl_shared.set_window_title()
+    else:
+        glbl_shared.set_window_title(
+            _("Loading audio files {}/{}").format(*f_progress),
+        )
+
+def timestretch_progress(a_done, a_total):
+    """ Show the progress of PROJECT.timestretch_audio_items in the window
+        title, and repaint the UI while waiting for it.  User input is not
+        processed until it finishes
+    """
+    if a_done < a_total:
+        glbl_shared.set_window_title(
+            _("Time stretching {}/{}").format(a_done, a_total),
+        )
+    else:
+        glbl_shared.set_window_title()
+    glbl_shared.APP.processEvents(
+        QtCore.QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents,
+    )
+
 def active_audio_pool_uids():
     return constants.DAW_PROJECT.active_audio_pool_uids()
 
@@ -751,12 +816,15 @@ __all__ = [
     'global_ui_refresh_callback',
     'global_update_hidden_rows',
     'global_update_peak_meters',
+    'global_update_peak_meters_array',
     'global_update_track_comboboxes',
     'on_ready',
     'open_last',
+    'poll_sample_graphs',
     'get_current_sequence_length',
     'seconds_to_beats',
     'set_piano_roll_quantize',
+    'timestretch_progress',
     'routing_graph_toggle_callback',
     'HoverCursorChange',
     'set_cursor',
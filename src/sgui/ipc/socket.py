@@ -1,13 +1,18 @@
 from sgui.sgqt import QMessageBox, QtCore, Signal
 from sglib.ipc.abstract import AbstractIPCTransport
+from sglib.ipc.jobs import ENGINE_JOBS, JOBS_PATH
 from sglib import constants
 from sglib.lib import engine
+from sglib.lib.save_queue import SAVE_QUEUE
 from sglib.lib.translate import _
 from sglib.log import LOG
 from sgui import shared
+import collections
+import itertools
 import select
 import socket
 import socketserver
+import threading
 import time
 
 __all__ = [
@@ -19,6 +24,10 @@ SOCKET_IPC_SERVER = None
 IPC_ENGINE_SERVER_PORT = 31999
 IPC_UI_SERVER_PORT = 31909
 SOCKET_ERROR_SHOWN = False
+# Must match IPC_MAX_MESSAGE_SIZE and IPC_BATCH_HEADER in the engine
+IPC_MAX_MESSAGE_SIZE = 60000
+IPC_MAX_BATCH_SIZE = 59000
+IPC_BATCH_HEADER = b"/clinttools/batch\n\n"
 
 class SocketIPCServerSignal(QtCore.QObject):
     handled = Signal(str)
@@ -26,14 +35,22 @@ class SocketIPCServerSignal(QtCore.QObject):
     def handle(self, data):
         self.handled.emit(data)
 
+def dispatch(data: str):
+    """ Handle a message from the engine, called from the server thread """
+    if data.startswith(f"{JOBS_PATH}\n"):
+        # Not through the Qt event loop, the UI thread may be waiting
+        # for this job
+        ENGINE_JOBS.finish(data.split("\n", 1)[1])
+        return
+    SOCKET_IPC_SERVER.signal.handle(data)
+
 class UDPHandler(socketserver.DatagramRequestHandler):
     def handle(self):
         data = self.rfile.read().strip()
         self.wfile.write(
 			"Message received".encode(),
 		)
-        data = data.decode('utf-8')
-        SOCKET_IPC_SERVER.signal.handle(data)
+        dispatch(data.decode('utf-8'))
 
 class SocketIPCServerThread(QtCore.QThread):
     def run(self):
@@ -84,7 +101,36 @@ class SocketIPCServer:
     def free(self):
         self.server.shutdown()
 
+class SocketIPCTransportSignal(QtCore.QObject):
+    """ Show errors from the sending thread in the UI thread """
+    error = Signal(str)
+
+def _show_socket_error(msg):
+    QMessageBox.warning(
+        shared.MAIN_WINDOW,
+        _("Error"),
+        msg,
+    )
+
 class SocketIPCTransport(AbstractIPCTransport):
+    """ Queues messages and sends them from a background thread, so that
+        the UI thread never waits for the engine.  Messages queued while
+        the previous datagram was being sent are packed into as few
+        datagrams as possible, and only the latest message for each
+        (plugin_uid, port) of the keys in COALESCE_KEYS is sent.  Up to
+        MAX_IN_FLIGHT datagrams are sent before waiting for the engine to
+        acknowledge them.  Messages are not sent until the project files
+        saved before them are written
+    """
+    # key: The number of "|" separated fields at the start of the value
+    #      that identify what the message sets
+    COALESCE_KEYS = {
+        "pc": 2,
+    }
+    MAX_IN_FLIGHT = 8
+    # Seconds to wait for the engine to acknowledge a datagram
+    ACK_TIMEOUT = 1.0
+
     def __init__(
         self,
         host='127.0.0.1',
@@ -106,6 +152,23 @@ class SocketIPCTransport(AbstractIPCTransport):
         self.socket.connect((self.host, self.port))
         self.socket.setblocking(0)
         self.failures = 0
+        self.signal = SocketIPCTransportSignal()
+        self.signal.error.connect(_show_socket_error)
+        self._cond = threading.Condition()
+        # queue key: encoded message
+        self._queue = collections.OrderedDict()
+        self._counter = itertools.count()
+        # The messages taken from the queue that have not been sent yet
+        self._sending = 0
+        self._in_flight = 0
+        # The SAVE_QUEUE generation to wait for before sending the queue
+        self._save_generation = 0
+        self._thread = threading.Thread(
+            target=self._send_thread,
+            name='ipc-send',
+            daemon=True,
+        )
+        self._thread.start()
 
     def send(
         self,
@@ -115,20 +178,121 @@ class SocketIPCTransport(AbstractIPCTransport):
     ):
         message = "\n".join([path, key, value])
         message = message.encode('utf-8')
-        assert len(message) < 60000, (len(message), message)
+        assert len(message) < IPC_MAX_MESSAGE_SIZE, (len(message), message)
+        if key in self.COALESCE_KEYS:
+            count = self.COALESCE_KEYS[key]
+            queue_key = (path, key, *value.split("|", count)[:count])
+        else:
+            queue_key = next(self._counter)
+        with self._cond:
+            # Replaces a queued message with the same key, and sends it
+            # in the order of the latest message
+            self._queue.pop(queue_key, None)
+            self._queue[queue_key] = message
+            self._save_generation = SAVE_QUEUE.generation
+            self._cond.notify_all()
+
+    def flush(self, timeout=2.0):
+        """ Wait until every queued message has been sent and acknowledged
+            by the engine.  Returns False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (
+                    not self._queue
+                    and
+                    not self._sending
+                    and
+                    not self._in_flight
+                ),
+                timeout,
+            )
+
+    @staticmethod
+    def pack(messages):
+        """ Return a list of datagrams containing messages.  A single
+            message is sent as-is, multiple are sent as
+            IPC_BATCH_HEADER + "{len}\n{message}" for each message
+        """
+        result = []
+        batch = []
+        size = len(IPC_BATCH_HEADER)
+        for message in messages:
+            part = f"{len(message)}\n".encode('utf-8') + message
+            if size + len(part) > IPC_MAX_BATCH_SIZE:
+                if batch:
+                    result.append(batch)
+                batch = []
+                size = len(IPC_BATCH_HEADER)
+            batch.append(part)
+            size += len(part)
+        if batch:
+            result.append(batch)
+        return [
+            parts[0].split(b"\n", 1)[1] if len(parts) == 1
+            else IPC_BATCH_HEADER + b"".join(parts)
+            for parts in result
+        ]
+
+    def _send_thread(self):
+        last_ack = time.time()
+        while True:
+            with self._cond:
+                if not self._queue and not self._in_flight:
+                    self._cond.notify_all()
+                    self._cond.wait()
+                messages = list(self._queue.values())
+                self._queue.clear()
+                # Pending for flush() until they are sent
+                self._sending = len(messages)
+                save_generation = self._save_generation
+            # The engine may read the files that the messages refer to
+            SAVE_QUEUE.wait(save_generation)
+            for datagram in self.pack(messages):
+                while self._in_flight >= self.MAX_IN_FLIGHT:
+                    if not self._receive_acks(self.ACK_TIMEOUT):
+                        self._ack_timeout()
+                self._send_datagram(datagram)
+                last_ack = time.time()
+            with self._cond:
+                self._sending = 0
+                self._cond.notify_all()
+            if self._in_flight:
+                # Short, to pick up newly queued messages quickly
+                if self._receive_acks(0.005):
+                    last_ack = time.time()
+                elif time.time() - last_ack > self.ACK_TIMEOUT:
+                    self._ack_timeout()
+
+    def _receive_acks(self, timeout):
+        """ Receive the acknowledgements that the engine has sent, return
+            True if there were any
+        """
+        ready = select.select([self.socket], [], [], timeout)
+        if not ready[0]:
+            return False
+        count = 0
+        try:
+            while True:
+                self.socket.recv(4096)
+                count += 1
+        except (BlockingIOError, ConnectionError):
+            pass
+        with self._cond:
+            self._in_flight = max(self._in_flight - count, 0)
+        return bool(count)
+
+    def _ack_timeout(self):
+        LOG.warning("Did not receive a reply from the engine")
+        with self._cond:
+            self._in_flight = 0
+
+    def _send_datagram(self, message):
         for wait in (0.1, 0.2, 0.3) if self.failures < 10 else (0,):
             try:
                 self.socket.sendall(message)
-                ready = select.select(
-                    [self.socket],
-                    [],
-                    [],
-                    1.0,
-                )
-                if ready[0]:
-                    self.socket.recv(4096)
-                else:
-                    LOG.warning("Did not receive a reply from the engine")
+                with self._cond:
+                    self._in_flight += 1
                 self.failures = 0
                 return
             except Exception as ex:
@@ -152,10 +316,5 @@ class SocketIPCTransport(AbstractIPCTransport):
             )
             LOG.error(msg)
             SOCKET_ERROR_SHOWN = True
-            QMessageBox.warning(
-                shared.MAIN_WINDOW,
-                _("Error"),
-                msg,
-            )
+            self.signal.error.emit(msg)
         LOG.error(f"Failed to send {message[:100]}")
-
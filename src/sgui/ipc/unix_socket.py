@@ -0,0 +1,184 @@
+""" IPC between the UI and engine over Linux abstract namespace
+    SOCK_SEQPACKET sockets, selected with the ipcTransport device setting.
+
+    Unlike UDP, the connection is reliable and ordered, so messages are not
+    acknowledged, and the size of a message is not limited to one datagram.
+    Each UI process uses its own socket names, so multiple instances do not
+    collide on ports.
+"""
+
+from sgui.ipc.socket import SocketIPCServer, dispatch
+from sglib.ipc.abstract import AbstractIPCTransport
+from sglib.lib import util
+from sglib.lib.save_queue import SAVE_QUEUE, SaveError
+from sglib.log import LOG
+import collections
+import select
+import socket
+import threading
+import time
+
+__all__ = [
+    'UnixSocketIPCServer',
+    'UnixSocketIPCTransport',
+]
+
+# The largest message that the engine sends to the UI
+IPC_MAX_UI_MESSAGE_SIZE = 65536
+
+
+def unix_address(a_name, a_suffix):
+    """ The abstract namespace address of a socket, it has no file and
+        is removed when closed
+    """
+    return f"\0{a_name}-{a_suffix}"
+
+def _socket():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 500000)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 500000)
+    return sock
+
+class UnixSocketIPCTransport(AbstractIPCTransport):
+    """ Sends each message directly from the calling thread.  Messages sent
+        before the engine is listening are kept and sent once it connects.
+        Messages sent while project files are waiting to be saved are sent
+        from the saving thread once the files are written.  Messages are
+        never dropped, an error is logged when more than MAX_PENDING are
+        waiting
+    """
+    # Seconds to wait for the engine to receive a message
+    SEND_TIMEOUT = 1.0
+    MAX_PENDING = 10000
+
+    def __init__(self, name=None):
+        self.name = name if name else util.IPC_SOCKET_NAME
+        self.address = unix_address(self.name, 'engine')
+        self.socket = None
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        # True if MAX_PENDING was exceeded since the queue was last empty
+        self._overflowed = False
+
+    def send(
+        self,
+        path,
+        key,
+        value,
+    ):
+        message = "\n".join([path, key, value]).encode('utf-8')
+        with self._lock:
+            self._pending.append(message)
+            if (
+                len(self._pending) > self.MAX_PENDING
+                and
+                not self._overflowed
+            ):
+                self._overflowed = True
+                LOG.error(
+                    f"{len(self._pending)} IPC messages are waiting for "
+                    "the engine, it is not receiving them"
+                )
+        # The engine may read the files that the message refers to
+        SAVE_QUEUE.call_after(SAVE_QUEUE.generation, self._send_queued)
+
+    def _send_queued(self):
+        with self._lock:
+            self._send_pending()
+
+    def engine_args(self):
+        return ["--ipc-socket", self.name]
+
+    def flush(self, timeout=2.0):
+        end = time.time() + timeout
+        try:
+            SAVE_QUEUE.flush(timeout)
+        except SaveError as ex:
+            # Shown by the UI
+            LOG.exception(ex)
+        while True:
+            with self._lock:
+                if self._send_pending():
+                    return True
+            if time.time() >= end:
+                return False
+            time.sleep(0.05)
+
+    def _connect(self):
+        sock = _socket()
+        sock.settimeout(self.SEND_TIMEOUT)
+        try:
+            sock.connect(self.address)
+        except OSError:
+            sock.close()
+            return False
+        self.socket = sock
+        return True
+
+    def _send_pending(self):
+        """ Send the pending messages in order, must hold self._lock.
+            Returns True if all were sent
+        """
+        if self.socket is None and not self._connect():
+            return False
+        while self._pending:
+            try:
+                self.socket.send(self._pending[0])
+            except OSError as ex:
+                LOG.warning(f"Unix socket send failed: {ex}, reconnecting")
+                self.socket.close()
+                self.socket = None
+                return False
+            self._pending.popleft()
+        self._overflowed = False
+        return True
+
+class UnixSocketIPCServer(SocketIPCServer):
+    """ Receives the messages that the engine sends to the UI """
+    def __init__(
+        self,
+        daw_callback,
+        we_callback,
+        name=None,
+    ):
+        SocketIPCServer.__init__(self, daw_callback, we_callback)
+        self.address = unix_address(
+            name if name else util.IPC_SOCKET_NAME,
+            'ui',
+        )
+        self._exiting = False
+        # Bound now, the engine connects as soon as it starts
+        self.server = _socket()
+        self.server.bind(self.address)
+        self.server.listen(1)
+
+    def _thread(self):
+        with self.server:
+            while not self._exiting:
+                if not select.select([self.server], [], [], 0.1)[0]:
+                    continue
+                try:
+                    conn, _ = self.server.accept()
+                except OSError:
+                    continue
+                # One connection at a time, a restarted engine reconnects
+                with conn:
+                    self._receive(conn)
+
+    def _receive(self, conn):
+        while not self._exiting:
+            if not select.select([conn], [], [], 0.1)[0]:
+                continue
+            try:
+                data = conn.recv(IPC_MAX_UI_MESSAGE_SIZE)
+            except OSError as ex:
+                LOG.warning(f"Unix socket receive failed: {ex}")
+                return
+            if not data:
+                # The engine closed the connection
+                return
+            dispatch(data.decode('utf-8').strip())
+
+    def free(self):
+        # The server thread closes the socket
+        self._exiting = True
@@ -17,8 +17,11 @@ from .updates import ui_check_updates
 from sglib.models import clinttools as sg_project
 from sglib.models import theme
 from sglib.ipc import *
+from sglib.ipc.jobs import ENGINE_JOBS
 from sglib.lib import util
+from sglib.lib.cache import log_cache_stats
 from sglib.lib.process import run_process
+from sglib.lib.save_queue import SAVE_QUEUE, SaveError
 from sglib.lib.util import *
 from sglib.lib.translate import _
 from sglib.lib.appimage import *
@@ -32,6 +35,7 @@ from sgui.daw.item_editor.audio._shared import (
     remove_path_from_painter_path_cache,
 )
 from sgui.ipc.socket import SocketIPCServer, SocketIPCTransport
+from sgui.ipc.unix_socket import UnixSocketIPCServer, UnixSocketIPCTransport
 from sgui.plugins import SgPluginUiDict
 from sgui.transport import TransportWidget
 from sglib.lib import engine
@@ -132,7 +136,10 @@ class SgMainWindow(QWidget):
     def setup(self, scaler):
         self.suppress_resize_events = False
         shared.MAIN_WINDOW = self
-        constants.IPC_TRANSPORT = SocketIPCTransport()
+        if util.ipc_transport() == util.IPC_TRANSPORT_UNIX:
+            constants.IPC_TRANSPORT = UnixSocketIPCTransport()
+        else:
+            constants.IPC_TRANSPORT = SocketIPCTransport()
         with_audio = constants.IPC_TRANSPORT is not None
         constants.IPC = clinttoolsIPC(
             constants.IPC_TRANSPORT,
@@ -519,12 +526,22 @@ class SgMainWindow(QWidget):
         self.subprocess_timer = None
         self.socket_server = None
 
-        self.socket_server = SocketIPCServer(
+        if util.ipc_transport() == util.IPC_TRANSPORT_UNIX:
+            server_class = UnixSocketIPCServer
+        else:
+            server_class = SocketIPCServer
+        self.socket_server = server_class(
             daw.MAIN_WINDOW.configure_callback,
             wave_edit.MAIN_WINDOW.configure_callback,
         )
         self.socket_server.start()
 
+        # Project files are saved in a background thread
+        self.save_error_timer = QtCore.QTimer(self)
+        self.save_error_timer.timeout.connect(self.show_save_errors)
+        self.save_error_timer.setSingleShot(False)
+        self.save_error_timer.start(1000)
+
         if util.WITH_AUDIO:
             self.subprocess_timer = QtCore.QTimer(self)
             self.subprocess_timer.timeout.connect(self.subprocess_monitor)
@@ -533,6 +550,18 @@ class SgMainWindow(QWidget):
 
         self.on_collapse_splitters(a_restore=True)
 
+    def show_save_errors(self):
+        """ Show the project files that could not be saved since the last
+            call, they are saved again with the next change
+        """
+        f_errors = SAVE_QUEUE.pop_errors()
+        if f_errors:
+            QMessageBox.warning(
+                self,
+                _("Error"),
+                str(SaveError(f_errors)),
+            )
+
     def appimage_install(self):
         appimage_start_menu_install()
         self.menu_bar.removeAction(
@@ -719,6 +748,12 @@ class SgMainWindow(QWidget):
                 f_elapsed_time = time.time() - f_start_time
                 clock.display(str(round(f_elapsed_time, 1)))
 
+        # The render process reads the project
+        try:
+            SAVE_QUEUE.flush()
+        except SaveError as ex:
+            QMessageBox.warning(self, _("Error"), str(ex))
+            return
         f_proc = run_process(a_cmd_list)
         f_start_time = time.time()
         f_window = QDialog(
@@ -778,6 +813,9 @@ class SgMainWindow(QWidget):
             ):
                 self.subprocess_timer.stop()
                 exitCode = engine.ENGINE_SUBPROCESS.returncode
+                ENGINE_JOBS.cancel_all(
+                    f"The engine exited with code {exitCode}",
+                )
                 handle_engine_error(exitCode)
         except Exception as ex:
             LOG.error("subprocess_monitor: {}".format(ex))
@@ -874,6 +912,11 @@ class SgMainWindow(QWidget):
         try:
             self.setUpdatesEnabled(False)
             close_engine()
+            try:
+                SAVE_QUEUE.flush()
+            except SaveError as ex:
+                LOG.exception(ex)
+                QMessageBox.warning(self, _("Error"), str(ex))
             shared.PLUGIN_UI_DICT.close_all_plugin_windows()
             if self.socket_server is not None:
                 self.socket_server.free()
@@ -891,7 +934,9 @@ class SgMainWindow(QWidget):
             shared.IGNORE_CLOSE_EVENT = False
             if self.subprocess_timer:
                 self.subprocess_timer.stop()
+            self.save_error_timer.stop()
             shared.prepare_to_quit()
+            log_cache_stats()
         except Exception as ex:
             LOG.error(
                 "Exception thrown while attempting to exit, "
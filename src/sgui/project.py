@@ -7,6 +7,7 @@ from sglib.constants import (
     MAJOR_VERSION,
 )
 from sglib.lib import portable
+from sglib.lib.save_queue import SAVE_QUEUE, SaveError
 from sglib.lib.translate import _
 from sglib.lib.util import (
     pi_path,
@@ -83,6 +84,12 @@ def clone_project(parent):
     if not new:
         return False
     clone_dir = os.path.dirname(clone)
+    # The project may be the one that is open
+    try:
+        SAVE_QUEUE.flush()
+    except SaveError as ex:
+        QMessageBox.warning(parent, _("Error"), str(ex))
+        return False
     shutil.copytree(clone_dir, new)
     set_project(
         os.path.join(new, f"{MAJOR_VERSION}.project"),
@@ -102,7 +102,8 @@ def prepare_to_quit():
     global MAIN_WINDOW, TRANSPORT
     MAIN_WINDOW = TRANSPORT = None
 
-def set_window_title():
+def set_window_title(a_status=None):
+    """ @a_status: Optional text to show after the project name """
     if not MAIN_WINDOW:
         return
     dirname = os.path.normpath(constants.PROJECT.project_folder)
@@ -111,7 +112,8 @@ def set_window_title():
         dirname = dirname.replace(project_dir, '...', 1)
     if util.IS_WINDOWS:
         dirname = dirname.replace('/', '\\')
-    MAIN_STACKED_WIDGET.setWindowTitle(
-        f'Clint Tools DAW - {dirname}'
-    )
+    title = f'Clint Tools DAW - {dirname}'
+    if a_status:
+        title = f'{title} - {a_status}'
+    MAIN_STACKED_WIDGET.setWindowTitle(title)
 
@@ -352,6 +352,20 @@ class HardwareDialog:
         f_window_layout.addWidget(f_worker_threads_combobox, 30, 1)
 
         if util.IS_LINUX:
+            f_window_layout.addWidget(QLabel(_("IPC Transport")), 60, 0)
+            f_ipc_transport_combobox = QComboBox()
+            f_ipc_transport_combobox.addItems(
+                [util.IPC_TRANSPORT_UDP, util.IPC_TRANSPORT_UNIX],
+            )
+            f_ipc_transport_combobox.setToolTip(
+                'How the user interface communicates with the audio engine.  '
+                'udp uses ports 31909 and 31999 on localhost.  unix uses '
+                'unix sockets, which have lower latency, no message size '
+                'limit, and allow running multiple instances at the same '
+                'time.  Use udp if unix sockets do not work on your system'
+            )
+            f_window_layout.addWidget(f_ipc_transport_combobox, 60, 1)
+
             f_hugepages_checkbox = QCheckBox(
                 _("Use HugePages? (You must configure HugePages on your "
                 "system first)"))
@@ -659,6 +673,7 @@ class HardwareDialog:
             f_worker_threads = f_worker_threads_combobox.currentIndex()
             if util.IS_LINUX:
                 f_hugepages = 1 if f_hugepages_checkbox.isChecked() else 0
+                f_ipc_transport = f_ipc_transport_combobox.currentText()
             f_audio_inputs = f_audio_in_spinbox.value()
             f_out_tuple = (f_audio_out_spinbox,) + OUT_SPINBOXES
             f_audio_outputs = "|".join(str(x.value()) for x in f_out_tuple)
@@ -723,6 +738,7 @@ class HardwareDialog:
 
                     if util.IS_LINUX:
                         f.write("hugePages|{}\n".format(f_hugepages))
+                        f.write(f"ipcTransport|{f_ipc_transport}\n")
                     f.write("audioInputs|{}\n".format(f_audio_inputs))
                     f.write("audioOutputs|{}\n".format(f_audio_outputs))
                     f.write("testVolume|{}\n".format(test_volume))
@@ -858,6 +874,9 @@ class HardwareDialog:
             if "hugePages" in util.DEVICE_SETTINGS and \
             int(util.DEVICE_SETTINGS["hugePages"]) == 1:
                 f_hugepages_checkbox.setChecked(True)
+            f_ipc_transport_combobox.setCurrentIndex(
+                f_ipc_transport_combobox.findText(util.ipc_transport()),
+            )
 
         if a_msg is not None:
             QMessageBox.warning(f_window, _("Information"), a_msg)
@@ -1,6 +1,9 @@
 from . import _shared
 from sgui.sgqt import *
+from sglib.lib import util
+from sglib.lib.translate import _
 from sglib.models import theme
+from sglib.models.daw.routing import RoutingAnalysis
 from sgui.util import get_font
 from sgui.daw import shared as daw_shared
 
@@ -100,6 +103,8 @@ class RoutingGraphWidget(QGraphicsView):
 
     def backgroundMousePressEvent(self, a_event):
         #QGraphicsRectItem.mousePressEvent(self.background_item, a_event)
+        if a_event.button() == QtCore.Qt.MouseButton.RightButton:
+            return
         if self.toggle_callback:
             f_x, f_y = self.get_coords(a_event.scenePos())
             if f_x == f_y or f_y == 0:
@@ -128,6 +133,30 @@ class RoutingGraphWidget(QGraphicsView):
     def backgroundHoverLeaveEvent(self, a_event):
         self.clear_selection()
 
+    def contextMenuEvent(self, a_event):
+        if not getattr(self, 'graph', None):
+            return
+        f_menu = QMenu(self)
+        f_analysis_action = f_menu.addAction(_("Parallelism analysis..."))
+        f_analysis_action.triggered.connect(self.show_analysis)
+        f_menu.exec(QCursor.pos())
+
+    def show_analysis(self):
+        """ Show how well the routing should scale across CPU cores """
+        f_threads = [1, 2, 4, 8, 16]
+        f_setting = int(util.DEVICE_SETTINGS.get("threads", 0))
+        if f_setting and f_setting not in f_threads:
+            f_threads = sorted(f_threads + [f_setting])
+        f_analysis = RoutingAnalysis(self.graph)
+        QMessageBox.information(
+            self,
+            _("Parallelism analysis"),
+            f_analysis.report(
+                dict(enumerate(self.track_names)),
+                f_threads,
+            ),
+        )
+
     def clear_selection(self):
         for v in self.node_dict.values():
             v.set_brush()
@@ -1,10 +1,12 @@
 from sglib import constants
 from sglib.math import db_to_lin
+from sgui.batch_path import path_from_arrays
 from sgui.shared import (
     AUDIO_ITEM_SCENE_HEIGHT,
     AUDIO_ITEM_SCENE_WIDTH,
 )
 from sgui.sgqt import *
+import numpy
 
 def create_sample_graph(
     sample_graph,
@@ -13,6 +15,16 @@ def create_sample_graph(
     a_height=None,
     a_audio_item=None,
 ):
+    if a_width:
+        # Only draw as many peaks as there are pixels, the paths cached for
+        # scaling (no explicit width) keep the full resolution
+        f_all_high_peaks, f_all_low_peaks = sample_graph.peaks_for_width(
+            a_width,
+        )
+    else:
+        f_all_high_peaks = sample_graph.high_peaks
+        f_all_low_peaks = sample_graph.low_peaks
+    f_count = len(f_all_high_peaks[0])
     if a_audio_item:
         f_ss = a_audio_item.sample_start * 0.001
         f_se = a_audio_item.sample_end * 0.001
@@ -21,9 +33,8 @@ def create_sample_graph(
         by_uid = audio_pool.by_uid()
         ap_entry = by_uid[a_audio_item.uid]
         f_vol = db_to_lin(a_audio_item.vol + ap_entry.volume)
-        f_len = len(sample_graph.high_peaks[0])
-        f_slice_start = int(f_ss * f_len)
-        f_slice_end = int(f_se * f_len)
+        f_slice_start = int(f_ss * f_count)
+        f_slice_end = int(f_se * f_count)
         #a_width *= f_width_frac
     else:
         f_slice_start = None
@@ -35,48 +46,50 @@ def create_sample_graph(
             a_height = AUDIO_ITEM_SCENE_HEIGHT
 
         if a_for_scene:
-            f_width_inc = a_width / sample_graph.count
+            f_width_inc = a_width / f_count
             f_section = a_height / float(sample_graph.channels)
         else:
-            f_width_inc = 98.0 / sample_graph.count
+            f_width_inc = 98.0 / f_count
             f_section = 100.0 / float(sample_graph.channels)
         f_section_div2 = f_section * 0.5
 
         f_paths = []
 
         for f_i in range(sample_graph.channels):
-            f_result = QPainterPath()
-            f_width_pos = 1.0
-            f_result.moveTo(f_width_pos, f_section_div2)
             if a_audio_item and a_audio_item.reversed:
-                f_high_peaks = sample_graph.high_peaks[f_i][
+                f_high_peaks = f_all_high_peaks[f_i][
                     f_slice_end:f_slice_start:-1]
-                f_low_peaks = sample_graph.low_peaks[f_i][::-1]
+                f_low_peaks = f_all_low_peaks[f_i][::-1]
                 f_low_peaks = f_low_peaks[f_slice_start:f_slice_end]
             else:
-                f_high_peaks = sample_graph.high_peaks[f_i][
+                f_high_peaks = f_all_high_peaks[f_i][
                     f_slice_start:f_slice_end]
-                f_low_peaks = sample_graph.low_peaks[f_i][::-1]
+                f_low_peaks = f_all_low_peaks[f_i][::-1]
                 f_low_peaks = f_low_peaks[f_slice_end:f_slice_start:-1]
 
             if a_audio_item:
                 f_high_peaks = f_high_peaks * f_vol
                 f_low_peaks = f_low_peaks * f_vol
 
-            for f_peak in f_high_peaks:
-                f_result.lineTo(
-                    f_width_pos,
-                    f_section_div2 - (f_peak * f_section_div2),
-                )
-                f_width_pos += f_width_inc
-            for f_peak in f_low_peaks:
-                f_result.lineTo(
-                    f_width_pos,
-                    (f_peak * -1.0 * f_section_div2) + f_section_div2,
-                )
-                f_width_pos -= f_width_inc
-            f_result.closeSubpath()
-            f_paths.append(f_result)
+            # Trace the high peaks left to right, then the low peaks back
+            # right to left, and close the polygon at the starting point
+            f_high_count = len(f_high_peaks)
+            f_x = numpy.concatenate((
+                (1.0,),
+                1.0 + (numpy.arange(f_high_count) * f_width_inc),
+                1.0 + (
+                    (f_high_count - numpy.arange(len(f_low_peaks)))
+                    * f_width_inc
+                ),
+                (1.0,),
+            ))
+            f_y = numpy.concatenate((
+                (f_section_div2,),
+                f_section_div2 - (f_high_peaks * f_section_div2),
+                f_section_div2 - (f_low_peaks * f_section_div2),
+                (f_section_div2,),
+            ))
+            f_paths.append(path_from_arrays(f_x, f_y))
         if a_width or a_height:
             return f_paths
         sample_graph.cache = f_paths
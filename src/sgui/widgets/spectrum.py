@@ -1,7 +1,8 @@
 from . import _shared
-from sglib.math import clip_value, lin_to_db, pitch_to_hz
 from sglib.lib import util
+from sgui.batch_path import path_from_arrays
 from sgui.sgqt import *
+import numpy
 
 
 class spectrum(QGraphicsPathItem):
@@ -12,27 +13,45 @@ class spectrum(QGraphicsPathItem):
         self.setPen(QtCore.Qt.GlobalColor.white)
 
     def set_spectrum(self, a_message):
-        self.painter_path = QPainterPath(QtCore.QPointF(0.0, 20.0))
-        self.values = a_message.split("|")
-        self.painter_path.moveTo(0.0, self.spectrum_height)
+        """ @a_message: The magnitude of each FFT bin, either a NumPy array
+                        from the shared memory ring buffer, or a "|"
+                        delimited string from the engine's socket
+        """
+        if isinstance(a_message, str):
+            self.values = numpy.array(a_message.split("|"), dtype=float)
+        else:
+            self.values = a_message
         f_low = _shared.EQ_LOW_PITCH
         f_high = _shared.EQ_HIGH_PITCH
         f_width_per_point = (self.spectrum_width / float(f_high - f_low))
         f_fft_low = float(util.SAMPLE_RATE) * 0.00024414 # / 4096.0
         f_nyquist = float(util.NYQUIST_FREQ)
         nyquist_recip = 1. / f_nyquist
-        f_i = f_low
-        while f_i < f_high:
-            f_hz = pitch_to_hz(f_i) - f_fft_low
-            f_pos = int((f_hz * nyquist_recip) * len(self.values))
-            f_val = float(self.values[f_pos])
-            f_db = lin_to_db(f_val) - 64.0
-            f_db += ((f_i - f_low) * 0.08333333) * 3.0 # / 12.
-            f_db = clip_value(f_db, -70.0, 0.0)
-            f_val = 1.0 - ((f_db + 70.0) * 0.0142857142) # / 70.
-            f_x = f_width_per_point * (f_i - f_low)
-            f_y = f_val * self.spectrum_height
-            self.painter_path.lineTo(f_x, f_y)
-            f_i += 0.5
+        f_pitches = numpy.arange(f_low, f_high, 0.5)
+        # pitch_to_hz
+        f_hz = (
+            440.0 * numpy.power(2.0, (f_pitches - 57.0) * 0.0833333)
+        ) - f_fft_low
+        f_pos = numpy.clip(
+            ((f_hz * nyquist_recip) * len(self.values)).astype(int),
+            0,
+            len(self.values) - 1,
+        )
+        f_vals = self.values[f_pos]
+        # lin_to_db
+        f_db = numpy.where(
+            f_vals >= 0.001,
+            numpy.log10(numpy.maximum(f_vals, 0.001)) * 20.0,
+            -120.0,
+        ) - 64.0
+        f_db += ((f_pitches - f_low) * 0.08333333) * 3.0 # / 12.
+        f_db = numpy.clip(f_db, -70.0, 0.0)
+        f_vals = 1.0 - ((f_db + 70.0) * 0.0142857142) # / 70.
+        f_x = f_width_per_point * (f_pitches - f_low)
+        f_y = f_vals * self.spectrum_height
+        self.painter_path = path_from_arrays(
+            numpy.concatenate(([0.0], f_x)),
+            numpy.concatenate(([self.spectrum_height], f_y)),
+        )
         self.setPath(self.painter_path)
 
@@ -0,0 +1,103 @@
+""" Benchmark item.fix_overlaps.
+
+    Not collected by pytest, run it from the src folder:
+
+        python -m test.benchmark.bench_fix_overlaps [--notes 100000]
+
+    Reports the fastest of --repeat runs, like timeit, and exits with 1 if
+    fixing a recorded or quantized item with --notes notes takes longer
+    than --max-seconds, half a second by default.  The dense
+    item, where most notes start at the same time as another note with the
+    same note number that they overlap, is the worst case and is only
+    reported.
+"""
+
+from sglib.models.clinttools import MIDINote
+from sglib.models.daw.item import item
+import argparse
+import copy
+import random
+import sys
+import time
+
+
+def notes(a_count, a_kind, a_seed=0):
+    """ a_count notes on 2 channels and 16 note numbers
+
+        @a_kind:
+            'recorded':   Starts anywhere, lengths from 1/16 to 2 beats,
+                          about a third of the notes overlap the next note
+                          with the same note number
+            'quantized':  The recorded notes quantized to 1/16 notes, so
+                          that some notes start at the same time
+            'dense':      Notes up to 16 beats long on 1/16 notes, most
+                          of them overlap the next 10 notes
+    """
+    rand = random.Random(a_seed)
+    f_result = []
+    for _ in range(a_count):
+        if a_kind == 'dense':
+            f_start = rand.randint(0, a_count // 4) * 0.25
+            f_length = rand.choice([0.25, 1., 4., 16.])
+        else:
+            f_start = rand.uniform(0., a_count / 32.)
+            if a_kind == 'quantized':
+                f_start = round(f_start * 4.) * 0.25
+            f_length = rand.uniform(0.0625, 2.)
+        f_result.append(
+            MIDINote(
+                f_start,
+                f_length,
+                rand.randint(36, 51),
+                rand.randint(1, 127),
+                channel=rand.randint(0, 1),
+            )
+        )
+    return f_result
+
+def bench(a_count, a_kind, a_pack, a_repeat=1):
+    f_notes = notes(a_count, a_kind)
+    f_result = None
+    for _ in range(a_repeat):
+        f_item = item(1)
+        f_item.notes = copy.deepcopy(f_notes)
+        if a_pack:
+            f_item.pack()
+        f_start = time.perf_counter()
+        f_item.fix_overlaps()
+        f_seconds = time.perf_counter() - f_start
+        if f_result is None or f_seconds < f_result:
+            f_result = f_seconds
+    return f_result, len(f_item.event_arrays().notes)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--max-seconds', type=float, default=0.5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    f_failed = False
+    print(
+        f"{'item':>10} {'notes':>8} {'packed':>8} {'seconds':>8} "
+        f"{'remaining':>10}"
+    )
+    for f_kind in ('recorded', 'quantized', 'dense'):
+        for f_pack in (False, True):
+            f_seconds, f_remaining = bench(
+                args.notes,
+                f_kind,
+                f_pack,
+                args.repeat,
+            )
+            print(
+                f"{f_kind:>10} {args.notes:>8} {str(f_pack):>8} "
+                f"{f_seconds:>8.3f} {f_remaining:>10}"
+            )
+            if f_kind != 'dense' and f_seconds > args.max_seconds:
+                f_failed = True
+    if f_failed:
+        print(f"Slower than {args.max_seconds} seconds")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
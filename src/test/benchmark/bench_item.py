@@ -0,0 +1,85 @@
+""" Benchmark parsing and serializing sequencer items.
+
+    Not collected by pytest, run it from the src folder:
+
+        python -m test.benchmark.bench_item [--max-events 1000000]
+
+    Exits with 1 if the time per event at the largest size is more than
+    --max-ratio times the time per event at the smallest size, which would
+    mean that the scaling is not linear.
+"""
+
+from sglib.models.clinttools import MIDIControl, MIDINote, MIDIPitchbend
+from sglib.models.daw.item import item
+import argparse
+import random
+import sys
+import time
+
+
+def item_text(a_count, a_seed=0):
+    """ An item with a_count events, 70% notes, 20% CCs, 10% pitchbends,
+        like a drum recording with CC lanes
+    """
+    rand = random.Random(a_seed)
+    f_item = item(1)
+    for i in range(a_count):
+        f_start = i * 0.125
+        f_type = rand.random()
+        if f_type < 0.7:
+            f_item.notes.append(
+                MIDINote(
+                    f_start,
+                    0.1,
+                    rand.randint(36, 51),
+                    rand.randint(1, 127),
+                    channel=rand.randint(0, 1),
+                ),
+            )
+        elif f_type < 0.9:
+            f_item.ccs.append(
+                MIDIControl(f_start, 1, rand.randint(0, 127)),
+            )
+        else:
+            f_item.pitchbends.append(
+                MIDIPitchbend(f_start, rand.uniform(-1., 1.)),
+            )
+    return str(f_item)
+
+def bench(a_count):
+    """ Returns (parse seconds, serialize seconds) """
+    f_text = item_text(a_count)
+    f_start = time.perf_counter()
+    f_item = item.from_str(f_text, 1)
+    f_parse = time.perf_counter() - f_start
+    f_start = time.perf_counter()
+    f_result = str(f_item)
+    f_serialize = time.perf_counter() - f_start
+    assert f_result == f_text
+    return f_parse, f_serialize
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-events', type=int, default=1000000)
+    parser.add_argument('--max-ratio', type=float, default=3.)
+    args = parser.parse_args()
+    sizes = [10000]
+    while sizes[-1] * 10 <= args.max_events:
+        sizes.append(sizes[-1] * 10)
+    per_event = []
+    print(f"{'events':>10} {'parse s':>10} {'str s':>10} {'us/event':>10}")
+    for count in sizes:
+        parse, serialize = bench(count)
+        per_event.append((parse + serialize) / count)
+        print(
+            f"{count:>10} {parse:>10.3f} {serialize:>10.3f} "
+            f"{per_event[-1] * 1e6:>10.2f}"
+        )
+    ratio = per_event[-1] / per_event[0]
+    print(f"Time per event ratio {sizes[-1]}/{sizes[0]}: {ratio:.2f}")
+    if ratio > args.max_ratio:
+        print(f"Not linear, the ratio is over {args.max_ratio}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+""" Benchmark paulstretch.paulstretch.
+
+    Not collected by pytest, run it from the src folder:
+
+        python -m test.benchmark.bench_paulstretch [--seconds 60] [--jobs 4]
+
+    Stretches a synthetic stereo file of --seconds seconds by --stretch
+    with each batch size, then with --jobs processes, and reports the
+    real-time factor, the seconds of output rendered per second of
+    processing, and the peak memory used by NumPy in the main process.
+    Exits with 1 if the default batch size, 8, renders slower than
+    --min-realtime with 1 process.
+"""
+
+from sglib.lib import paulstretch
+from sg_py_vendor import wavefile
+import argparse
+import numpy
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+SAMPLE_RATE = 44100
+
+def write_wav(a_path, a_seconds, a_channels=2, a_seed=0):
+    """ Chords that change every half second, with some noise """
+    rand = numpy.random.RandomState(a_seed)
+    f_writer = wavefile.WaveWriter(
+        a_path,
+        channels=a_channels,
+        samplerate=SAMPLE_RATE,
+    )
+    for f_second in range(int(a_seconds)):
+        f_time = numpy.arange(SAMPLE_RATE) / SAMPLE_RATE
+        f_data = numpy.zeros((a_channels, SAMPLE_RATE), order='F')
+        for f_note in rand.randint(40, 80, 3):
+            f_hz = 440. * 2. ** ((f_note - 69) / 12.)
+            f_data += 0.2 * numpy.sin(2. * numpy.pi * f_hz * f_time)
+        f_data[:, SAMPLE_RATE // 2:] *= 0.5
+        f_data += 0.02 * rand.standard_normal(f_data.shape)
+        f_writer.write(f_data)
+    f_writer.close()
+
+def bench(a_src, a_dest, a_stretch, a_batch_size, a_jobs=1):
+    tracemalloc.start()
+    f_start = time.perf_counter()
+    paulstretch.paulstretch(
+        a_src,
+        a_stretch,
+        0.25,
+        10.0,
+        a_dest,
+        batch_size=a_batch_size,
+        jobs=a_jobs,
+        seed=0,
+    )
+    f_seconds = time.perf_counter() - f_start
+    f_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    f_reader = wavefile.WaveReader(a_dest)
+    f_output_seconds = f_reader.frames / f_reader.samplerate
+    f_reader.close()
+    return f_seconds, f_output_seconds / f_seconds, f_peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=60.)
+    parser.add_argument('--stretch', type=float, default=8.)
+    parser.add_argument('--jobs', type=int, default=4)
+    parser.add_argument('--min-realtime', type=float, default=1.)
+    args = parser.parse_args()
+    f_failed = False
+    with tempfile.TemporaryDirectory() as f_dir:
+        f_src = os.path.join(f_dir, 'src.wav')
+        f_dest = os.path.join(f_dir, 'dest.wav')
+        write_wav(f_src, args.seconds)
+        print(
+            f"{'batch':>6} {'jobs':>5} {'seconds':>8} {'realtime':>9} "
+            f"{'peak MB':>8}"
+        )
+        for f_batch_size, f_jobs in (
+            (1, 1),
+            (8, 1),
+            (32, 1),
+            (8, args.jobs),
+        ):
+            f_seconds, f_realtime, f_peak = bench(
+                f_src,
+                f_dest,
+                args.stretch,
+                f_batch_size,
+                f_jobs,
+            )
+            print(
+                f"{f_batch_size:>6} {f_jobs:>5} {f_seconds:>8.2f} "
+                f"{f_realtime:>8.1f}x {f_peak:>8.1f}"
+            )
+            if (
+                (f_batch_size, f_jobs) == (8, 1)
+                and
+                f_realtime < args.min_realtime
+            ):
+                f_failed = True
+    if f_failed:
+        print(f"Slower than {args.min_realtime}x realtime")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from sglib.ipc.jobs import EngineJobs
+import concurrent.futures
+import os
+import pytest
+import tempfile
+import threading
+
+
+def test_finish_by_message():
+    jobs = EngineJobs()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, '1')
+        future = jobs.add(path)
+        assert not future.done()
+        # The engine may format the path differently
+        timer = threading.Timer(
+            0.01,
+            jobs.finish,
+            (os.path.join(tmpdir, '.', '1'),),
+        )
+        timer.start()
+        assert future.result(5.) == os.path.join(tmpdir, '.', '1')
+        assert jobs.pending() == 0
+        assert not jobs.finish(path)
+
+def test_finish_by_file():
+    jobs = EngineJobs()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'out.wav')
+        future = jobs.add(path)
+        with open(f"{path}.finished", 'w'):
+            pass
+        assert future.result(5.) == path
+        assert not os.path.exists(f"{path}.finished")
+
+def test_stale_finished_file_is_ignored():
+    jobs = EngineJobs()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'out.wav')
+        with open(f"{path}.finished", 'w'):
+            pass
+        future = jobs.add(path)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            future.result(0.2)
+        jobs.finish(path)
+        assert future.result(0.) == path
+
+def test_cancel_all():
+    jobs = EngineJobs()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        future = jobs.add(os.path.join(tmpdir, '2'))
+        jobs.cancel_all('engine exited')
+        with pytest.raises(RuntimeError):
+            future.result(0.)
+        assert jobs.pending() == 0
+
+def test_result_timeout():
+    jobs = EngineJobs()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, '3')
+        future = jobs.add(path)
+        with pytest.raises(TimeoutError):
+            jobs.result(future, 0.05)
+        assert jobs.pending() == 0
+        assert not jobs.finish(path)
+        with pytest.raises(TimeoutError):
+            future.result(0.)
+        future = jobs.add(path)
+        jobs.finish(path)
+        assert jobs.result(future, 0.05) == path
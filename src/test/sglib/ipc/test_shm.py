@@ -0,0 +1,104 @@
+from sglib.ipc.shm import *
+from sglib.ipc.shm import HEADER_DTYPE, SHM_MAGIC, SHM_VERSION, frame_dtype
+import numpy
+import os
+import tempfile
+
+
+class _Writer:
+    """ Writes frames the way the engine does """
+    def __init__(self, a_folder, a_frame_count=4, a_max_values=8):
+        self.path = os.path.join(a_folder, SHM_FILE_NAME)
+        self.frame_dtype = frame_dtype(a_max_values)
+        self.data = numpy.memmap(
+            self.path,
+            dtype=numpy.uint8,
+            mode='w+',
+            shape=(
+                HEADER_DTYPE.itemsize
+                + (self.frame_dtype.itemsize * a_frame_count),
+            ),
+        )
+        self.header = self.data[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+        self.frames = self.data[HEADER_DTYPE.itemsize:].view(self.frame_dtype)
+        self.header['version'] = SHM_VERSION
+        self.header['frame_count'] = a_frame_count
+        self.header['max_values'] = a_max_values
+        self.header['magic'] = SHM_MAGIC
+
+    def write(self, a_type, a_id, a_values):
+        index = int(self.header['reserved_index'])
+        self.header['reserved_index'] = index + 1
+        frame = self.frames[index % len(self.frames)]
+        frame['seq'] = 0
+        frame['type'] = a_type
+        frame['id'] = a_id
+        frame['count'] = len(a_values)
+        frame['values'][:len(a_values)] = a_values
+        frame['seq'] = index + 1
+        self.header['write_index'] = index + 1
+        self.data.flush()
+
+def test_read_frames():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert ShmRingReader.open(tmpdir) is None
+        writer = _Writer(tmpdir)
+        reader = ShmRingReader.open(tmpdir)
+        assert reader.read() == []
+        writer.write(SHM_PEAK, 0, [0., 0.5, 0.25, 3., 0.1, 0.2])
+        writer.write(SHM_POSITION, 0, [16.5])
+        frames = reader.read()
+        assert [x[:2] for x in frames] == [
+            (SHM_PEAK, 0),
+            (SHM_POSITION, 0),
+        ], frames
+        assert frames[0][2].reshape(-1, 3).shape == (2, 3)
+        assert frames[1][2][0] == 16.5
+        # The values are copies, not views of the file
+        writer.write(SHM_POSITION, 0, [17.])
+        assert frames[1][2][0] == 16.5
+        assert reader.read()[0][2][0] == 17.
+        assert reader.read() == []
+        reader.close()
+
+def test_overwritten_frames_dropped():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = _Writer(tmpdir, a_frame_count=4)
+        reader = ShmRingReader.open(tmpdir)
+        for i in range(10):
+            writer.write(SHM_SPECTRUM, 5, [float(i)] * 8)
+        frames = reader.read()
+        assert [x[2][0] for x in frames] == [6., 7., 8., 9.], frames
+        assert reader.dropped == 6, reader.dropped
+        writer.write(SHM_SPECTRUM, 5, [10.] * 8)
+        writer.write(SHM_SPECTRUM, 6, [11.] * 8)
+        latest = reader.latest()
+        assert sorted(latest) == [(SHM_SPECTRUM, 5), (SHM_SPECTRUM, 6)]
+        reader.close()
+
+def test_unfinished_frame_skipped():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = _Writer(tmpdir)
+        reader = ShmRingReader.open(tmpdir)
+        writer.write(SHM_POSITION, 0, [1.])
+        writer.write(SHM_POSITION, 0, [2.])
+        # Another writer reserved the first frame again, but has not
+        # published it
+        writer.frames[0]['seq'] = 0
+        assert [x[2][0] for x in reader.read()] == [2.]
+        reader.close()
+
+def test_engine_restart():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        writer = _Writer(tmpdir)
+        reader = ShmRingReader.open(tmpdir)
+        for i in range(3):
+            writer.write(SHM_POSITION, 0, [float(i)])
+        assert len(reader.read()) == 3
+        writer = _Writer(tmpdir)
+        writer.write(SHM_POSITION, 0, [5.])
+        # The index went backwards, the reader starts from the new index
+        assert reader.read() == []
+        writer.write(SHM_POSITION, 0, [6.])
+        assert [x[2][0] for x in reader.read()] == [6.]
+        reader.close()
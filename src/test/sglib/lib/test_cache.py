@@ -0,0 +1,63 @@
+from sglib.lib.cache import *
+
+
+def test_lru_eviction():
+    cache = LRUCache('test-lru', 30, len)
+    cache.put('a', 'x' * 10)
+    cache.put('b', 'x' * 10)
+    cache.put('c', 'x' * 10)
+    assert cache.bytes == 30, cache.bytes
+    # Mark 'a' as recently used, 'b' is now the oldest
+    assert cache.get('a') == 'x' * 10
+    cache.put('d', 'x' * 10)
+    assert 'b' not in cache
+    assert 'a' in cache
+    assert cache.bytes == 30, cache.bytes
+    stats = cache.stats()
+    assert stats['evictions'] == 1, stats
+    assert stats['hits'] == 1, stats
+    assert cache.get('b') is None
+    assert cache.stats()['misses'] == 1, cache.stats()
+
+def test_replace_and_pop():
+    cache = LRUCache('test-replace', 100, len)
+    cache.put('a', 'x' * 10)
+    cache.put('a', 'x' * 20)
+    assert len(cache) == 1, len(cache)
+    assert cache.bytes == 20, cache.bytes
+    assert cache.pop('a') == 'x' * 20
+    assert cache.pop('a') is None
+    assert cache.bytes == 0, cache.bytes
+
+def test_too_large_not_cached():
+    cache = LRUCache('test-large', 5, len)
+    value = cache.put('a', 'x' * 10)
+    assert value == 'x' * 10
+    assert 'a' not in cache
+    assert cache.bytes == 0, cache.bytes
+
+def test_invalidate_by_tag():
+    graphs = LRUCache('test-graphs', 100)
+    pixmaps = LRUCache('test-pixmaps', 100)
+    graphs.put('graph0', 0, ((AUDIO_POOL_UID, 0),))
+    graphs.put('graph1', 1, ((AUDIO_POOL_UID, 1),))
+    pixmaps.put('item0', 0, ((ITEM_UID, 5), (AUDIO_POOL_UID, 0)))
+    pixmaps.put('item1', 1, ((ITEM_UID, 6), (AUDIO_POOL_UID, 1)))
+    assert invalidate_audio_pool_uid(0) == 2
+    assert 'graph0' not in graphs
+    assert 'item0' not in pixmaps
+    assert 'graph1' in graphs
+    assert invalidate_item_uid(6) == 1
+    assert 'item1' not in pixmaps
+    assert 'graph1' in graphs
+    assert pixmaps.bytes == 0, pixmaps.bytes
+    # The tag index is cleaned up along with the entries
+    assert not pixmaps._tags, pixmaps._tags
+
+def test_clear():
+    cache = LRUCache('test-clear', 100, len)
+    cache.put('a', 'x', ((ITEM_UID, 1),))
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.bytes == 0
+    assert cache.invalidate((ITEM_UID, 1)) == 0
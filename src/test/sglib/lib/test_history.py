@@ -0,0 +1,176 @@
+from sglib.lib import history
+from sglib.lib.history import *
+import os
+import random
+import tempfile
+
+
+def _save(a_history, a_folder, a_name, a_text):
+    """ Like AbstractProject.save_file """
+    path = os.path.join(a_folder, a_name)
+    existed = os.path.isfile(path)
+    old = ''
+    if existed:
+        with open(path) as f:
+            old = f.read()
+    with open(path, 'w') as f:
+        f.write(a_text)
+    a_history.add_file('', a_name, a_text, old, existed)
+
+def _read(a_folder, a_name):
+    with open(os.path.join(a_folder, a_name)) as f:
+        return f.read()
+
+def _text(a_seed):
+    rand = random.Random(a_seed)
+    return '\n'.join(str(rand.random()) for _ in range(500))
+
+def test_versions_shared_between_commits():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        h = ProjectHistory()
+        for i in range(10):
+            _save(h, tmpdir, 'item', _text(i))
+            h.commit(f'edit {i}')
+        # Each version is stored once
+        assert len(h.blobs) == 11, len(h.blobs)
+        for i in reversed(range(10)):
+            assert h.undo(tmpdir)
+            if i:
+                assert _read(tmpdir, 'item') == _text(i - 1)
+        assert not os.path.exists(os.path.join(tmpdir, 'item'))
+        assert not h.undo(tmpdir)
+        assert h.redo(tmpdir)
+        assert h.redo(tmpdir)
+        assert _read(tmpdir, 'item') == _text(1)
+
+def test_commit_after_undo_drops_redo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        h = ProjectHistory()
+        for i in range(5):
+            _save(h, tmpdir, 'item', str(i))
+            h.commit(f'edit {i}')
+        h.undo(tmpdir)
+        h.undo(tmpdir)
+        _save(h, tmpdir, 'item', 'new')
+        h.commit('new')
+        assert [x.message for x in h.commits[0]] == [
+            'edit 0', 'edit 1', 'edit 2', 'new',
+        ]
+        assert not h.redo(tmpdir)
+        assert h.undo(tmpdir)
+        assert _read(tmpdir, 'item') == '2'
+
+def test_memory_budget_evicts_oldest():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        h = ProjectHistory(20000)
+        for i in range(20):
+            h.set_context(i % 2)
+            _save(h, tmpdir, f'item{i % 2}', _text(i))
+            h.commit(f'edit {i}')
+            assert h.blobs.size <= 20000 or len(h.commits[i % 2]) == 1
+        commits = h.commits[0] + h.commits[1]
+        assert 1 < len(commits) < 20, len(commits)
+        assert max(x.seq for x in commits) == 20
+        # The newest commits were kept
+        assert h.commits[1][-1].message == 'edit 19'
+        assert h.undo(tmpdir)
+        assert _read(tmpdir, 'item1') == _text(17)
+
+def test_journal_restores_history():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journal = os.path.join(tmpdir, 'journal')
+        h = ProjectHistory(20000)
+        h.open_journal(journal, tmpdir)
+        for i in range(20):
+            _save(h, tmpdir, 'item', _text(i))
+            h.commit(f'edit {i}')
+        # Blobs over the budget were spilled, not forgotten
+        assert h.blobs.size <= 20000, h.blobs.size
+        assert len(h.commits[0]) == 20
+        h.undo(tmpdir)
+        h.close_journal()
+
+        h = ProjectHistory(20000)
+        assert h.open_journal(journal, tmpdir)
+        assert h.blobs.size == 0, h.blobs.size
+        assert len(h.commits[0]) == 20
+        assert h.redo(tmpdir)
+        assert _read(tmpdir, 'item') == _text(19)
+        for i in reversed(range(1, 20)):
+            assert h.undo(tmpdir)
+            assert _read(tmpdir, 'item') == _text(i - 1)
+        h.close_journal()
+
+def test_journal_discarded_if_files_changed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journal = os.path.join(tmpdir, 'journal')
+        h = ProjectHistory()
+        h.open_journal(journal, tmpdir)
+        _save(h, tmpdir, 'item', 'a')
+        h.commit('a')
+        h.close_journal()
+        with open(os.path.join(tmpdir, 'item'), 'w') as f:
+            f.write('changed outside of the history')
+        h = ProjectHistory()
+        assert not h.open_journal(journal, tmpdir)
+        assert not h.undo(tmpdir)
+        assert not os.path.exists(journal)
+
+def test_journal_partial_line_and_cleared_context():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journal = os.path.join(tmpdir, 'journal')
+        h = ProjectHistory()
+        h.open_journal(journal, tmpdir)
+        h.set_context(1)
+        _save(h, tmpdir, 'item', 'a')
+        h.commit('a')
+        h.clear_context(1)
+        h.set_context(0)
+        _save(h, tmpdir, 'item', 'b')
+        h.commit('b')
+        h.close_journal()
+        with open(journal, 'ab') as f:
+            f.write(b'{"commit": 0, "seq"')
+        h = ProjectHistory()
+        assert h.open_journal(journal, tmpdir)
+        assert 1 not in h.commits
+        assert [x.message for x in h.commits[0]] == ['b']
+        _save(h, tmpdir, 'item', 'c')
+        h.commit('c')
+        h.close_journal()
+        h = ProjectHistory()
+        assert h.open_journal(journal, tmpdir)
+        assert [x.message for x in h.commits[0]] == ['b', 'c']
+        h.close_journal()
+
+def test_journal_compacted(monkeypatch):
+    monkeypatch.setattr(history, 'JOURNAL_MAX_BYTES', 40000)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journal = os.path.join(tmpdir, 'journal')
+        h = ProjectHistory()
+        h.open_journal(journal, tmpdir)
+        for i in range(20):
+            h.set_context(i % 2)
+            _save(h, tmpdir, 'item', _text(i))
+            h.commit(f'edit {i}')
+        h.set_context(0)
+        h.undo(tmpdir)
+        h.close_journal()
+        size = os.path.getsize(journal)
+        assert size > 40000, size
+
+        h = ProjectHistory()
+        assert h.open_journal(journal, tmpdir)
+        assert os.path.getsize(journal) < 40000, os.path.getsize(journal)
+        commits = h.commits[0] + h.commits[1]
+        assert 1 < len(commits) < 20, len(commits)
+        assert h.commits[1][-1].message == 'edit 19'
+        h.close_journal()
+
+        h = ProjectHistory()
+        assert h.open_journal(journal, tmpdir)
+        assert h.cursors[0] == 1
+        h.set_context(0)
+        assert h.redo(tmpdir)
+        assert _read(tmpdir, 'item') == _text(18)
+        h.close_journal()
@@ -0,0 +1,37 @@
+from sg_py_vendor import wavefile
+from sglib.lib import paulstretch
+import numpy
+import os
+import tempfile
+
+
+def _stretch(a_src, a_dest, a_jobs):
+    paulstretch.paulstretch(
+        a_src,
+        4.,
+        0.05,
+        0.5,
+        a_dest,
+        batch_size=2,
+        jobs=a_jobs,
+        seed=1234,
+    )
+    with wavefile.WaveReader(a_dest) as f:
+        data = f.buffer(f.frames)
+        f.read(data)
+    return data
+
+def test_jobs_same_output():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, 'src.wav')
+        rand = numpy.random.default_rng(0)
+        with wavefile.WaveWriter(src, channels=2, samplerate=8000) as f:
+            f.write(
+                rand.uniform(-0.5, 0.5, (2, 8000)).astype(numpy.float32),
+            )
+        expected = _stretch(src, os.path.join(tmpdir, '1.wav'), 1)
+        # More than 2 segments of 64 output frames of 200 samples
+        assert expected.shape[1] > 2 * 64 * 200, expected.shape
+        result = _stretch(src, os.path.join(tmpdir, '2.wav'), 2)
+        assert result.shape == expected.shape
+        numpy.testing.assert_allclose(result, expected, atol=1e-6)
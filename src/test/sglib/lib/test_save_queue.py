@@ -0,0 +1,104 @@
+from sglib.lib.save_queue import *
+from sglib.lib import util
+import os
+import tempfile
+import threading
+
+
+def test_write_read_flush():
+    queue = SaveQueue(a_fsync=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'file.txt')
+        assert queue.read(path) is None
+        for i in range(100):
+            queue.write(path, str(i))
+        assert queue.read(path) in [str(x) for x in range(100)]
+        assert queue.flush(5.)
+        assert queue.pending() == 0
+        assert queue.read(path) is None
+        with open(path) as f:
+            assert f.read() == '99'
+        assert os.listdir(tmpdir) == ['file.txt']
+
+def test_coalesce_while_writing():
+    queue = SaveQueue(a_fsync=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [os.path.join(tmpdir, str(i)) for i in range(10)]
+        lock = threading.Lock()
+        write_batch = queue._write_batch
+        batches = []
+        def _write_batch(a_files):
+            with lock:
+                batches.append(dict(a_files))
+            return write_batch(a_files)
+        queue._write_batch = _write_batch
+        with lock:
+            queue.write(paths[0], 'a')
+            # The first batch is blocked, these are coalesced
+            for i in range(3):
+                for path in paths:
+                    queue.write(path, f'b{i}')
+            assert queue.read(paths[0]) == 'b2'
+        assert queue.flush(5.)
+        assert len(batches) <= 2, batches
+        assert batches[-1] == {
+            SaveQueue.key(x): 'b2' for x in paths
+        }, batches
+        for path in paths:
+            with open(path) as f:
+                assert f.read() == 'b2'
+
+def test_discard_and_call_after():
+    queue = SaveQueue(a_fsync=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'file.txt')
+        called = threading.Event()
+        queue.write(path, 'a')
+        queue.discard(path)
+        queue.call_after(queue.generation, called.set)
+        assert called.wait(5.)
+        assert queue.read(path) is None
+        called.clear()
+        queue.call_after(queue.generation, called.set)
+        assert called.is_set()
+
+def test_util_reads_queued_text():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'file.txt')
+        util.write_file_text(path, 'old')
+        SAVE_QUEUE.write(path, 'line1\nline2')
+        assert util.read_file_text(path) == 'line1\nline2'
+        assert util.read_file_lines(path) == ['line1\n', 'line2']
+        # A direct write replaces the queued text
+        util.write_file_text(path, 'new')
+        assert SAVE_QUEUE.flush(5.)
+        assert util.read_file_text(path) == 'new'
+
+def test_failed_write_raised_and_retried():
+    queue = SaveQueue(a_fsync=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = os.path.join(tmpdir, 'folder')
+        path = os.path.join(folder, 'file.txt')
+        other = os.path.join(tmpdir, 'other.txt')
+        # The folder does not exist
+        queue.write(path, 'a')
+        queue.write(other, 'b')
+        try:
+            queue.flush(5.)
+            assert False, "Did not raise"
+        except SaveError as ex:
+            assert list(ex.errors) == [SaveQueue.key(path)], ex.errors
+        assert queue.read(path) == 'a'
+        assert queue.pending() == 1
+        assert list(queue.pop_errors()) == [SaveQueue.key(path)]
+        assert queue.pop_errors() == {}
+        with open(other) as f:
+            assert f.read() == 'b'
+        # Written with the next batch
+        os.mkdir(folder)
+        queue.write(other, 'c')
+        assert queue.flush(5.)
+        with open(path) as f:
+            assert f.read() == 'a'
+        assert queue.read(path) is None
+        assert queue.pending() == 0
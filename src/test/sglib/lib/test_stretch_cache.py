@@ -0,0 +1,82 @@
+from sglib.lib.stretch_cache import StretchCache, tool_version
+import os
+import tempfile
+
+
+def _write(a_path, a_size, a_byte=b'x'):
+    with open(a_path, 'wb') as f:
+        f.write(a_byte * a_size)
+
+def test_key_by_content():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = StretchCache(os.path.join(tmpdir, 'cache'), 1000)
+        a = os.path.join(tmpdir, 'a.wav')
+        b = os.path.join(tmpdir, 'b.wav')
+        _write(a, 10)
+        _write(b, 10)
+        key = cache.key(a, 3, (2.0, 0.0), '1')
+        assert cache.key(b, 3, (2.0, 0.0), '1') == key
+        assert cache.key(a, 4, (2.0, 0.0), '1') != key
+        assert cache.key(a, 3, (2.0, 1.0), '1') != key
+        assert cache.key(a, 3, (2.0, 0.0), '2') != key
+        _write(b, 10, b'y')
+        assert cache.key(b, 3, (2.0, 0.0), '1') != key
+        # Shared with other processes
+        other = StretchCache(cache.dir, 1000)
+        assert other.content_hash(a) == cache.content_hash(a)
+        other.close()
+        cache.close()
+    assert tool_version(a) == ''
+    assert tool_version(__file__)
+
+def test_get_put_evict():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = StretchCache(os.path.join(tmpdir, 'cache'), 250)
+        src = os.path.join(tmpdir, 'src.wav')
+        dest = os.path.join(tmpdir, 'dest.wav')
+        assert not cache.get('a', dest)
+        for key, size in (('a', 100), ('b', 100)):
+            _write(src, size, key.encode())
+            cache.put(key, src)
+        assert cache.get('a', dest)
+        with open(dest, 'rb') as f:
+            assert f.read() == b'a' * 100
+        # b is the least recently used
+        _write(src, 100, b'c')
+        cache.put('c', src)
+        assert cache.stats() == {'entries': 2, 'bytes': 200}
+        assert not cache.get('b', dest)
+        assert not os.path.exists(os.path.join(cache.dir, 'b.wav'))
+        assert cache.get('a', dest) and cache.get('c', dest)
+        # Larger than the budget
+        _write(src, 300)
+        cache.put('d', src)
+        assert not cache.get('d', dest)
+        # Deleted outside of the cache
+        os.remove(os.path.join(cache.dir, 'a.wav'))
+        assert not cache.get('a', dest)
+        assert cache.stats() == {'entries': 1, 'bytes': 100}
+        cache.close()
+
+def test_put_temp_files_and_prune_sources():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = StretchCache(os.path.join(tmpdir, 'cache'), 150)
+        src = os.path.join(tmpdir, 'src.wav')
+        other = os.path.join(tmpdir, 'other.wav')
+        _write(src, 100)
+        _write(other, 10)
+        cache.content_hash(src)
+        cache.content_hash(other)
+        cache.put('a', src)
+        assert sorted(os.listdir(cache.dir)) == ['a.wav', 'index.sqlite']
+        os.remove(other)
+        _write(src, 100, b'y')
+        os.utime(src, ns=(0, 0))
+        # Evicts a, and the hashes of the deleted and the changed file
+        cache.put('b', src)
+        assert not cache.get('a', os.path.join(tmpdir, 'dest.wav'))
+        assert cache._db.execute(
+            'SELECT COUNT(*) FROM sources',
+        ).fetchone()[0] == 0
+        assert not [x for x in os.listdir(cache.dir) if x.endswith('.tmp')]
+        cache.close()
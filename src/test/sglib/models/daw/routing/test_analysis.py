@@ -0,0 +1,78 @@
+from sglib.models.daw.routing import RoutingAnalysis, RoutingGraph
+import os
+import sys
+import tempfile
+
+
+def _graph(a_sends):
+    graph = RoutingGraph()
+    for src, dest in a_sends:
+        assert graph.toggle(src, dest) is None
+    return graph
+
+def test_all_tracks_to_main():
+    analysis = RoutingAnalysis(_graph((x, 0) for x in range(1, 9)))
+    assert analysis.critical_path_length == 2
+    assert analysis.widths == [8, 1]
+    assert analysis.critical_path == [1, 0]
+    assert analysis.serializing_sends == []
+    assert analysis.speedup(1) == 1.
+    assert analysis.speedup(4) == 9. / 3.
+    assert analysis.speedup(16) == analysis.max_speedup() == 9. / 2.
+
+def test_chain_of_buses():
+    graph = _graph(
+        [(1, 5), (2, 5), (3, 0), (4, 0), (5, 6), (6, 0), (7, 6), (8, 9)]
+    )
+    analysis = RoutingAnalysis(graph)
+    assert analysis.levels == {
+        0: 1, 1: 4, 2: 4, 3: 2, 4: 2, 5: 3, 6: 2, 7: 3,
+    }, analysis.levels
+    assert analysis.unrouted == [8], analysis.unrouted
+    assert analysis.critical_path == [1, 5, 6, 0], analysis.critical_path
+    assert analysis.widths == [2, 2, 3, 1], analysis.widths
+    assert [
+        (x.track_num, x.output) for x in analysis.serializing_sends
+    ] == [(1, 5), (2, 5), (5, 6)]
+    # 7 -> 6 is not on a critical path
+    assert analysis.speedup(2) == 8. / 5.
+    report = analysis.report({x: f"track{x}" for x in range(10)}, (2,))
+    assert "track1 -> track5 -> track6 -> track0" in report, report
+    assert " 2 threads: 1.60x" in report, report
+
+def test_bus_waits_for_its_inputs():
+    # The other tracks of the level of bus 2 start while 1 is processed
+    analysis = RoutingAnalysis(
+        _graph([(1, 2), (2, 0), (3, 0), (4, 0), (5, 0)])
+    )
+    assert analysis.widths == [1, 4, 1], analysis.widths
+    assert analysis.speedup(3) == 6. / 3.
+    # Thread 2 waits for 1 before it processes bus 2
+    assert analysis.speedup(2) == 6. / 4.
+    assert analysis.max_speedup() == 6. / 3.
+
+def test_empty():
+    analysis = RoutingAnalysis(RoutingGraph())
+    assert analysis.critical_path_length == 0
+    assert analysis.speedup(4) == analysis.max_speedup() == 1.
+    assert analysis.report()
+
+def test_cli(monkeypatch, capsys):
+    from sglib.models.daw.routing import analysis as analysis_module
+    graph = _graph([(1, 2), (2, 0), (3, 0)])
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folder = os.path.join(tmpdir, 'projects', 'daw')
+        os.makedirs(folder)
+        with open(os.path.join(folder, 'routing.txt'), 'w') as f:
+            f.write(str(graph))
+        project_file = os.path.join(tmpdir, 'clinttools.project')
+        open(project_file, 'w').close()
+        monkeypatch.setattr(
+            sys,
+            'argv',
+            ['analysis', project_file, '-t', '2'],
+        )
+        analysis_module.main()
+    output = capsys.readouterr().out
+    assert "Critical path: 3 tracks\n    1 -> 2 -> 0" in output, output
+    assert " 2 threads: 1.33x" in output, output
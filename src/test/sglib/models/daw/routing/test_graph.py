@@ -1,4 +1,5 @@
 from sglib.models.daw.routing import RoutingGraph, TrackSend
+import random
 
 
 def test_to_from_str():
@@ -67,3 +68,82 @@ def test_reorder():
         "conn_type": 0,
     }, node.__dict__
 
+
+def _levels(a_graph):
+    """ The levels of each track by trying every path """
+    def _paths(a_src, a_path):
+        a_path = a_path + [a_src]
+        if a_src == 0:
+            return [a_path]
+        f_result = []
+        for f_send in a_graph.graph.get(a_src, {}).values():
+            if f_send.output not in a_path:
+                f_result.extend(_paths(f_send.output, a_path))
+        return f_result
+    f_tracks = set(a_graph.graph).union(
+        x.output for y in a_graph.graph.values() for x in y.values()
+    )
+    return {
+        k: max((len(x) for x in _paths(k, [])), default=0)
+        for k in f_tracks
+    }
+
+def test_levels_updated_in_place():
+    rand = random.Random(0)
+    graph = RoutingGraph()
+    for _ in range(400):
+        src = rand.randint(0, 12)
+        dest = rand.randint(0, 12)
+        if src == dest:
+            continue
+        msg = graph.toggle(src, dest, rand.randint(0, 2))
+        if msg is None:
+            # Connected or disconnected, there is never a cycle
+            assert not graph.reaches(dest, src)
+        else:
+            assert graph.reaches(dest, src)
+        levels = _levels(graph)
+        assert {
+            k: v for k, v in graph.levels().items() if k in levels
+        } == levels
+        assert [levels[x] for x in graph.sort_all_paths()] == sorted(
+            (levels[x] for x in graph.graph),
+            reverse=True,
+        )
+        if rand.random() < 0.1:
+            # Rebuilt from scratch
+            graph = RoutingGraph.from_str(str(graph))
+        if rand.random() < 0.1:
+            track_num = rand.randint(1, 12)
+            graph.set_node(
+                track_num,
+                {0: TrackSend(track_num, 0, 0, 0)},
+            )
+
+def test_long_chain():
+    graph = RoutingGraph()
+    for i in range(1, 512):
+        graph.set_default_output(i, i - 1)
+        for j in range(max(0, i - 8), i - 1):
+            assert graph.toggle(i, j) is None
+    assert graph.sort_all_paths()[0] == 511
+    assert graph.levels()[511] == 512
+    assert graph.check_for_feedback(0, 511)
+    assert not graph.check_for_feedback(511, 0)
+    graph.toggle(256, 255)
+    assert graph.levels()[511] == 512 - 1
+
+def test_set_node_cycle():
+    graph = RoutingGraph()
+    graph.toggle(1, 2)
+    graph.toggle(2, 0)
+    assert graph.levels()[1] == 3
+    graph.set_node(2, {0: TrackSend(2, 0, 1, 0)})
+    assert graph.levels()[1] == graph.levels()[2] == 0
+    assert graph.sort_all_paths()
+    # Toggling a send of a track on the cycle does not hang either
+    graph.toggle(1, 0)
+    assert graph.levels()[1] == 0
+    # Removing the cycle
+    graph.set_node(2, {0: TrackSend(2, 0, 0, 0)})
+    assert graph.levels()[1] == 3, graph.levels()
@@ -0,0 +1,95 @@
+from sglib.models.daw import DawAtmPoint, DawAtmRegion
+import random
+
+
+def _random_points(a_seed, a_count):
+    rand = random.Random(a_seed)
+    return [
+        DawAtmPoint(
+            rand.randint(0, 400) * 0.25,
+            rand.randint(0, 2),
+            rand.randint(0, 127),
+            rand.randint(0, 3),
+            7,
+        )
+        for _ in range(a_count)
+    ]
+
+def _region(a_points):
+    f_result = DawAtmRegion()
+    for f_point in a_points:
+        f_result.add_point(f_point)
+    return f_result
+
+def _key(a_point):
+    return (a_point.index, a_point.port_num, a_point.beat)
+
+def _sorted(a_points):
+    return sorted(a_points, key=_key)
+
+def _assert_points(a_region, a_points):
+    f_points = a_region.points
+    assert [_key(x) for x in f_points] == sorted(_key(x) for x in a_points)
+    assert {id(x) for x in f_points} == {id(x) for x in a_points}
+
+def test_str_sorts_each_port():
+    f_points = _random_points(0, 500)
+    f_region = _region(f_points)
+    f_lines = str(f_region).split("\n")
+    assert f_lines[0] == "p|0|3", f_lines[0]
+    assert [x for x in f_lines if x[0] not in "pq\\"] == [
+        str(x) for x in _sorted(f_points)
+    ]
+    assert str(DawAtmRegion.from_str(str(f_region))) == str(f_region)
+
+def test_range_operations():
+    f_points = _random_points(1, 500)
+    f_region = _region(f_points)
+    f_removed = f_region.clear_range(1, 2, 10., 20.)
+    assert f_removed == [
+        x for x in _sorted(f_points)
+        if (x.index, x.port_num) == (1, 2) and 10. <= x.beat < 20.
+    ]
+    f_points = [x for x in f_points if x not in f_removed]
+    f_region.clear_range_by_plugins(50., 60., [0, 3])
+    f_points = [
+        x for x in f_points
+        if x.index not in (0, 3) or not 50. <= x.beat < 60.
+    ]
+    f_copy = f_region.copy_range_by_plugins(4., 8., [2])
+    assert [str(x) for x in f_copy] == [
+        str(DawAtmPoint(x.beat - 4., x.port_num, x.cc_val, 2, 7))
+        for x in _sorted(f_points)
+        if x.index == 2 and 4. <= x.beat < 8.
+    ]
+    f_region.insert_space(30., 2.)
+    for f_point in f_points:
+        assert f_point in f_region.get_points(f_point.index, f_point.port_num)
+    _assert_points(f_region, f_points)
+
+def test_points_edited_in_place():
+    f_points = _random_points(2, 300)
+    f_region = _region(f_points)
+    rand = random.Random(3)
+    for i in range(100):
+        f_point = rand.choice(f_points)
+        f_point.beat = rand.randint(0, 400) * 0.25
+        if i % 3 == 0:
+            f_region.remove_point(f_point)
+            f_points.remove(f_point)
+        f_list = f_region.get_points(f_point.index, f_point.port_num)
+        assert [x.beat for x in f_list] == sorted(x.beat for x in f_list)
+    _assert_points(f_region, f_points)
+
+def test_smooth_points_does_not_duplicate():
+    f_region = DawAtmRegion()
+    f_points = [
+        DawAtmPoint(x, 3, y, 1, 7)
+        for x, y in ((0., 0.), (1., 127.), (1.03, 0.), (2., 0.))
+    ]
+    for f_point in f_points:
+        f_region.add_point(f_point)
+    f_region.smooth_points(1, 3, 7, f_points[:], True)
+    f_beats = [x.beat for x in f_region.get_points(1, 3)]
+    assert len(f_beats) == len(set(f_beats)), f_beats
+    assert f_beats[0] == 0. and f_beats[-1] == 2., f_beats
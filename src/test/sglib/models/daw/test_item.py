@@ -0,0 +1,224 @@
+from sglib.models.clinttools import MIDIControl, MIDINote, MIDIPitchbend
+from sglib.models.daw import _shared
+from sglib.models.daw.item import item
+import copy
+import random
+
+
+def _item_str(a_lines):
+    return "\n".join(["U|7", f"M|{len(a_lines)}", *a_lines, "\\"])
+
+def test_from_str_drops_overlapping_notes():
+    f_item = item.from_str(
+        _item_str([
+            str(MIDINote(0., 1., 60, 100)),
+            # Overlaps the first note
+            str(MIDINote(0.5, 1., 60, 90)),
+            # Another channel or note number does not overlap
+            str(MIDINote(0.5, 1., 60, 80, channel=1)),
+            str(MIDINote(0.5, 1., 61, 70)),
+            # Starts when the first note ends
+            str(MIDINote(1., 1., 60, 60)),
+            # Out of order, overlaps the start of the first note
+            str(MIDINote(-0.5, 1., 60, 50)),
+            str(MIDINote(-0.5, 0.5, 61, 40)),
+        ]),
+        7,
+    )
+    assert [x.velocity for x in f_item.notes] == [40, 100, 80, 70, 60], [
+        str(x) for x in f_item.notes
+    ]
+
+def test_from_str_drops_duplicate_cc_pb():
+    f_item = item.from_str(
+        _item_str([
+            str(MIDIControl(1., 1, 64.)),
+            str(MIDIPitchbend(0.5, 0.5)),
+            str(MIDIControl(1., 1, 64.)),
+            str(MIDIControl(0., 1, 64.)),
+            str(MIDIPitchbend(0.5, 0.5)),
+            str(MIDIPitchbend(0.5, 0.25)),
+        ]),
+        7,
+    )
+    assert [x.start for x in f_item.ccs] == [0., 1.]
+    assert [x.pb_val for x in f_item.pitchbends] == [0.5, 0.25]
+
+def test_round_trip_and_deduplicate():
+    f_item = item(3)
+    f_item.notes.append(MIDINote(1., 1., 60, 100))
+    f_item.notes.append(MIDINote(0., 1., 62, 100))
+    f_item.notes.append(MIDINote(1., 1., 60, 100))
+    f_item.ccs.append(MIDIControl(0.5, 1, 3.))
+    f_item.pitchbends.append(MIDIPitchbend(0., 0.5))
+    f_str = str(f_item)
+    assert f_str.split("\n") == [
+        "U|3",
+        "M|4",
+        str(MIDINote(0., 1., 62, 100)),
+        str(MIDIPitchbend(0., 0.5)),
+        str(MIDIControl(0.5, 1, 3.)),
+        str(MIDINote(1., 1., 60, 100)),
+        "\\",
+    ], f_str
+    assert [x.start for x in f_item.notes] == [0., 1.]
+    assert str(item.from_str(f_str, 3)) == f_str
+
+def _random_item_str(a_seed, a_count):
+    rand = random.Random(a_seed)
+    f_lines = []
+    for i in range(a_count):
+        f_start = rand.randint(0, 64) / 3.
+        f_type = rand.random()
+        if f_type < 0.6:
+            f_event = MIDINote(
+                f_start,
+                rand.choice([0.1, 0.25, 1., 1 / 3.]),
+                rand.randint(60, 63),
+                rand.randint(1, 127),
+                pan=rand.choice([0., 0.5]),
+                channel=rand.randint(0, 1),
+            )
+        elif f_type < 0.85:
+            f_event = MIDIControl(
+                f_start,
+                rand.randint(1, 2),
+                rand.randint(0, 127),
+                rand.randint(0, 1),
+            )
+        else:
+            f_event = MIDIPitchbend(f_start, rand.uniform(-1., 1.))
+        f_lines.append(str(f_event))
+    return _item_str(f_lines)
+
+def _events(a_item):
+    return [
+        (x.start, x.length, x.end, x.note_num, x.velocity, x.channel)
+        for x in a_item.notes
+    ], [str(x) for x in a_item.ccs + a_item.pitchbends]
+
+def test_pack_unpack():
+    f_item = item.from_str(_random_item_str(0, 300), 7)
+    f_str = str(f_item)
+    f_length = f_item.get_length()
+    f_notes, f_other = _events(f_item)
+    f_item.notes[3].is_selected = True
+    f_item.pack()
+    assert f_item.is_packed()
+    assert f_item.get_length() == f_length
+    assert str(f_item) == f_str
+    assert f_item.is_packed()
+    assert _events(f_item) == (f_notes, f_other)
+    assert not f_item.is_packed()
+    assert f_item.notes[3].is_selected
+
+def test_packed_bulk_edits():
+    for f_seed in range(20):
+        f_str = _random_item_str(f_seed, 200)
+        f_items = [item.from_str(f_str, 7), item.from_str(f_str, 7).pack()]
+        f_results = []
+        for f_item in f_items:
+            f_result = [
+                f_item.transpose(3, a_duplicate=True, channel=1),
+                f_item.velocity_mod(
+                    10, 0, 2., 12., a_line=True, a_end_amt=90),
+                f_item.velocity_mod(-20, 1, a_end_beat=10., a_add=True),
+                f_item.remove_cc_range(1, 0, 2., 10.),
+                f_item.remove_pb_range(5., 15., 0),
+                str(f_item),
+            ]
+            assert f_item.is_packed() == (f_item is f_items[1])
+            f_result.append(f_item.quantize('1/8', 1))
+            f_result.append(str(f_item))
+            f_result.append(_events(f_item))
+            f_results.append(f_result)
+        assert f_results[0] == f_results[1], f_seed
+
+def _fix_overlaps_reference(a_notes):
+    """ The quadratic item.fix_overlaps that the sweep replaced """
+    f_to_delete = []
+    for f_channel in {x.channel for x in a_notes}:
+        f_notes = [x for x in a_notes if x.channel == f_channel]
+        for f_note in f_notes:
+            if f_note in f_to_delete:
+                continue
+            for f_note2 in f_notes:
+                if (
+                    f_note == f_note2
+                    or
+                    f_note2 in f_to_delete
+                    or
+                    f_note.note_num != f_note2.note_num
+                ):
+                    continue
+                if f_note2.start == f_note.start:
+                    if f_note2.length == f_note.length:
+                        f_to_delete.append(f_note2)
+                    elif f_note2.length > f_note.length:
+                        f_note2.length = f_note2.length - f_note.length
+                        f_note2.start = f_note.end
+                        f_note2.set_end()
+                    else:
+                        f_note.length = f_note.length - f_note2.length
+                        f_note.start = f_note2.end
+                        f_note.set_end()
+                elif f_note2.start > f_note.start:
+                    if f_note.end > f_note2.start:
+                        f_note.length = f_note2.start - f_note.start
+                        f_note.set_end()
+    for f_note in a_notes:
+        if f_note.length < _shared.min_note_length:
+            f_to_delete.append(f_note)
+    for f_note in f_to_delete:
+        a_notes.remove(f_note)
+
+def _random_notes(a_seed, a_count):
+    rand = random.Random(a_seed)
+    f_grid = rand.choice([0.25, 1., 1 / 3.])
+    f_result = []
+    for i in range(a_count):
+        if rand.random() < 0.7:
+            f_start = rand.randint(0, a_count // 2) * f_grid
+        else:
+            f_start = rand.uniform(0., a_count // 2 * f_grid)
+        f_note = MIDINote(
+            f_start,
+            rand.choice([0.01, 0.5, 1., 3 * f_grid, rand.uniform(0., 4.)]),
+            rand.randint(60, 61),
+            rand.choice([90, 100, 100]),
+            channel=rand.randint(0, 1),
+        )
+        if rand.random() < 0.3:
+            # Quantized without rounding, like item.quantize
+            f_note.start = rand.randint(0, a_count // 2) * f_grid
+            f_note.set_end()
+        f_result.append(f_note)
+        if rand.random() < 0.1:
+            f_result.append(copy.copy(rand.choice(f_result)))
+    return f_result
+
+def test_fix_overlaps_matches_reference():
+    f_checked = 0
+    for f_seed in range(400):
+        f_notes = _random_notes(f_seed, f_seed % 40)
+        f_expected = copy.deepcopy(f_notes)
+        try:
+            _fix_overlaps_reference(f_expected)
+        except ValueError:
+            # The reference removes a note that it already removed
+            continue
+        f_expected = [
+            (str(x), x.start, x.length, x.end) for x in f_expected
+        ]
+        for f_pack in (False, True):
+            f_item = item(1)
+            f_item.notes = copy.deepcopy(f_notes)
+            if f_pack:
+                f_item.pack()
+            f_item.fix_overlaps()
+            assert f_item.is_packed() == f_pack
+            assert [
+                (str(x), x.start, x.length, x.end) for x in f_item.notes
+            ] == f_expected, (f_seed, f_pack)
+        f_checked += 1
+    assert f_checked > 300, f_checked
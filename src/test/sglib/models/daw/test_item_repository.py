@@ -0,0 +1,57 @@
+from sglib.models.clinttools import MIDINote
+from sglib.models.daw import item
+from sglib.models.daw.item_repository import *
+from sglib.models.daw.project import DawProject, folder_items
+import os
+import random
+import tempfile
+
+
+def _item_str(a_uid, a_count):
+    f_item = item(a_uid)
+    for i in range(a_count):
+        f_item.add_note(MIDINote(i * 0.25, 0.25, 60 + (i % 12), 100))
+    return str(f_item)
+
+def test_each_item_parsed_once():
+    loads = []
+    def _load(uid):
+        loads.append(uid)
+        return _item_str(uid, 16)
+    repo = ItemRepository(_load)
+    rand = random.Random(0)
+    refs = [rand.randint(0, 99) for _ in range(2000)]
+    for uid in refs:
+        assert repo.get_item(uid).uid == uid
+    assert sorted(loads) == sorted(set(refs)), loads
+    stats = repo.stats()
+    assert stats['parses'] == len(set(refs)), stats
+    assert stats['misses'] == len(set(refs)), stats
+    assert stats['hits'] == 2000 - len(set(refs)), stats
+
+def test_copy_does_not_change_cache():
+    repo = ItemRepository(lambda uid: _item_str(uid, 4))
+    shared = repo.get_item(5)
+    assert repo.get_item(5) is shared
+    copy = repo.get_item(5, True)
+    assert copy is not shared
+    copy.notes.clear()
+    assert len(repo.get_item(5).notes) == 4
+    repo.put_item(5, copy)
+    assert repo.get_item(5) is copy
+    assert repo.parses == 1, repo.parses
+
+def test_project_invalidated_on_save_and_undo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = DawProject(False)
+        project.set_project_folders(os.path.join(tmpdir, 'x.project'))
+        project.save_file(folder_items, '3', _item_str(3, 2))
+        project.commit('create')
+        assert len(project.get_item_by_uid(3).notes) == 2
+        project.save_file(folder_items, '3', _item_str(3, 5))
+        project.commit('edit')
+        assert len(project.get_item_by_uid(3).notes) == 5
+        assert project.undo()
+        assert len(project.get_item_by_uid(3).notes) == 2
+        assert project.redo()
+        assert len(project.get_item_by_uid(3).notes) == 5
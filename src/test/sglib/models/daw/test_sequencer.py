@@ -0,0 +1,153 @@
+from sglib.models.daw import sequencer, sequencer_item
+import copy
+import random
+
+
+def _random_items(a_seed, a_count):
+    rand = random.Random(a_seed)
+    return [
+        sequencer_item(
+            rand.randint(0, 4),
+            rand.randint(0, a_count) * 0.5,
+            rand.choice([0.125, 1., 4., 16.]),
+            rand.randint(0, 3),
+            rand.choice([0., 1.]),
+            modified=rand.random() < 0.5,
+        )
+        for _ in range(a_count)
+    ]
+
+def _sequencer(a_items):
+    f_result = sequencer('test')
+    for f_item in a_items:
+        f_result.add_item(f_item)
+    return f_result
+
+def _key(a_item):
+    return (a_item.track_num, a_item.start_beat, a_item.modified)
+
+def _in_range(a_items, a_start, a_end, a_tracks=None):
+    return {
+        x for x in a_items
+        if (a_tracks is None or x.track_num in a_tracks)
+        and
+        (
+            a_start <= x.start_beat < a_end
+            or
+            x.start_beat < a_start < x.start_beat + x.length_beats
+        )
+    }
+
+def _fix_overlaps_reference(a_items):
+    """ The sequencer.fix_overlaps that filtered every item for each track,
+        returns the str of the remaining items
+    """
+    f_items = sorted(dict.fromkeys(a_items))
+    f_to_delete = {x for x in f_items if x.length_beats < 0.25}
+    for f_track in range(5):
+        f_list = sorted(
+            x for x in f_items
+            if x.track_num == f_track and x not in f_to_delete
+        )
+        for f_item, f_next in zip(f_list, f_list[1:]):
+            if f_item.start_beat == f_next.start_beat:
+                f_to_delete.add(f_item)
+                continue
+            if f_item.start_beat + f_item.length_beats > f_next.start_beat:
+                f_length = f_next.start_beat - f_item.start_beat
+                if f_length < 0.25:
+                    f_to_delete.add(f_item)
+                else:
+                    f_item.length_beats = f_length
+    f_to_delete = {str(x) for x in f_to_delete}
+    return sorted(str(x) for x in f_items if str(x) not in f_to_delete)
+
+def test_items_in_range_after_edits():
+    f_items = _random_items(0, 300)
+    f_seq = _sequencer(f_items)
+    rand = random.Random(1)
+    for i in range(200):
+        # Edit the items in place, like the sequencer UI
+        f_item = rand.choice(f_items)
+        f_edit = rand.random()
+        if f_edit < 0.3:
+            f_item.track_num = rand.randint(0, 4)
+        elif f_edit < 0.6:
+            f_item.start_beat += rand.choice([-2., 0.5, 3.])
+        else:
+            f_item.length_beats = rand.choice([0.5, 8., 40.])
+        f_start = rand.uniform(-10., 300.)
+        f_end = f_start + rand.uniform(0., 50.)
+        f_tracks = rand.choice([None, [0], [1, 3]])
+        f_result = f_seq.get_items_in_range(f_start, f_end, f_tracks)
+        assert sorted(f_result, key=_key) == f_result, i
+        assert set(f_result) == _in_range(
+            f_items, f_start, f_end, f_tracks), i
+    assert sorted(map(str, f_seq.items)) == sorted(map(str, f_items))
+
+def test_clear_range_insert_space():
+    f_seq = _sequencer(_random_items(2, 200))
+    f_expected = copy.deepcopy(f_seq.items)
+    f_seq.clear_range([1, 2], 10., 30.)
+    f_seq.insert_space(50., 4.)
+    for f_item in f_expected[:]:
+        if f_item.track_num not in (1, 2):
+            continue
+        f_end = f_item.start_beat + f_item.length_beats
+        if 10. <= f_item.start_beat < 30.:
+            if f_end <= 30.:
+                f_expected.remove(f_item)
+            else:
+                f_item.start_offset += 30. - f_item.start_beat
+                f_item.length_beats = f_end - 30.
+                f_item.start_beat = 30.
+        elif f_item.start_beat < 10. < f_end:
+            f_item.length_beats = 10. - f_item.start_beat
+    for f_item in f_expected:
+        if f_item.start_beat >= 50.:
+            f_item.start_beat += 4.
+    assert sorted(map(str, f_seq.items)) == sorted(map(str, f_expected))
+
+def test_remove_item_ref_and_fix_overlaps():
+    for f_seed in range(20):
+        f_items = _random_items(f_seed, 100)
+        f_seq = _sequencer(copy.deepcopy(f_items))
+        for f_item in f_items[::7]:
+            # An equal copy removes every equal item
+            f_seq.remove_item_ref(copy.deepcopy(f_item))
+            f_items = [x for x in f_items if str(x) != str(f_item)]
+        assert sorted(map(str, f_seq.items)) == sorted(map(str, f_items))
+        f_seq.fix_overlaps()
+        assert sorted(map(str, f_seq.items)) == \
+            _fix_overlaps_reference(f_items), f_seed
+        assert str(sequencer.from_str(str(f_seq))) == str(f_seq)
+
+def test_split():
+    f_seq = _sequencer([
+        sequencer_item(0, 0., 10., 1),
+        sequencer_item(0, 12., 2., 2),
+        sequencer_item(1, 3., 2., 3),
+    ])
+    f_result = f_seq.split([4., 8.], [0])
+    assert [[str(x) for x in y] for y in f_result] == [
+        ["0|0.0|4.0|1|0.0"],
+        ["0|4.0|4.0|1|4.0"],
+        ["0|8.0|2.0|1|8.0", "0|12.0|2.0|2|0.0"],
+    ]
+    assert [str(x) for x in f_seq.items] == [
+        "0|0.0|4.0|1|0.0",
+        "0|12.0|2.0|2|0.0",
+        "1|3.0|2.0|3|0.0",
+    ]
+
+def test_deepcopy():
+    f_seq = _sequencer(_random_items(3, 50))
+    f_copy = copy.deepcopy(f_seq)
+    assert str(f_copy) == str(f_seq)
+    f_item = f_copy.get_items_in_range(0., 1000., [2])[0]
+    f_item.track_num = 4
+    f_item.start_beat = 500.
+    assert f_copy.get_items_in_range(500., 501., [4]) == [f_item]
+    assert not f_seq.get_items_in_range(500., 501., [4])
+    f_copy.remove_item_ref(f_item)
+    assert len(f_copy.items) == len(f_seq.items) - 1
@@ -0,0 +1,63 @@
+from sglib.models.daw import sequencer, tempo_marker
+import numpy
+import random
+
+
+def _sequencer(a_seed):
+    rand = random.Random(a_seed)
+    f_result = sequencer('test')
+    for f_beat in rand.sample(range(1, 200), 10):
+        f_result.set_marker(
+            tempo_marker(
+                f_beat,
+                rand.uniform(60., 180.),
+                rand.randint(2, 7),
+                rand.choice([4, 8]),
+            ),
+        )
+    return f_result
+
+def _seconds(a_markers, a_beat):
+    """ Add the seconds of each beat, one beat at a time """
+    f_result = 0.
+    f_beat = 0
+    while f_beat < a_beat:
+        f_marker = [x for x in a_markers if x.beat <= f_beat][-1]
+        f_result += min(1, a_beat - f_beat) * 60. / f_marker.real_tempo
+        f_beat += 1
+    return f_result
+
+def test_lookups_match_markers():
+    for f_seed in range(5):
+        f_seq = _sequencer(f_seed)
+        f_markers = f_seq.get_tempo_markers()
+        for f_beat in numpy.linspace(0., 250., 101).tolist():
+            f_marker = [x for x in f_markers if x.beat <= f_beat][-1]
+            assert f_seq.get_tempo_at_pos(f_beat) == f_marker.real_tempo
+            assert f_seq.get_tsig_at_pos(f_beat) == f_marker.tsig_num
+            f_seconds = f_seq.get_seconds_at_beat(f_beat)
+            assert abs(f_seconds - _seconds(f_markers, f_beat)) < 1e-9
+            assert abs(f_seq.get_beat_at_seconds(f_seconds) - f_beat) < 1e-9
+
+def test_arrays_match_scalars():
+    f_map = _sequencer(7).get_tempo_map()
+    f_beats = numpy.linspace(-8., 300., 1001)
+    for f_method in (
+        f_map.tempo_at_beat,
+        f_map.tsig_at_beat,
+        f_map.seconds_at_beat,
+        f_map.beat_at_seconds,
+    ):
+        f_result = f_method(f_beats)
+        assert isinstance(f_result, numpy.ndarray)
+        assert f_result.tolist() == [f_method(x) for x in f_beats.tolist()]
+
+def test_rebuilt_when_markers_change():
+    f_seq = sequencer('test')
+    f_map = f_seq.get_tempo_map()
+    assert f_seq.get_tempo_map() is f_map
+    assert f_seq.get_seconds_at_beat(8) == 3.75
+    f_seq.set_marker(tempo_marker(4, 64., 4, 4))
+    assert f_seq.get_seconds_at_beat(8) == 1.875 + 3.75
+    f_seq.delete_marker(f_seq.has_marker(4, 2))
+    assert f_seq.get_seconds_at_beat(8) == 3.75
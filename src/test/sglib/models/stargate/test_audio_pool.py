@@ -1,6 +1,7 @@
 from sglib import constants
 from sglib.models.clinttools.audio_pool import *
 import copy
+import os
 
 POOL_STR = """\
 0|0.0|/path/to/file.wav
@@ -66,3 +67,36 @@ def test_set_per_file_fx():
     pool.set_per_file_fx(fx)
     assert len(pool.per_file_fx) == 2, pool.per_file_fx
 
+
+def test_indexes():
+    constants.PROJECT = MockProject()
+    pool = AudioPool.from_str(POOL_STR_NO_FILE_FX)
+    assert pool.by_uid()[1].path == '/path/to/file2.wav'
+    assert pool.by_path()['/path/to/file.wav'].uid == 0
+    assert pool.next_uid() == 2, pool.next_uid()
+    entry = pool.add_entry(__file__)
+    assert entry.uid == 2, entry
+    assert pool.by_uid()[2] is entry
+    assert pool.by_path()[entry.path] is entry
+    pool.remove_by_uid([2, 1])
+    assert [x.uid for x in pool.pool] == [0], pool.pool
+    assert set(pool.by_uid()) == {0}, pool.by_uid()
+    assert set(pool.by_path()) == {'/path/to/file.wav'}, pool.by_path()
+    # UIDs are not reused while the pool is loaded
+    assert pool.next_uid() == 3, pool.next_uid()
+
+def test_add_existing():
+    constants.PROJECT = MockProject()
+    pool = AudioPool.new()
+    pool.add_entry(__file__)
+    try:
+        pool.add_entry(__file__)
+        assert False, "Did not raise FileExistsError"
+    except FileExistsError:
+        pass
+    try:
+        pool.add_entry(os.path.dirname(__file__), uid=0)
+        assert False, "Did not raise FileExistsError"
+    except FileExistsError:
+        pass
+    assert len(pool.pool) == 1, pool.pool
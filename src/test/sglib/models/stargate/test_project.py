@@ -0,0 +1,226 @@
+from sglib import constants
+from sglib.lib.stretch_cache import StretchCache
+from sglib.models.clinttools.project import SgProject
+import os
+import tempfile
+
+
+def test_audio_pool_cached_and_saved_when_changed():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        os.makedirs(os.path.dirname(project.audio_pool_file))
+        constants.PROJECT = project
+        pool = project.get_audio_pool()
+        assert project.get_audio_pool() is pool
+        entry = pool.add_entry(__file__)
+        project.save_audio_pool(pool)
+        with open(project.audio_pool_file) as f:
+            assert str(entry) in f.read()
+        # Unchanged, not written again
+        os.remove(project.audio_pool_file)
+        project.save_audio_pool(pool)
+        assert not os.path.exists(project.audio_pool_file)
+        entry.volume = -3.
+        project.save_audio_pool(pool)
+        assert os.path.exists(project.audio_pool_file)
+        assert project.get_wav_path_by_uid(entry.uid) == entry.path
+        assert project.get_wav_uid_by_name(__file__, a_cp=False) == entry.uid
+        # Reopening the project reads the pool from disk again
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        reopened = project.get_audio_pool()
+        assert reopened is not pool
+        assert reopened.by_uid()[entry.uid].volume == -3., reopened.pool
+
+def test_import_audio_files_without_engine():
+    from sg_py_vendor import wavefile
+    import numpy
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        for folder in project.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        constants.PROJECT = project
+        constants.IPC_ENABLED = False
+        paths = []
+        for i in range(3):
+            path = os.path.join(tmpdir, f'{i}.wav')
+            with wavefile.WaveWriter(path, channels=2) as f:
+                f.write(numpy.full((2, 44100), 0.25, dtype=numpy.float32))
+            paths.append(path)
+        uids = project.import_audio_files(paths + paths[:1], a_cp=False)
+        assert len(set(uids)) == 3, uids
+        assert uids[0] == uids[3], uids
+        assert project.sample_graph_progress()[1] == 3
+        placeholder = project.get_sample_graph_by_uid(uids[0])
+        assert round(placeholder.length_in_seconds, 1) == 1.0
+        project.sample_graph_batch.wait(10.)
+        assert project.sample_graph_progress() is None
+        graph = project.get_sample_graph_by_uid(uids[0])
+        assert graph is not placeholder
+        assert graph.count > 1, graph.count
+        assert round(float(graph.high_peaks[1][-5]), 3) == 0.25
+        # Without the engine, single files are generated in this process
+        path = os.path.join(tmpdir, 'single.wav')
+        with wavefile.WaveWriter(path) as f:
+            f.write(numpy.zeros((1, 100), dtype=numpy.float32))
+        uid = project.get_wav_uid_by_name(path, a_cp=False)
+        assert project.get_sample_graph_by_uid(uid).is_valid()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        assert project.sample_graph_batch is None
+
+def test_timestretch_audio_items_runs_each_key_once(monkeypatch):
+    from sg_py_vendor import wavefile
+    from sglib.models.clinttools import SgAudioItem
+    from sglib.models.clinttools import project as project_module
+    import numpy
+    import sys
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        for folder in project.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        constants.PROJECT = project
+        constants.IPC_ENABLED = False
+        project.timestretch_cache = {}
+        project.timestretch_reverse_lookup = {}
+        project.stretch_cache = StretchCache(
+            os.path.join(tmpdir, 'cache'),
+            2 ** 20,
+        )
+        # Copies the file, or fails for a stretch of 4.0
+        log = os.path.join(tmpdir, 'log')
+        script = os.path.join(tmpdir, 'stretch')
+        with open(script, 'w') as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import shutil, sys\n"
+                f"open({log!r}, 'a').write(sys.argv[1] + '\\n')\n"
+                "if sys.argv[4] != '-rate=-75.0':\n"
+                "    shutil.copy(sys.argv[1], sys.argv[2])\n"
+            )
+        os.chmod(script, 0o755)
+        monkeypatch.setattr(project_module, 'SOUNDSTRETCH', script)
+        path = os.path.join(tmpdir, 'src.wav')
+        with wavefile.WaveWriter(path, channels=2) as f:
+            f.write(numpy.zeros((2, 4410), dtype=numpy.float32))
+        uid = project.get_wav_uid_by_name(path, a_cp=False)
+        items = [
+            SgAudioItem(uid, a_timestretch_amt=x)
+            for x in (2.0, 3.0, 2.0, 2.0, 3.0)
+        ]
+        progress = []
+        project.timestretch_audio_items(
+            items,
+            lambda *x: progress.append(x),
+        )
+        with open(log) as f:
+            assert len(f.readlines()) == 2
+        assert progress[0] == (0, 2) and progress[-1] == (2, 2), progress
+        uids = [x.uid for x in items]
+        assert len({uid, *uids}) == 3, uids
+        assert uids[0] == uids[2] == uids[3], uids
+        assert uids[1] == uids[4], uids
+        by_uid = project.get_audio_pool().by_uid()
+        for new_uid in set(uids):
+            assert os.path.exists(by_uid[new_uid].path)
+            assert project.timestretch_reverse_lookup[
+                by_uid[new_uid].path
+            ] == path
+        # Cached
+        item = SgAudioItem(uid, a_timestretch_amt=3.0)
+        project.timestretch_audio_item(item)
+        assert item.uid == uids[1], item.uid
+        # The items of the jobs that succeeded are updated
+        items = [
+            SgAudioItem(uid, a_timestretch_amt=x)
+            for x in (4.0, 5.0)
+        ]
+        try:
+            project.timestretch_audio_items(items)
+            assert False, "Did not raise"
+        except FileNotFoundError:
+            pass
+        assert items[0].uid == uid, items[0].uid
+        assert items[1].uid not in (uid, *uids), items[1].uid
+        assert len(project.timestretch_cache) == 3, project.timestretch_cache
+        # Another project finds the stretched file in the StretchCache
+        # without running the program again
+        other = SgProject()
+        other.set_project_folders(os.path.join(tmpdir, 'other.project'))
+        for folder in other.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        constants.PROJECT = other
+        other.timestretch_cache = {}
+        other.timestretch_reverse_lookup = {}
+        other.stretch_cache = project.stretch_cache
+        other_uid = other.get_wav_uid_by_name(path, a_cp=False)
+        item = SgAudioItem(other_uid, a_timestretch_amt=2.0)
+        other.timestretch_audio_items([item])
+        with open(log) as f:
+            assert len(f.readlines()) == 4
+        new_path = other.get_wav_path_by_uid(item.uid)
+        assert new_path.startswith(other.timestretch_folder), new_path
+        with open(new_path, 'rb') as f, open(path, 'rb') as g:
+            assert f.read() == g.read()
+        project.stretch_cache.close()
+
+def test_stretch_dicts_saved_and_opened():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        for folder in project.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        key = (3, 2.0, -1.5, 2.0, -1.5, 5, '/a|b/src.wav')
+        project.timestretch_cache = {key: 7}
+        project.timestretch_reverse_lookup = {'/dest/7.wav': '/a|b/src.wav'}
+        project.save_stretch_dicts()
+        project.open_stretch_dicts()
+        assert project.timestretch_cache == {key: 7}
+        assert project.timestretch_reverse_lookup == {
+            '/dest/7.wav': '/a|b/src.wav',
+        }
+
+def test_legacy_stretch_dicts_opened():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        for folder in project.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        # Without the crispness
+        with open(project.pystretch_file, 'w') as f:
+            f.write(
+                '3|2.0|-1.5|2.0|-1.5|/a|b/src.wav|||7\n'
+                '6|4.0|0.0|4.0|0.0|/src.wav|||8\n'
+                '\\'
+            )
+        with open(project.pystretch_map_file, 'w') as f:
+            f.write('\\')
+        project.open_stretch_dicts()
+        assert project.timestretch_cache == {
+            (3, 2.0, -1.5, 2.0, -1.5, 5, '/a|b/src.wav'): 7,
+            (6, 4.0, 0.0, 4.0, 0.0, 5, '/src.wav'): 8,
+        }
+
+def test_create_backup_excludes_undo_journal():
+    import tarfile
+    from sglib.lib.history import JOURNAL_FILE_NAME
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = SgProject()
+        project.set_project_folders(os.path.join(tmpdir, 'test.project'))
+        for folder in project.project_folders:
+            os.makedirs(folder, exist_ok=True)
+        daw = os.path.join(project.projects_folder, 'daw')
+        os.makedirs(daw, exist_ok=True)
+        for name in (JOURNAL_FILE_NAME, 'routing.txt'):
+            with open(os.path.join(daw, name), 'w') as f:
+                f.write(name)
+        assert project.create_backup('test')
+        backups = os.listdir(project.backups_folder)
+        assert len(backups) == 1, backups
+        with tarfile.open(
+            os.path.join(project.backups_folder, backups[0]),
+        ) as f_tar:
+            names = [os.path.basename(x) for x in f_tar.getnames()]
+        assert 'routing.txt' in names, names
+        assert JOURNAL_FILE_NAME not in names, names
@@ -0,0 +1,245 @@
+from sglib.models.clinttools.sample_graph import *
+import numpy
+import os
+import tempfile
+
+SAMPLE_GRAPH_STR = """\
+meta|filename|/path/to/file.wav
+meta|timestamp|1639711027
+meta|channels|2
+meta|frame_count|48
+meta|sample_rate|44100
+meta|length|0.001088
+p|0|h|0.5
+p|0|l|-0.25
+p|1|h|1.5
+p|1|l|-0.005
+p|0|h|0.001
+p|0|l|-0.75
+p|1|h|0.2
+p|1|l|-0.3
+p|0|h|0.9
+p|0|l|-0.1
+p|1|h|0.4
+p|1|l|-0.6
+meta|count|3
+\\"""
+
+def _sample_graph_file(tmpdir):
+    path = os.path.join(tmpdir, '0')
+    with open(path, 'w') as f:
+        f.write(SAMPLE_GRAPH_STR)
+    return path
+
+def test_convert_text_to_binary():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _sample_graph_file(tmpdir)
+        graph = SampleGraph(path, tmpdir)
+        assert graph.is_valid()
+        assert os.path.isfile(sample_graph_binary_path(path))
+        assert isinstance(graph.peaks, numpy.memmap), type(graph.peaks)
+        assert graph.channels == 2, graph.channels
+        assert graph.count == 3, graph.count
+        assert graph.frame_count == 48, graph.frame_count
+        assert graph.sample_rate == 44100, graph.sample_rate
+        assert graph._file == '/path/to/file.wav', graph._file
+        assert round(graph.peak, 3) == 1.5, graph.peak
+        assert numpy.allclose(graph.high_peaks[0], [0.5, 0.01, 0.9])
+        assert numpy.allclose(graph.high_peaks[1], [0.99, 0.2, 0.4])
+        # Low peaks are stored in reverse order, as they always have been
+        assert numpy.allclose(graph.low_peaks[0], [-0.1, -0.75, -0.25])
+        assert numpy.allclose(graph.low_peaks[1], [-0.6, -0.3, -0.01])
+
+def test_binary_matches_text():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _sample_graph_file(tmpdir)
+        converted = SampleGraph(path, tmpdir)
+        # The engine does not regenerate existing graphs, but the binary
+        # must also be readable without the text version
+        os.remove(path)
+        graph = SampleGraph(path, tmpdir)
+        assert graph.is_valid()
+        assert graph.timestamp == converted.timestamp
+        assert graph.length_in_seconds == converted.length_in_seconds
+        for ch in range(2):
+            assert numpy.array_equal(
+                graph.high_peaks[ch],
+                converted.high_peaks[ch],
+            )
+            assert numpy.array_equal(
+                graph.low_peaks[ch],
+                converted.low_peaks[ch],
+            )
+
+def test_stale_binary_is_replaced():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _sample_graph_file(tmpdir)
+        SampleGraph(path, tmpdir)
+        binary_path = sample_graph_binary_path(path)
+        mtime = os.path.getmtime(path)
+        os.utime(binary_path, (mtime - 10., mtime - 10.))
+        with open(path, 'w') as f:
+            f.write(SAMPLE_GRAPH_STR.replace('p|0|h|0.5', 'p|0|h|0.6'))
+        graph = SampleGraph(path, tmpdir)
+        assert round(float(graph.high_peaks[0][0]), 3) == 0.6, graph.peaks
+
+def test_remove_item_from_sg_cache():
+    clear_sample_graph_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = _sample_graph_file(tmpdir)
+        graph = SampleGraph.create(path, tmpdir)
+        assert SampleGraph.create(path, tmpdir) is graph
+        del graph
+        remove_item_from_sg_cache(path)
+        assert not os.path.exists(path)
+        assert not os.path.exists(sample_graph_binary_path(path))
+
+def test_missing_file_is_invalid():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        graph = SampleGraph(os.path.join(tmpdir, '1'), tmpdir)
+        assert not graph.is_valid()
+
+def test_level_counts():
+    assert sample_graph_level_counts(3) == [3]
+    assert sample_graph_level_counts(0) == [0]
+    counts = sample_graph_level_counts(1001)
+    assert counts[:3] == [1001, 501, 251], counts
+    assert counts[-1] <= SAMPLE_GRAPH_MIN_LEVEL_COUNT, counts
+    assert counts[-2] > SAMPLE_GRAPH_MIN_LEVEL_COUNT, counts
+
+def test_reduce_level():
+    peaks = numpy.array(
+        [[[0.1, 0.5, 0.3], [-0.2, -0.1, -0.7]]],
+        dtype=numpy.float32,
+    )
+    result = reduce_sample_graph_level(peaks)
+    assert numpy.allclose(result, [[[0.5, 0.3], [-0.2, -0.7]]]), result
+
+def test_peaks_for_width():
+    lines = SAMPLE_GRAPH_STR.split("\n")
+    peaks = []
+    for i in range(200):
+        val = (i % 10) / 10.
+        peaks.extend([
+            f"p|0|h|{val}",
+            f"p|0|l|{-val}",
+            f"p|1|h|{val}",
+            f"p|1|l|{-val}",
+        ])
+    _str = "\n".join(lines[:6] + peaks + ["meta|count|200", "\\"])
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, '0')
+        with open(path, 'w') as f:
+            f.write(_str)
+        graph = SampleGraph(path, tmpdir)
+        assert [len(x[0][0]) for x in graph.levels] == [200, 100, 50, 25]
+        high, low = graph.peaks_for_width(40)
+        assert len(high[0]) == 50, len(high[0])
+        assert len(low[0]) == 50, len(low[0])
+        assert numpy.allclose(high[0][:5], [0.3, 0.7, 0.9, 0.5, 0.9])
+        assert numpy.allclose(low[0][-5:], [-0.9, -0.5, -0.9, -0.7, -0.3])
+        high, low = graph.peaks_for_width(10)
+        assert len(high[0]) == 25, len(high[0])
+        high, low = graph.peaks_for_width(1000)
+        assert high is graph.high_peaks
+
+def _wav_file(tmpdir, name, samples, sample_rate=44100):
+    from sg_py_vendor import wavefile
+    path = os.path.join(tmpdir, name)
+    samples = numpy.asarray(samples, dtype=numpy.float32)
+    with wavefile.WaveWriter(
+        path,
+        channels=samples.shape[0],
+        samplerate=sample_rate,
+    ) as f:
+        f.write(samples)
+    return path
+
+def test_generate_sample_graph():
+    samples = numpy.zeros((2, 100), dtype=numpy.float32)
+    samples[0][10] = 0.5
+    samples[1][50] = -0.25
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wav = _wav_file(tmpdir, 'test.wav', samples)
+        path = os.path.join(tmpdir, '0')
+        # 100 frames + 12 samples of padding, 16 samples per peak
+        assert generate_sample_graph(wav, path) == 7
+        # Written directly in the binary format
+        assert not os.path.exists(path)
+        assert os.path.isfile(sample_graph_binary_path(path))
+        graph = SampleGraph(path, tmpdir)
+        assert graph.peak == 0.5, graph.peak
+        assert graph.is_valid()
+        assert graph.count == 7, graph.count
+        assert graph.channels == 2, graph.channels
+        assert graph.frame_count == 112, graph.frame_count
+        assert graph._file == wav, graph._file
+        # The engine pads the start with 32 samples of silence
+        assert numpy.allclose(
+            graph.high_peaks[0],
+            [0.01, 0.01, 0.5, 0.01, 0.01, 0.01, 0.01],
+        ), graph.high_peaks[0]
+        assert numpy.allclose(
+            graph.low_peaks[1][::-1],
+            [-0.01, -0.01, -0.01, -0.01, -0.01, -0.25, -0.01],
+        ), graph.low_peaks[1]
+
+def test_generate_sample_graph_blocks():
+    # Longer than one block, the result must not depend on block size
+    samples = numpy.sin(
+        numpy.arange(44100 * 4, dtype=numpy.float32) * 0.001,
+    ).reshape((1, -1))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wav = _wav_file(tmpdir, 'test.wav', samples)
+        path = os.path.join(tmpdir, '0')
+        count = generate_sample_graph(wav, path)
+        peak_size = sample_graph_peak_size(44100 * 4 + 12, 44100)
+        assert count == -(-(44100 * 4 + 12) // peak_size), count
+        graph = SampleGraph(path, tmpdir)
+        padded = numpy.concatenate(
+            (numpy.zeros(32, dtype=numpy.float32), samples[0]),
+        )[:44100 * 4 + 12]
+        padded = numpy.concatenate(
+            (padded, numpy.zeros(count * peak_size - len(padded))),
+        )
+        expected = numpy.maximum(
+            padded.reshape((count, peak_size)).max(axis=1),
+            0.01,
+        )
+        assert numpy.allclose(
+            graph.high_peaks[0],
+            numpy.clip(expected, 0.01, 0.99),
+            atol=0.001,
+        )
+
+def test_sample_graph_batch():
+    clear_sample_graph_cache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        batch = SampleGraphBatch(tmpdir, 2)
+        wavs = [
+            _wav_file(
+                tmpdir,
+                f'{i}.wav',
+                numpy.full((1, 4410 * (i + 1)), 0.5),
+            )
+            for i in range(4)
+        ]
+        for uid, wav in enumerate(wavs):
+            placeholder = batch.add(uid, wav, os.path.join(tmpdir, str(uid)))
+            assert placeholder.count == 1
+            assert round(placeholder.length_in_seconds, 2) == (uid + 1) / 10.
+        assert batch.placeholder(0) is not None
+        assert batch.progress()[1] == 4
+        done = batch.wait(10.)
+        assert sorted(x for x, _ in done) == [0, 1, 2, 3], done
+        assert batch.is_finished()
+        assert batch.progress() == (4, 4), batch.progress()
+        assert batch.placeholder(0) is None
+        for uid, graph in done:
+            assert graph.is_valid()
+            assert round(float(graph.high_peaks[0][-2]), 3) == 0.5
+            assert SampleGraph.create(
+                os.path.join(tmpdir, str(uid)),
+                tmpdir,
+            ) is graph
+        batch.shutdown()
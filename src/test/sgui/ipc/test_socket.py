@@ -0,0 +1,104 @@
+from sgui.ipc import socket as socket_ipc
+from sgui.ipc.socket import (
+    IPC_BATCH_HEADER,
+    IPC_MAX_BATCH_SIZE,
+    SocketIPCTransport,
+)
+import socket
+import threading
+import time
+
+
+class _Engine:
+    """ Receives datagrams on a local UDP port and acknowledges them """
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.datagrams = []
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def _receive(self):
+        while True:
+            data, address = self.socket.recvfrom(65536)
+            self.datagrams.append(data)
+            self.socket.sendto(b"Message received", address)
+
+    def messages(self):
+        """ The messages of the received datagrams, unpacked """
+        result = []
+        for data in self.datagrams:
+            if not data.startswith(IPC_BATCH_HEADER):
+                result.append(data)
+                continue
+            data = data[len(IPC_BATCH_HEADER):]
+            while data:
+                size, data = data.split(b"\n", 1)
+                result.append(data[:int(size)])
+                data = data[int(size):]
+        return result
+
+def test_pack():
+    assert SocketIPCTransport.pack([]) == []
+    assert SocketIPCTransport.pack([b"a\nb\nc"]) == [b"a\nb\nc"]
+    assert SocketIPCTransport.pack([b"a\nb\nc", b"d\ne\nf"]) == [
+        IPC_BATCH_HEADER + b"5\na\nb\nc5\nd\ne\nf",
+    ]
+    messages = [bytes([65 + i % 26]) * 1000 for i in range(150)]
+    datagrams = SocketIPCTransport.pack(messages)
+    assert len(datagrams) == 3, [len(x) for x in datagrams]
+    assert all(len(x) <= IPC_MAX_BATCH_SIZE for x in datagrams)
+    unpacked = []
+    for datagram in datagrams:
+        data = datagram[len(IPC_BATCH_HEADER):]
+        while data:
+            size, data = data.split(b"\n", 1)
+            unpacked.append(data[:int(size)])
+            data = data[int(size):]
+    assert unpacked == messages
+
+def test_coalesce_and_order(monkeypatch):
+    engine = _Engine()
+    # Hold the send thread while messages are queued
+    release = threading.Event()
+    monkeypatch.setattr(
+        socket_ipc.SAVE_QUEUE,
+        'wait',
+        lambda *args, **kwargs: release.wait(5.),
+    )
+    transport = SocketIPCTransport(port=engine.port)
+    transport.send("p", "first", "")
+    time.sleep(0.05)
+    transport.send("p", "pc", "1|2|0.5")
+    transport.send("p", "co", "1|x|y")
+    transport.send("p", "pc", "1|3|0.5")
+    transport.send("p", "pc", "1|2|0.7")
+    transport.send("p", "co", "1|x|y")
+    release.set()
+    assert transport.flush(5.)
+    assert engine.messages() == [
+        b"p\nfirst\n",
+        b"p\nco\n1|x|y",
+        b"p\npc\n1|3|0.5",
+        # Replaced, in the order of the latest message
+        b"p\npc\n1|2|0.7",
+        # Not coalesced
+        b"p\nco\n1|x|y",
+    ], engine.messages()
+
+def test_flush_waits_for_messages_being_sent(monkeypatch):
+    engine = _Engine()
+    # The project files take a while to save
+    monkeypatch.setattr(
+        socket_ipc.SAVE_QUEUE,
+        'wait',
+        lambda *args, **kwargs: time.sleep(0.3) or True,
+    )
+    transport = SocketIPCTransport(port=engine.port)
+    transport.send("p", "exit", "")
+    # The send thread has taken the message from the queue
+    time.sleep(0.1)
+    assert not transport._queue
+    assert transport.flush(5.)
+    assert engine.messages() == [b"p\nexit\n"]